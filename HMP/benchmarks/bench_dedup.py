@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark de deduplicacao: `list.unique` e um loop com `set.add`.
+
+`list.unique` comparava cada item com a lista dos ja vistos (O(n^2)); agora
+usa a chave canonica de `hmp.runtime.sets` em um dicionario. O loop com
+`set.has`/`set.add` mede a pertinencia O(1) do `ValueSet` pelo script. Para
+comparacao, o benchmark registra `bench.unique_scan`, uma tool com o
+comportamento antigo.
+
+Uso:
+    python benchmarks/bench_dedup.py
+    python benchmarks/bench_dedup.py 200000
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+UNIQUE = 'CALL TOOL WITH list=${ids} AS unicos'
+
+LOOP = '''
+CALL set.new AS vistos
+SET repetidos TO 0
+FOR EACH id IN ${ids}
+    CALL set.has WITH items=${vistos}, value=${id} AS existe
+    IF ${existe} THEN
+        SET repetidos TO ${repetidos + 1}
+    ENDIF
+    CALL set.add WITH items=${vistos}, value=${id} AS vistos
+ENDFOR
+'''
+
+
+def unique_scan(params, variables):
+    seen = []
+    for item in params.get('list', []):
+        if item not in seen:
+            seen.append(item)
+    return seen
+
+
+def timed(engine: HMPEngine, script: str, ids) -> float:
+    start = time.perf_counter()
+    result = engine.execute(script, {'ids': ids})
+    elapsed = time.perf_counter() - start
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    rng = random.Random(1)
+    print(f"{'n':>8} | {'unique (varredura)':>18} | {'unique':>9} | {'loop set.add':>12}")
+    for n in sizes:
+        ids = [f"INC-{rng.randrange(n // 4)}" for _ in range(n)]
+        engine = HMPEngine(config=HMPConfig(max_iterations=4 * n + 100))
+        engine.registry.register_legacy('bench.unique_scan', unique_scan)
+        # A varredura fica impraticavel acima de ~50k itens
+        scan = timed(engine, UNIQUE.replace('TOOL', 'bench.unique_scan'), ids) if n <= 50_000 else None
+        unique = timed(engine, UNIQUE.replace('TOOL', 'list.unique'), ids)
+        loop = timed(engine, LOOP, ids)
+        scan_text = f"{scan:17.3f}s" if scan is not None else f"{'-':>18}"
+        print(f"{n:>8} | {scan_text} | {unique:8.3f}s | {loop:11.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark de execute_many (pool de processos) contra execucao sequencial.
+
+Roda um script CPU-bound (Fibonacci iterativo) com entradas diferentes em
+sequencia e com `execute_many` em 2, 4 e `os.cpu_count()` processos. O ganho
+depende do numero de nucleos da maquina.
+
+Uso:
+    python benchmarks/bench_execute_many.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+SCRIPT = '''
+FUNCTION fib(n)
+    SET a TO 0
+    SET b TO 1
+    LOOP ${n} TIMES
+        SET t TO ${a + b}
+        SET a TO ${b}
+        SET b TO ${t}
+    ENDLOOP
+    RETURN ${a}
+ENDFUNCTION
+SET soma TO 0
+LOOP 20 TIMES
+    CALL fib WITH n=${n} AS r
+    SET soma TO ${soma + r}
+ENDLOOP
+'''
+
+JOBS = [{'n': 200 + i % 50} for i in range(400)]
+
+
+def main():
+    engine = HMPEngine(config=HMPConfig(max_loop_iterations=10**6))
+
+    start = time.perf_counter()
+    expected = [engine.execute(SCRIPT, job) for job in JOBS]
+    sequential = time.perf_counter() - start
+    print(f"{'sequencial':>12}: {sequential:.3f}s")
+
+    for workers in sorted({2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        results = [result for _, result in engine.execute_many(JOBS, workers=workers, script=SCRIPT)]
+        elapsed = time.perf_counter() - start
+        if results != expected:
+            raise AssertionError(f"Resultados diferentes com {workers} processos")
+        print(f"{workers:>3} processos: {elapsed:.3f}s ({sequential / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark de atribuicoes e leituras dentro de funcoes recursivas.
+
+Desce N niveis de recursao e, no fundo, roda dois FOR EACH aninhados que
+leem e atribuem variaveis locais. Com os slots resolvidos antes da execucao
+o custo por iteracao nao deve depender da profundidade da pilha.
+
+Uso:
+    python benchmarks/bench_frames.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+ITEMS = 100
+
+SCRIPT = f'''
+FUNCTION desce(n)
+    IF ${{n}} > 0 THEN
+        CALL desce WITH n=${{n - 1}}
+        RETURN ${{last_result}}
+    ENDIF
+    SET total TO 0
+    SET itens TO {list(range(ITEMS))}
+    FOR EACH a IN ${{itens}}
+        FOR EACH b IN ${{itens}}
+            SET total TO ${{total + a + b}}
+        ENDFOR
+    ENDFOR
+    RETURN ${{total}}
+ENDFUNCTION
+
+CALL desce WITH n=DEPTH
+'''
+
+
+def measure(engine: HMPEngine, depth: int, repeat: int = 3) -> float:
+    """Retorna o melhor tempo por iteracao interna (em microssegundos)."""
+    script = SCRIPT.replace('DEPTH', str(depth))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = engine.execute(script)
+        elapsed = time.perf_counter() - start
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        best = min(best, elapsed)
+    return best / (ITEMS * ITEMS) * 1e6
+
+
+def main():
+    engine = HMPEngine(config=HMPConfig(max_nested_depth=1000, max_loop_iterations=10**6))
+    print(f"{'profundidade':>12} | {'us/iteracao':>12}")
+    print("-" * 27)
+    for depth in (0, 10, 50, 150):
+        print(f"{depth:>12} | {measure(engine, depth):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parser incremental (edicao de buffers grandes no REPL).
+
+Gera workflows de 1k, 5k e 10k linhas (os mesmos blocos de
+bench_tokenizer.py) e compara `Parser.parse` com `IncrementalParser.parse`
+depois de editar uma linha no meio do buffer e depois de inserir uma linha
+no inicio (o que desloca os numeros de linha de todo o resto).
+
+Uso:
+    python benchmarks/bench_incremental.py
+    python benchmarks/bench_incremental.py 20000
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_tokenizer import best, generate
+from hmp.parser.incremental import IncrementalParser
+from hmp.parser.parser import Parser
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 5_000, 10_000]
+    for size in sizes:
+        source = generate(size)
+        lines = source.split('\n')
+        middle = len(lines) // 2
+        edited = lines[:middle] + [lines[middle] + '  # editado'] + lines[middle + 1:]
+        inserted = ['SET novo TO 1'] + edited
+        edited, inserted = '\n'.join(edited), '\n'.join(inserted)
+
+        full = best(lambda: Parser(edited).parse())
+        parser = IncrementalParser()
+        first = timed(lambda: parser.parse(source))
+        edit = timed(lambda: parser.parse(edited))
+        insert = timed(lambda: parser.parse(inserted))
+
+        print(f"{len(lines):,} linhas")
+        print(f"  parse completo:        {full * 1000:7.1f} ms")
+        print(f"  incremental (inicial): {first * 1000:7.1f} ms")
+        print(f"  editar uma linha:      {edit * 1000:7.1f} ms")
+        print(f"  inserir no inicio:     {insert * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de acumulacao em listas com `list.push` e `list.set`.
+
+O padrao idiomatico `CALL list.push WITH list=${xs}, value=... AS xs` em um
+loop copiava a lista inteira a cada iteracao (O(n^2) no total). Com o
+vetor persistente (`hmp.runtime.persistent.PersistentVector`) cada push
+copia so o caminho ate a ultima folha, e quando a lista nao tem outro alias
+o push altera a propria lista (hmp.runtime.inplace). A coluna "push (vetor)"
+mantem um alias (`AS ys` + `SET xs TO ${ys}`) para medir so o vetor. Para
+comparacao, o benchmark registra `bench.push_copy`, uma tool com o
+comportamento antigo (copia + append).
+
+Uso:
+    python benchmarks/bench_list_accumulate.py
+    python benchmarks/bench_list_accumulate.py 200000
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+PUSH = '''
+SET xs TO []
+LOOP N TIMES
+    CALL TOOL WITH list=${xs}, value=1 AS xs
+ENDLOOP
+'''
+
+PUSH_ALIASED = '''
+SET xs TO []
+LOOP N TIMES
+    CALL list.push WITH list=${xs}, value=1 AS ys
+    SET xs TO ${ys}
+ENDLOOP
+'''
+
+SET = '''
+SET i TO 0
+LOOP N TIMES
+    CALL list.set WITH list=${xs}, index=${i}, value=0 AS xs
+    SET i TO ${i + 1}
+ENDLOOP
+'''
+
+
+def push_copy(params, variables):
+    items = params.get('list', [])
+    result = list(items)
+    result.append(params.get('value'))
+    return result
+
+
+def timed(engine: HMPEngine, script: str, initial_vars=None) -> float:
+    start = time.perf_counter()
+    result = engine.execute(script, initial_vars)
+    elapsed = time.perf_counter() - start
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000, 100_000]
+    print(f"{'n':>8} | {'push (copia)':>12} | {'push (vetor)':>12} | {'push':>9} | {'set':>9}")
+    for n in sizes:
+        engine = HMPEngine(config=HMPConfig(max_iterations=4 * n + 100))
+        engine.registry.register_legacy('bench.push_copy', push_copy)
+        script = PUSH.replace('N TIMES', f'{n} TIMES')
+        # A versao com copia fica impraticavel acima de ~50k elementos
+        copy = timed(engine, script.replace('TOOL', 'bench.push_copy')) if n <= 50_000 else None
+        aliased = timed(engine, PUSH_ALIASED.replace('N TIMES', f'{n} TIMES'))
+        push = timed(engine, script.replace('TOOL', 'list.push'))
+        update = timed(engine, SET.replace('N TIMES', f'{n} TIMES'), {'xs': [1] * n})
+        copy_text = f"{copy:11.3f}s" if copy is not None else f"{'-':>12}"
+        print(f"{n:>8} | {copy_text} | {aliased:11.3f}s | {push:8.3f}s | {update:8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
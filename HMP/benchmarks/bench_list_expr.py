@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark das tools de lista com expressao (`list.map`, `list.filter_by`, ...).
+
+Compara a transformacao de registros com FOR EACH (um comando, uma checagem
+de limite e um `list.push` por item) com uma unica chamada de tool que
+compila a expressao uma vez e a aplica a lista inteira.
+
+Uso:
+    python benchmarks/bench_list_expr.py
+    python benchmarks/bench_list_expr.py 200000
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+CASES = {
+    'map': (
+        '''
+        SET out TO []
+        FOR EACH item IN ${records}
+            CALL list.push WITH list=${out}, value=${item['score'] * 2} AS out
+        ENDFOR
+        ''',
+        '''CALL list.map WITH list=${records}, expr="item['score'] * 2" AS out''',
+    ),
+    'filter': (
+        '''
+        SET out TO []
+        FOR EACH item IN ${records}
+            IF ${item['score'] > 50} THEN
+                CALL list.push WITH list=${out}, value=${item} AS out
+            ENDIF
+        ENDFOR
+        ''',
+        '''CALL list.filter_by WITH list=${records}, expr="item['score'] > 50" AS out''',
+    ),
+    'reduce': (
+        '''
+        SET out TO 0
+        FOR EACH item IN ${records}
+            SET out TO ${out + item['score']}
+        ENDFOR
+        ''',
+        '''CALL list.reduce WITH list=${records}, expr="acc + item['score']", initial=0 AS out''',
+    ),
+}
+
+
+def timed(engine: HMPEngine, script: str, records) -> float:
+    start = time.perf_counter()
+    result = engine.execute(script, {'records': records})
+    elapsed = time.perf_counter() - start
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = [{'id': i, 'score': i % 100, 'team': f"t{i % 7}"} for i in range(n)]
+    print(f"{n} registros")
+    print(f"{'backend':>8} | {'caso':>7} | {'FOR EACH':>9} | {'tool':>8} | {'ganho':>6}")
+    for backend in ('tree', 'vm', 'python'):
+        engine = HMPEngine(config=HMPConfig(backend=backend, max_iterations=4 * n + 100))
+        for case, (loop, tool) in CASES.items():
+            slow = timed(engine, loop, records)
+            fast = timed(engine, tool, records)
+            print(f"{backend:>8} | {case:>7} | {slow:8.3f}s | {fast:7.3f}s | {slow / fast:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de tokens, AST e programas preparados.
+
+Mede com `tracemalloc` os bytes alocados (e mantidos vivos) pela lista de
+tokens, pela AST parseada com slots resolvidos e pelo `PreparedProgram` de um
+workflow gerado, e divide pelo numero de tokens e de comandos (contando os
+aninhados).
+
+Uso:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py 50000
+"""
+
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.engine import HMPEngine
+from hmp.core.resolver import resolve_program
+from hmp.parser.parser import Parser
+from hmp.parser.tokenizer import Tokenizer
+
+BLOCK = '''# etapa {i}
+FUNCTION etapa_{i}(itens, limite)
+    SET total TO 0
+    FOR EACH item IN ${{itens}}
+        IF ${{item["valor"] > limite}} THEN
+            SET total TO ${{total + item["valor"]}}
+        ELSE
+            CALL log.print WITH message="ignorado: ${{item}}"
+        ENDIF
+    ENDFOR
+    RETURN ${{total}}
+ENDFUNCTION
+SET dados_{i} TO [{i}, 2, 3]
+CALL etapa_{i} WITH itens=${{dados_{i}}}, limite=10 AS resultado_{i}
+'''
+
+
+def count_statements(statements) -> int:
+    total = 0
+    for statement in statements:
+        total += 1
+        for name in ('body', 'else_body', 'catch_body'):
+            children = getattr(statement, name, None)
+            if children:
+                total += count_statements(children)
+    return total
+
+
+def measure(build):
+    """Bytes mantidos vivos pelo objeto retornado por `build`."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = ''.join(BLOCK.format(i=i) for i in range(max(1, lines // BLOCK.count('\n'))))
+
+    tokens, token_bytes = measure(lambda: Tokenizer(source).tokenize())
+
+    def parse():
+        program = Parser(source).parse()
+        resolve_program(program)
+        return program
+
+    program, ast_bytes = measure(parse)
+    statements = count_statements(program.statements)
+
+    engine = HMPEngine()
+    prepared, prepared_bytes = measure(lambda: engine.compile(source))
+
+    print(f"{source.count(chr(10)):,} linhas, {len(tokens):,} tokens, {statements:,} comandos")
+    print(f"  tokens:              {token_bytes / 1e6:7.2f} MB ({token_bytes / len(tokens):6.1f} bytes/token)")
+    print(f"  AST:                 {ast_bytes / 1e6:7.2f} MB ({ast_bytes / statements:6.1f} bytes/comando)")
+    print(f"  PreparedProgram:     {prepared_bytes / 1e6:7.2f} MB ({prepared_bytes / statements:6.1f} bytes/comando)")
+
+
+if __name__ == '__main__':
+    main()
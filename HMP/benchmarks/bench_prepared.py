@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark de scripts preparados (engine.compile) contra parse a cada execucao.
+
+Roda o mesmo script muitas vezes com entradas diferentes de tres formas:
+parse em toda chamada (cache de programas desligado), `execute` com o cache
+de programas e `PreparedProgram.run` direto.
+
+Uso:
+    python benchmarks/bench_prepared.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+SCRIPT = '''
+FUNCTION classifica(valor)
+    IF ${valor > 100} THEN
+        RETURN "alto"
+    ENDIF
+    IF ${valor > 10} THEN
+        RETURN "medio"
+    ENDIF
+    RETURN "baixo"
+ENDFUNCTION
+
+SET desconto TO ${preco * 0.1}
+SET final TO ${preco - desconto}
+CALL classifica WITH valor=${final} AS faixa
+CALL string.upper WITH text=${faixa} AS rotulo
+SET resumo TO "${rotulo}: ${final}"
+RETURN ${resumo}
+'''
+
+RUNS = 3000
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for i in range(RUNS):
+        result = fn({'preco': i})
+        if not result['success']:
+            raise RuntimeError(result['error'])
+    return time.perf_counter() - start
+
+
+def main():
+    for backend in ("tree", "vm", "python"):
+        cold = HMPEngine(config=HMPConfig(backend=backend, program_cache_size=0))
+        warm = HMPEngine(config=HMPConfig(backend=backend))
+        prepared = warm.compile(SCRIPT)
+
+        parse_each = timed(lambda v: cold.execute(SCRIPT, v))
+        cached = timed(lambda v: warm.execute(SCRIPT, v))
+        direct = timed(prepared.run)
+
+        print(f"[{backend}] {RUNS} execucoes")
+        print(f"  parse a cada execucao: {parse_each:.3f}s ({RUNS / parse_each:,.0f}/s)")
+        print(f"  execute com cache:     {cached:.3f}s ({RUNS / cached:,.0f}/s) - {parse_each / cached:.1f}x")
+        print(f"  PreparedProgram.run:   {direct:.3f}s ({RUNS / direct:,.0f}/s) - {parse_each / direct:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
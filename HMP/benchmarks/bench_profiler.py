@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo do profiler.
+
+Roda o mesmo script (funcao chamada em loop, com uma tool por iteracao) sem
+profiler e com profiler. Sem profiler o tempo deve ficar igual ao do
+interpretador sem os ganchos; com profiler, o custo extra e o das medicoes
+de cada comando, funcao e tool.
+
+Uso:
+    python benchmarks/bench_profiler.py
+    python benchmarks/bench_profiler.py 50000
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.profiler import Profiler
+
+SCRIPT = '''
+FUNCTION incrementa(x)
+    RETURN ${x + 1}
+ENDFUNCTION
+
+SET total TO 0
+LOOP N TIMES
+    SET total TO ${total + 1}
+    CALL incrementa WITH x=${total}
+    CALL math.abs WITH value=${total} AS a
+ENDLOOP
+'''
+
+
+def best(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    engine = HMPEngine(config=HMPConfig(max_iterations=10 * n + 100))
+    prepared = engine.compile(SCRIPT.replace('N TIMES', f'{n} TIMES'))
+
+    plain = best(lambda: engine.run_prepared(prepared))
+    profiler = Profiler()
+    profiled = best(lambda: engine.run_prepared(prepared, profiler=profiler))
+
+    print(f"{n} iteracoes")
+    print(f"  sem profiler: {plain * 1000:8.1f} ms")
+    print(f"  com profiler: {profiled * 1000:8.1f} ms ({profiled / plain:.2f}x)")
+    print()
+    print(profiler.format_table(limit=5))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo por expressao em funcao do numero de variaveis.
+
+Executa o mesmo loop com quantidades crescentes de variaveis globais e
+mostra o tempo medio por avaliacao de expressao. Com a visao de escopo sem
+copia (`ExecutionContext.scope`) o custo deve ficar estavel.
+
+Uso:
+    python benchmarks/bench_scope.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.engine import HMPEngine
+
+ITERATIONS = 20000
+
+SCRIPT = f'''
+SET i TO 0
+LOOP {ITERATIONS} TIMES
+    SET i TO ${{i + 1}}
+ENDLOOP
+'''
+
+FUNCTION_SCRIPT = f'''
+FUNCTION contar(n)
+    SET i TO 0
+    LOOP ${{n}} TIMES
+        SET i TO ${{i + 1}}
+    ENDLOOP
+    RETURN ${{i}}
+ENDFUNCTION
+
+CALL contar WITH n={ITERATIONS}
+'''
+
+
+def _best_time(engine: HMPEngine, script: str, initial_vars: dict, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = engine.execute(script, initial_vars)
+        elapsed = time.perf_counter() - start
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        best = min(best, elapsed)
+    return best
+
+
+def measure(engine: HMPEngine, script: str, num_vars: int, repeat: int = 3) -> float:
+    """
+    Retorna o melhor tempo por expressao (em microssegundos).
+
+    O custo fixo de `execute` (copia das variaveis iniciais e montagem do
+    resultado) e medido com um script vazio e descontado.
+    """
+    initial_vars = {f"var_{n}": n for n in range(num_vars)}
+    fixed = _best_time(engine, 'SET i TO 0', initial_vars, repeat)
+    total = _best_time(engine, script, initial_vars, repeat)
+    return max(total - fixed, 0.0) / ITERATIONS * 1e6
+
+
+def main():
+    engine = HMPEngine()
+    print(f"{'variaveis':>10} | {'global (us/expr)':>17} | {'funcao (us/expr)':>17}")
+    print("-" * 52)
+    for num_vars in (10, 1_000, 10_000, 100_000):
+        top = measure(engine, SCRIPT, num_vars)
+        func = measure(engine, FUNCTION_SCRIPT, num_vars)
+        print(f"{num_vars:>10} | {top:>17.2f} | {func:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tokenizador e do parser em scripts grandes gerados.
+
+Gera workflows de 10k, 50k e 100k linhas (funcoes, loops, chamadas de tools,
+strings interpoladas, expressoes e comentarios) e mede o tempo de
+`Tokenizer.tokenize` e de `Parser.parse` (que inclui a tokenizacao).
+
+Uso:
+    python benchmarks/bench_tokenizer.py
+    python benchmarks/bench_tokenizer.py 20000 200000
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.parser.parser import Parser
+from hmp.parser.tokenizer import Tokenizer
+
+BLOCK = '''# etapa {i}
+FUNCTION etapa_{i}(itens, limite)
+    SET total TO 0
+    FOR EACH item IN ${{itens}}
+        IF ${{item["valor"] > limite and item.get("ativo", True)}} THEN
+            SET total TO ${{total + item["valor"] * 1.5}}
+        ELSE
+            CALL log.print WITH message="ignorado: ${{item}}"
+        ENDIF
+    ENDFOR
+    RETURN ${{total}}
+ENDFUNCTION
+
+SET dados_{i} TO [{{"valor": {i}, "ativo": true}}, {{"valor": -2, "ativo": false}}]
+CALL etapa_{i} WITH itens=${{dados_{i}}}, limite=10 AS resultado_{i}
+CALL string.upper WITH text='etapa {i}: ok' AS rotulo_{i}
+'''
+
+LINES_PER_BLOCK = BLOCK.count('\n')
+REPEAT = 3
+
+
+def generate(lines: int) -> str:
+    return ''.join(BLOCK.format(i=i) for i in range(max(1, lines // LINES_PER_BLOCK)))
+
+
+def best(fn) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000]
+    for size in sizes:
+        source = generate(size)
+        lines = source.count('\n')
+        tokens = len(Tokenizer(source).tokenize())
+
+        tokenize = best(lambda: Tokenizer(source).tokenize())
+        parse = best(lambda: Parser(source).parse())
+
+        print(f"{lines:,} linhas, {len(source) / 1e6:.1f} MB, {tokens:,} tokens")
+        print(f"  tokenize: {tokenize:.3f}s ({lines / tokenize:,.0f} linhas/s, {tokens / tokenize:,.0f} tokens/s)")
+        print(f"  parse:    {parse:.3f}s ({lines / parse:,.0f} linhas/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark do backend transpilado para Python contra a VM e o interpretador
+de arvore.
+
+Roda os mesmos scripts nos tres backends, confere que os resultados sao
+identicos e mostra o tempo de cada um. A primeira execucao do backend
+"python" inclui a geracao e a compilacao do codigo; as seguintes usam o
+objeto de codigo em cache.
+
+Uso:
+    python benchmarks/bench_transpiler.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+LIMITS = dict(max_iterations=10**8, max_loop_iterations=10**8, max_nested_depth=200)
+
+SCRIPTS = {
+    "soma numerica": '''
+SET i TO 0
+SET soma TO 0
+WHILE ${i} < 50000
+    SET soma TO ${soma + i * 2 - 1}
+    SET i TO ${i + 1}
+ENDWHILE
+''',
+    "funcao numerica": '''
+FUNCTION soma_quadrados(n)
+    SET total TO 0
+    SET i TO 0
+    WHILE ${i} < ${n}
+        SET total TO ${total + i * i}
+        SET i TO ${i + 1}
+    ENDWHILE
+    RETURN ${total}
+ENDFUNCTION
+LOOP 20 TIMES
+    CALL soma_quadrados WITH n=2000 AS r
+ENDLOOP
+''',
+    "condicionais": '''
+SET pares TO 0
+LOOP 30000 TIMES
+    IF ${loop_index % 2 == 0 and loop_index > 10} THEN
+        SET pares TO ${pares + 1}
+    ENDIF
+ENDLOOP
+''',
+}
+
+
+def measure(backend: str, script: str, repeat: int = 3):
+    """Retorna (primeira execucao, melhor execucao seguinte, resultado) em segundos."""
+    engine = HMPEngine(config=HMPConfig(backend=backend, **LIMITS))
+    start = time.perf_counter()
+    result = engine.execute(script)
+    first = time.perf_counter() - start
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.execute(script)
+        best = min(best, time.perf_counter() - start)
+    return first, best, result
+
+
+def main():
+    print(f"{'script':>16} | {'tree (s)':>9} | {'vm (s)':>9} | {'python 1a (s)':>13} | {'python (s)':>10} | {'ganho':>6}")
+    print("-" * 80)
+    for name, script in SCRIPTS.items():
+        _, tree, tree_result = measure("tree", script)
+        _, vm, vm_result = measure("vm", script)
+        first, py, py_result = measure("python", script)
+        if not (tree_result == vm_result == py_result):
+            raise AssertionError(f"Resultados diferentes em '{name}'")
+        print(f"{name:>16} | {tree:>9.4f} | {vm:>9.4f} | {first:>13.4f} | {py:>10.4f} | {tree / py:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
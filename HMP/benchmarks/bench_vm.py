@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark do backend de bytecode (VM) contra o interpretador de arvore.
+
+Roda os mesmos scripts nos dois backends, confere que os resultados sao
+identicos e mostra o throughput em comandos por segundo.
+
+Uso:
+    python benchmarks/bench_vm.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+
+LIMITS = dict(max_iterations=10**8, max_loop_iterations=10**8, max_nested_depth=200)
+
+SCRIPTS = {
+    "while": '''
+SET i TO 0
+SET soma TO 0
+WHILE ${i} < 20000
+    SET soma TO ${soma + i}
+    SET i TO ${i + 1}
+ENDWHILE
+''',
+    "for each aninhado": '''
+FUNCTION grade(n)
+    SET total TO 0
+    FOR EACH a IN ${n}
+        FOR EACH b IN ${n}
+            IF ${(a + b) % 2 == 0} THEN
+                SET total TO ${total + 1}
+            ENDIF
+        ENDFOR
+    ENDFOR
+    RETURN ${total}
+ENDFUNCTION
+CALL grade WITH n=''' + str(list(range(120))) + ''' AS r
+''',
+    "recursao": '''
+FUNCTION desce(n, acc)
+    SET total TO ${acc}
+    LOOP 20 TIMES
+        SET total TO ${total + 1}
+    ENDLOOP
+    IF ${n} > 0 THEN
+        CALL desce WITH n=${n - 1}, acc=${total}
+    ENDIF
+    RETURN ${total}
+ENDFUNCTION
+LOOP 30 TIMES
+    CALL desce WITH n=40, acc=0 AS r
+ENDLOOP
+''',
+}
+
+
+def measure(backend: str, script: str, repeat: int = 3):
+    """Retorna (melhor tempo em segundos, comandos executados, resultado)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        engine = HMPEngine(config=HMPConfig(backend=backend, **LIMITS))
+        start = time.perf_counter()
+        result = engine.execute(script)
+        best = min(best, time.perf_counter() - start)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+    return best, result
+
+
+def count_statements(script: str) -> int:
+    from hmp.core.context import ExecutionContext
+    engine = HMPEngine(config=HMPConfig(**LIMITS))
+    counter = {}
+    original = ExecutionContext.increment_iteration
+
+    def increment(self, count=1):
+        counter['n'] = counter.get('n', 0) + count
+        original(self, count)
+
+    ExecutionContext.increment_iteration = increment
+    try:
+        engine.execute(script)
+    finally:
+        ExecutionContext.increment_iteration = original
+    return counter.get('n', 0)
+
+
+def main():
+    print(f"{'script':>18} | {'tree (cmd/s)':>13} | {'vm (cmd/s)':>13} | {'ganho':>6}")
+    print("-" * 62)
+    for name, script in SCRIPTS.items():
+        statements = count_statements(script)
+        tree, tree_result = measure("tree", script)
+        vm, vm_result = measure("vm", script)
+        if tree_result != vm_result:
+            raise AssertionError(f"Resultados diferentes em '{name}'")
+        print(f"{name:>18} | {statements / tree:>13,.0f} | {statements / vm:>13,.0f} | {tree / vm:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,8 @@ __author__ = "HMP Team"
 
 from hmp.core.engine import HMPEngine
 from hmp.core.context import ExecutionContext
+from hmp.core.prepared import PreparedProgram
+from hmp.core.session import HMPSession
 from hmp.tools.registry import ToolRegistry
 from hmp.expr.cache import ExpressionCache
 from hmp.expr.evaluator import safe_eval_expr
@@ -17,10 +19,14 @@ from hmp.expr.evaluator import safe_eval_expr
 __all__ = [
     "HMPEngine",
     "ExecutionContext", 
+    "PreparedProgram",
+    "HMPSession",
     "ToolRegistry",
     "ExpressionCache",
     "safe_eval_expr",
     "run_script",
+    "run_file",
+    "compile_script",
     "list_tools",
 ]
 
@@ -36,6 +42,14 @@ def run_script(script: str, context: dict = None) -> dict:
     """Executa um script HMP e retorna o resultado."""
     return _get_engine().execute(script, context)
 
+def run_file(path, context: dict = None) -> dict:
+    """Executa um arquivo .hmp, usando o .hmpc ao lado quando atualizado."""
+    return _get_engine().execute_file(path, context)
+
+def compile_script(script: str) -> "PreparedProgram":
+    """Prepara um script HMP para execucoes repetidas (ver HMPEngine.compile)."""
+    return _get_engine().compile(script)
+
 def list_tools() -> list:
     """Lista todas as tools disponiveis."""
     return _get_engine().registry.list_tools()
@@ -1,11 +1,14 @@
 """CLI principal do HMP."""
 
+import os
 import sys
 import json
+import time
 import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from hmp.core.context import HMPConfig
 from hmp.core.engine import HMPEngine
 
 
@@ -19,7 +22,17 @@ def create_parser() -> argparse.ArgumentParser:
 Exemplos:
   hmp run script.hmp           Executa um script HMP
   hmp run script.hmp -v        Executa com saida detalhada
+  hmp run script.hmp -O 2      Executa com a AST otimizada
+  hmp run script.hmp --profile Mostra o tempo por linha, funcao e tool
+  hmp run script.hmp --profile collapsed --profile-output perfil.txt
+                               Gera pilhas para flamegraph
+  hmp run script.hmp --trace eventos.jsonl --spans spans.jsonl
+                               Grava eventos e spans da execucao
   hmp validate script.hmp      Valida sintaxe de um script
+  hmp validate projetos/ -j 8  Valida todos os .hmp de um diretorio em paralelo
+  hmp run-many 'jobs/**/*.hmp' -j 4 --format jsonl
+                               Executa varios scripts e emite JSON Lines
+  hmp compile projetos/        Gera .hmpc (AST pre-parseada) dos scripts
   hmp tools                    Lista todas as tools disponiveis
   hmp version                  Mostra versao do HMP
   hmp repl                     Inicia modo interativo
@@ -34,9 +47,36 @@ Exemplos:
     run_parser.add_argument('-o', '--output', type=str, help='Arquivo de saida JSON')
     run_parser.add_argument('--var', action='append', nargs=2, metavar=('NOME', 'VALOR'),
                            help='Define variavel inicial')
+    run_parser.add_argument('-O', '--optimize', type=int, choices=(0, 1, 2), default=0, metavar='NIVEL',
+                           help='Nivel de otimizacao da AST (0, 1 ou 2)')
+    run_parser.add_argument('--profile', nargs='?', const='table', choices=('table', 'json', 'collapsed'),
+                           metavar='FORMATO', help='Mede a execucao: table (padrao), json ou collapsed')
+    run_parser.add_argument('--profile-output', type=str, metavar='ARQUIVO',
+                           help='Grava o perfil no arquivo (padrao: stderr)')
+    run_parser.add_argument('--profile-sort', choices=('self', 'cumulative', 'count'), default='self',
+                           help='Ordenacao da tabela e do JSON do perfil')
+    run_parser.add_argument('--trace', type=str, metavar='ARQUIVO',
+                           help='Grava os eventos da execucao em JSON Lines')
+    run_parser.add_argument('--spans', type=str, metavar='ARQUIVO',
+                           help='Grava spans no formato do OpenTelemetry (JSON Lines)')
     
-    validate_parser = subparsers.add_parser('validate', help='Valida sintaxe de um script')
-    validate_parser.add_argument('file', type=str, help='Arquivo HMP a validar')
+    validate_parser = subparsers.add_parser('validate', help='Valida sintaxe de scripts')
+    validate_parser.add_argument('paths', nargs='+', metavar='path',
+                                 help='Arquivo HMP, diretorio (recursivo) ou padrao glob')
+    _add_batch_arguments(validate_parser)
+    
+    run_many_parser = subparsers.add_parser('run-many', help='Executa varios scripts em paralelo')
+    run_many_parser.add_argument('patterns', nargs='+', metavar='glob',
+                                 help='Padroes glob (aceitam **), arquivos ou diretorios')
+    run_many_parser.add_argument('--var', action='append', nargs=2, metavar=('NOME', 'VALOR'),
+                                 help='Define variavel inicial (igual para todos os arquivos)')
+    run_many_parser.add_argument('-O', '--optimize', type=int, choices=(0, 1, 2), default=0, metavar='NIVEL',
+                                 help='Nivel de otimizacao da AST (0, 1 ou 2)')
+    _add_batch_arguments(run_many_parser)
+    
+    compile_parser = subparsers.add_parser('compile', help='Gera arquivos .hmpc com a AST dos scripts')
+    compile_parser.add_argument('path', type=str, help='Diretorio (recursivo) ou arquivo HMP')
+    compile_parser.add_argument('-q', '--quiet', action='store_true', help='Mostra apenas erros e o total')
     
     subparsers.add_parser('tools', help='Lista todas as tools disponiveis')
     subparsers.add_parser('version', help='Mostra versao do HMP')
@@ -45,6 +85,69 @@ Exemplos:
     return parser
 
 
+def _add_batch_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('-j', '--jobs', type=int, default=None, metavar='N',
+                        help='Processos em paralelo (padrao: numero de CPUs)')
+    parser.add_argument('--format', choices=('text', 'jsonl'), default='text',
+                        help='Saida em texto ou JSON Lines (um objeto por arquivo e um resumo)')
+
+
+def _parse_vars(pairs: Optional[List[List[str]]]) -> Dict[str, Any]:
+    initial_vars = {}
+    for name, value in pairs or ():
+        try:
+            initial_vars[name] = json.loads(value)
+        except json.JSONDecodeError:
+            initial_vars[name] = value
+    return initial_vars
+
+
+def _report_batch(
+    reports: Iterator[Tuple[int, Dict[str, Any]]],
+    fmt: str,
+    jobs: Optional[int],
+    detail: Callable[[Dict[str, Any]], str]
+) -> int:
+    """Imprime o relatorio de cada arquivo e o resumo; retorna o codigo de saida."""
+    start = time.perf_counter()
+    total = failed = 0
+    busy_ms = 0.0
+    slowest: Optional[Dict[str, Any]] = None
+    
+    for _, report in reports:
+        total += 1
+        failed += not report['success']
+        busy_ms += report['time_ms']
+        if slowest is None or report['time_ms'] > slowest['time_ms']:
+            slowest = report
+        if fmt == 'jsonl':
+            print(json.dumps(report, ensure_ascii=False, default=str), flush=True)
+        elif report['success']:
+            print(f"  OK    {report['time_ms']:8.1f} ms  {report['file']}{detail(report)}")
+        else:
+            print(f"  ERRO  {report['time_ms']:8.1f} ms  {report['file']}: {report['error']}")
+    
+    summary = {
+        'files': total,
+        'ok': total - failed,
+        'errors': failed,
+        'wall_s': round(time.perf_counter() - start, 3),
+        'busy_s': round(busy_ms / 1000, 3),
+        'mean_ms': round(busy_ms / total, 3) if total else 0.0,
+        'slowest': slowest['file'] if slowest else None,
+        'slowest_ms': round(slowest['time_ms'], 3) if slowest else None,
+        'jobs': jobs or os.cpu_count() or 1,
+    }
+    if fmt == 'jsonl':
+        print(json.dumps({'summary': summary}, ensure_ascii=False))
+    else:
+        print(f"{total} arquivo(s), {failed} erro(s) em {summary['wall_s']:.2f}s "
+              f"(soma {summary['busy_s']:.2f}s, media {summary['mean_ms']:.1f} ms, -j {summary['jobs']})")
+        if slowest is not None:
+            print(f"Mais lento: {slowest['file']} ({slowest['time_ms']:.1f} ms)")
+    return 1 if failed or not total else 0
+
+
 def cmd_run(args: argparse.Namespace) -> int:
     """Executa um script HMP."""
     file_path = Path(args.file)
@@ -53,22 +156,31 @@ def cmd_run(args: argparse.Namespace) -> int:
         print(f"Erro: Arquivo nao encontrado: {file_path}")
         return 1
     
-    try:
-        script = file_path.read_text(encoding='utf-8')
-    except Exception as e:
-        print(f"Erro ao ler arquivo: {e}")
-        return 1
+    initial_vars = _parse_vars(args.var)
     
-    initial_vars = {}
-    if args.var:
-        for name, value in args.var:
-            try:
-                initial_vars[name] = json.loads(value)
-            except json.JSONDecodeError:
-                initial_vars[name] = value
+    profiler = None
+    if args.profile:
+        from hmp.core.profiler import Profiler
+        profiler = Profiler()
     
-    engine = HMPEngine()
-    result = engine.execute(script, initial_vars)
+    tracers = []
+    if args.trace or args.spans:
+        from hmp.core.tracing import JsonLinesTracer, SpanExporter
+        if args.trace:
+            tracers.append(JsonLinesTracer(args.trace))
+        if args.spans:
+            tracers.append(SpanExporter(args.spans))
+    
+    engine = HMPEngine(config=HMPConfig(optimize_level=args.optimize), tracers=tracers)
+    try:
+        # Usa o .hmpc ao lado do arquivo quando ele estiver atualizado
+        result = engine.execute_file(file_path, initial_vars, profiler)
+    finally:
+        for tracer in tracers:
+            tracer.close()
+    
+    if profiler is not None:
+        _write_profile(profiler, args)
     
     if args.verbose:
         print("\n=== Saida do Script ===")
@@ -93,14 +205,39 @@ def cmd_run(args: argparse.Namespace) -> int:
     return 0
 
 
+def _write_profile(profiler: Any, args: argparse.Namespace) -> None:
+    if args.profile == 'json':
+        text = profiler.to_json(args.profile_sort)
+    elif args.profile == 'collapsed':
+        text = profiler.collapsed()
+    else:
+        text = profiler.format_table(args.profile_sort)
+    
+    if args.profile_output:
+        Path(args.profile_output).write_text(text + '\n', encoding='utf-8')
+        print(f"Perfil salvo em: {args.profile_output}", file=sys.stderr)
+    else:
+        print(text, file=sys.stderr)
+
+
 def cmd_validate(args: argparse.Namespace) -> int:
-    """Valida sintaxe de um script."""
-    file_path = Path(args.file)
+    """Valida sintaxe de um script, ou de varios em paralelo."""
+    from hmp.core.batch import collect_files, validate_files
     
-    if not file_path.exists():
-        print(f"Erro: Arquivo nao encontrado: {file_path}")
+    single = Path(args.paths[0]) if len(args.paths) == 1 else None
+    if single is not None and single.is_file() and args.format == 'text' and args.jobs is None:
+        return _validate_single(single)
+    
+    files = collect_files(args.paths)
+    if not files:
+        print(f"Erro: Nenhum arquivo .hmp encontrado em {' '.join(args.paths)}")
         return 1
     
+    reports = validate_files(files, workers=args.jobs)
+    return _report_batch(reports, args.format, args.jobs, lambda r: f" ({r['statements']} statements)")
+
+
+def _validate_single(file_path: Path) -> int:
     try:
         script = file_path.read_text(encoding='utf-8')
     except Exception as e:
@@ -119,6 +256,48 @@ def cmd_validate(args: argparse.Namespace) -> int:
         return 1
 
 
+def cmd_run_many(args: argparse.Namespace) -> int:
+    """Executa varios scripts em um pool de processos."""
+    from hmp.core.batch import collect_files
+    
+    files = collect_files(args.patterns)
+    if not files:
+        print(f"Erro: Nenhum arquivo .hmp encontrado em {' '.join(args.patterns)}")
+        return 1
+    
+    engine = HMPEngine(config=HMPConfig(optimize_level=args.optimize))
+    reports = engine.execute_files(files, workers=args.jobs, initial_vars=_parse_vars(args.var))
+    return _report_batch(reports, args.format, args.jobs, lambda r: '')
+
+
+def cmd_compile(args: argparse.Namespace) -> int:
+    """Gera os .hmpc de um diretorio ou arquivo."""
+    from hmp.parser import hmpc
+    
+    path = Path(args.path)
+    
+    if path.is_dir():
+        written, errors = hmpc.compile_dir(path)
+    elif path.exists():
+        written, errors = [], []
+        try:
+            written.append(hmpc.compile_file(path))
+        except Exception as e:
+            errors.append((path, e))
+    else:
+        print(f"Erro: Caminho nao encontrado: {path}")
+        return 1
+    
+    if not args.quiet:
+        for target in written:
+            print(f"  {target}")
+    for source, error in errors:
+        print(f"Erro em {source}: {error}")
+    
+    print(f"{len(written)} arquivo(s) compilado(s), {len(errors)} erro(s)")
+    return 1 if errors else 0
+
+
 def cmd_tools(args: argparse.Namespace) -> int:
     """Lista todas as tools disponiveis."""
     engine = HMPEngine()
@@ -153,52 +332,84 @@ def cmd_version(args: argparse.Namespace) -> int:
 def cmd_repl(args: argparse.Namespace) -> int:
     """Inicia modo interativo."""
     from hmp import __version__
+    from hmp.core.session import HMPSession
+    from hmp.parser.incremental import is_complete
     
     print(f"HMP REPL v{__version__}")
-    print("Digite comandos HMP ou 'exit' para sair\n")
+    print("Digite comandos HMP ou 'exit' para sair")
+    print("Comandos: vars, funcs, clear, load ARQUIVO (reexecuta o arquivo, reparseando so o que mudou)\n")
     
-    engine = HMPEngine()
-    context_vars = {}
+    session = HMPSession(HMPEngine())
+    pending: List[str] = []
     
     while True:
         try:
-            line = input("hmp> ").strip()
+            line = input("...> " if pending else "hmp> ")
         except (EOFError, KeyboardInterrupt):
             print("\nAte logo!")
             break
         
-        if not line:
-            continue
-        
-        if line.lower() in ('exit', 'quit', 'q'):
-            print("Ate logo!")
-            break
-        
-        if line.lower() == 'vars':
-            print("Variaveis:", context_vars)
-            continue
-        
-        if line.lower() == 'clear':
-            context_vars = {}
-            print("Variaveis limpas")
-            continue
-        
-        result = engine.execute(line, context_vars)
-        
-        for output in result.get('output', []):
-            print(output)
+        if pending:
+            # Bloco (FUNCTION, IF, ...) ou string ainda aberto: acumula linhas
+            pending.append(line)
+            script = '\n'.join(pending)
+            if not is_complete(script):
+                continue
+            pending = []
+        else:
+            line = line.strip()
+            if not line:
+                continue
+            
+            command = line.lower()
+            if command in ('exit', 'quit', 'q'):
+                print("Ate logo!")
+                break
+            
+            if command == 'vars':
+                print("Variaveis:", session.variables)
+                continue
+            
+            if command == 'funcs':
+                print("Funcoes:", ', '.join(session.functions) or '(nenhuma)')
+                continue
+            
+            if command == 'clear':
+                session.reset()
+                print("Variaveis e funcoes limpas")
+                continue
+            
+            if command.startswith('load '):
+                path = Path(line[5:].strip())
+                try:
+                    source = path.read_text(encoding='utf-8')
+                except OSError as e:
+                    print(f"Erro ao ler arquivo: {e}")
+                    continue
+                _print_repl_result(session.execute_buffer(source, name=str(path.resolve())))
+                continue
+            
+            if not is_complete(line):
+                pending = [line]
+                continue
+            script = line
         
-        context_vars.update(result.get('variables', {}))
-        
-        if result.get('return_value') is not None:
-            print(f"=> {result['return_value']}")
-        
-        if not result.get('success'):
-            print(f"Erro: {result.get('error')}")
+        _print_repl_result(session.execute(script))
     
     return 0
 
 
+def _print_repl_result(result: Dict[str, Any]) -> None:
+    for output in result.get('output', []):
+        print(output)
+    
+    if result.get('return_value') is not None:
+        print(f"=> {result['return_value']}")
+    
+    if not result.get('success'):
+        print(f"Erro: {result.get('error')}")
+
+
 def app() -> int:
     """Ponto de entrada principal da CLI."""
     parser = create_parser()
@@ -211,6 +422,8 @@ def app() -> int:
     commands = {
         'run': cmd_run,
         'validate': cmd_validate,
+        'run-many': cmd_run_many,
+        'compile': cmd_compile,
         'tools': cmd_tools,
         'version': cmd_version,
         'repl': cmd_repl,
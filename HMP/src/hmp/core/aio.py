@@ -0,0 +1,249 @@
+"""Interpretador assincrono (asyncio) do HMP."""
+
+import asyncio
+from typing import Any, Dict, Optional, Sequence, TYPE_CHECKING
+
+from hmp.core.context import ExecutionContext
+from hmp.runtime.errors import HMPRuntimeError
+from hmp.runtime.inplace import INPLACE_TOOLS, settle
+from hmp.runtime.persistent import SEQUENCE_TYPES
+from hmp.parser.ast import (
+    Program,
+    Statement,
+    SetStatement,
+    CallStatement,
+    ImportStatement,
+    ReturnStatement,
+    IfStatement,
+    LoopTimesStatement,
+    WhileStatement,
+    ForEachStatement,
+    TryCatchStatement,
+    ParallelStatement,
+)
+
+if TYPE_CHECKING:
+    from hmp.core.engine import HMPEngine
+
+# Comandos sem espera: rodam no interpretador sincrono
+_SYNC_STATEMENTS = (SetStatement, ImportStatement, ReturnStatement)
+
+
+class AsyncInterpreter:
+    """
+    Versao coroutine do interpretador de arvore do `HMPEngine`.
+
+    So a forma de esperar e propria: tools sao chamadas com
+    `ToolRegistry.aexecute` e os ramos de PARALLEL rodam com
+    `asyncio.gather`, com o isolamento e a ordem de merge de
+    `HMPEngine._execute_parallel`. O resto vem do interpretador sincrono:
+    SET, RETURN e IMPORT rodam em `HMPEngine._execute_statement`, e o CALL
+    usa as mesmas partes (argumentos, frame da funcao, `list.push` no
+    lugar, ganchos do profiler e do tracer). Aqui ficam apenas os blocos,
+    que precisam esperar os comandos do corpo.
+    """
+
+    def __init__(self, engine: "HMPEngine"):
+        self.engine = engine
+
+    async def run(self, program: Program, context: ExecutionContext, result: Dict) -> None:
+        await self._statements(program.statements, context, result, in_function=False)
+
+    async def _statements(
+        self,
+        statements: Sequence[Statement],
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        if context.profiler is not None or context.tracer is not None:
+            return await self._statements_instrumented(statements, context, result, in_function)
+        for statement in statements:
+            context.increment_iteration()
+            context.check_limits()
+            returned = await self._statement(statement, context, result, in_function)
+            if in_function and returned is not None:
+                return returned
+        return None
+
+    async def _statements_instrumented(
+        self,
+        statements: Sequence[Statement],
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        engine = self.engine
+        for statement in statements:
+            context.increment_iteration()
+            context.check_limits()
+            engine._enter_line(statement, context)
+            try:
+                returned = await self._statement(statement, context, result, in_function)
+            except Exception as e:
+                engine._line_error(e, statement, context)
+                raise
+            finally:
+                engine._exit_line(context)
+            if in_function and returned is not None:
+                return returned
+        return None
+
+    async def _statement(
+        self,
+        statement: Statement,
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        if isinstance(statement, _SYNC_STATEMENTS):
+            return self.engine._execute_statement(statement, context, result, in_function)
+
+        if isinstance(statement, CallStatement):
+            val = await self._call(statement, context, result)
+            return val if in_function else None
+
+        evaluate = self.engine._evaluate_expression
+
+        if isinstance(statement, IfStatement):
+            if evaluate(statement.condition, context):
+                return await self._statements(statement.body, context, result, in_function)
+            elif statement.else_body:
+                return await self._statements(statement.else_body, context, result, in_function)
+            return None
+
+        if isinstance(statement, LoopTimesStatement):
+            for _ in range(int(evaluate(statement.count, context))):
+                context.check_limits()
+                returned = await self._statements(statement.body, context, result, in_function)
+                if in_function and returned is not None:
+                    return returned
+            return None
+
+        if isinstance(statement, WhileStatement):
+            while evaluate(statement.condition, context):
+                context.check_limits()
+                returned = await self._statements(statement.body, context, result, in_function)
+                if in_function and returned is not None:
+                    return returned
+            return None
+
+        if isinstance(statement, ForEachStatement):
+            items = evaluate(statement.iterable, context)
+            if not isinstance(items, SEQUENCE_TYPES):
+                items = []
+
+            context.push_frame('foreach')
+            try:
+                for item in items:
+                    context.check_limits()
+                    context.store(statement.slot, statement.var_name, item)
+                    returned = await self._statements(statement.body, context, result, in_function)
+                    if in_function and returned is not None:
+                        return returned
+            finally:
+                context.pop_frame()
+            return None
+
+        if isinstance(statement, TryCatchStatement):
+            try:
+                returned = await self._statements(statement.body, context, result, in_function)
+                if in_function and returned is not None:
+                    return returned
+            except Exception as e:
+                context.push_frame('catch')
+                try:
+                    context.store(statement.slot, statement.error_var, str(e))
+                    returned = await self._statements(statement.catch_body, context, result, in_function)
+                    if in_function and returned is not None:
+                        return returned
+                finally:
+                    context.pop_frame()
+            return None
+
+        if isinstance(statement, ParallelStatement):
+            return await self._parallel(statement, context, result, in_function)
+
+        return None
+
+    async def _call(self, statement: CallStatement, context: ExecutionContext, result: Dict) -> Any:
+        engine = self.engine
+        evaluate = engine._evaluate_expression
+        args = {name: evaluate(expr, context) for name, expr in statement.params.items()}
+
+        func = context.functions.get(statement.tool)
+        if func is not None:
+            body = engine._push_function_frame(statement.tool, func, args, context)
+            try:
+                if context.profiler is None and context.tracer is None:
+                    val = await self._statements(body, context, result, in_function=True)
+                else:
+                    val = await self._body_instrumented(statement.tool, args, body, context, result)
+            finally:
+                context.pop_frame()
+        else:
+            owned = engine._claim(statement, args, context) if statement.inplace else None
+            try:
+                val = await context.registry.aexecute(statement.tool, args, context, owned is not None)
+            except Exception as e:
+                raise HMPRuntimeError(f"Erro ao chamar tool '{statement.tool}': {str(e)}")
+            if owned is not None:
+                settle(owned, statement.target, args, INPLACE_TOOLS[statement.tool], val)
+
+        return engine._store_call_result(statement, val, context)
+
+    async def _body_instrumented(
+        self,
+        name: str,
+        args: Dict[str, Any],
+        body: Sequence[Statement],
+        context: ExecutionContext,
+        result: Dict
+    ) -> Any:
+        start = self.engine._enter_function(name, args, context)
+        value = error = None
+        try:
+            value = await self._statements(body, context, result, in_function=True)
+            return value
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.engine._exit_function(name, value, start, context, error)
+
+    async def _parallel(
+        self,
+        statement: ParallelStatement,
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        branches = statement.body
+        forks = [context.fork() for _ in branches]
+        results = [dict(result) for _ in branches]
+        if context.profiler is not None or context.tracer is not None:
+            # Como no interpretador sincrono: com ganchos, os ramos rodam em sequencia
+            gathered = []
+            for branch, fork, branch_result in zip(branches, forks, results):
+                try:
+                    gathered.append(await self._statements([branch], fork, branch_result, in_function))
+                except Exception as e:
+                    gathered.append(e)
+        else:
+            gathered = await asyncio.gather(
+                *(
+                    self._statements([branch], fork, branch_result, in_function)
+                    for branch, fork, branch_result in zip(branches, forks, results)
+                ),
+                return_exceptions=True,
+            )
+        outcomes = []
+        for value in gathered:
+            if isinstance(value, Exception):
+                outcomes.append((None, value))
+            elif isinstance(value, BaseException):
+                # Cancelamento e afins nao sao erros do script
+                raise value
+            else:
+                outcomes.append((value, None))
+        return self.engine._join_branches(context, result, forks, results, outcomes)
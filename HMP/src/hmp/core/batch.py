@@ -0,0 +1,361 @@
+"""Execucao de lotes de scripts em um pool de processos."""
+
+import contextlib
+import dataclasses
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING, Union
+
+from hmp.expr.cache import ExpressionCache
+
+if TYPE_CHECKING:
+    from hmp.core.context import HMPConfig
+    from hmp.core.engine import HMPEngine
+
+# (indice do job, digest do script, variaveis iniciais, script ou None)
+Job = Tuple[int, str, Optional[Dict[str, Any]], Optional[str]]
+
+# Estado de cada processo do pool, criado por `_init_worker`: o engine (os
+# programas preparados ficam no LRU dele, por digest) e o texto dos scripts
+# que falharam no parse, limitado ao mesmo tamanho
+_worker_engine: Optional["HMPEngine"] = None
+_worker_failures: Optional[ExpressionCache] = None
+
+
+class _Resend:
+    """Resultado de um job cujo script o processo ainda nao recebeu."""
+
+
+def _init_worker(
+    config: "HMPConfig",
+    script_path: str,
+    setup: Optional[Callable[["HMPEngine"], None]]
+) -> None:
+    """Cria o engine do processo (registry pronto), usado ate o pool ser encerrado."""
+    global _worker_engine, _worker_failures
+    from hmp.core.engine import HMPEngine
+
+    _worker_engine = HMPEngine(config=config, script_path=script_path)
+    if setup is not None:
+        setup(_worker_engine)
+    _worker_failures = ExpressionCache(maxsize=config.program_cache_size)
+
+
+def _run_jobs(jobs: List[Job]) -> List[Tuple[int, Any]]:
+    results: List[Tuple[int, Any]] = []
+    for index, digest, initial_vars, script in jobs:
+        prepared = _worker_engine._programs.get(digest) or _worker_failures.get(digest)
+        if prepared is None:
+            if script is None:
+                # Nunca recebido ou ja descartado pelo LRU
+                results.append((index, _Resend()))
+                continue
+            try:
+                prepared = _worker_engine.compile(script)
+            except Exception:
+                # O erro de parse volta no resultado de cada job (via execute)
+                prepared = script
+                _worker_failures.set(digest, script)
+        if isinstance(prepared, str):
+            results.append((index, _worker_engine.execute(prepared, initial_vars)))
+        else:
+            results.append((index, prepared.run(initial_vars)))
+    return results
+
+
+class WorkerPool:
+    """
+    Pool de processos de um engine, reaproveitado entre lotes.
+
+    Cada processo guarda os programas que ja preparou no LRU do seu engine
+    (`program_cache_size`). Um job leva o texto do script so na primeira vez
+    em que o digest e enviado ao pool; o processo que ainda nao o tem (ou ja
+    o descartou) devolve `_Resend` e recebe o job de novo com o texto.
+    """
+
+    def __init__(
+        self,
+        config: "HMPConfig",
+        script_path: str,
+        workers: int,
+        setup: Optional[Callable[["HMPEngine"], None]]
+    ):
+        self.config = dataclasses.replace(config)
+        self.script_path = script_path
+        self.workers = workers
+        self.setup = setup
+        self.broken = False
+        # Digests cujo texto ja foi enviado a algum processo
+        self.sent: Set[str] = set()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(config, script_path, setup),
+        )
+
+    def fits(
+        self,
+        config: "HMPConfig",
+        script_path: str,
+        workers: int,
+        setup: Optional[Callable[["HMPEngine"], None]]
+    ) -> bool:
+        """Se o pool serve para um lote com estes parametros."""
+        return (
+            not self.broken
+            and self.workers == workers
+            and self.setup is setup
+            and self.script_path == script_path
+            and self.config == config
+        )
+
+    def map(
+        self,
+        fn: Callable[[List[Any]], List[Tuple[int, Any]]],
+        items: Sequence[Any],
+        ordered: bool,
+        chunksize: Optional[int],
+        resend: Optional[Callable[[Any], Any]] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        try:
+            yield from _map_chunks(self.executor, fn, items, self.workers, ordered, chunksize, resend)
+        except BrokenProcessPool:
+            self.broken = True
+            raise
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def _normalize(
+    jobs: Iterable[Any],
+    script: Optional[str]
+) -> Tuple[List[Tuple[int, str, Optional[Dict[str, Any]]]], Dict[str, str]]:
+    """Converte os jobs em (indice, digest, variaveis) e junta os scripts distintos."""
+    scripts: Dict[str, str] = {}
+    digests: Dict[str, str] = {}
+    normalized: List[Tuple[int, str, Optional[Dict[str, Any]]]] = []
+    for index, job in enumerate(jobs):
+        if script is not None:
+            text, initial_vars = script, job
+        elif isinstance(job, str):
+            text, initial_vars = job, None
+        else:
+            text, initial_vars = job
+        digest = digests.get(text)
+        if digest is None:
+            digest = digests[text] = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            scripts[digest] = text
+        normalized.append((index, digest, initial_vars))
+    return normalized, scripts
+
+
+def execute_many(
+    engine: "HMPEngine",
+    jobs: Iterable[Any],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    script: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    setup: Optional[Callable[["HMPEngine"], None]] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Implementacao de `HMPEngine.execute_many`."""
+    normalized, scripts = _normalize(jobs, script)
+    if not normalized:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for index, digest, initial_vars in normalized:
+            yield index, engine.execute(scripts[digest], initial_vars)
+        return
+
+    pool = engine._worker_pool(workers, setup)
+    items: List[Job] = []
+    for index, digest, initial_vars in normalized:
+        if digest in pool.sent:
+            items.append((index, digest, initial_vars, None))
+        else:
+            pool.sent.add(digest)
+            items.append((index, digest, initial_vars, scripts[digest]))
+
+    def resend(job: Job) -> Job:
+        index, digest, initial_vars, _ = job
+        return index, digest, initial_vars, scripts[digest]
+
+    yield from pool.map(_run_jobs, items, ordered, chunksize, resend)
+
+
+def _map_chunks(
+    pool: ProcessPoolExecutor,
+    fn: Callable[[List[Any]], List[Tuple[int, Any]]],
+    items: Sequence[Any],
+    workers: int,
+    ordered: bool,
+    chunksize: Optional[int],
+    resend: Optional[Callable[[Any], Any]] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Roda `fn` sobre blocos de `items` no pool.
+
+    Cada item comeca com o seu indice e `fn` devolve pares (indice,
+    resultado), gerados aqui na ordem dos indices ou na ordem em que os
+    blocos terminam. Itens com resultado `_Resend` voltam ao pool, em um
+    bloco, depois de passar por `resend`.
+    """
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    chunks = [list(items[i:i + chunksize]) for i in range(0, len(items), chunksize)]
+    by_index = {item[0]: item for item in items} if resend is not None else {}
+
+    pending = {pool.submit(fn, chunk) for chunk in chunks}
+    try:
+        buffered: Dict[int, Any] = {}
+        next_index = 0
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                again = []
+                for index, result in future.result():
+                    if isinstance(result, _Resend):
+                        again.append(resend(by_index[index]))
+                    elif ordered:
+                        buffered[index] = result
+                    else:
+                        yield index, result
+                if again:
+                    pending.add(pool.submit(fn, again))
+            if ordered:
+                while next_index in buffered:
+                    yield next_index, buffered.pop(next_index)
+                    next_index += 1
+    finally:
+        # Lote abandonado no meio: o pool continua em uso pelo engine
+        for future in pending:
+            future.cancel()
+
+
+# -- lotes de arquivos (hmp validate DIR / hmp run-many) --------------------------
+
+def collect_files(patterns: Iterable[Union[str, Path]]) -> List[Path]:
+    """
+    Arquivos .hmp de uma lista de caminhos, diretorios e padroes glob.
+
+    Diretorios sao percorridos recursivamente; padroes aceitam `**`. A lista
+    sai ordenada e sem repeticoes.
+    """
+    import glob
+
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.rglob('*.hmp'))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(m) for m in glob.glob(str(pattern), recursive=True) if Path(m).is_file())
+        for match in matches:
+            found.setdefault(match, None)
+    return sorted(found)
+
+
+def _validate_one(path: str) -> Dict[str, Any]:
+    from hmp.parser.parser import Parser
+
+    start = time.perf_counter()
+    report: Dict[str, Any] = {"file": path, "success": True, "statements": 0, "error": None}
+    try:
+        with open(path, encoding='utf-8') as f:
+            report["statements"] = len(Parser(f).parse().statements)
+    except Exception as e:
+        report["success"] = False
+        report["error"] = str(e)
+    report["time_ms"] = (time.perf_counter() - start) * 1000
+    return report
+
+
+def _validate_chunk(jobs: List[Tuple[int, str]]) -> List[Tuple[int, Dict[str, Any]]]:
+    return [(index, _validate_one(path)) for index, path in jobs]
+
+
+def validate_files(
+    paths: Iterable[Union[str, Path]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    chunksize: Optional[int] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Faz o parse de cada arquivo (sem executar) em um pool de processos.
+
+    Gera (indice, relatorio) com `file`, `success`, `statements` (comandos de
+    nivel superior), `error` e `time_ms`.
+    """
+    jobs = [(index, str(path)) for index, path in enumerate(paths)]
+    if not jobs:
+        return
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for index, path in jobs:
+            yield index, _validate_one(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _map_chunks(pool, _validate_chunk, jobs, workers, ordered, chunksize)
+
+
+def _run_file(engine: "HMPEngine", path: str, initial_vars: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # O que o script imprime (log.print) vai para "output" pelo contexto, sem
+    # mexer no sys.stdout do processo (outras threads seguem imprimindo)
+    output: List[str] = []
+    start = time.perf_counter()
+    try:
+        prepared = engine.compile_file(path)
+    except Exception as e:
+        result = engine._new_result()
+        engine._fail(result, e)
+    else:
+        context = engine._new_context(prepared, initial_vars)
+        context.output = output
+        result = engine._run_in_context(prepared, context)
+    result["time_ms"] = (time.perf_counter() - start) * 1000
+    result["output"] = output
+    return {"file": path, **result}
+
+
+def _run_file_chunk(jobs: List[Tuple[int, str, Optional[Dict[str, Any]]]]) -> List[Tuple[int, Dict[str, Any]]]:
+    results = []
+    for index, path, initial_vars in jobs:
+        # No processo do pool, o que outras tools imprimem tambem vai para
+        # "output", nao para a saida do processo, que os relatorios usam
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            report = _run_file(_worker_engine, path, initial_vars)
+        report["output"] += buffer.getvalue().splitlines()
+        results.append((index, report))
+    return results
+
+
+def execute_files(
+    engine: "HMPEngine",
+    paths: Iterable[Union[str, Path]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    initial_vars: Optional[Dict[str, Any]] = None,
+    chunksize: Optional[int] = None,
+    setup: Optional[Callable[["HMPEngine"], None]] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Implementacao de `HMPEngine.execute_files`."""
+    jobs = [(index, str(path), initial_vars) for index, path in enumerate(paths)]
+    if not jobs:
+        return
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for index, path, job_vars in jobs:
+            yield index, _run_file(engine, path, job_vars)
+        return
+    yield from engine._worker_pool(workers, setup).map(_run_file_chunk, jobs, ordered, chunksize)
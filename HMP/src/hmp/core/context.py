@@ -1,19 +1,143 @@
 """Contexto de execucao do HMP."""
 
+from collections.abc import Mapping, MutableMapping
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from hmp.tools.registry import ToolRegistry
     from hmp.expr.cache import ExpressionCache
 
 
-@dataclass
+# Marca de slot ainda nao atribuido
+_UNSET = object()
+
+
+class FrameLayout:
+    """
+    Disposicao das variaveis locais de uma funcao, resolvida antes da execucao.
+
+    Cada nome recebe um indice fixo no array de valores do frame.
+    """
+
+    __slots__ = ('names', 'index')
+
+    def __init__(self, names: Sequence[str]):
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"FrameLayout({list(self.names)!r})"
+
+
 class ExecutionFrame:
-    """Frame de execucao para pilha de chamadas."""
-    name: str
-    variables: Dict[str, Any] = field(default_factory=dict)
-    is_function: bool = False
+    """
+    Frame de execucao para pilha de chamadas.
+
+    Frames de funcao com `layout` guardam as variaveis em um array indexado
+    por slot; nomes fora do layout ficam em `extra`. `variables` continua
+    disponivel como mapeamento para quem precisa da API de dicionario.
+    """
+
+    __slots__ = ('name', 'is_function', 'layout', 'slots', 'extra', 'shadows', 'owned')
+
+    def __init__(
+        self,
+        name: str,
+        variables: Optional[Dict[str, Any]] = None,
+        is_function: bool = False,
+        layout: Optional[FrameLayout] = None
+    ):
+        self.name = name
+        self.is_function = is_function
+        self.layout = layout
+        self.slots: List[Any] = [_UNSET] * len(layout) if layout is not None else []
+        self.extra: Dict[str, Any] = {}
+        if variables:
+            for key, value in variables.items():
+                self.set(key, value)
+        # Frames que nao sao de funcao so guardam variaveis quando criados com elas
+        self.shadows = not is_function and bool(self.extra)
+        # Listas criadas pelo engine para as locais (hmp.runtime.inplace)
+        self.owned: Optional[Dict[str, Any]] = None
+
+    @property
+    def variables(self) -> "FrameVariables":
+        return FrameVariables(self)
+
+    def lookup(self, name: str) -> Any:
+        """Retorna o valor da variavel ou `_UNSET` se nao definida no frame."""
+        layout = self.layout
+        if layout is not None:
+            index = layout.index.get(name)
+            if index is not None:
+                return self.slots[index]
+        return self.extra.get(name, _UNSET)
+
+    def set(self, name: str, value: Any) -> None:
+        layout = self.layout
+        if layout is not None:
+            index = layout.index.get(name)
+            if index is not None:
+                self.slots[index] = value
+                return
+        self.extra[name] = value
+
+    def copy(self) -> "ExecutionFrame":
+        """Copia do frame com arrays de valores proprios."""
+        frame = ExecutionFrame.__new__(ExecutionFrame)
+        frame.name = self.name
+        frame.is_function = self.is_function
+        frame.layout = self.layout
+        frame.slots = list(self.slots)
+        frame.extra = dict(self.extra)
+        frame.shadows = self.shadows
+        frame.owned = None
+        return frame
+
+    def __repr__(self) -> str:
+        return f"ExecutionFrame(name={self.name!r}, variables={dict(self.variables)!r}, is_function={self.is_function!r})"
+
+
+class FrameVariables(MutableMapping):
+    """Visao em dicionario das variaveis de um frame (slots + extras)."""
+
+    __slots__ = ('_frame',)
+
+    def __init__(self, frame: ExecutionFrame):
+        self._frame = frame
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._frame.lookup(name)
+        if value is _UNSET:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._frame.set(name, value)
+
+    def __delitem__(self, name: str) -> None:
+        frame = self._frame
+        if frame.lookup(name) is _UNSET:
+            raise KeyError(name)
+        if name in frame.extra:
+            del frame.extra[name]
+        else:
+            frame.slots[frame.layout.index[name]] = _UNSET
+
+    def __iter__(self) -> Iterator[str]:
+        frame = self._frame
+        if frame.layout is not None:
+            for name, value in zip(frame.layout.names, frame.slots):
+                if value is not _UNSET:
+                    yield name
+        yield from frame.extra
+
+    def __len__(self) -> int:
+        return sum(1 for value in self._frame.slots if value is not _UNSET) + len(self._frame.extra)
 
 
 @dataclass 
@@ -23,6 +147,17 @@ class HMPConfig:
     max_loop_iterations: int = 10000
     max_while_iterations: int = 1000
     max_nested_depth: int = 50
+    # Threads do pool que executa os ramos de PARALLEL (1 = sequencial)
+    parallel_max_workers: int = 8
+    expression_cache_size: int = 2000
+    # Programas preparados (PreparedProgram) mantidos pelo engine, por hash do script
+    program_cache_size: int = 256
+    # Backend de execucao: "tree" (interpretador de AST), "vm" (bytecode)
+    # ou "python" (transpilado para codigo Python)
+    backend: str = "tree"
+    # Otimizacao da AST antes da execucao (ver hmp.core.optimizer):
+    # 0 = nenhuma, 1 = constantes e ramos mortos, 2 = 1 + propagacao de globais constantes
+    optimize_level: int = 0
     http_timeout: int = 5
     http_max_response_size: int = 1024 * 1024
     allowed_http_hosts: frozenset = field(default_factory=lambda: frozenset([
@@ -40,6 +175,63 @@ class HMPConfig:
     ]))
 
 
+class ScopeView(Mapping):
+    """
+    Visao somente leitura das variaveis visiveis no ponto atual da execucao.
+
+    Consulta os frames do topo ate o frame de funcao mais interno e, em
+    seguida, as variaveis globais - as mesmas regras de `get_variable` -
+    sem copiar nenhum dicionario.
+    """
+
+    __slots__ = ('_context',)
+
+    def __init__(self, context: "ExecutionContext"):
+        self._context = context
+
+    def __getitem__(self, name: str) -> Any:
+        context = self._context
+        if context._shadowing:
+            value = context._lookup(name)
+        else:
+            frame = context._frame
+            if frame is None:
+                return context.variables[name]
+            value = frame.lookup(name)
+            if value is _UNSET:
+                return context.variables[name]
+        if value is _UNSET:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name: object) -> bool:
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def _visible(self) -> List[Dict[str, Any]]:
+        layers = []
+        for frame in reversed(self._context.call_stack):
+            layers.append(frame.variables)
+            if frame.is_function:
+                break
+        layers.append(self._context.variables)
+        return layers
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for layer in self._visible():
+            for name in layer:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class ExecutionContext:
     """
     Contexto de execucao do HMP.
@@ -55,12 +247,54 @@ class ExecutionContext:
         self.variables: Dict[str, Any] = initial_vars.copy() if initial_vars else {}
         self.call_stack: List[ExecutionFrame] = []
         self.functions: Dict[str, Dict] = {}
+        # Modulos ja importados nesta execucao
+        self.imported_modules: Set[str] = set()
+        # True nos contextos criados por `fork` (ramos de PARALLEL)
+        self.in_parallel = False
         self.config = config or HMPConfig()
+        # Profiler e tracer da execucao (hmp.core.profiler / hmp.core.tracing), se houver
+        self.profiler = None
+        self.tracer = None
+        # Estado dos tracers na execucao atual (trace id, spans abertos...), por tracer
+        self.trace_state: Dict[int, Any] = {}
+        # Listas criadas pelo engine para as globais (hmp.runtime.inplace);
+        # None desliga a atualizacao in-place das globais
+        self.owned: Optional[Dict[str, Any]] = {}
+        # Linhas de log.print guardadas em vez de impressas (None: imprime)
+        self.output: Optional[List[str]] = None
         
         self._registry = registry
         self._cache = cache
         self._iteration_count = 0
         self._nested_depth = 0
+        # Frame de funcao mais interno (None no escopo global)
+        self._frame: Optional[ExecutionFrame] = None
+        self._function_frames: List[ExecutionFrame] = []
+        # Quantidade de frames nao-funcao que carregam variaveis proprias
+        self._shadowing = 0
+        self._scope = ScopeView(self)
+
+    @property
+    def scope(self) -> ScopeView:
+        """Visao somente leitura (sem copia) das variaveis visiveis."""
+        return self._scope
+
+    @property
+    def function_frame(self) -> Optional[ExecutionFrame]:
+        """Frame de funcao mais interno (None no escopo global)."""
+        return self._frame
+
+    def current_scope(self) -> Mapping:
+        """
+        Mapeamento de leitura mais barato para o ponto atual da execucao.
+
+        Fora de funcoes (e sem frames com variaveis proprias) e o proprio
+        dicionario global; caso contrario, a visao `scope`. Nao deve ser
+        guardado: o resultado muda ao entrar ou sair de funcoes.
+        """
+        if self._frame is None and not self._shadowing:
+            return self.variables
+        return self._scope
 
     @property
     def registry(self) -> "ToolRegistry":
@@ -76,49 +310,147 @@ class ExecutionContext:
             self._cache = ExpressionCache()
         return self._cache
 
+    def _lookup(self, name: str) -> Any:
+        """Resolve um nome visivel; retorna `_UNSET` se nao existir."""
+        if self._shadowing:
+            for frame in reversed(self.call_stack):
+                value = frame.lookup(name)
+                if value is not _UNSET:
+                    return value
+                if frame.is_function:
+                    break
+        else:
+            frame = self._frame
+            if frame is not None:
+                value = frame.lookup(name)
+                if value is not _UNSET:
+                    return value
+        return self.variables.get(name, _UNSET)
+
     def get_variable(self, name: str, default: Any = None) -> Any:
-        # Procura na pilha de frames (do topo para a base)
-        for frame in reversed(self.call_stack):
-            if name in frame.variables:
-                return frame.variables[name]
-            if frame.is_function:
-                break
-        
-        return self.variables.get(name, default)
+        value = self._lookup(name)
+        return default if value is _UNSET else value
 
     def set_variable(self, name: str, value: Any) -> None:
-        # Se houver frames de funcao, define no frame da funcao atual
-        # Mas se for uma atribuicao global (fora de funcao), define no global
-        if not any(f.is_function for f in self.call_stack):
+        # Dentro de funcao, define no frame da funcao atual; fora, no global
+        frame = self._frame
+        if frame is None:
             self.variables[name] = value
-            return
+        else:
+            frame.set(name, value)
 
-        # Se estiver dentro de uma funcao, define no frame da funcao atual
-        for frame in reversed(self.call_stack):
-            if frame.is_function:
-                frame.variables[name] = value
-                return
-        
-        # Fallback
-        self.variables[name] = value
-
-    def push_frame(self, name: str, local_vars: Dict[str, Any] = None, is_function: bool = False) -> None:
-        frame = ExecutionFrame(
-            name=name,
-            variables=local_vars.copy() if local_vars else {},
-            is_function=is_function
-        )
+    def store(self, slot: Optional[int], name: str, value: Any) -> None:
+        """
+        Define uma variavel usando o slot resolvido pelo resolver.
+
+        Sem slot (ou em frame sem layout) cai em `set_variable`.
+        """
+        frame = self._frame
+        if slot is not None and frame is not None and frame.layout is not None:
+            frame.slots[slot] = value
+        else:
+            self.set_variable(name, value)
+
+    def push_frame(
+        self,
+        name: str,
+        local_vars: Dict[str, Any] = None,
+        is_function: bool = False,
+        layout: Optional[FrameLayout] = None
+    ) -> None:
+        frame = ExecutionFrame(name, local_vars, is_function, layout)
         self.call_stack.append(frame)
         self._nested_depth += 1
+        if is_function:
+            self._function_frames.append(frame)
+            self._frame = frame
+        elif frame.shadows:
+            self._shadowing += 1
 
     def pop_frame(self) -> Optional[ExecutionFrame]:
         if self.call_stack:
             self._nested_depth -= 1
-            return self.call_stack.pop()
+            frame = self.call_stack.pop()
+            if frame.is_function:
+                self._function_frames.pop()
+                self._frame = self._function_frames[-1] if self._function_frames else None
+            elif frame.shadows:
+                self._shadowing -= 1
+            return frame
         return None
 
-    def increment_iteration(self) -> None:
+    def fork(self) -> "ExecutionContext":
+        """
+        Cria o contexto isolado de um ramo de PARALLEL.
+
+        O ramo enxerga as mesmas variaveis, mas escreve em copias proprias do
+        dicionario global e do frame de funcao atual. Funcoes, tools e
+        modulos importados sao compartilhados. As escritas voltam com `join`.
+        """
+        branch = ExecutionContext(self.registry, self.cache, self.config, self.variables)
+        branch.functions = self.functions
+        branch.imported_modules = self.imported_modules
+        branch.in_parallel = True
+        branch.profiler = self.profiler
+        branch.tracer = self.tracer
+        branch.trace_state = self.trace_state
+        branch.owned = None if self.owned is None else {}
+        branch.output = self.output
+        branch._iteration_count = self._iteration_count
+        branch._nested_depth = self._nested_depth
+        branch._shadowing = self._shadowing
+        branch.call_stack = list(self.call_stack)
+        branch._function_frames = list(self._function_frames)
+        frame = self._frame
+        if frame is not None:
+            copy = frame.copy()
+            for i, item in enumerate(branch.call_stack):
+                if item is frame:
+                    branch.call_stack[i] = copy
+            branch._function_frames[-1] = copy
+            branch._frame = copy
+        return branch
+
+    def join(self, branches: Sequence["ExecutionContext"]) -> None:
+        """
+        Aplica as escritas dos ramos criados com `fork`, na ordem dada.
+
+        Uma variavel conta como escrita por um ramo quando o valor dele nao e
+        o mesmo objeto de antes do PARALLEL; se varios ramos escrevem a mesma
+        variavel, vale o ultimo. As iteracoes dos ramos somam no contexto.
+        """
+        base_count = self._iteration_count
+        base_vars = dict(self.variables)
+        frame = self._frame
+        if frame is not None:
+            base_slots = list(frame.slots)
+            base_extra = dict(frame.extra)
+        for branch in branches:
+            for name, value in branch.variables.items():
+                if base_vars.get(name, _UNSET) is not value:
+                    self.variables[name] = value
+            if frame is not None:
+                copy = branch._frame
+                for i, value in enumerate(copy.slots):
+                    if value is not base_slots[i]:
+                        frame.slots[i] = value
+                for name, value in copy.extra.items():
+                    if base_extra.get(name, _UNSET) is not value:
+                        frame.extra[name] = value
+            self._iteration_count += branch._iteration_count - base_count
+
+    @property
+    def iteration_count(self) -> int:
+        return self._iteration_count
+
+    def increment_iteration(self, count: int = 1) -> None:
+        self._iteration_count += count
+
+    def tick(self) -> None:
+        """Equivale a `increment_iteration` seguido de `check_limits`."""
         self._iteration_count += 1
+        if self._iteration_count > self.config.max_iterations or self._nested_depth > self.config.max_nested_depth:
+            self.check_limits()
 
     def check_limits(self) -> None:
         if self._iteration_count > self.config.max_iterations:
@@ -128,6 +460,19 @@ class ExecutionContext:
 
     def reset(self) -> None:
         self.variables.clear()
+        self.imported_modules.clear()
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        """
+        Zera a contagem de iteracoes e descarta frames que ficaram abertos.
+
+        Variaveis, funcoes e modulos importados sao mantidos: e o inicio de
+        cada execucao em um contexto reaproveitado (ver `HMPSession`).
+        """
         self.call_stack.clear()
+        self._function_frames.clear()
+        self._frame = None
+        self._shadowing = 0
         self._iteration_count = 0
         self._nested_depth = 0
@@ -1,16 +1,32 @@
 """Engine for HMP scripts."""
 
-import json
-import re
+import hashlib
 import os
-from typing import Any, Dict, List, Optional, Sequence, Union
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
+from hmp.core.aio import AsyncInterpreter
+from hmp.core.batch import WorkerPool, execute_files, execute_many
 from hmp.core.context import ExecutionContext, HMPConfig
+from hmp.core.modules import ModuleCache, default_module_cache
+from hmp.core.optimizer import optimize_program
+from hmp.core.prepared import PreparedProgram
+from hmp.core.profiler import Profiler
+from hmp.core.resolver import resolve_program
+from hmp.core.tracing import Tracer, TracerGroup
 from hmp.tools.registry import ToolRegistry
-from hmp.expr.evaluator import safe_eval_expr
+from hmp.expr.evaluator import safe_eval_expr, eval_parsed
 from hmp.expr.cache import ExpressionCache
+from hmp.vm.bytecode import compile_statements
+from hmp.vm.machine import VirtualMachine
+from hmp.transpiler.runtime import Transpiler
 from hmp.runtime.errors import HMPRuntimeError, HMPLimitError
+from hmp.runtime.inplace import INPLACE_TOOLS, claim, release, settle
+from hmp.runtime.persistent import SEQUENCE_TYPES, thaw
 from hmp.parser.parser import Parser, HMPParseError
 from hmp.parser.ast import (
     Program,
@@ -30,11 +46,13 @@ from hmp.parser.ast import (
     Literal,
     Variable,
     InterpolatedString,
+    ParsedExpression,
 )
 
 from hmp.tools.math_tools import MathToolProvider
 from hmp.tools.string_tools import StringToolProvider
 from hmp.tools.list_tools import ListToolProvider
+from hmp.tools.set_tools import SetToolProvider
 from hmp.tools.json_tools import JsonToolProvider
 from hmp.tools.date_tools import DateToolProvider
 from hmp.tools.http_tools import HttpToolProvider
@@ -45,6 +63,16 @@ from hmp.tools.system_tools import SystemToolProvider
 from hmp.tools.meta_tools import MetaToolProvider
 
 
+def _run_now(fn, *args) -> Future:
+    """Executa `fn` na thread atual e devolve o resultado como um Future."""
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
 class HMPEngine:
     """
     Motor de execucao do HMP.
@@ -57,13 +85,37 @@ class HMPEngine:
         config: Optional[HMPConfig] = None,
         registry: Optional[ToolRegistry] = None,
         cache: Optional[ExpressionCache] = None,
-        script_path: Optional[str] = None
+        script_path: Optional[str] = None,
+        modules: Optional[ModuleCache] = None,
+        tracers: Optional[Iterable[Tracer]] = None
     ):
         self.config = config or HMPConfig()
         self.registry = registry or ToolRegistry()
-        self.cache = cache or ExpressionCache(maxsize=2000)
+        self.cache = cache or ExpressionCache(maxsize=self.config.expression_cache_size)
         self.script_path = script_path or os.getcwd()
-        self._imported_modules = set()
+        # Modulos de IMPORT ja parseados (por padrao, cache do processo)
+        self.modules = modules if modules is not None else default_module_cache
+        # PreparedProgram por hash do script (usado por compile e execute)
+        self._programs = ExpressionCache(maxsize=self.config.program_cache_size)
+        # Pool dos ramos de PARALLEL, criado no primeiro bloco executado
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Pool de processos de execute_many/execute_files, criado no primeiro lote
+        self._workers: Optional[WorkerPool] = None
+        self._pool_lock = threading.Lock()
+        # Tracers registrados e o despachante usado pelos contextos (None sem tracers)
+        self._tracers: List[Tracer] = []
+        self._tracer: Optional[TracerGroup] = None
+        for tracer in tracers or ():
+            self.add_tracer(tracer)
+        
+        self._vm = None
+        self._transpiler = None
+        if self.config.backend == "vm":
+            self._vm = VirtualMachine(self)
+        elif self.config.backend == "python":
+            self._transpiler = Transpiler(self)
+        elif self.config.backend != "tree":
+            raise ValueError(f"Backend desconhecido: {self.config.backend!r} (use 'tree', 'vm' ou 'python')")
         
         self._register_default_tools()
     
@@ -73,6 +125,7 @@ class HMPEngine:
             MathToolProvider(),
             StringToolProvider(),
             ListToolProvider(),
+            SetToolProvider(),
             JsonToolProvider(),
             DateToolProvider(),
             HttpToolProvider(),
@@ -86,54 +139,317 @@ class HMPEngine:
         for provider in providers:
             self.registry.register_provider(provider)
     
+    @property
+    def tracers(self) -> Tuple[Tracer, ...]:
+        return tuple(self._tracers)
+
+    def add_tracer(self, tracer: Tracer) -> None:
+        """
+        Registra um tracer (ver `hmp.core.tracing`) para as proximas execucoes.
+
+        Com tracers, as execucoes rodam no interpretador de arvore, com os
+        ramos de PARALLEL em sequencia.
+        """
+        self._tracers.append(tracer)
+        self._tracer = TracerGroup(self._tracers)
+
+    def remove_tracer(self, tracer: Tracer) -> None:
+        self._tracers.remove(tracer)
+        self._tracer = TracerGroup(self._tracers) if self._tracers else None
+
+    def compile(self, script: str, parser: Optional[Callable[[str], Program]] = None) -> PreparedProgram:
+        """
+        Prepara um script HMP para ser executado varias vezes.
+
+        O parse, a resolucao de slots e a compilacao para o backend acontecem
+        uma vez; o resultado fica no cache LRU do engine pelo hash do script.
+        `parser` substitui `Parser(script).parse()` quando o script nao esta no
+        cache (ex.: `IncrementalParser.parse`). Levanta HMPParseError se o
+        script for invalido.
+        """
+        digest = hashlib.sha256(script.encode('utf-8')).hexdigest()
+        prepared = self._programs.get(digest)
+        if prepared is None:
+            prepared = self._prepare(script, digest, parser(script) if parser is not None else None)
+            self._programs.set(digest, prepared)
+        return prepared
+
+    def compile_file(self, path: Union[str, os.PathLike]) -> PreparedProgram:
+        """
+        Como `compile`, mas a partir de um arquivo .hmp.
+
+        O arquivo passa pelo `ModuleCache` do engine: e parseado em streaming
+        (sem ler o texto inteiro para a memoria), ou carregado do .hmpc ao
+        lado se este estiver atualizado (ver `hmp compile`), e so volta a ser
+        lido quando o mtime ou o tamanho mudam.
+        """
+        entry = self.modules.load(Path(path).resolve())
+        prepared = self._programs.get(entry.digest)
+        if prepared is None:
+            prepared = self._prepare(None, entry.digest, entry.program)
+            self._programs.set(entry.digest, prepared)
+        return prepared
+
+    def _prepare(self, script: Optional[str], digest: str, program: Optional[Program] = None) -> PreparedProgram:
+        if program is None:
+            program = Parser(script).parse()
+        if self.config.optimize_level > 0:
+            # Devolve nos novos: a AST do ModuleCache/.hmpc fica intacta
+            program = optimize_program(program, self.config.optimize_level, self.cache)
+        resolve_program(program)
+
+        functions = {}
+        for statement in program.statements:
+            if isinstance(statement, FunctionDef):
+                entry = {
+                    "params": statement.params,
+                    "body": statement.body,
+                    "layout": statement.layout,
+                }
+                if self._vm is not None:
+                    entry["code"] = compile_statements(statement.body, statement.name, in_function=True, cache=self.cache)
+                functions[statement.name] = MappingProxyType(entry)
+
+        code = None
+        if self._vm is not None:
+            code = compile_statements(program.statements, cache=self.cache)
+        elif self._transpiler is not None:
+            code = self._transpiler.prepare(program, script, digest)
+
+        return PreparedProgram(
+            engine=self,
+            source=script,
+            digest=digest,
+            program=program,
+            functions=MappingProxyType(functions),
+            code=code,
+        )
+
     def execute(
         self, 
         script: str, 
-        initial_vars: Optional[Dict[str, Any]] = None
+        initial_vars: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Profiler] = None
     ) -> Dict[str, Any]:
         """
         Executa um script HMP.
+
+        Com `profiler`, os tempos por linha, funcao e tool sao registrados
+        nele (ver `hmp.core.profiler.Profiler`).
+        """
+        try:
+            prepared = self.compile(script)
+        except Exception as e:
+            result = self._new_result()
+            self._fail(result, e)
+            return result
+        return self.run_prepared(prepared, initial_vars, profiler)
+
+    def execute_file(
+        self,
+        path: Union[str, os.PathLike],
+        initial_vars: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Profiler] = None
+    ) -> Dict[str, Any]:
+        """Executa um arquivo .hmp (usando o .hmpc quando atualizado)."""
+        try:
+            prepared = self.compile_file(path)
+        except Exception as e:
+            result = self._new_result()
+            self._fail(result, e)
+            return result
+        return self.run_prepared(prepared, initial_vars, profiler)
+
+    def run_prepared(
+        self,
+        prepared: PreparedProgram,
+        initial_vars: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Profiler] = None
+    ) -> Dict[str, Any]:
+        """Executa um PreparedProgram em um contexto novo."""
+        context = self._new_context(prepared, initial_vars)
+        return self._run_in_context(prepared, context, profiler)
+
+    def _run_in_context(
+        self,
+        prepared: PreparedProgram,
+        context: ExecutionContext,
+        profiler: Optional[Profiler] = None
+    ) -> Dict[str, Any]:
+        """Executa o programa em `context`, com o profiler e os tracers ligados."""
+        result = self._new_result()
+        self._start_run(context, profiler)
+        
+        try:
+            self._execute_program(prepared.program, context, result, digest=prepared.digest, code=prepared.code)
+            self._collect_variables(context, result)
+        except Exception as e:
+            self._fail_run(result, e, context)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        
+        self._end_run(result, context)
+        return result
+
+    # Inicio e fim de uma execucao, compartilhados com `run_prepared_async`
+
+    def _start_run(self, context: ExecutionContext, profiler: Optional[Profiler]) -> None:
+        tracer = context.tracer = self._tracer
+        context.trace_state = {}
+        context.profiler = profiler
+        if profiler is not None:
+            profiler.start()
+        if tracer is not None:
+            tracer.on_run_start(context)
+
+    @classmethod
+    def _fail_run(cls, result: Dict[str, Any], error: Exception, context: ExecutionContext) -> None:
+        cls._fail(result, error)
+        if context.tracer is not None:
+            context.tracer.on_error(error, None, context)
+
+    @staticmethod
+    def _end_run(result: Dict[str, Any], context: ExecutionContext) -> None:
+        if context.tracer is not None:
+            context.tracer.on_run_end(result, context)
+
+    def execute_many(
+        self,
+        jobs: Iterable[Any],
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        script: Optional[str] = None,
+        chunksize: Optional[int] = None,
+        setup: Optional[Callable[["HMPEngine"], None]] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Executa um lote de scripts em um pool de processos.
+
+        `jobs` contem scripts, pares (script, variaveis iniciais) ou, quando
+        `script` e informado, apenas as variaveis iniciais de cada execucao.
+        Cada processo cria um engine com a mesma config e o registry pronto
+        e prepara cada script distinto uma vez; os jobs levam so o hash do
+        script e as variaveis. O pool fica no engine e e reaproveitado pelos
+        lotes seguintes com os mesmos `workers` e `setup` (ate `close`).
+        `setup(engine)` roda em cada processo (ex.: registrar tools proprias;
+        precisa ser importavel).
+
+        Gera pares (indice do job, resultado) na ordem de submissao
+        (`ordered=True`) ou na ordem em que terminam. Com `workers=1` roda
+        tudo neste processo.
+        """
+        return execute_many(self, jobs, workers, ordered, script, chunksize, setup)
+
+    def execute_files(
+        self,
+        paths: Iterable[Union[str, os.PathLike]],
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        initial_vars: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+        setup: Optional[Callable[["HMPEngine"], None]] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Executa varios arquivos .hmp em um pool de processos (ver `execute_many`).
+
+        Cada arquivo roda com `execute_file` (usando o .hmpc quando
+        atualizado) e as mesmas `initial_vars`. O resultado de cada um tem
+        tambem `file` e `time_ms` (tempo de parse e execucao no processo), e
+        o que o script imprimiu com log.print fica em `output`, uma linha por
+        item (nos processos do pool, tambem o que outras tools imprimem). Com
+        `workers=1` o `sys.stdout` do processo nao e trocado.
+        """
+        return execute_files(self, paths, workers, ordered, initial_vars, chunksize, setup)
+
+    async def execute_async(
+        self,
+        script: str,
+        initial_vars: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Profiler] = None
+    ) -> Dict[str, Any]:
+        """
+        Executa um script HMP como coroutine.
+
+        Tools sao chamadas com `ainvoke` (I/O nao bloqueante em http.* e
+        system.sleep; as demais rodam no executor de threads do loop) e os
+        ramos de PARALLEL rodam com `asyncio.gather`. O resultado tem o mesmo
+        formato de `execute`, e o `profiler` e os tracers do engine recebem os
+        mesmos eventos.
         """
+        try:
+            prepared = self.compile(script)
+        except Exception as e:
+            result = self._new_result()
+            self._fail(result, e)
+            return result
+        return await self.run_prepared_async(prepared, initial_vars, profiler)
+
+    async def run_prepared_async(
+        self,
+        prepared: PreparedProgram,
+        initial_vars: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Profiler] = None
+    ) -> Dict[str, Any]:
+        """Versao coroutine de `run_prepared` (sempre usa o interpretador de arvore)."""
+        context = self._new_context(prepared, initial_vars)
+        result = self._new_result()
+        self._start_run(context, profiler)
+        
+        try:
+            await AsyncInterpreter(self).run(prepared.program, context, result)
+            self._collect_variables(context, result)
+        except Exception as e:
+            self._fail_run(result, e, context)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        
+        self._end_run(result, context)
+        return result
+
+    def _new_context(
+        self,
+        prepared: PreparedProgram,
+        initial_vars: Optional[Dict[str, Any]]
+    ) -> ExecutionContext:
         context = ExecutionContext(
             registry=self.registry,
             cache=self.cache,
             config=self.config,
             initial_vars=initial_vars
         )
-        
-        result = {
+        # Copia rasa: backends anotam as entradas com codigo ligado ao contexto
+        context.functions.update((name, dict(func)) for name, func in prepared.functions.items())
+        return context
+
+    @staticmethod
+    def _collect_variables(context: ExecutionContext, result: Dict[str, Any]) -> None:
+        # Coleta todas as variaveis globais
+        result["variables"] = {
+            k: thaw(v) for k, v in context.variables.items() 
+            if not k.startswith('_') and k != 'last_result'
+        }
+        # Vetores persistentes das tools de lista saem como listas comuns
+        result["return_value"] = thaw(result["return_value"])
+
+    @staticmethod
+    def _new_result() -> Dict[str, Any]:
+        return {
             "success": True,
             "output": [],
             "variables": {},
             "return_value": None,
             "error": None
         }
-        
-        try:
-            parser = Parser(script)
-            program = parser.parse()
-            self._register_functions_ast(program, context, result)
-            self._execute_program(program, context, result)
-            
-            # Coleta todas as variaveis globais
-            result["variables"] = {
-                k: v for k, v in context.variables.items() 
-                if not k.startswith('_') and k != 'last_result'
-            }
-        except HMPParseError as e:
-            result["success"] = False
-            result["error"] = str(e)
-        except HMPLimitError as e:
-            result["success"] = False
-            result["error"] = str(e)
-        except HMPRuntimeError as e:
-            result["success"] = False
-            result["error"] = str(e)
-        except Exception as e:
-            result["success"] = False
-            result["error"] = f"Erro inesperado: {str(e)}"
-        
-        return result
+
+    @staticmethod
+    def _fail(result: Dict[str, Any], error: Exception) -> None:
+        result["success"] = False
+        if isinstance(error, (HMPParseError, HMPLimitError, HMPRuntimeError)):
+            result["error"] = str(error)
+        else:
+            result["error"] = f"Erro inesperado: {str(error)}"
     
     def _register_functions_ast(
         self,
@@ -147,15 +463,35 @@ class HMPEngine:
                 context.functions[statement.name] = {
                     "params": statement.params,
                     "body": statement.body,
+                    "layout": statement.layout,
                 }
 
     def _execute_program(
         self,
         program: Program,
         context: ExecutionContext,
-        result: Dict
+        result: Dict,
+        digest: Optional[str] = None,
+        code: Any = None
     ) -> None:
-        """Executa o programa."""
+        """
+        Executa o programa no backend configurado.
+
+        `code` e o codigo ja preparado para o backend (ver `_prepare`); sem
+        ele, o programa e compilado aqui. Com profiler ou tracer no contexto,
+        roda sempre no interpretador de arvore, que tem os ganchos.
+        """
+        instrumented = context.profiler is not None or context.tracer is not None
+        if self._transpiler is not None and not instrumented:
+            if code is None:
+                code = self._transpiler.prepare(program, digest=digest)
+            if self._transpiler.execute(code, context, result):
+                return
+        elif self._vm is not None and not instrumented:
+            if code is None:
+                code = compile_statements(program.statements, cache=self.cache)
+            self._vm.run(code, context, result)
+            return
         self._execute_statements(program.statements, context, result, in_function=False)
 
     def _execute_statements(
@@ -165,6 +501,8 @@ class HMPEngine:
         result: Dict,
         in_function: bool
     ) -> Optional[Any]:
+        if context.profiler is not None or context.tracer is not None:
+            return self._execute_statements_instrumented(statements, context, result, in_function)
         for statement in statements:
             context.increment_iteration()
             context.check_limits()
@@ -173,6 +511,48 @@ class HMPEngine:
                 return returned
         return None
 
+    def _execute_statements_instrumented(
+        self,
+        statements: Sequence[Statement],
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        """`_execute_statements` com os ganchos do profiler e do tracer do contexto."""
+        for statement in statements:
+            context.increment_iteration()
+            context.check_limits()
+            self._enter_line(statement, context)
+            try:
+                returned = self._execute_statement(statement, context, result, in_function)
+            except Exception as e:
+                self._line_error(e, statement, context)
+                raise
+            finally:
+                self._exit_line(context)
+            if in_function and returned is not None:
+                return returned
+        return None
+
+    # Ganchos por comando, compartilhados com o AsyncInterpreter
+
+    @staticmethod
+    def _enter_line(statement: Statement, context: ExecutionContext) -> None:
+        if context.tracer is not None:
+            context.tracer.on_statement(statement, context)
+        if context.profiler is not None:
+            context.profiler.enter_line(statement)
+
+    @staticmethod
+    def _line_error(error: Exception, statement: Statement, context: ExecutionContext) -> None:
+        if context.tracer is not None:
+            context.tracer.on_error(error, statement, context)
+
+    @staticmethod
+    def _exit_line(context: ExecutionContext) -> None:
+        if context.profiler is not None:
+            context.profiler.exit_line()
+
     def _execute_statement(
         self,
         statement: Statement,
@@ -182,7 +562,7 @@ class HMPEngine:
     ) -> Optional[Any]:
         if isinstance(statement, SetStatement):
             value = self._evaluate_expression(statement.value, context)
-            context.set_variable(statement.name, value)
+            context.store(statement.slot, statement.name, value)
             return None
             
         if isinstance(statement, CallStatement):
@@ -225,14 +605,14 @@ class HMPEngine:
             
         if isinstance(statement, ForEachStatement):
             items = self._evaluate_expression(statement.iterable, context)
-            if not isinstance(items, (list, tuple)):
+            if not isinstance(items, SEQUENCE_TYPES):
                 items = []
             
             context.push_frame('foreach')
             try:
                 for item in items:
                     context.check_limits()
-                    context.set_variable(statement.var_name, item)
+                    context.store(statement.slot, statement.var_name, item)
                     returned = self._execute_statements(statement.body, context, result, in_function)
                     if in_function and returned is not None:
                         return returned
@@ -248,7 +628,7 @@ class HMPEngine:
             except Exception as e:
                 context.push_frame('catch')
                 try:
-                    context.set_variable(statement.error_var, str(e))
+                    context.store(statement.slot, statement.error_var, str(e))
                     returned = self._execute_statements(statement.catch_body, context, result, in_function)
                     if in_function and returned is not None:
                         return returned
@@ -257,10 +637,116 @@ class HMPEngine:
             return None
             
         if isinstance(statement, ParallelStatement):
-            return self._execute_statements(statement.body, context, result, in_function)
+            return self._execute_parallel(statement, context, result, in_function)
             
         return None
 
+    def _execute_parallel(
+        self,
+        statement: ParallelStatement,
+        context: ExecutionContext,
+        result: Dict,
+        in_function: bool
+    ) -> Optional[Any]:
+        """
+        Executa cada comando do bloco PARALLEL como um ramo no pool de threads.
+
+        Cada ramo roda em um contexto isolado (`ExecutionContext.fork`) e as
+        escritas sao aplicadas na ordem do bloco ao final (`join`). Todos os
+        ramos rodam ate o fim; se algum falhar, as escritas dos que terminaram
+        sao aplicadas e o erro do primeiro ramo que falhou (na ordem do bloco)
+        e propagado. Dentro de funcoes, o retorno e o do primeiro ramo que
+        retornar um valor.
+
+        Com `parallel_max_workers` <= 1, em blocos aninhados dentro de um
+        ramo ou com profiler/tracer, os ramos rodam em sequencia na thread atual,
+        com o mesmo isolamento e o mesmo resultado.
+        """
+        branches = statement.body
+        forks = [context.fork() for _ in branches]
+        results = [dict(result) for _ in branches]
+        if (
+            self.config.parallel_max_workers <= 1
+            or len(branches) < 2
+            or context.in_parallel
+            or context.profiler is not None
+            or context.tracer is not None
+        ):
+            submit = _run_now
+        else:
+            submit = self._parallel_pool().submit
+        futures = [
+            submit(self._execute_statements, [branch], fork, branch_result, in_function)
+            for branch, fork, branch_result in zip(branches, forks, results)
+        ]
+
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append((future.result(), None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return self._join_branches(context, result, forks, results, outcomes)
+
+    @staticmethod
+    def _join_branches(
+        context: ExecutionContext,
+        result: Dict,
+        forks: Sequence[ExecutionContext],
+        results: Sequence[Dict],
+        outcomes: Sequence[Tuple[Any, Optional[Exception]]]
+    ) -> Optional[Any]:
+        """Aplica os ramos de um PARALLEL que terminaram e propaga o primeiro erro."""
+        finished = []
+        returned = None
+        error = None
+        base_return = result["return_value"]
+        for fork, branch_result, (value, branch_error) in zip(forks, results, outcomes):
+            if branch_error is not None:
+                if error is None:
+                    error = branch_error
+                continue
+            finished.append(fork)
+            if returned is None:
+                returned = value
+            if branch_result["return_value"] is not base_return:
+                result["return_value"] = branch_result["return_value"]
+
+        context.join(finished)
+        if error is not None:
+            raise error
+        context.check_limits()
+        return returned
+
+    def _parallel_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.config.parallel_max_workers,
+                    thread_name_prefix="hmp-parallel",
+                )
+            return self._pool
+
+    def _worker_pool(self, workers: int, setup: Optional[Callable[["HMPEngine"], None]]) -> WorkerPool:
+        with self._pool_lock:
+            pool = self._workers
+            if pool is not None and not pool.fits(self.config, self.script_path, workers, setup):
+                pool.shutdown()
+                pool = None
+            if pool is None:
+                pool = self._workers = WorkerPool(self.config, self.script_path, workers, setup)
+            return pool
+
+    def close(self) -> None:
+        """Encerra o pool de threads dos blocos PARALLEL e o de processos dos lotes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._workers is not None:
+                self._workers.shutdown()
+                self._workers = None
+
     def _execute_call(
         self,
         statement: CallStatement,
@@ -271,40 +757,135 @@ class HMPEngine:
         args = {name: self._evaluate_expression(expr, context) for name, expr in statement.params.items()}
         
         # Verifica se e uma funcao definida no script
-        if statement.tool in context.functions:
-            func = context.functions[statement.tool]
-            params_names = func["params"]
-            body = func["body"]
-            
-            local_vars = {}
-            for i, p_name in enumerate(params_names):
-                if p_name in args:
-                    local_vars[p_name] = args[p_name]
-                else:
-                    local_vars[p_name] = None
-            
-            context.push_frame(statement.tool, local_vars, is_function=True)
+        func = context.functions.get(statement.tool)
+        if func is not None:
+            body = self._push_function_frame(statement.tool, func, args, context)
             try:
-                val = self._execute_statements(body, context, result, in_function=True)
+                if context.profiler is None and context.tracer is None:
+                    val = self._execute_statements(body, context, result, in_function=True)
+                else:
+                    val = self._execute_body_instrumented(statement.tool, args, body, context, result)
             finally:
                 context.pop_frame()
-                
-            if statement.target:
-                context.set_variable(statement.target, val)
-            
-            context.set_variable('last_result', val)
-            return val
+            return self._store_call_result(statement, val, context)
         
         # Caso contrario, tenta executar como tool
+        return self._call_tool(statement, args, context)
+
+    # Partes do CALL sem espera, compartilhadas com o AsyncInterpreter
+
+    @staticmethod
+    def _push_function_frame(
+        name: str,
+        func: Mapping[str, Any],
+        args: Dict[str, Any],
+        context: ExecutionContext
+    ) -> Sequence[Statement]:
+        """Abre o frame de uma funcao do script (parametros ausentes valem None) e devolve o corpo."""
+        local_vars = {p_name: args.get(p_name) for p_name in func["params"]}
+        context.push_frame(name, local_vars, is_function=True, layout=func.get("layout"))
+        return func["body"]
+
+    @staticmethod
+    def _store_call_result(statement: CallStatement, val: Any, context: ExecutionContext) -> Any:
+        if statement.target:
+            context.store(statement.slot, statement.target, val)
+        context.set_variable('last_result', val)
+        return val
+
+    @staticmethod
+    def _enter_function(name: str, args: Dict[str, Any], context: ExecutionContext) -> float:
+        if context.profiler is not None:
+            context.profiler.enter_function(name)
+        if context.tracer is not None:
+            context.tracer.on_call_enter(name, args, context)
+        return time.perf_counter()
+
+    @staticmethod
+    def _exit_function(
+        name: str,
+        value: Any,
+        start: float,
+        context: ExecutionContext,
+        error: Optional[Exception]
+    ) -> None:
+        if context.profiler is not None:
+            context.profiler.exit_function()
+        if context.tracer is not None:
+            context.tracer.on_call_exit(name, value, time.perf_counter() - start, context, error)
+
+    def _execute_body_instrumented(
+        self,
+        name: str,
+        args: Dict[str, Any],
+        body: Sequence[Statement],
+        context: ExecutionContext,
+        result: Dict
+    ) -> Any:
+        """Corpo de uma funcao do script com os ganchos do profiler e do tracer."""
+        start = self._enter_function(name, args, context)
+        value = error = None
         try:
-            val = context.registry.execute(statement.tool, args, context)
-            if statement.target:
-                context.set_variable(statement.target, val)
-            
-            context.set_variable('last_result', val)
-            return val
+            value = self._execute_statements(body, context, result, in_function=True)
+            return value
         except Exception as e:
-            raise HMPRuntimeError(f"Erro ao chamar tool '{statement.tool}': {str(e)}")
+            error = e
+            raise
+        finally:
+            self._exit_function(name, value, start, context, error)
+
+    def _call_tool(
+        self,
+        statement: CallStatement,
+        args: Dict[str, Any],
+        context: ExecutionContext
+    ) -> Any:
+        if statement.inplace:
+            val = self._invoke_owned(statement, args, context)
+        else:
+            val = self._invoke_tool(statement.tool, args, context)
+        return self._store_call_result(statement, val, context)
+
+    def _invoke_owned(self, statement: CallStatement, args: Dict[str, Any], context: ExecutionContext) -> Any:
+        """Chamada de um CALL marcado como `inplace` (ver hmp.runtime.inplace)."""
+        owned = self._claim(statement, args, context)
+        val = self._invoke_tool(statement.tool, args, context, owned is not None)
+        if owned is not None:
+            settle(owned, statement.target, args, INPLACE_TOOLS[statement.tool], val)
+        return val
+
+    @staticmethod
+    def _claim(statement: CallStatement, args: Dict[str, Any], context: ExecutionContext) -> Optional[Dict[str, Any]]:
+        """
+        Prepara `args` para a chamada in-place de um CALL `inplace` (`claim`).
+
+        Retorna as listas criadas pelo engine no armazenamento que o `AS`
+        escreve (frame da funcao ou globais), ou None se a chamada segue
+        pelo caminho normal.
+        """
+        frame = context.function_frame
+        if statement.slot is not None:
+            if frame.owned is None:
+                frame.owned = {}
+            owned = frame.owned
+        elif frame is None:
+            owned = context.owned
+        else:
+            # Corpo principal de um modulo importado dentro de uma funcao:
+            # o `AS` escreve no frame, a leitura pode ter vindo da global
+            return None
+        # Tracers recebem os parametros depois da chamada: nada e alterado
+        if context.tracer is None and owned is not None:
+            if claim(args, INPLACE_TOOLS[statement.tool], owned.get(statement.target)):
+                return owned
+        release(owned, statement.target)
+        return None
+
+    def _invoke_tool(self, tool: str, args: Dict[str, Any], context: ExecutionContext, inplace: bool = False) -> Any:
+        try:
+            return context.registry.execute(tool, args, context, inplace)
+        except Exception as e:
+            raise HMPRuntimeError(f"Erro ao chamar tool '{tool}': {str(e)}")
 
     def _execute_import(
         self,
@@ -313,91 +894,76 @@ class HMPEngine:
         result: Dict
     ) -> None:
         module_path = statement.path
-        if module_path in self._imported_modules:
+        if module_path in context.imported_modules:
             return
-            
-        # Tenta carregar modulo
-        p = Path(self.script_path) / f"{module_path}.hmp"
-        if not p.exists():
-            p = Path(self.script_path) / "modules" / f"{module_path}.hmp"
-            
-        if p.exists():
-            try:
-                content = p.read_text()
-                parser = Parser(content)
-                program = parser.parse()
-                # Registra as funcoes do modulo no contexto atual
-                self._register_functions_ast(program, context, result)
-                # Executa o corpo do modulo (se houver comandos fora de funcoes)
-                self._execute_statements(program.statements, context, result, in_function=False)
-                self._imported_modules.add(module_path)
-            except Exception as e:
-                raise HMPRuntimeError(f"Erro ao importar modulo '{module_path}': {str(e)}")
-        else:
-            # Tenta no diretorio do script atual
-            script_dir = os.path.dirname(os.path.abspath(self.script_path))
-            p = Path(script_dir) / f"{module_path}.hmp"
-            if p.exists():
-                try:
-                    content = p.read_text()
-                    parser = Parser(content)
-                    program = parser.parse()
-                    self._register_functions_ast(program, context, result)
-                    self._execute_statements(program.statements, context, result, in_function=False)
-                    self._imported_modules.add(module_path)
-                    return
-                except Exception as e:
-                    raise HMPRuntimeError(f"Erro ao importar modulo '{module_path}': {str(e)}")
-            
-            # Tenta no diretorio atual de execucao
-            p = Path(os.getcwd()) / f"{module_path}.hmp"
-            if p.exists():
-                try:
-                    content = p.read_text()
-                    parser = Parser(content)
-                    program = parser.parse()
-                    self._register_functions_ast(program, context, result)
-                    self._execute_statements(program.statements, context, result, in_function=False)
-                    self._imported_modules.add(module_path)
-                    return
-                except Exception as e:
-                    raise HMPRuntimeError(f"Erro ao importar modulo '{module_path}': {str(e)}")
-            
-            # Tenta na pasta examples se estiver rodando um exemplo
-            p = Path(os.getcwd()) / "examples" / f"{module_path}.hmp"
-            if p.exists():
-                try:
-                    content = p.read_text()
-                    parser = Parser(content)
-                    program = parser.parse()
-                    self._register_functions_ast(program, context, result)
-                    self._execute_statements(program.statements, context, result, in_function=False)
-                    self._imported_modules.add(module_path)
-                    return
-                except Exception as e:
-                    raise HMPRuntimeError(f"Erro ao importar modulo '{module_path}': {str(e)}")
-            
+        
+        search_dirs = self._module_dirs()
+        path = self.modules.resolve(module_path, search_dirs)
+        if path is None:
             raise HMPRuntimeError(f"Modulo '{module_path}' nao encontrado em {self.script_path} ou caminhos alternativos.")
+        
+        try:
+            try:
+                module = self.modules.load(path)
+            except FileNotFoundError:
+                # O arquivo memorizado sumiu: resolve de novo
+                self.modules.forget(module_path, search_dirs)
+                path = self.modules.resolve(module_path, search_dirs)
+                if path is None:
+                    raise
+                module = self.modules.load(path)
+            # Registra as funcoes do modulo no contexto atual
+            self._register_functions_ast(module.program, context, result)
+            # Executa o corpo do modulo (se houver comandos fora de funcoes);
+            # as globais que ele altera tambem sao lidas pelo programa que importa
+            owned, context.owned = context.owned, None
+            try:
+                self._execute_program(module.program, context, result, digest=module.digest)
+            finally:
+                context.owned = owned
+            context.imported_modules.add(module_path)
+        except Exception as e:
+            raise HMPRuntimeError(f"Erro ao importar modulo '{module_path}': {str(e)}")
+
+    def _module_dirs(self) -> Tuple[str, ...]:
+        """Diretorios onde IMPORT procura `<modulo>.hmp`, em ordem."""
+        cwd = os.getcwd()
+        return (
+            self.script_path,
+            os.path.join(self.script_path, "modules"),
+            # Diretorio do script atual
+            os.path.dirname(os.path.abspath(self.script_path)),
+            # Diretorio atual de execucao
+            cwd,
+            # Pasta examples, se estiver rodando um exemplo
+            os.path.join(cwd, "examples"),
+        )
+
+    def _evaluate_expression(
+        self,
+        expr: Expression,
+        context: ExecutionContext,
+        scope: Optional[Mapping] = None
+    ) -> Any:
+        if scope is None:
+            scope = context.scope
+
+        if isinstance(expr, ParsedExpression):
+            return eval_parsed(expr, scope, self.cache)
 
-    def _evaluate_expression(self, expr: Expression, context: ExecutionContext) -> Any:
-        # Prepara dicionario de variaveis consolidado para o safe_eval_expr
-        vars_map = context.variables.copy()
-        for frame in context.call_stack:
-            vars_map.update(frame.variables)
-            
         if isinstance(expr, Literal):
             val = expr.value
             if isinstance(val, list):
-                return [self._evaluate_expression(e, context) if isinstance(e, Expression) else e for e in val]
+                return [self._evaluate_expression(e, context, scope) if isinstance(e, Expression) else e for e in val]
             if isinstance(val, dict):
-                return {k: self._evaluate_expression(v, context) if isinstance(v, Expression) else v for k, v in val.items()}
+                return {k: self._evaluate_expression(v, context, scope) if isinstance(v, Expression) else v for k, v in val.items()}
             return val
             
         if isinstance(expr, Variable):
             name = expr.name
             if name.startswith('${') and name.endswith('}'):
-                return safe_eval_expr(name[2:-1], vars_map, self.cache)
-            return context.get_variable(name)
+                return safe_eval_expr(name[2:-1], scope, self.cache)
+            return scope.get(name)
             
         if isinstance(expr, InterpolatedString):
             res = ""
@@ -405,7 +971,7 @@ class HMPEngine:
                 if isinstance(part, str):
                     res += part
                 else:
-                    val = self._evaluate_expression(part, context)
+                    val = self._evaluate_expression(part, context, scope)
                     res += str(val)
             return res
             
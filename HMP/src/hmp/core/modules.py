@@ -0,0 +1,134 @@
+"""Cache de modulos carregados por IMPORT, compartilhado pelo processo."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, TextIO, Tuple
+
+from hmp.core.resolver import resolve_program
+from hmp.parser import hmpc
+from hmp.parser.ast import Program
+from hmp.parser.parser import Parser
+
+
+@dataclass(frozen=True)
+class ModuleEntry:
+    """Modulo ja parseado, valido enquanto o arquivo tiver o mesmo mtime e tamanho."""
+    path: Path
+    mtime_ns: int
+    size: int
+    # sha256 do texto do arquivo (mesma chave de `HMPEngine.compile`)
+    digest: str
+    program: Program
+
+
+class _HashingReader:
+    """Arquivo de texto que calcula o sha256 (UTF-8) do que foi lido."""
+
+    def __init__(self, file: TextIO):
+        self._file = file
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> str:
+        chunk = self._file.read(size)
+        self._hash.update(chunk.encode('utf-8'))
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class ModuleCache:
+    """
+    Cache de modulos HMP por caminho resolvido e mtime.
+
+    Guarda o `Program` parseado (com slots resolvidos) de cada arquivo e a
+    resolucao nome -> caminho de cada IMPORT. Um `stat` por IMPORT confirma
+    que o arquivo nao mudou; se mudou (ou sumiu), o modulo e lido e parseado
+    de novo, ou carregado do .hmpc ao lado se este estiver atualizado.
+
+    Quais modulos ja rodaram em uma execucao fica no `ExecutionContext`,
+    nao aqui.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Path, ModuleEntry]" = OrderedDict()
+        self._resolved: Dict[Tuple[str, Tuple[str, ...]], Path] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def resolve(self, module_path: str, search_dirs: Sequence[str]) -> Optional[Path]:
+        """Primeiro `<dir>/<module_path>.hmp` existente, memorizado por (nome, diretorios)."""
+        key = (module_path, tuple(search_dirs))
+        path = self._resolved.get(key)
+        if path is not None:
+            return path
+        for directory in search_dirs:
+            candidate = Path(directory) / f"{module_path}.hmp"
+            if candidate.exists():
+                path = candidate.resolve()
+                with self._lock:
+                    self._resolved[key] = path
+                return path
+        return None
+
+    def load(self, path: Path) -> ModuleEntry:
+        """Retorna o modulo parseado, relendo o arquivo apenas se ele mudou."""
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._hits += 1
+                self._entries.move_to_end(path)
+                return entry
+            self._misses += 1
+
+        cached = hmpc.load_cached(path, stat)
+        if cached is not None:
+            digest, program = cached.digest, cached.program
+        else:
+            # Parse em streaming: o texto do arquivo nunca fica inteiro na memoria
+            with open(path, 'r', encoding='utf-8') as f:
+                reader = _HashingReader(f)
+                program = Parser(reader).parse()
+            digest = reader.hexdigest()
+        resolve_program(program)
+        entry = ModuleEntry(path, stat.st_mtime_ns, stat.st_size, digest, program)
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def forget(self, module_path: str, search_dirs: Sequence[str]) -> None:
+        """Descarta a resolucao memorizada (ex.: o arquivo resolvido sumiu)."""
+        with self._lock:
+            self._resolved.pop((module_path, tuple(search_dirs)), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._entries),
+            "resolved": len(self._resolved),
+            "maxsize": self._maxsize,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._resolved.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache padrao, compartilhado por todos os engines do processo
+default_module_cache = ModuleCache()
@@ -0,0 +1,310 @@
+"""Otimizacao da AST entre o parse e a execucao (`HMPConfig.optimize_level`)."""
+
+import dataclasses
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from hmp.expr.cache import ExpressionCache
+from hmp.expr.compiler import constant_value
+from hmp.parser import ast as hmp_ast
+from hmp.parser.ast import (
+    Program,
+    Statement,
+    SetStatement,
+    CallStatement,
+    ImportStatement,
+    ReturnStatement,
+    IfStatement,
+    LoopTimesStatement,
+    WhileStatement,
+    ForEachStatement,
+    FunctionDef,
+    TryCatchStatement,
+    ParallelStatement,
+    Expression,
+    Literal,
+    Variable,
+    InterpolatedString,
+    ParsedExpression,
+)
+
+# Tipos de valor que podem virar constante: imutaveis e sem efeito na leitura
+_SCALARS = (int, float, bool, str, type(None))
+
+# Niveis de otimizacao
+LEVEL_NONE = 0
+LEVEL_FOLD = 1
+LEVEL_PROPAGATE = 2
+
+
+def optimize_program(program: Program, level: int = LEVEL_FOLD, cache: Optional[ExpressionCache] = None) -> Program:
+    """
+    Retorna uma copia otimizada do programa (o original nao e alterado).
+
+    Nivel 1:
+        - expressoes `${...}` constantes viram `Literal` (ex.: `${5 + 3 * 2}`),
+          com as mesmas regras de pre-calculo do compilador de expressoes:
+          erros e listas/dicionarios continuam sendo avaliados na execucao;
+        - strings interpoladas sem partes variaveis viram `Literal`;
+        - listas e dicionarios literais guardam os valores escalares direto,
+          sem um no por elemento (cada avaliacao continua criando um objeto novo);
+        - IF com condicao constante perde o ramo que nunca roda, e WHILE com
+          condicao falsa perde o corpo.
+
+    Nivel 2 (inclui o 1):
+        - variaveis globais atribuidas uma unica vez no programa, com um
+          `SET` de valor escalar constante no corpo principal, sao
+          substituidas pelo valor nos comandos seguintes do corpo principal
+          (inclusive dentro de loops), e as subexpressoes que so dependiam
+          delas sao pre-calculadas. Programas com IMPORT ou PARALLEL, que
+          podem alterar globais por fora, nao passam por esta etapa.
+
+    Os comandos nunca sao removidos nem fundidos: a contagem de iteracoes
+    usada pelos limites de execucao fica igual a do programa original.
+    Rode antes de `resolve_program`.
+    """
+    return _Optimizer(level, cache).program(program)
+
+
+class _Optimizer:
+    def __init__(self, level: int, cache: Optional[ExpressionCache]):
+        self.level = level
+        self.cache = cache
+
+    # -- comandos ---------------------------------------------------------------
+
+    def program(self, program: Program) -> Program:
+        if self.level <= LEVEL_NONE:
+            return program
+        if self.level < LEVEL_PROPAGATE or not _propagation_allowed(program.statements):
+            return Program(line=program.line, statements=self._block(program.statements, {}))
+
+        counts = _assignment_counts(program.statements)
+        constants: Dict[str, Any] = {}
+        statements: List[Statement] = []
+        for statement in program.statements:
+            statement = self._statement(statement, constants)
+            statements.append(statement)
+            if (
+                isinstance(statement, SetStatement)
+                and counts.get(statement.name) == 1
+                and isinstance(statement.value, Literal)
+                and _is_scalar(statement.value.value)
+            ):
+                # Daqui em diante o valor da global e sempre este
+                constants = {**constants, statement.name: statement.value.value}
+        return Program(line=program.line, statements=tuple(statements))
+
+    def _block(self, statements: Sequence[Statement], constants: Mapping[str, Any]) -> tuple:
+        return tuple(self._statement(statement, constants) for statement in statements)
+
+    def _statement(self, statement: Statement, constants: Mapping[str, Any]) -> Statement:
+        line = statement.line
+        expr = self._expression
+
+        if isinstance(statement, SetStatement):
+            return SetStatement(line=line, name=statement.name, value=expr(statement.value, constants))
+
+        if isinstance(statement, CallStatement):
+            params = {name: expr(value, constants) for name, value in statement.params.items()}
+            return CallStatement(line=line, tool=statement.tool, params=params, target=statement.target)
+
+        if isinstance(statement, ReturnStatement):
+            return ReturnStatement(line=line, value=expr(statement.value, constants))
+
+        if isinstance(statement, IfStatement):
+            condition = expr(statement.condition, constants)
+            body, else_body = statement.body, statement.else_body
+            if isinstance(condition, Literal) and not isinstance(condition.value, (list, dict)):
+                # O IF continua la (conta como comando), so sem o ramo morto
+                if condition.value:
+                    else_body = ()
+                else:
+                    body = ()
+            return IfStatement(
+                line=line,
+                condition=condition,
+                body=self._block(body, constants),
+                else_body=self._block(else_body, constants),
+            )
+
+        if isinstance(statement, LoopTimesStatement):
+            return LoopTimesStatement(
+                line=line,
+                count=expr(statement.count, constants),
+                body=self._block(statement.body, constants),
+            )
+
+        if isinstance(statement, WhileStatement):
+            condition = expr(statement.condition, constants)
+            body = statement.body
+            if isinstance(condition, Literal) and not isinstance(condition.value, (list, dict)) and not condition.value:
+                body = ()
+            return WhileStatement(line=line, condition=condition, body=self._block(body, constants))
+
+        if isinstance(statement, ForEachStatement):
+            return ForEachStatement(
+                line=line,
+                var_name=statement.var_name,
+                iterable=expr(statement.iterable, constants),
+                body=self._block(statement.body, constants),
+            )
+
+        if isinstance(statement, FunctionDef):
+            # Dentro da funcao os nomes podem ser locais: sem propagacao
+            return FunctionDef(
+                line=line,
+                name=statement.name,
+                params=statement.params,
+                body=self._block(statement.body, {}),
+            )
+
+        if isinstance(statement, TryCatchStatement):
+            return TryCatchStatement(
+                line=line,
+                body=self._block(statement.body, constants),
+                catch_body=self._block(statement.catch_body, constants),
+                error_var=statement.error_var,
+            )
+
+        if isinstance(statement, ParallelStatement):
+            return ParallelStatement(line=line, body=self._block(statement.body, constants))
+
+        return statement
+
+    # -- expressoes -------------------------------------------------------------
+
+    def _expression(self, expr: Expression, constants: Mapping[str, Any]) -> Expression:
+        if isinstance(expr, ParsedExpression):
+            if constants:
+                body = _substitute(expr.body, constants)
+                if body is not expr.body:
+                    expr = ParsedExpression(line=expr.line, source=expr.source, body=body)
+            found, value = constant_value(expr, self.cache)
+            if found:
+                return Literal(line=expr.line, value=value)
+            return expr
+
+        if isinstance(expr, Variable):
+            name = expr.name
+            if name in constants and not (name.startswith('${') and name.endswith('}')):
+                return Literal(line=expr.line, value=constants[name])
+            return expr
+
+        if isinstance(expr, Literal):
+            value = expr.value
+            if isinstance(value, list):
+                return Literal(line=expr.line, value=[self._element(item, constants) for item in value])
+            if isinstance(value, dict):
+                return Literal(line=expr.line, value={key: self._element(item, constants) for key, item in value.items()})
+            return expr
+
+        if isinstance(expr, InterpolatedString):
+            parts: List[Union[str, Expression]] = []
+            for part in expr.parts:
+                if not isinstance(part, str):
+                    part = self._expression(part, constants)
+                    if isinstance(part, Literal) and _is_scalar(part.value):
+                        part = str(part.value)
+                if isinstance(part, str) and parts and isinstance(parts[-1], str):
+                    parts[-1] += part
+                else:
+                    parts.append(part)
+            if all(isinstance(part, str) for part in parts):
+                return Literal(line=expr.line, value=''.join(parts))
+            return InterpolatedString(line=expr.line, parts=parts)
+
+        return expr
+
+    def _element(self, item: Any, constants: Mapping[str, Any]) -> Any:
+        """Elemento de lista/dicionario literal: escalares constantes ficam como valor puro."""
+        if not isinstance(item, Expression):
+            return item
+        item = self._expression(item, constants)
+        if isinstance(item, Literal) and _is_scalar(item.value):
+            return item.value
+        return item
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, _SCALARS) and not (isinstance(value, str) and '${' in value)
+
+
+def _substitute(node: Expression, constants: Mapping[str, Any]) -> Expression:
+    """Troca `Name`s constantes por `Constant`; retorna o mesmo no se nada mudou."""
+    if isinstance(node, hmp_ast.Name):
+        if node.id in constants:
+            return hmp_ast.Constant(line=node.line, value=constants[node.id])
+        return node
+    if isinstance(node, hmp_ast.Constant):
+        return node
+
+    changed = {}
+    for name in _CHILDREN.get(type(node), ()):
+        value = getattr(node, name)
+        if isinstance(value, tuple):
+            new = tuple(_substitute(item, constants) for item in value)
+            if any(a is not b for a, b in zip(new, value)):
+                changed[name] = new
+        else:
+            new = _substitute(value, constants)
+            if new is not value:
+                changed[name] = new
+    if not changed:
+        return node
+    return dataclasses.replace(node, **changed)
+
+
+# Campos filhos (expressoes) de cada no de expressao
+_CHILDREN = {
+    hmp_ast.BinaryOp: ('left', 'right'),
+    hmp_ast.UnaryOp: ('operand',),
+    hmp_ast.Compare: ('left', 'comparators'),
+    hmp_ast.BoolOp: ('values',),
+    hmp_ast.Subscript: ('value', 'index'),
+    hmp_ast.Conditional: ('test', 'body', 'orelse'),
+    hmp_ast.ListExpr: ('elements',),
+    hmp_ast.TupleExpr: ('elements',),
+    hmp_ast.DictExpr: ('keys', 'values'),
+}
+
+
+def _walk(statements: Sequence[Statement], functions: bool) -> Iterable[Statement]:
+    """Todos os comandos aninhados; com `functions=False`, sem entrar em FUNCTION."""
+    for statement in statements:
+        yield statement
+        if isinstance(statement, FunctionDef):
+            if functions:
+                yield from _walk(statement.body, functions)
+        elif isinstance(statement, IfStatement):
+            yield from _walk(statement.body, functions)
+            yield from _walk(statement.else_body, functions)
+        elif isinstance(statement, TryCatchStatement):
+            yield from _walk(statement.body, functions)
+            yield from _walk(statement.catch_body, functions)
+        elif isinstance(statement, (LoopTimesStatement, WhileStatement, ForEachStatement, ParallelStatement)):
+            yield from _walk(statement.body, functions)
+
+
+def _propagation_allowed(statements: Sequence[Statement]) -> bool:
+    return not any(isinstance(s, (ImportStatement, ParallelStatement)) for s in _walk(statements, functions=True))
+
+
+def _assignment_counts(statements: Sequence[Statement]) -> Dict[str, int]:
+    """Quantas vezes cada global aparece como destino de atribuicao no corpo principal."""
+    counts: Dict[str, int] = {}
+
+    def add(name: Optional[str]) -> None:
+        if name:
+            counts[name] = counts.get(name, 0) + 1
+
+    for statement in _walk(statements, functions=False):
+        if isinstance(statement, SetStatement):
+            add(statement.name)
+        elif isinstance(statement, CallStatement):
+            add(statement.target)
+            add('last_result')
+        elif isinstance(statement, ForEachStatement):
+            add(statement.var_name)
+        elif isinstance(statement, TryCatchStatement):
+            add(statement.error_var)
+    return counts
@@ -0,0 +1,42 @@
+"""Programas HMP preparados para execucao repetida."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, TYPE_CHECKING
+
+from hmp.parser.ast import Program
+
+if TYPE_CHECKING:
+    from hmp.core.engine import HMPEngine
+
+
+@dataclass(frozen=True)
+class PreparedProgram:
+    """
+    Script ja parseado e pronto para rodar, obtido com `HMPEngine.compile`.
+
+    Guarda a AST, a tabela de funcoes definidas no script e o codigo do
+    backend (bytecode ou codigo Python compilado). Nada disso e alterado por
+    `run`: cada chamada cria o seu proprio `ExecutionContext`, entao o mesmo
+    objeto pode ser executado muitas vezes e por varias threads ao mesmo tempo.
+    """
+
+    engine: "HMPEngine"
+    # Texto do script; None quando a AST veio de um .hmpc
+    source: Optional[str]
+    digest: str
+    program: Program
+    # nome -> {"params", "body", "layout"[, "code"]} (somente leitura)
+    functions: Mapping[str, Mapping[str, Any]]
+    # Codigo do backend: Code da VM, (code, modulo) do transpilador ou None
+    code: Any = None
+
+    def run(self, initial_vars: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Executa o programa com as variaveis iniciais dadas; mesmo formato de `execute`."""
+        return self.engine.run_prepared(self, initial_vars)
+
+    async def run_async(self, initial_vars: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Versao coroutine de `run` (ver `HMPEngine.execute_async`)."""
+        return await self.engine.run_prepared_async(self, initial_vars)
+
+    def __repr__(self) -> str:
+        return f"PreparedProgram({self.digest[:12]}, {len(self.program.statements)} comandos)"
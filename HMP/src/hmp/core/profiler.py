@@ -0,0 +1,242 @@
+"""Profiler opcional: tempo gasto por linha, por funcao e por tool de um script HMP."""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from hmp.parser.ast import (
+    Statement,
+    SetStatement,
+    CallStatement,
+    ImportStatement,
+    ForEachStatement,
+    FunctionDef,
+)
+
+# Ordenacoes aceitas por `report` e `format_table`
+SORT_KEYS = ('self', 'cumulative', 'count')
+
+_ROOT = '<main>'
+
+
+class ProfileStat:
+    """Contagem e tempos (em segundos) de uma linha, funcao ou tool."""
+
+    __slots__ = ('count', 'self_time', 'cumulative')
+
+    def __init__(self):
+        self.count = 0
+        self.self_time = 0.0
+        self.cumulative = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'self_ms': round(self.self_time * 1000, 3),
+            'cumulative_ms': round(self.cumulative * 1000, 3),
+        }
+
+
+class _Frame:
+    __slots__ = ('key', 'stat', 'start', 'children')
+
+    def __init__(self, key: Any, stat: ProfileStat, start: float):
+        self.key = key
+        self.stat = stat
+        self.start = start
+        self.children = 0.0
+
+
+def describe(statement: Statement) -> str:
+    """Rotulo curto de um comando (ex.: 'CALL math.add', 'SET total')."""
+    if isinstance(statement, SetStatement):
+        return f'SET {statement.name}'
+    if isinstance(statement, CallStatement):
+        return f'CALL {statement.tool}'
+    if isinstance(statement, ImportStatement):
+        return f'IMPORT {statement.path}'
+    if isinstance(statement, ForEachStatement):
+        return f'FOR EACH {statement.var_name}'
+    if isinstance(statement, FunctionDef):
+        return f'FUNCTION {statement.name}'
+    return _KEYWORDS.get(type(statement).__name__, type(statement).__name__)
+
+
+_KEYWORDS = {
+    'ReturnStatement': 'RETURN',
+    'IfStatement': 'IF',
+    'LoopTimesStatement': 'LOOP',
+    'WhileStatement': 'WHILE',
+    'TryCatchStatement': 'TRY',
+    'ParallelStatement': 'PARALLEL',
+}
+
+
+class Profiler:
+    """
+    Mede o tempo de parede de execucoes no interpretador de arvore.
+
+    Passe uma instancia em `HMPEngine.execute(..., profiler=p)` (ou
+    `execute_file`/`run_prepared`); execucoes seguidas com o mesmo profiler
+    acumulam. Sem profiler, o interpretador nao passa por nenhum gancho, e
+    com ele os outros backends dao lugar ao interpretador de arvore e os
+    ramos de PARALLEL rodam em sequencia.
+
+    Tres visoes:
+        - `lines`: cada comando, pela linha e pelo rotulo (`describe`). O
+          tempo proprio exclui os comandos aninhados (corpo de blocos e das
+          funcoes chamadas), mas inclui as tools chamadas na linha;
+        - `functions` e `tools`: o tempo proprio exclui as funcoes e tools
+          chamadas de dentro;
+        - `stacks`: tempo proprio por pilha `<main>;funcao;tool`, exportado
+          por `collapsed` no formato dos geradores de flamegraph.
+
+    O acumulado de chamadas recursivas conta so a chamada mais externa.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.lines: Dict[Tuple[int, str], ProfileStat] = {}
+        self.functions: Dict[str, ProfileStat] = {}
+        self.tools: Dict[str, ProfileStat] = {}
+        self.stacks: Dict[str, float] = {}
+        self.runs = ProfileStat()
+        # Pilhas abertas: comandos de um lado, <main>/funcoes/tools do outro
+        self._line_frames: List[_Frame] = []
+        self._call_frames: List[_Frame] = []
+        self._path: List[str] = []
+        # Chave -> quantas vezes esta aberta (recursao)
+        self._active: Dict[Any, int] = {}
+
+    @property
+    def total(self) -> float:
+        """Tempo total (segundos) das execucoes medidas."""
+        return self.runs.cumulative
+
+    # -- ganchos do interpretador -----------------------------------------------
+
+    def start(self) -> None:
+        """Inicio de uma execucao."""
+        self._path.append(_ROOT)
+        self._push(self._call_frames, ('run', _ROOT), self.runs)
+
+    def stop(self) -> None:
+        """Fim de uma execucao (fecha o que tiver ficado aberto)."""
+        while self._line_frames:
+            self._pop(self._line_frames)
+        while self._call_frames:
+            self.exit_call()
+
+    def enter_line(self, statement: Statement) -> None:
+        key = (statement.line, describe(statement))
+        stat = self.lines.get(key)
+        if stat is None:
+            stat = self.lines[key] = ProfileStat()
+        self._push(self._line_frames, key, stat)
+
+    def exit_line(self) -> None:
+        self._pop(self._line_frames)
+
+    def enter_function(self, name: str) -> None:
+        self._enter_call(self.functions, 'function', name)
+
+    def enter_tool(self, name: str) -> None:
+        self._enter_call(self.tools, 'tool', name)
+
+    def exit_call(self) -> None:
+        """Fim da funcao ou tool aberta mais recente."""
+        own = self._pop(self._call_frames)
+        path = ';'.join(self._path)
+        self.stacks[path] = self.stacks.get(path, 0.0) + own
+        self._path.pop()
+
+    exit_function = exit_call
+    exit_tool = exit_call
+
+    def _enter_call(self, table: Dict[str, ProfileStat], kind: str, name: str) -> None:
+        stat = table.get(name)
+        if stat is None:
+            stat = table[name] = ProfileStat()
+        self._path.append(name)
+        self._push(self._call_frames, (kind, name), stat)
+
+    def _push(self, frames: List[_Frame], key: Any, stat: ProfileStat) -> None:
+        active = self._active
+        active[key] = active.get(key, 0) + 1
+        frames.append(_Frame(key, stat, self._clock()))
+
+    def _pop(self, frames: List[_Frame]) -> float:
+        frame = frames.pop()
+        elapsed = self._clock() - frame.start
+        own = elapsed - frame.children
+        stat = frame.stat
+        stat.count += 1
+        stat.self_time += own
+        active = self._active
+        depth = active[frame.key] - 1
+        if depth:
+            active[frame.key] = depth
+        else:
+            del active[frame.key]
+            stat.cumulative += elapsed
+        if frames:
+            frames[-1].children += elapsed
+        return own
+
+    # -- relatorios -------------------------------------------------------------
+
+    def report(self, sort: str = 'self') -> Dict[str, Any]:
+        """Relatorio serializavel em JSON, cada secao ordenada por `sort` (decrescente)."""
+        lines = [
+            {'line': line, 'statement': label, **stat.as_dict()}
+            for (line, label), stat in self.lines.items()
+        ]
+        functions = [{'name': name, **stat.as_dict()} for name, stat in self.functions.items()]
+        tools = [{'name': name, **stat.as_dict()} for name, stat in self.tools.items()]
+        return {
+            'runs': self.runs.count,
+            'total_ms': round(self.total * 1000, 3),
+            'lines': _sorted(lines, sort),
+            'functions': _sorted(functions, sort),
+            'tools': _sorted(tools, sort),
+        }
+
+    def to_json(self, sort: str = 'self', indent: int = 2) -> str:
+        return json.dumps(self.report(sort), indent=indent, ensure_ascii=False)
+
+    def format_table(self, sort: str = 'self', limit: int = 20) -> str:
+        """Tabelas de texto com as `limit` primeiras entradas de cada secao."""
+        report = self.report(sort)
+        out = [f"Tempo total: {report['total_ms']:.3f} ms ({report['runs']} execucao(oes))"]
+        sections = (
+            ('Linhas', 'lines', lambda row: f"{row['line']:>5}  {row['statement']}"),
+            ('Funcoes', 'functions', lambda row: row['name']),
+            ('Tools', 'tools', lambda row: row['name']),
+        )
+        for title, key, label in sections:
+            rows = report[key][:limit]
+            if not rows:
+                continue
+            labels = [label(row) for row in rows]
+            width = max(len(title), *(len(text) for text in labels))
+            out.append('')
+            out.append(f"{title:<{width}}  {'Vezes':>8}  {'Proprio (ms)':>12}  {'Acumulado (ms)':>14}")
+            for text, row in zip(labels, rows):
+                out.append(
+                    f"{text:<{width}}  {row['count']:>8}  {row['self_ms']:>12.3f}  {row['cumulative_ms']:>14.3f}"
+                )
+        return '\n'.join(out)
+
+    def collapsed(self) -> str:
+        """Uma linha `pilha microssegundos` por pilha (entrada de flamegraph.pl/speedscope)."""
+        return '\n'.join(
+            f'{path} {round(seconds * 1_000_000)}'
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+
+def _sorted(rows: List[Dict[str, Any]], sort: str) -> List[Dict[str, Any]]:
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Ordenacao desconhecida: {sort!r} (use {', '.join(SORT_KEYS)})")
+    field = 'count' if sort == 'count' else f'{sort}_ms'
+    return sorted(rows, key=lambda row: row[field], reverse=True)
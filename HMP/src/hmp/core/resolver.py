@@ -0,0 +1,312 @@
+"""Resolucao de slots das variaveis locais antes da execucao."""
+
+import dataclasses
+import re
+from typing import Any, Iterator, List, Sequence, Set, Tuple
+
+from hmp.core.context import FrameLayout
+from hmp.parser.ast import (
+    Program,
+    Statement,
+    Expression,
+    Variable,
+    ParsedExpression,
+    Name,
+    SetStatement,
+    CallStatement,
+    IfStatement,
+    LoopTimesStatement,
+    WhileStatement,
+    ForEachStatement,
+    FunctionDef,
+    TryCatchStatement,
+    ParallelStatement,
+    ImportStatement,
+    ReturnStatement,
+)
+from hmp.runtime.inplace import INPLACE_TOOLS
+from hmp.tools.list_tools import SCOPE_TOOLS
+
+# Identificadores que uma expressao (ou texto avaliado por ela) pode ler
+_IDENTIFIER = re.compile(r'[^\W\d]\w*')
+
+# Leitura de qualquer variavel: IMPORT, tools que avaliam expressoes em
+# texto e `last_result` (que aponta para o resultado do ultimo CALL)
+_ANY = '*'
+
+
+def resolve_program(program: Program) -> None:
+    """
+    Resolve os slots de todas as funcoes definidas no programa.
+
+    Os nos sao anotados in-place (`FunctionDef.layout`, `slot` dos comandos
+    que atribuem variaveis e `CallStatement.inplace`). Variaveis do corpo
+    principal continuam no dicionario global do contexto, lido por tools e
+    pelo resultado da execucao. Chamar de novo sobre um programa ja
+    resolvido nao faz nada.
+    """
+    for statement in program.statements:
+        if isinstance(statement, FunctionDef) and statement.layout is None:
+            resolve_function(statement)
+    private = _private_globals(program.statements)
+    for statement in _calls(program.statements):
+        # Corpo principal: leitura e escrita no dicionario global
+        if statement.target in private and _self_update(statement):
+            _mark(statement)
+
+
+def resolve_function(func: FunctionDef) -> FrameLayout:
+    """Atribui um slot fixo a cada variavel local da funcao."""
+    names: List[str] = list(dict.fromkeys(func.params))
+    _collect(func.body, names, {name: i for i, name in enumerate(names)})
+    _mark_inplace(func.body, set(func.params), _private(func.body))
+    layout = FrameLayout(names)
+    object.__setattr__(func, 'layout', layout)
+    return layout
+
+
+def _slot(name: str, names: List[str], index: dict) -> int:
+    slot = index.get(name)
+    if slot is None:
+        slot = index[name] = len(names)
+        names.append(name)
+    return slot
+
+
+def _collect(statements: Sequence[Statement], names: List[str], index: dict) -> None:
+    for statement in statements:
+        if isinstance(statement, SetStatement):
+            object.__setattr__(statement, 'slot', _slot(statement.name, names, index))
+        elif isinstance(statement, CallStatement):
+            _slot('last_result', names, index)
+            if statement.target:
+                object.__setattr__(statement, 'slot', _slot(statement.target, names, index))
+        elif isinstance(statement, IfStatement):
+            _collect(statement.body, names, index)
+            _collect(statement.else_body, names, index)
+        elif isinstance(statement, (LoopTimesStatement, WhileStatement, ParallelStatement)):
+            _collect(statement.body, names, index)
+        elif isinstance(statement, ForEachStatement):
+            object.__setattr__(statement, 'slot', _slot(statement.var_name, names, index))
+            _collect(statement.body, names, index)
+        elif isinstance(statement, TryCatchStatement):
+            _collect(statement.body, names, index)
+            if statement.error_var:
+                object.__setattr__(statement, 'slot', _slot(statement.error_var, names, index))
+            _collect(statement.catch_body, names, index)
+
+
+def _self_update(statement: CallStatement) -> bool:
+    """True para `CALL list.<acao> WITH list=${xs} ... AS xs` e afins (ver hmp.runtime.inplace)."""
+    target = statement.target
+    param = INPLACE_TOOLS.get(statement.tool)
+    return (
+        param is not None
+        and bool(target)
+        and target != 'last_result'
+        and _reads(statement.params.get(param), target)
+    )
+
+
+def _mark(statement: CallStatement) -> None:
+    object.__setattr__(statement, 'inplace', True)
+
+
+def _mark_inplace(statements: Sequence[Statement], assigned: Set[str], private: Set[str]) -> Set[str]:
+    """
+    Marca os CALLs de uma funcao que atualizam a propria lista (`_self_update`).
+
+    Dentro de funcao, ler uma local ainda sem valor cai na global de mesmo
+    nome, mas o `AS` escreve no slot local: so e o mesmo armazenamento se a
+    local ja tem valor em todos os caminhos ate o CALL. `assigned` sao as
+    locais com valor garantido no inicio do bloco; devolve as do fim.
+    `private` sao as locais sem leituras antes das atualizacoes (`_private`).
+    """
+    for statement in statements:
+        if isinstance(statement, SetStatement):
+            assigned.add(statement.name)
+        elif isinstance(statement, CallStatement):
+            if statement.target in assigned and statement.target in private and _self_update(statement):
+                _mark(statement)
+            if statement.target:
+                assigned.add(statement.target)
+            assigned.add('last_result')
+        elif isinstance(statement, IfStatement):
+            body = _mark_inplace(statement.body, set(assigned), private)
+            assigned = body & _mark_inplace(statement.else_body, set(assigned), private)
+        elif isinstance(statement, (LoopTimesStatement, WhileStatement)):
+            # O corpo pode nao rodar nenhuma vez
+            _mark_inplace(statement.body, set(assigned), private)
+        elif isinstance(statement, ForEachStatement):
+            _mark_inplace(statement.body, assigned | {statement.var_name}, private)
+        elif isinstance(statement, TryCatchStatement):
+            body = _mark_inplace(statement.body, set(assigned), private)
+            caught = set(assigned)
+            if statement.error_var:
+                caught.add(statement.error_var)
+            assigned = body & _mark_inplace(statement.catch_body, caught, private)
+        elif isinstance(statement, ParallelStatement):
+            # Cada ramo parte do mesmo estado; apos o join valem as escritas de todos
+            branches = [_mark_inplace([branch], set(assigned), private) for branch in statement.body]
+            assigned = assigned.union(*branches)
+    return assigned
+
+
+def _reads(expr: Expression, name: str) -> bool:
+    """True se a expressao e so a leitura da variavel `name`."""
+    if isinstance(expr, ParsedExpression):
+        expr = expr.body
+        return isinstance(expr, Name) and expr.id == name
+    return isinstance(expr, Variable) and expr.name == name
+
+
+def _calls(statements: Sequence[Statement]) -> Iterator[CallStatement]:
+    """CALLs do bloco e dos blocos aninhados (sem entrar em FUNCTION)."""
+    for statement in statements:
+        if isinstance(statement, CallStatement):
+            yield statement
+        elif isinstance(statement, IfStatement):
+            yield from _calls(statement.body)
+            yield from _calls(statement.else_body)
+        elif isinstance(statement, (LoopTimesStatement, WhileStatement, ForEachStatement, ParallelStatement)):
+            yield from _calls(statement.body)
+        elif isinstance(statement, TryCatchStatement):
+            yield from _calls(statement.body)
+            yield from _calls(statement.catch_body)
+
+
+def _private_globals(statements: Sequence[Statement]) -> Set[str]:
+    """
+    `_private` do corpo principal, sem as globais que funcoes ou modulos leem.
+
+    Funcoes podem ser chamadas de qualquer ponto, entao qualquer mencao no
+    corpo delas desqualifica a global (inclusive em atualizacoes: uma local
+    ainda sem valor le a global); com IMPORT, o modulo e as funcoes dele
+    tambem leem as globais, entao nenhuma e privada.
+    """
+    read: Set[str] = set()
+    for func in _statements(statements, functions=True):
+        if isinstance(func, ImportStatement):
+            return set()
+        if isinstance(func, FunctionDef):
+            for statement in _statements(func.body, functions=True):
+                read |= _statement_reads(statement, own_updates=False)
+    if _ANY in read:
+        return set()
+    return _private(statements) - read
+
+
+def _private(statements: Sequence[Statement]) -> Set[str]:
+    """
+    Alvos de `_self_update` no bloco sem nenhuma leitura antes de uma atualizacao.
+
+    Uma leitura (fora do parametro `list`/`items` da propria atualizacao)
+    pode guardar a lista em outro lugar; depois disso, alterar o valor da
+    variavel mudaria o que foi guardado. A variavel e privada quando toda
+    leitura dela vem depois da ultima atualizacao na ordem do programa e
+    fora dos loops que contem atualizacoes. E uma aproximacao conservadora:
+    qualquer identificador com o mesmo nome em uma expressao conta como
+    leitura.
+    """
+    reads: List[Tuple[int, Set[str], Tuple[int, ...]]] = []
+    updates: List[Tuple[int, str, Tuple[int, ...]]] = []
+
+    def visit(block: Sequence[Statement], loops: Tuple[int, ...]) -> None:
+        for statement in block:
+            position = len(reads) + len(updates)
+            if isinstance(statement, WhileStatement):
+                # A condicao e avaliada a cada volta
+                loops = loops + (id(statement),)
+            names = _statement_reads(statement)
+            if names:
+                reads.append((position, names, loops))
+            if isinstance(statement, CallStatement) and _self_update(statement):
+                updates.append((position, statement.target, loops))
+            if isinstance(statement, WhileStatement):
+                visit(statement.body, loops)
+                loops = loops[:-1]
+            elif isinstance(statement, (LoopTimesStatement, ForEachStatement)):
+                visit(statement.body, loops + (id(statement),))
+            elif isinstance(statement, IfStatement):
+                visit(statement.body, loops)
+                visit(statement.else_body, loops)
+            elif isinstance(statement, TryCatchStatement):
+                visit(statement.body, loops)
+                visit(statement.catch_body, loops)
+            elif isinstance(statement, ParallelStatement):
+                visit(statement.body, loops)
+
+    visit(statements, ())
+    private = {name for _, name, _ in updates}
+    for update_at, name, update_loops in updates:
+        for read_at, names, read_loops in reads:
+            if name not in names and _ANY not in names:
+                continue
+            if read_at <= update_at or set(read_loops) & set(update_loops):
+                private.discard(name)
+                break
+    return private
+
+
+def _statement_reads(statement: Statement, own_updates: bool = True) -> Set[str]:
+    """
+    Variaveis que o comando pode ler (`_ANY`: qualquer uma).
+
+    Com `own_updates`, o parametro lido por uma atualizacao (`_self_update`)
+    nao conta: ele le o mesmo armazenamento que a propria chamada escreve.
+    """
+    names: Set[str] = set()
+    if isinstance(statement, (SetStatement, ReturnStatement)):
+        _mentions(statement.value, names)
+    elif isinstance(statement, CallStatement):
+        if statement.tool in SCOPE_TOOLS:
+            return {_ANY}
+        skip = INPLACE_TOOLS.get(statement.tool) if own_updates and _self_update(statement) else None
+        for param, expr in statement.params.items():
+            if param != skip:
+                _mentions(expr, names)
+    elif isinstance(statement, (IfStatement, WhileStatement)):
+        _mentions(statement.condition, names)
+    elif isinstance(statement, LoopTimesStatement):
+        _mentions(statement.count, names)
+    elif isinstance(statement, ForEachStatement):
+        _mentions(statement.iterable, names)
+    elif isinstance(statement, ImportStatement):
+        return {_ANY}
+    if 'last_result' in names:
+        return {_ANY}
+    return names
+
+
+def _mentions(value: Any, names: Set[str]) -> None:
+    """Acrescenta a `names` os identificadores de uma expressao, inclusive em textos."""
+    if isinstance(value, str):
+        names.update(_IDENTIFIER.findall(value))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _mentions(item, names)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _mentions(key, names)
+            _mentions(item, names)
+    elif isinstance(value, Expression):
+        for item in dataclasses.fields(value):
+            if item.name not in ('line', 'compiled'):
+                _mentions(getattr(value, item.name), names)
+
+
+def _statements(statements: Sequence[Statement], functions: bool) -> Iterator[Statement]:
+    """Todos os comandos aninhados; com `functions=False`, sem entrar em FUNCTION."""
+    for statement in statements:
+        yield statement
+        if isinstance(statement, FunctionDef):
+            if functions:
+                yield from _statements(statement.body, functions)
+        elif isinstance(statement, IfStatement):
+            yield from _statements(statement.body, functions)
+            yield from _statements(statement.else_body, functions)
+        elif isinstance(statement, TryCatchStatement):
+            yield from _statements(statement.body, functions)
+            yield from _statements(statement.catch_body, functions)
+        elif isinstance(statement, (LoopTimesStatement, WhileStatement, ForEachStatement, ParallelStatement)):
+            yield from _statements(statement.body, functions)
@@ -0,0 +1,91 @@
+"""Sessoes interativas: um contexto de execucao que sobrevive entre comandos."""
+
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from hmp.core.context import ExecutionContext
+from hmp.core.prepared import PreparedProgram
+from hmp.parser.incremental import IncrementalParser
+
+if TYPE_CHECKING:
+    from hmp.core.engine import HMPEngine
+
+
+class HMPSession:
+    """
+    Sessao sobre um `HMPEngine` com um unico `ExecutionContext` vivo.
+
+    Cada `execute` roda no mesmo contexto: variaveis, funcoes definidas com
+    FUNCTION e modulos importados continuam disponiveis nos comandos
+    seguintes, sem copiar o dicionario de variaveis a cada linha. Os limites
+    de iteracao valem por execucao.
+
+    `execute_buffer` executa um buffer inteiro (ex.: um arquivo aberto no
+    editor) usando um `IncrementalParser` por buffer: ao executar de novo
+    depois de uma edicao, so os comandos alterados sao parseados.
+    """
+
+    def __init__(self, engine: Optional["HMPEngine"] = None, initial_vars: Optional[Dict[str, Any]] = None):
+        if engine is None:
+            from hmp.core.engine import HMPEngine
+            engine = HMPEngine()
+        self.engine = engine
+        self.context = self._new_context(initial_vars)
+        self._parsers: Dict[str, IncrementalParser] = {}
+
+    @property
+    def variables(self) -> Dict[str, Any]:
+        """Variaveis globais visiveis (mesmo filtro do resultado de `execute`)."""
+        result = self.engine._new_result()
+        self.engine._collect_variables(self.context, result)
+        return result["variables"]
+
+    @property
+    def functions(self) -> List[str]:
+        """Nomes das funcoes definidas na sessao."""
+        return sorted(self.context.functions)
+
+    def execute(self, script: str) -> Dict[str, Any]:
+        """Executa um trecho de script no contexto da sessao; mesmo formato de `HMPEngine.execute`."""
+        return self._run(script, None)
+
+    def execute_buffer(self, source: str, name: str = '<buffer>') -> Dict[str, Any]:
+        """Executa o buffer `name`, reparseando apenas o que mudou desde a ultima vez."""
+        parser = self._parsers.get(name)
+        if parser is None:
+            parser = self._parsers[name] = IncrementalParser()
+        return self._run(source, parser)
+
+    def run_prepared(self, prepared: PreparedProgram) -> Dict[str, Any]:
+        """Executa um programa ja preparado no contexto da sessao."""
+        context = self.context
+        context.reset_counters()
+        # Funcoes redefinidas substituem as anteriores
+        context.functions.update((name, dict(func)) for name, func in prepared.functions.items())
+        return self.engine._run_in_context(prepared, context)
+
+    def reset(self, initial_vars: Optional[Dict[str, Any]] = None) -> None:
+        """Descarta variaveis, funcoes e modulos importados (os caches de parse ficam)."""
+        self.context = self._new_context(initial_vars)
+
+    def _run(self, script: str, parser: Optional[IncrementalParser]) -> Dict[str, Any]:
+        engine = self.engine
+        try:
+            prepared = engine.compile(script, parser.parse if parser is not None else None)
+        except Exception as e:
+            result = engine._new_result()
+            engine._fail(result, e)
+            return result
+        return self.run_prepared(prepared)
+
+    def _new_context(self, initial_vars: Optional[Dict[str, Any]]) -> ExecutionContext:
+        engine = self.engine
+        context = ExecutionContext(
+            registry=engine.registry,
+            cache=engine.cache,
+            config=engine.config,
+            initial_vars=initial_vars,
+        )
+        # As globais sobrevivem entre execucoes e podem ser lidas por funcoes
+        # de comandos anteriores: sem atualizacao in-place (hmp.runtime.inplace)
+        context.owned = None
+        return context
@@ -0,0 +1,308 @@
+"""
+Ganchos de rastreamento da execucao (tracers).
+
+Um tracer e qualquer objeto com os metodos de `Tracer` (basta herdar e
+sobrescrever os que interessam). Registrados no engine
+(`HMPEngine(tracers=[...])` ou `engine.add_tracer`), passam a receber os
+eventos de todas as execucoes, sincronas (`execute`) ou assincronas
+(`execute_async`): inicio e fim da execucao, cada comando, entrada e saida
+de funcoes do script, cada chamada de tool e os erros. Sem tracers
+registrados, o interpretador nao passa por nenhum gancho.
+
+O estado de cada execucao (trace id, spans abertos) fica no contexto da
+execucao (`Tracer.run_state`), nunca no tracer ou na thread: varias
+execucoes assincronas podem se intercalar na mesma thread do event loop.
+Um erro dentro de um tracer nao interrompe o script: vira um
+`RuntimeWarning` e o tracer deixa de receber eventos ate o fim da execucao.
+
+Tracers prontos:
+    - `JsonLinesTracer`: um evento JSON por linha em um arquivo ou stream;
+    - `SpanExporter`: spans no formato do OpenTelemetry (execucao, funcoes e
+      tools, com trace/span ids e pai), um JSON por linha em arquivo local.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+import warnings
+from typing import IO, Any, Dict, Optional, Sequence, Union, TYPE_CHECKING
+
+from hmp.core.profiler import describe
+from hmp.parser.ast import Statement
+from hmp.runtime.persistent import PersistentVector, thaw
+from hmp.runtime.sets import ValueSet
+
+if TYPE_CHECKING:
+    from hmp.core.context import ExecutionContext
+
+
+class Tracer:
+    """Interface dos tracers; todos os metodos sao opcionais (padrao: nada)."""
+
+    def on_run_start(self, context: "ExecutionContext") -> None:
+        """Inicio de uma execucao."""
+
+    def on_statement(self, node: Statement, context: "ExecutionContext") -> None:
+        """Antes de cada comando."""
+
+    def on_call_enter(self, name: str, args: Dict[str, Any], context: "ExecutionContext") -> None:
+        """Entrada em uma funcao do script (FUNCTION), com os argumentos."""
+
+    def on_call_exit(
+        self,
+        name: str,
+        value: Any,
+        elapsed: float,
+        context: "ExecutionContext",
+        error: Optional[BaseException] = None
+    ) -> None:
+        """Saida da funcao: valor de retorno, duracao em segundos e o erro, se houve."""
+
+    def on_tool(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        result: Any,
+        elapsed: float,
+        context: "ExecutionContext"
+    ) -> None:
+        """Depois de cada chamada de tool (erros de tool chegam como `{"error": ...}`)."""
+
+    def on_error(self, error: BaseException, node: Optional[Statement], context: "ExecutionContext") -> None:
+        """Erro no comando `node` (None: fora de comandos, ex.: limite de iteracoes)."""
+
+    def on_run_end(self, result: Dict[str, Any], context: "ExecutionContext") -> None:
+        """Fim da execucao, com o resultado final."""
+
+    def run_state(self, context: "ExecutionContext") -> Dict[str, Any]:
+        """Dicionario deste tracer para a execucao de `context` (novo a cada execucao)."""
+        state = context.trace_state.get(id(self))
+        if state is None:
+            state = context.trace_state[id(self)] = {}
+        return state
+
+
+class TracerGroup(Tracer):
+    """
+    Repassa cada evento aos tracers registrados, na ordem de registro.
+
+    Um erro e reportado uma unica vez, no comando mais interno em que
+    ocorreu, mesmo propagando pelos blocos de fora. Um tracer que levanta
+    excecao e desligado ate o fim da execucao, sem afetar o script.
+    """
+
+    def __init__(self, tracers: Sequence[Tracer]):
+        self.tracers = tuple(tracers)
+
+    def _emit(self, event: str, context: "ExecutionContext", *args: Any) -> None:
+        """Chama `event(*args)` em cada tracer ainda ligado nesta execucao."""
+        failed = self.run_state(context).setdefault('failed', set())
+        for tracer in self.tracers:
+            if id(tracer) in failed:
+                continue
+            try:
+                getattr(tracer, event)(*args)
+            except Exception as e:
+                failed.add(id(tracer))
+                warnings.warn(
+                    f"tracer {type(tracer).__name__} falhou em {event} e foi desligado "
+                    f"nesta execucao: {type(e).__name__}: {e}",
+                    RuntimeWarning,
+                    stacklevel=2
+                )
+
+    def on_run_start(self, context):
+        self._emit('on_run_start', context, context)
+
+    def on_statement(self, node, context):
+        self._emit('on_statement', context, node, context)
+
+    def on_call_enter(self, name, args, context):
+        self._emit('on_call_enter', context, name, args, context)
+
+    def on_call_exit(self, name, value, elapsed, context, error=None):
+        self._emit('on_call_exit', context, name, value, elapsed, context, error)
+
+    def on_tool(self, name, params, result, elapsed, context):
+        self._emit('on_tool', context, name, params, result, elapsed, context)
+
+    def on_error(self, error, node, context):
+        state = self.run_state(context)
+        if state.get('error') is error:
+            return
+        state['error'] = error
+        self._emit('on_error', context, error, node, context)
+
+    def on_run_end(self, result, context):
+        self._emit('on_run_end', context, result, context)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (PersistentVector, ValueSet)):
+        return thaw(value)
+    return str(value)
+
+
+class _FileTracer(Tracer):
+    """Base dos tracers que escrevem uma linha JSON por registro."""
+
+    def __init__(self, target: Union[str, os.PathLike, IO[str]]):
+        if isinstance(target, (str, os.PathLike)):
+            self._stream = open(target, 'a', encoding='utf-8')
+            self._owned = True
+        else:
+            self._stream = target
+            self._owned = False
+        self._lock = threading.Lock()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            self._stream.write(line + '\n')
+
+    def flush(self) -> None:
+        with self._lock:
+            self._stream.flush()
+
+    def close(self) -> None:
+        """Fecha o arquivo (streams recebidos prontos so recebem flush)."""
+        with self._lock:
+            if self._owned:
+                self._stream.close()
+            else:
+                self._stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonLinesTracer(_FileTracer):
+    """
+    Grava cada evento como uma linha JSON (`{"ts": ..., "event": ..., ...}`).
+
+    Eventos: run_start, statement (linha e rotulo do comando; desligue com
+    `statements=False`), call_enter, call_exit, tool, error e run_end.
+    Parametros e resultados que nao sao JSON viram texto.
+    """
+
+    def __init__(self, target: Union[str, os.PathLike, IO[str]], statements: bool = True):
+        super().__init__(target)
+        self.statements = statements
+
+    def _event(self, event: str, **fields: Any) -> None:
+        self._write({'ts': time.time(), 'event': event, **fields})
+
+    def on_run_start(self, context):
+        self._event('run_start')
+
+    def on_statement(self, node, context):
+        if self.statements:
+            self._event('statement', line=node.line, statement=describe(node))
+
+    def on_call_enter(self, name, args, context):
+        self._event('call_enter', name=name, args=args)
+
+    def on_call_exit(self, name, value, elapsed, context, error=None):
+        fields = {'name': name, 'elapsed_ms': round(elapsed * 1000, 3), 'value': value}
+        if error is not None:
+            fields['error'] = str(error)
+        self._event('call_exit', **fields)
+
+    def on_tool(self, name, params, result, elapsed, context):
+        self._event('tool', name=name, params=params, result=result, elapsed_ms=round(elapsed * 1000, 3))
+
+    def on_error(self, error, node, context):
+        fields: Dict[str, Any] = {'error': str(error), 'type': type(error).__name__}
+        if node is not None:
+            fields.update(line=node.line, statement=describe(node))
+        self._event('error', **fields)
+
+    def on_run_end(self, result, context):
+        self._event('run_end', success=result['success'], error=result['error'])
+        self.flush()
+
+
+class _Span:
+    __slots__ = ('span_id', 'parent_id', 'name', 'start', 'attributes')
+
+    def __init__(self, span_id: str, parent_id: Optional[str], name: str, start: int, attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.attributes = attributes
+
+
+class SpanExporter(_FileTracer):
+    """
+    Exporta spans no formato do OpenTelemetry, um JSON por linha.
+
+    Cada execucao e um trace com um span raiz `hmp.run`; cada funcao do
+    script e cada tool viram spans filhos do span aberto no momento. Os
+    campos seguem o modelo de span do OTel (`trace_id`, `span_id`,
+    `parent_span_id`, `start_time_unix_nano`, `end_time_unix_nano`,
+    `attributes`, `status`) e cada span e gravado quando termina.
+    """
+
+    def __init__(self, target: Union[str, os.PathLike, IO[str]], service_name: str = 'hmp'):
+        super().__init__(target)
+        self.service_name = service_name
+
+    def _open(self, context: "ExecutionContext", name: str, attributes: Dict[str, Any], start: Optional[int] = None) -> _Span:
+        stack = self.run_state(context)['stack']
+        parent = stack[-1].span_id if stack else None
+        span = _Span(secrets.token_hex(8), parent, name, start or time.time_ns(), attributes)
+        stack.append(span)
+        return span
+
+    def _close(self, context: "ExecutionContext", error: Optional[str] = None, end: Optional[int] = None) -> None:
+        state = self.run_state(context)
+        span = state['stack'].pop()
+        if error is None:
+            status = {'code': 'OK'}
+        else:
+            status = {'code': 'ERROR', 'message': error}
+        self._write({
+            'trace_id': state['trace_id'],
+            'span_id': span.span_id,
+            'parent_span_id': span.parent_id,
+            'name': span.name,
+            'kind': 'INTERNAL',
+            'start_time_unix_nano': span.start,
+            'end_time_unix_nano': end or time.time_ns(),
+            'attributes': span.attributes,
+            'status': status,
+            'resource': {'service.name': self.service_name},
+        })
+
+    def on_run_start(self, context):
+        state = self.run_state(context)
+        state['trace_id'] = secrets.token_hex(16)
+        state['stack'] = []
+        self._open(context, 'hmp.run', {})
+
+    def on_call_enter(self, name, args, context):
+        self._open(context, name, {'hmp.kind': 'function', 'hmp.args': sorted(args)})
+
+    def on_call_exit(self, name, value, elapsed, context, error=None):
+        self._close(context, None if error is None else str(error))
+
+    def on_tool(self, name, params, result, elapsed, context):
+        end = time.time_ns()
+        self._open(context, name, {'hmp.kind': 'tool'}, start=end - int(elapsed * 1e9))
+        error = result.get('error') if isinstance(result, dict) else None
+        self._close(context, None if error is None else str(error), end=end)
+
+    def on_run_end(self, result, context):
+        stack = self.run_state(context)['stack']
+        if stack:
+            stack[0].attributes['hmp.iterations'] = context.iteration_count
+        # Spans que ficaram abertos por erro fecham junto com a execucao
+        while stack:
+            self._close(context, result['error'])
+        self.flush()
@@ -1,6 +1,7 @@
 """Modulo de avaliacao de expressoes."""
 
 from hmp.expr.cache import ExpressionCache
-from hmp.expr.evaluator import safe_eval_expr, SAFE_OPERATORS
+from hmp.expr.compiler import compile_expr
+from hmp.expr.evaluator import compile_source, safe_eval_expr, SAFE_OPERATORS
 
-__all__ = ["ExpressionCache", "safe_eval_expr", "SAFE_OPERATORS"]
+__all__ = ["ExpressionCache", "compile_expr", "compile_source", "safe_eval_expr", "SAFE_OPERATORS"]
@@ -1,7 +1,8 @@
 """Cache LRU para expressoes AST pre-compiladas."""
 
+import threading
 from collections import OrderedDict
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 import ast
 
 
@@ -13,27 +14,45 @@ class ExpressionCache:
         self._maxsize = maxsize
         self._hits = 0
         self._misses = 0
+        self._lock = threading.Lock()
 
-    def get_ast(self, expr_str: str) -> Optional[ast.AST]:
-        """Retorna AST cacheada ou None - move para o final (mais recente) em caso de hit."""
-        if expr_str in self._cache:
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna a entrada cacheada ou None - move para o final (mais recente) em caso de hit."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
             self._hits += 1
-            self._cache.move_to_end(expr_str)
-            return self._cache[expr_str]
-        return None
+            self._cache.move_to_end(key)
+            return entry
 
-    def set_ast(self, expr_str: str, tree: ast.AST) -> None:
-        """Armazena AST no cache - remove o mais antigo (LRU) se cheio."""
-        if expr_str in self._cache:
-            self._cache.move_to_end(expr_str)
-            self._cache[expr_str] = tree
+    def set(self, key: str, entry: Any) -> None:
+        """Armazena uma entrada no cache - remove a mais antiga (LRU) se cheio."""
+        if self._maxsize <= 0:
             return
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._cache[key] = entry
+                return
+
+            if len(self._cache) >= self._maxsize:
+                self._cache.popitem(last=False)
+
+            self._cache[key] = entry
 
-        if len(self._cache) >= self._maxsize:
-            self._cache.popitem(last=False)
+    def get_ast(self, expr_str: str) -> Optional[ast.AST]:
+        """Retorna AST cacheada ou None."""
+        return self.get(expr_str)
 
-        self._cache[expr_str] = tree
-        self._misses += 1
+    def set_ast(self, expr_str: str, tree: ast.AST) -> None:
+        """Armazena AST no cache."""
+        self.set(expr_str, tree)
 
     def stats(self) -> Dict[str, int]:
         """Retorna estatisticas do cache."""
@@ -42,11 +61,16 @@ class ExpressionCache:
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": round(self._hits / total * 100, 2) if total > 0 else 0,
-            "size": len(self._cache)
+            "size": len(self._cache),
+            "maxsize": self._maxsize,
         }
 
     def clear(self) -> None:
         """Limpa o cache."""
-        self._cache.clear()
-        self._hits = 0
-        self._misses = 0
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
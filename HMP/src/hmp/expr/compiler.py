@@ -0,0 +1,475 @@
+"""Compilador de expressoes para closures Python."""
+
+import ast
+import operator
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from hmp.parser import ast as hmp_ast
+
+if TYPE_CHECKING:
+    from hmp.expr.cache import ExpressionCache
+
+CompiledExpr = Callable[[Dict], Any]
+
+SAFE_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.And: lambda a, b: a and b,
+    ast.Or: lambda a, b: a or b,
+    ast.Not: operator.not_,
+}
+
+# Operadores dos nos de expressao do parser HMP, pelo simbolo
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '//': operator.floordiv,
+    '%': operator.mod,
+    '**': operator.pow,
+}
+
+UNARY_OPERATORS = {
+    '-': operator.neg,
+    '+': operator.pos,
+    'not': operator.not_,
+}
+
+COMPARE_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+_CONSTANT_NAMES = {
+    'true': True,
+    'false': False,
+    'none': None,
+    'null': None,
+}
+
+
+class _Constant:
+    """Marca closures de valor constante, usadas para pre-resolver subarvores."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __call__(self, variables: Dict) -> Any:
+        return self.value
+
+
+def compile_expr(tree: ast.AST, cache: Optional["ExpressionCache"] = None) -> CompiledExpr:
+    """
+    Compila uma AST de expressao em uma closure `fn(variables)`.
+
+    Operadores sao resolvidos e subarvores constantes pre-calculadas uma unica
+    vez; avaliar a expressao passa a ser uma chamada de funcao.
+    """
+    if isinstance(tree, ast.Expression):
+        tree = tree.body
+    return _compile(tree, cache)
+
+
+def compile_node(node: hmp_ast.Expression, cache: Optional["ExpressionCache"] = None) -> CompiledExpr:
+    """Compila um no de expressao do parser HMP em uma closure `fn(variables)`."""
+    handler = _NODE_HANDLERS.get(type(node))
+    if handler is None:
+        return _unsupported(f"Tipo de expressao nao suportado: {type(node).__name__}")
+    return handler(node, cache)
+
+
+def constant_value(node: hmp_ast.Expression, cache: Optional["ExpressionCache"] = None) -> Tuple[bool, Any]:
+    """
+    Retorna (True, valor) se a expressao for pre-calculada pelo compilador.
+
+    Segue as regras de `_fold`: expressoes que levantam erro ou resultam em
+    lista/dicionario nao sao constantes. Caso contrario retorna (False, None).
+    """
+    if isinstance(node, hmp_ast.ParsedExpression):
+        node = node.body
+    compiled = compile_node(node, cache)
+    if isinstance(compiled, _Constant) and not isinstance(compiled.value, (list, dict)):
+        return True, compiled.value
+    return False, None
+
+
+# -- construtores de closures (semantica compartilhada) ------------------------
+
+def _unsupported(message: str) -> CompiledExpr:
+    # O erro so e levantado se o ramo for de fato avaliado (ex.: IfExp, AND/OR)
+    def fn(variables):
+        raise ValueError(message)
+    return fn
+
+
+def _fold(fn: CompiledExpr, operands: Sequence[CompiledExpr]) -> CompiledExpr:
+    """Pre-calcula `fn` quando todos os operandos sao constantes."""
+    if all(isinstance(op, _Constant) for op in operands):
+        try:
+            value = fn({})
+        except Exception:
+            # Erros continuam acontecendo na avaliacao, como antes
+            return fn
+        if isinstance(value, (list, dict)):
+            return fn
+        return _Constant(value)
+    return fn
+
+
+def _build_name(name: str, cache) -> CompiledExpr:
+    lowered = name.lower()
+    if lowered in _CONSTANT_NAMES:
+        return _Constant(_CONSTANT_NAMES[lowered])
+
+    def fn(variables):
+        try:
+            val = variables[name]
+        except KeyError:
+            raise ValueError(f"Variavel nao definida: {name}") from None
+        # Se o valor da variavel for uma string com ${...}, resolvemos
+        if isinstance(val, str) and '${' in val:
+            from hmp.expr.evaluator import safe_eval_expr
+            return safe_eval_expr(val, variables, cache)
+        return val
+    return fn
+
+
+def _build_list(elts: List[CompiledExpr]) -> CompiledExpr:
+    def fn(variables):
+        return [f(variables) for f in elts]
+    return fn
+
+
+def _build_tuple(elts: List[CompiledExpr]) -> CompiledExpr:
+    def fn(variables):
+        return tuple(f(variables) for f in elts)
+    return _fold(fn, elts)
+
+
+def _build_dict(items: List[tuple]) -> CompiledExpr:
+    def fn(variables):
+        return {k(variables): v(variables) for k, v in items}
+    return fn
+
+
+def _build_binary(op: Optional[Callable], message: str, left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    if op is None:
+        def fn(variables):
+            left(variables)
+            right(variables)
+            raise ValueError(message)
+        return fn
+
+    if isinstance(right, _Constant):
+        value = right.value
+
+        def fn(variables):
+            return op(left(variables), value)
+    else:
+        def fn(variables):
+            return op(left(variables), right(variables))
+    return _fold(fn, [left, right])
+
+
+def _build_unary(op: Optional[Callable], message: str, operand: CompiledExpr) -> CompiledExpr:
+    if op is None:
+        def fn(variables):
+            operand(variables)
+            raise ValueError(message)
+        return fn
+
+    def fn(variables):
+        return op(operand(variables))
+    return _fold(fn, [operand])
+
+
+def _build_compare(left: CompiledExpr, chain: List[tuple]) -> CompiledExpr:
+    """`chain` contem (operador ou None, descricao, comparador)."""
+    comparators = [c for _, _, c in chain]
+
+    if len(chain) == 1 and chain[0][0] is not None:
+        op, _, right = chain[0]
+        if isinstance(right, _Constant):
+            value = right.value
+
+            def fn(variables):
+                return True if op(left(variables), value) else False
+        else:
+            def fn(variables):
+                return True if op(left(variables), right(variables)) else False
+        return _fold(fn, [left, right])
+
+    def fn(variables):
+        current = left(variables)
+        for op, label, comparator in chain:
+            right_value = comparator(variables)
+            if op is None:
+                raise ValueError(f"Comparacao nao suportada: {label}")
+            if not op(current, right_value):
+                return False
+            current = right_value
+        return True
+    return _fold(fn, [left] + comparators)
+
+
+def _build_and(values: List[CompiledExpr]) -> CompiledExpr:
+    if len(values) == 2:
+        first, second = values
+
+        def fn(variables):
+            return True if first(variables) and second(variables) else False
+    else:
+        def fn(variables):
+            for f in values:
+                if not f(variables):
+                    return False
+            return True
+    return _fold(fn, values)
+
+
+def _build_or(values: List[CompiledExpr]) -> CompiledExpr:
+    if len(values) == 2:
+        first, second = values
+
+        def fn(variables):
+            return True if first(variables) or second(variables) else False
+    else:
+        def fn(variables):
+            for f in values:
+                if f(variables):
+                    return True
+            return False
+    return _fold(fn, values)
+
+
+def _build_subscript(value: CompiledExpr, index: CompiledExpr) -> CompiledExpr:
+    if isinstance(index, _Constant):
+        key = index.value
+
+        def fn(variables):
+            return value(variables)[key]
+    else:
+        def fn(variables):
+            return value(variables)[index(variables)]
+    return fn
+
+
+def _build_conditional(test: CompiledExpr, body: CompiledExpr, orelse: CompiledExpr) -> CompiledExpr:
+    if isinstance(test, _Constant):
+        return body if test.value else orelse
+
+    def fn(variables):
+        if test(variables):
+            return body(variables)
+        return orelse(variables)
+    return fn
+
+
+# -- AST do Python (ast.parse) ------------------------------------------------
+
+def _compile(node: ast.AST, cache: Optional["ExpressionCache"]) -> CompiledExpr:
+    handler = _HANDLERS.get(type(node))
+    if handler is None:
+        return _unsupported(f"Tipo de expressao nao suportado: {type(node).__name__}")
+    return handler(node, cache)
+
+
+def _compile_constant(node: ast.Constant, cache) -> CompiledExpr:
+    return _Constant(node.value)
+
+
+def _compile_list(node: ast.List, cache) -> CompiledExpr:
+    return _build_list([_compile(e, cache) for e in node.elts])
+
+
+def _compile_tuple(node: ast.Tuple, cache) -> CompiledExpr:
+    return _build_tuple([_compile(e, cache) for e in node.elts])
+
+
+def _compile_dict(node: ast.Dict, cache) -> CompiledExpr:
+    if any(k is None for k in node.keys):
+        return _unsupported("Tipo de expressao nao suportado: NoneType")
+    return _build_dict([(_compile(k, cache), _compile(v, cache)) for k, v in zip(node.keys, node.values)])
+
+
+def _compile_name(node: ast.Name, cache) -> CompiledExpr:
+    return _build_name(node.id, cache)
+
+
+def _compile_binop(node: ast.BinOp, cache) -> CompiledExpr:
+    op_type = type(node.op)
+    return _build_binary(
+        SAFE_OPERATORS.get(op_type),
+        f"Operador nao suportado: {op_type}",
+        _compile(node.left, cache),
+        _compile(node.right, cache),
+    )
+
+
+def _compile_unaryop(node: ast.UnaryOp, cache) -> CompiledExpr:
+    op_type = type(node.op)
+    return _build_unary(
+        SAFE_OPERATORS.get(op_type),
+        f"Operador unario nao suportado: {op_type}",
+        _compile(node.operand, cache),
+    )
+
+
+def _compile_compare(node: ast.Compare, cache) -> CompiledExpr:
+    chain = [
+        (SAFE_OPERATORS.get(type(op)), type(op), _compile(c, cache))
+        for op, c in zip(node.ops, node.comparators)
+    ]
+    return _build_compare(_compile(node.left, cache), chain)
+
+
+def _compile_boolop(node: ast.BoolOp, cache) -> CompiledExpr:
+    values = [_compile(v, cache) for v in node.values]
+    if isinstance(node.op, ast.And):
+        return _build_and(values)
+    return _build_or(values)
+
+
+def _compile_subscript(node: ast.Subscript, cache) -> CompiledExpr:
+    return _build_subscript(_compile(node.value, cache), _compile(node.slice, cache))
+
+
+def _compile_ifexp(node: ast.IfExp, cache) -> CompiledExpr:
+    return _build_conditional(
+        _compile(node.test, cache),
+        _compile(node.body, cache),
+        _compile(node.orelse, cache),
+    )
+
+
+_HANDLERS: Dict[type, Callable[[Any, Any], CompiledExpr]] = {
+    ast.Constant: _compile_constant,
+    ast.List: _compile_list,
+    ast.Tuple: _compile_tuple,
+    ast.Dict: _compile_dict,
+    ast.Name: _compile_name,
+    ast.BinOp: _compile_binop,
+    ast.UnaryOp: _compile_unaryop,
+    ast.Compare: _compile_compare,
+    ast.BoolOp: _compile_boolop,
+    ast.Subscript: _compile_subscript,
+    ast.IfExp: _compile_ifexp,
+}
+
+
+# -- nos de expressao do parser HMP ---------------------------------------------
+
+def _compile_parsed(node: hmp_ast.ParsedExpression, cache) -> CompiledExpr:
+    body = compile_node(node.body, cache)
+    if isinstance(body, _Constant):
+        return body
+    source = node.source
+
+    def fn(variables):
+        try:
+            return body(variables)
+        except (SyntaxError, ValueError, TypeError):
+            # Mesmo resultado do avaliador textual (ex.: texto da expressao)
+            from hmp.expr.evaluator import safe_eval_expr
+            return safe_eval_expr(source, variables, cache)
+    return fn
+
+
+def _compile_node_constant(node: hmp_ast.Constant, cache) -> CompiledExpr:
+    return _Constant(node.value)
+
+
+def _compile_node_name(node: hmp_ast.Name, cache) -> CompiledExpr:
+    return _build_name(node.id, cache)
+
+
+def _compile_node_binary(node: hmp_ast.BinaryOp, cache) -> CompiledExpr:
+    return _build_binary(
+        BINARY_OPERATORS.get(node.op),
+        f"Operador nao suportado: {node.op}",
+        compile_node(node.left, cache),
+        compile_node(node.right, cache),
+    )
+
+
+def _compile_node_unary(node: hmp_ast.UnaryOp, cache) -> CompiledExpr:
+    return _build_unary(
+        UNARY_OPERATORS.get(node.op),
+        f"Operador unario nao suportado: {node.op}",
+        compile_node(node.operand, cache),
+    )
+
+
+def _compile_node_compare(node: hmp_ast.Compare, cache) -> CompiledExpr:
+    chain = [
+        (COMPARE_OPERATORS.get(op), op, compile_node(c, cache))
+        for op, c in zip(node.ops, node.comparators)
+    ]
+    return _build_compare(compile_node(node.left, cache), chain)
+
+
+def _compile_node_boolop(node: hmp_ast.BoolOp, cache) -> CompiledExpr:
+    values = [compile_node(v, cache) for v in node.values]
+    if node.op == 'and':
+        return _build_and(values)
+    return _build_or(values)
+
+
+def _compile_node_subscript(node: hmp_ast.Subscript, cache) -> CompiledExpr:
+    return _build_subscript(compile_node(node.value, cache), compile_node(node.index, cache))
+
+
+def _compile_node_conditional(node: hmp_ast.Conditional, cache) -> CompiledExpr:
+    return _build_conditional(
+        compile_node(node.test, cache),
+        compile_node(node.body, cache),
+        compile_node(node.orelse, cache),
+    )
+
+
+def _compile_node_list(node: hmp_ast.ListExpr, cache) -> CompiledExpr:
+    return _build_list([compile_node(e, cache) for e in node.elements])
+
+
+def _compile_node_tuple(node: hmp_ast.TupleExpr, cache) -> CompiledExpr:
+    return _build_tuple([compile_node(e, cache) for e in node.elements])
+
+
+def _compile_node_dict(node: hmp_ast.DictExpr, cache) -> CompiledExpr:
+    return _build_dict([(compile_node(k, cache), compile_node(v, cache)) for k, v in zip(node.keys, node.values)])
+
+
+_NODE_HANDLERS: Dict[type, Callable[[Any, Any], CompiledExpr]] = {
+    hmp_ast.ParsedExpression: _compile_parsed,
+    hmp_ast.Constant: _compile_node_constant,
+    hmp_ast.Name: _compile_node_name,
+    hmp_ast.BinaryOp: _compile_node_binary,
+    hmp_ast.UnaryOp: _compile_node_unary,
+    hmp_ast.Compare: _compile_node_compare,
+    hmp_ast.BoolOp: _compile_node_boolop,
+    hmp_ast.Subscript: _compile_node_subscript,
+    hmp_ast.Conditional: _compile_node_conditional,
+    hmp_ast.ListExpr: _compile_node_list,
+    hmp_ast.TupleExpr: _compile_node_tuple,
+    hmp_ast.DictExpr: _compile_node_dict,
+}
@@ -1,41 +1,112 @@
 """Avaliador seguro de expressoes usando AST."""
 
 import ast
-import operator
+import functools
 import re
-from typing import Any, Dict, Optional
+from collections import ChainMap
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from hmp.expr.cache import ExpressionCache
+# SAFE_OPERATORS continua exportado daqui, onde era definido antes do compilador
+from hmp.expr.compiler import SAFE_OPERATORS as SAFE_OPERATORS
+from hmp.expr.compiler import compile_expr, compile_node
+from hmp.parser.ast import ParsedExpression
 
-SAFE_OPERATORS = {
-    ast.Add: operator.add,
-    ast.Sub: operator.sub,
-    ast.Mult: operator.mul,
-    ast.Div: operator.truediv,
-    ast.FloorDiv: operator.floordiv,
-    ast.Mod: operator.mod,
-    ast.Pow: operator.pow,
-    ast.USub: operator.neg,
-    ast.UAdd: operator.pos,
-    ast.Eq: operator.eq,
-    ast.NotEq: operator.ne,
-    ast.Lt: operator.lt,
-    ast.LtE: operator.le,
-    ast.Gt: operator.gt,
-    ast.GtE: operator.ge,
-    ast.And: lambda a, b: a and b,
-    ast.Or: lambda a, b: a or b,
-    ast.Not: operator.not_,
-}
 
 _default_cache = ExpressionCache(maxsize=2000)
 
+_INTERPOLATION_RE = re.compile(r'\$\{(.*?)\}')
+_LOGICAL_OPERATORS = (
+    (re.compile(r'\bAND\b', re.IGNORECASE), 'and'),
+    (re.compile(r'\bOR\b', re.IGNORECASE), 'or'),
+    (re.compile(r'\bNOT\b', re.IGNORECASE), 'not'),
+)
+_PLACEHOLDER = '__hmp_interp_{}__'
+
+# Caracteres que, colados a um ${...}, fariam o valor se fundir com o texto vizinho.
+# Nesses casos a interpolacao continua sendo substituida textualmente.
+_UNSAFE_BEFORE = frozenset('_.\'")]}$')
+_UNSAFE_AFTER = frozenset('_.\'"([{$')
+
+# Marca expressoes cujo parse falhou, para nao repetir ast.parse a cada avaliacao
+_UNPARSEABLE = object()
+
 
 def get_default_cache() -> ExpressionCache:
     """Retorna o cache padrao de expressoes."""
     return _default_cache
 
 
+def _normalize_logical(expr_str: str) -> str:
+    """Normaliza operadores logicos estilo DSL para sintaxe Python."""
+    for pattern, replacement in _LOGICAL_OPERATORS:
+        expr_str = pattern.sub(replacement, expr_str)
+    return expr_str
+
+
+def _is_glued(char: str, unsafe: frozenset) -> bool:
+    return char.isalnum() or char in unsafe
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_expr(expr_str: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """
+    Normaliza o texto de uma expressao (uma unica vez por texto).
+
+    Cada ${...} interno vira um nome reservado, ligado ao valor da
+    interpolacao na avaliacao; assim o texto normalizado nao depende dos
+    valores e pode ser usado como chave do cache.
+
+    Returns:
+        (texto normalizado, expressoes interpoladas). O texto e None quando
+        alguma interpolacao precisa ser substituida textualmente.
+    """
+    if '${' not in expr_str:
+        return _normalize_logical(expr_str), ()
+
+    inner: List[str] = []
+    parts: List[str] = []
+    last_pos = 0
+    for match in _INTERPOLATION_RE.finditer(expr_str):
+        start, end = match.span()
+        before = expr_str[start - 1] if start > 0 else ' '
+        after = expr_str[end] if end < len(expr_str) else ' '
+        if _is_glued(before, _UNSAFE_BEFORE) or _is_glued(after, _UNSAFE_AFTER):
+            inner = [m.group(1) for m in _INTERPOLATION_RE.finditer(expr_str)]
+            return None, tuple(inner)
+        parts.append(expr_str[last_pos:start])
+        parts.append(_PLACEHOLDER.format(len(inner)))
+        inner.append(match.group(1))
+        last_pos = end
+    parts.append(expr_str[last_pos:])
+    return _normalize_logical(''.join(parts)), tuple(inner)
+
+
+def _substitute(expr_str: str, values: Sequence[Any]) -> str:
+    """Substitui textualmente cada ${...} pelo valor ja avaliado."""
+    it = iter(values)
+
+    def replace_var(match):
+        val = next(it)
+        if isinstance(val, str):
+            return f"'{val}'"
+        return str(val)
+
+    return _normalize_logical(_INTERPOLATION_RE.sub(replace_var, expr_str))
+
+
+def _compile(expr_str: str, cache: ExpressionCache) -> Any:
+    """Retorna a expressao normalizada compilada, consultando o cache antes do parse."""
+    compiled = cache.get(expr_str)
+    if compiled is None:
+        try:
+            compiled = compile_expr(ast.parse(expr_str, mode='eval'), cache)
+        except (SyntaxError, ValueError):
+            compiled = _UNPARSEABLE
+        cache.set(expr_str, compiled)
+    return compiled
+
+
 def safe_eval_expr(
     expr_str: str, 
     variables: Optional[Dict] = None,
@@ -54,121 +125,69 @@ def safe_eval_expr(
     if cache is None:
         cache = _default_cache
 
-    # Resolve interpolacoes recursivamente antes do parse
-    def replace_var(match):
-        var_expr = match.group(1)
-        val = safe_eval_expr(var_expr, variables, cache, _depth + 1)
-        if isinstance(val, str):
-            return f"'{val}'"
-        return str(val)
+    normalized, inner = normalize_expr(expr_str)
 
-    # Se a expressao contem ${...}, resolvemos primeiro
-    if '${' in expr_str:
-        expr_str = re.sub(r'\$\{(.*?)\}', replace_var, expr_str)
+    # Resolve interpolacoes recursivamente antes da avaliacao
+    values = [safe_eval_expr(var_expr, variables, cache, _depth + 1) for var_expr in inner]
 
-    # Normaliza operadores logicos estilo DSL para sintaxe Python
-    expr_str = re.sub(r'\bAND\b', 'and', expr_str, flags=re.IGNORECASE)
-    expr_str = re.sub(r'\bOR\b', 'or', expr_str, flags=re.IGNORECASE)
-    expr_str = re.sub(r'\bNOT\b', 'not', expr_str, flags=re.IGNORECASE)
+    scope = variables
+    if normalized is None:
+        normalized = _substitute(expr_str, values)
+    elif values:
+        scope = ChainMap(
+            {_PLACEHOLDER.format(i): val for i, val in enumerate(values)},
+            variables,
+        )
 
+    compiled = _compile(normalized, cache)
     try:
-        tree = ast.parse(expr_str, mode='eval')
-        return _eval_node(tree.body, variables)
-    except Exception as e:
-        if isinstance(e, (SyntaxError, ValueError, TypeError)):
-            return expr_str
-        raise e
-
+        if compiled is _UNPARSEABLE:
+            raise SyntaxError(normalized)
+        return compiled(scope)
+    except (SyntaxError, ValueError, TypeError):
+        if scope is not variables:
+            return _substitute(expr_str, values)
+        return normalized
 
-def _eval_node(node: ast.AST, variables: Dict) -> Any:
-    """Avalia um no da AST de forma segura."""
 
-    if isinstance(node, ast.Constant):
-        return node.value
+def compile_source(expr_str: str, cache: Optional[ExpressionCache] = None) -> Callable[[Any], Any]:
+    """
+    Compila o texto de uma expressao em uma closure `fn(variaveis)`.
 
-    if isinstance(node, ast.Num):
-        return node.n
+    Para tools que aplicam a mesma expressao a muitos valores: o texto e
+    normalizado e compilado uma vez e fica no cache. Levanta ValueError se a
+    expressao for invalida ou tiver interpolacoes ${...}.
+    """
+    normalized, inner = normalize_expr(expr_str)
+    if normalized is None or inner:
+        raise ValueError(f"Expressao com interpolacao nao suportada: {expr_str}")
+    compiled = _compile(normalized, cache if cache is not None else _default_cache)
+    if compiled is _UNPARSEABLE:
+        raise ValueError(f"Expressao invalida: {expr_str}")
+    return compiled
 
-    if isinstance(node, ast.Str):
-        return node.s
 
-    if isinstance(node, ast.List):
-        return [_eval_node(elem, variables) for elem in node.elts]
+def compile_parsed(expr: ParsedExpression, cache: Optional[ExpressionCache] = None) -> Callable[[Any], Any]:
+    """
+    Retorna a closure de uma expressao ja analisada pelo parser do script.
 
-    if isinstance(node, ast.Tuple):
-        return tuple(_eval_node(elem, variables) for elem in node.elts)
+    A closure e compilada na primeira chamada e guardada no proprio no, de
+    modo que o custo de parse/compilacao e pago uma vez por script.
+    """
+    compiled = expr.compiled
+    if compiled is None:
+        compiled = compile_node(expr, cache if cache is not None else _default_cache)
+        object.__setattr__(expr, 'compiled', compiled)
+    return compiled
 
-    if isinstance(node, ast.Dict):
-        return {
-            _eval_node(k, variables): _eval_node(v, variables)
-            for k, v in zip(node.keys, node.values)
-        }
 
-    if isinstance(node, ast.Name):
-        name = node.id
-        if name.lower() == 'true': return True
-        if name.lower() == 'false': return False
-        if name.lower() in ('none', 'null'): return None
-        
-        if name in variables:
-            val = variables[name]
-            # Se o valor da variavel for uma string com ${...}, resolvemos
-            if isinstance(val, str) and '${' in val:
-                return safe_eval_expr(val, variables)
-            return val
-        raise ValueError(f"Variavel nao definida: {name}")
-
-    if isinstance(node, ast.BinOp):
-        left = _eval_node(node.left, variables)
-        right = _eval_node(node.right, variables)
-        op_type = type(node.op)
-        if op_type in SAFE_OPERATORS:
-            return SAFE_OPERATORS[op_type](left, right)
-        raise ValueError(f"Operador nao suportado: {op_type}")
-
-    if isinstance(node, ast.UnaryOp):
-        operand = _eval_node(node.operand, variables)
-        op_type = type(node.op)
-        if op_type in SAFE_OPERATORS:
-            return SAFE_OPERATORS[op_type](operand)
-        raise ValueError(f"Operador unario nao suportado: {op_type}")
-
-    if isinstance(node, ast.Compare):
-        left = _eval_node(node.left, variables)
-        for op, comparator in zip(node.ops, node.comparators):
-            right = _eval_node(comparator, variables)
-            op_type = type(op)
-            if op_type not in SAFE_OPERATORS:
-                raise ValueError(f"Comparacao nao suportada: {op_type}")
-            if not SAFE_OPERATORS[op_type](left, right):
-                return False
-            left = right
-        return True
-
-    if isinstance(node, ast.BoolOp):
-        if isinstance(node.op, ast.And):
-            for v in node.values:
-                if not _eval_node(v, variables):
-                    return False
-            return True
-        if isinstance(node.op, ast.Or):
-            for v in node.values:
-                if _eval_node(v, variables):
-                    return True
-            return False
-
-    if isinstance(node, ast.Subscript):
-        value = _eval_node(node.value, variables)
-        if isinstance(node.slice, ast.Index):
-            index = _eval_node(node.slice.value, variables)
-        else:
-            index = _eval_node(node.slice, variables)
-        return value[index]
-
-    if isinstance(node, ast.IfExp):
-        test = _eval_node(node.test, variables)
-        if test:
-            return _eval_node(node.body, variables)
-        return _eval_node(node.orelse, variables)
-
-    raise ValueError(f"Tipo de expressao nao suportado: {type(node).__name__}")
+def eval_parsed(
+    expr: ParsedExpression,
+    variables: Dict,
+    cache: Optional[ExpressionCache] = None
+) -> Any:
+    """Avalia uma expressao ja analisada pelo parser do script."""
+    compiled = expr.compiled
+    if compiled is None:
+        compiled = compile_parsed(expr, cache)
+    return compiled(variables)
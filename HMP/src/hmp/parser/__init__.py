@@ -15,7 +15,20 @@ from hmp.parser.ast import (
     FunctionDef,
     TryCatchStatement,
     ParallelStatement,
+    ParsedExpression,
+    Constant,
+    Name,
+    BinaryOp,
+    UnaryOp,
+    Compare,
+    BoolOp,
+    Subscript,
+    Conditional,
+    ListExpr,
+    TupleExpr,
+    DictExpr,
 )
+from hmp.parser.expression import ExpressionParser, parse_expression
 from hmp.parser.parser import Parser, HMPParseError
 
 __all__ = [
@@ -35,6 +48,20 @@ __all__ = [
     "FunctionDef",
     "TryCatchStatement",
     "ParallelStatement",
+    "ParsedExpression",
+    "Constant",
+    "Name",
+    "BinaryOp",
+    "UnaryOp",
+    "Compare",
+    "BoolOp",
+    "Subscript",
+    "Conditional",
+    "ListExpr",
+    "TupleExpr",
+    "DictExpr",
+    "ExpressionParser",
+    "parse_expression",
     "Parser",
     "HMPParseError",
 ]
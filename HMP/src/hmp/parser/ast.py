@@ -1,42 +1,47 @@
-"""AST nodes for the HMP parser."""
+"""
+AST nodes for the HMP parser.
+
+Todos os nos usam `__slots__` (sem `__dict__` por instancia): programas
+preparados ficam residentes por muito tempo e a AST domina a memoria.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Sequence, Any, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Node:
     """Base AST node."""
     line: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Expression(Node):
     """Base class for expressions."""
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Literal(Expression):
     """Literal value (string, number, list, etc)."""
     value: Any
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Variable(Expression):
     """Variable reference."""
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InterpolatedString(Expression):
     """String with ${expr} interpolations."""
     parts: List[Union[str, Expression]]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Program(Node):
     """Root program node."""
     statements: Sequence["Statement"]
@@ -44,72 +49,159 @@ class Program(Node):
 
 class Statement(Node):
     """Base class for statements."""
+    __slots__ = ()
+
 
+# Campos `slot`/`layout`/`inplace` sao preenchidos pelo resolver (hmp.core.resolver)
+# apos o parse; ficam fora da comparacao e do repr dos nos.
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class SetStatement(Statement):
     name: str
     value: Expression
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CallStatement(Statement):
     tool: str
     params: Dict[str, Expression]
     target: Optional[str] = None
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
+    inplace: bool = field(default=False, compare=False, repr=False)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImportStatement(Statement):
     path: str
     namespace: Optional[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ReturnStatement(Statement):
     value: Expression
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IfStatement(Statement):
     condition: Expression
     body: Sequence[Statement]
     else_body: Sequence[Statement]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LoopTimesStatement(Statement):
     count: Expression
     body: Sequence[Statement]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WhileStatement(Statement):
     condition: Expression
     body: Sequence[Statement]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ForEachStatement(Statement):
     var_name: str
     iterable: Expression
     body: Sequence[Statement]
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FunctionDef(Statement):
     name: str
     params: List[str]
     body: Sequence[Statement]
+    layout: Optional[Any] = field(default=None, compare=False, repr=False)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TryCatchStatement(Statement):
     body: Sequence[Statement]
     catch_body: Sequence[Statement]
     error_var: Optional[str] = "error"
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParallelStatement(Statement):
     body: Sequence[Statement]
+
+
+# Nos de expressao gerados no parse de ${...} e das condicoes de IF/WHILE/LOOP/FOR.
+# Operadores sao guardados pelo simbolo ('+', '==', 'and', ...).
+
+@dataclass(frozen=True, slots=True)
+class ParsedExpression(Expression):
+    """Expressao ja analisada; `source` e o texto original usado como fallback."""
+    source: str
+    body: Expression
+    compiled: Optional[Callable[[Any], Any]] = field(default=None, compare=False, repr=False)
+
+
+@dataclass(frozen=True, slots=True)
+class Constant(Expression):
+    value: Any
+
+
+@dataclass(frozen=True, slots=True)
+class Name(Expression):
+    id: str
+
+
+@dataclass(frozen=True, slots=True)
+class BinaryOp(Expression):
+    op: str
+    left: Expression
+    right: Expression
+
+
+@dataclass(frozen=True, slots=True)
+class UnaryOp(Expression):
+    op: str
+    operand: Expression
+
+
+@dataclass(frozen=True, slots=True)
+class Compare(Expression):
+    left: Expression
+    ops: Tuple[str, ...]
+    comparators: Tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class BoolOp(Expression):
+    op: str
+    values: Tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Subscript(Expression):
+    value: Expression
+    index: Expression
+
+
+@dataclass(frozen=True, slots=True)
+class Conditional(Expression):
+    test: Expression
+    body: Expression
+    orelse: Expression
+
+
+@dataclass(frozen=True, slots=True)
+class ListExpr(Expression):
+    elements: Tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class TupleExpr(Expression):
+    elements: Tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class DictExpr(Expression):
+    keys: Tuple[Expression, ...]
+    values: Tuple[Expression, ...]
@@ -0,0 +1,322 @@
+"""Parser Pratt para expressoes ${...} do HMP."""
+
+import keyword
+import re
+import sys
+from typing import List, Optional, Tuple
+
+from hmp.runtime.errors import HMPSyntaxError
+from hmp.parser.ast import (
+    Expression,
+    ParsedExpression,
+    Constant,
+    Name,
+    BinaryOp,
+    UnaryOp,
+    Compare,
+    BoolOp,
+    Subscript,
+    Conditional,
+    ListExpr,
+    TupleExpr,
+    DictExpr,
+)
+
+# Mesmo recorte de interpolacoes usado pelo avaliador (primeiro '}' fecha)
+_INTERPOLATION_RE = re.compile(r'\$\{(.*?)\}')
+_LOGICAL_RE = re.compile(r'\b(AND|OR|NOT)\b', re.IGNORECASE)
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>[ \t\r]+)
+  | (?P<interp>\$\{)
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>\*\*|//|==|!=|<=|>=|[-+*/%<>()\[\]{},:])
+''', re.VERBOSE)
+
+_ESCAPES = {'\\': '\\', "'": "'", '"': '"', 'n': '\n', 't': '\t', 'r': '\r'}
+
+_CONSTANT_NAMES = {'true': True, 'false': False, 'none': None, 'null': None}
+
+_COMPARE_OPS = {'==', '!=', '<', '<=', '>', '>='}
+
+# Precedencia dos operadores binarios aritmeticos (Pratt)
+_BINARY_PRECEDENCE = {
+    '+': 10,
+    '-': 10,
+    '*': 20,
+    '/': 20,
+    '//': 20,
+    '%': 20,
+}
+
+# Caracteres que, colados a um ${...}, fazem o avaliador substituir o valor como texto
+_UNSAFE_BEFORE = frozenset('_.\'")]}$')
+_UNSAFE_AFTER = frozenset('_.\'"([{$')
+
+_LexToken = Tuple[str, object, int]
+
+
+def _lex(source: str) -> List[_LexToken]:
+    """Quebra o texto da expressao em tokens (tipo, valor, posicao)."""
+    tokens: List[_LexToken] = []
+    pos = 0
+    end = len(source)
+    while pos < end:
+        match = _TOKEN_RE.match(source, pos)
+        if match is None:
+            raise HMPSyntaxError(f"Caractere inesperado na expressao: {source[pos]!r}", column=pos)
+        kind = match.lastgroup
+        text = match.group()
+        start = pos
+        pos = match.end()
+
+        if kind == 'space':
+            continue
+
+        if kind == 'interp':
+            inner = _INTERPOLATION_RE.match(source, start)
+            if inner is None:
+                raise HMPSyntaxError("Interpolacao sem fechamento", column=start)
+            before = source[start - 1] if start > 0 else ' '
+            after = source[inner.end()] if inner.end() < end else ' '
+            if before.isalnum() or before in _UNSAFE_BEFORE or after.isalnum() or after in _UNSAFE_AFTER:
+                raise HMPSyntaxError("Interpolacao colada ao texto vizinho", column=start)
+            tokens.append(('interp', inner.group(1), start))
+            pos = inner.end()
+            continue
+
+        if kind == 'number':
+            if pos < end and (source[pos].isalnum() or source[pos] in '_.'):
+                raise HMPSyntaxError(f"Numero invalido: {text}", column=start)
+            if any(c in text for c in '.eE'):
+                tokens.append(('const', float(text), start))
+            else:
+                if len(text) > 1 and text[0] == '0' and text.strip('0'):
+                    raise HMPSyntaxError(f"Numero invalido: {text}", column=start)
+                tokens.append(('const', int(text), start))
+            continue
+
+        if kind == 'string':
+            tokens.append(('const', _unquote(text, start), start))
+            continue
+
+        if kind == 'name':
+            lowered = text.lower()
+            if lowered in ('and', 'or', 'not'):
+                tokens.append(('op', lowered, start))
+            elif text in ('if', 'else'):
+                tokens.append(('op', text, start))
+            elif lowered in _CONSTANT_NAMES:
+                tokens.append(('const', _CONSTANT_NAMES[lowered], start))
+            elif keyword.iskeyword(text):
+                raise HMPSyntaxError(f"Palavra reservada nao suportada: {text}", column=start)
+            else:
+                tokens.append(('name', sys.intern(text), start))
+            continue
+
+        tokens.append(('op', text, start))
+
+    tokens.append(('end', None, end))
+    return tokens
+
+
+def _unquote(text: str, column: int) -> str:
+    body = text[1:-1]
+    if '${' in body:
+        raise HMPSyntaxError("Interpolacao dentro de string", column=column)
+    # O avaliador normaliza AND/OR/NOT em todo o texto, inclusive em strings
+    body = _LOGICAL_RE.sub(lambda m: m.group(1).lower(), body)
+    if '\\' not in body:
+        return body
+    chars = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == '\\':
+            escaped = _ESCAPES.get(body[i + 1])
+            if escaped is None:
+                raise HMPSyntaxError(f"Escape nao suportado: \\{body[i + 1]}", column=column)
+            chars.append(escaped)
+            i += 2
+            continue
+        chars.append(c)
+        i += 1
+    return ''.join(chars)
+
+
+class ExpressionParser:
+    """
+    Parser Pratt/precedence-climbing para o subconjunto de expressoes do HMP.
+
+    Aceita apenas construcoes cuja semantica e identica a do avaliador
+    (`safe_eval_expr`); qualquer outra levanta HMPSyntaxError e o chamador
+    mantem o texto para avaliacao em tempo de execucao.
+    """
+
+    def __init__(self, source: str, line: int = 0):
+        self.source = source
+        self.line = line
+        self._tokens = _lex(source)
+        self._pos = 0
+
+    def parse(self) -> ParsedExpression:
+        body = self._parse_ternary()
+        kind, value, column = self._tokens[self._pos]
+        if kind != 'end':
+            raise HMPSyntaxError(f"Token inesperado na expressao: {value}", self.line, column)
+        return ParsedExpression(line=self.line, source=self.source, body=body)
+
+    # -- tokens ---------------------------------------------------------------
+
+    def _peek_op(self) -> Optional[str]:
+        kind, value, _ = self._tokens[self._pos]
+        return value if kind == 'op' else None
+
+    def _accept(self, op: str) -> bool:
+        if self._peek_op() == op:
+            self._pos += 1
+            return True
+        return False
+
+    def _expect(self, op: str) -> None:
+        if not self._accept(op):
+            kind, value, column = self._tokens[self._pos]
+            raise HMPSyntaxError(f"Esperado '{op}' na expressao", self.line, column)
+
+    # -- gramatica ------------------------------------------------------------
+
+    def _parse_ternary(self) -> Expression:
+        body = self._parse_or()
+        if self._accept('if'):
+            test = self._parse_or()
+            self._expect('else')
+            orelse = self._parse_ternary()
+            return Conditional(line=self.line, test=test, body=body, orelse=orelse)
+        return body
+
+    def _parse_or(self) -> Expression:
+        values = [self._parse_and()]
+        while self._accept('or'):
+            values.append(self._parse_and())
+        if len(values) == 1:
+            return values[0]
+        return BoolOp(line=self.line, op='or', values=tuple(values))
+
+    def _parse_and(self) -> Expression:
+        values = [self._parse_not()]
+        while self._accept('and'):
+            values.append(self._parse_not())
+        if len(values) == 1:
+            return values[0]
+        return BoolOp(line=self.line, op='and', values=tuple(values))
+
+    def _parse_not(self) -> Expression:
+        if self._accept('not'):
+            return UnaryOp(line=self.line, op='not', operand=self._parse_not())
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> Expression:
+        left = self._parse_binary(0)
+        ops = []
+        comparators = []
+        while self._peek_op() in _COMPARE_OPS:
+            ops.append(self._peek_op())
+            self._pos += 1
+            comparators.append(self._parse_binary(0))
+        if not ops:
+            return left
+        return Compare(line=self.line, left=left, ops=tuple(ops), comparators=tuple(comparators))
+
+    def _parse_binary(self, min_precedence: int) -> Expression:
+        left = self._parse_unary()
+        while True:
+            op = self._peek_op()
+            precedence = _BINARY_PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self._pos += 1
+            right = self._parse_binary(precedence + 1)
+            left = BinaryOp(line=self.line, op=op, left=left, right=right)
+
+    def _parse_unary(self) -> Expression:
+        op = self._peek_op()
+        if op in ('-', '+'):
+            self._pos += 1
+            return UnaryOp(line=self.line, op=op, operand=self._parse_unary())
+        return self._parse_power()
+
+    def _parse_power(self) -> Expression:
+        base = self._parse_postfix()
+        if self._accept('**'):
+            # Associativo a direita e mais forte que o unario a esquerda
+            return BinaryOp(line=self.line, op='**', left=base, right=self._parse_unary())
+        return base
+
+    def _parse_postfix(self) -> Expression:
+        node = self._parse_atom()
+        while self._accept('['):
+            index = self._parse_ternary()
+            self._expect(']')
+            node = Subscript(line=self.line, value=node, index=index)
+        return node
+
+    def _parse_atom(self) -> Expression:
+        kind, value, column = self._tokens[self._pos]
+        self._pos += 1
+
+        if kind == 'const':
+            return Constant(line=self.line, value=value)
+
+        if kind == 'name':
+            return Name(line=self.line, id=value)
+
+        if kind == 'interp':
+            return ExpressionParser(value, self.line).parse()
+
+        if value == '(':
+            if self._accept(')'):
+                return TupleExpr(line=self.line, elements=())
+            first = self._parse_ternary()
+            if self._accept(')'):
+                return first
+            elements = [first]
+            while self._accept(','):
+                if self._peek_op() == ')':
+                    break
+                elements.append(self._parse_ternary())
+            self._expect(')')
+            return TupleExpr(line=self.line, elements=tuple(elements))
+
+        if value == '[':
+            elements = self._parse_sequence(']')
+            return ListExpr(line=self.line, elements=tuple(elements))
+
+        if value == '{':
+            keys = []
+            values = []
+            while not self._accept('}'):
+                keys.append(self._parse_ternary())
+                self._expect(':')
+                values.append(self._parse_ternary())
+                if not self._accept(','):
+                    self._expect('}')
+                    break
+            return DictExpr(line=self.line, keys=tuple(keys), values=tuple(values))
+
+        raise HMPSyntaxError(f"Expressao invalida: {value}", self.line, column)
+
+    def _parse_sequence(self, closing: str) -> List[Expression]:
+        elements = []
+        while not self._accept(closing):
+            elements.append(self._parse_ternary())
+            if not self._accept(','):
+                self._expect(closing)
+                break
+        return elements
+
+
+def parse_expression(source: str, line: int = 0) -> ParsedExpression:
+    """Faz o parse do texto de uma expressao (sem o ${ })."""
+    return ExpressionParser(source, line).parse()
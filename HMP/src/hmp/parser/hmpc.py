@@ -0,0 +1,157 @@
+"""
+Arquivos .hmpc: AST de scripts HMP pre-parseada, no estilo dos .pyc.
+
+Formato (little-endian):
+
+    b'HMPC' | esquema (8 bytes) | mtime_ns (u64) | tamanho (u64) |
+    sha256 do fonte (32 bytes) | payload marshal
+
+O payload e a `Program` codificada em tuplas (apenas tipos nativos do
+`marshal`, nada de pickle). O esquema e derivado das classes de `hmp.parser.ast`,
+entao qualquer mudanca nos nos invalida os .hmpc antigos. Campos preenchidos
+depois do parse (`slot`, `layout`, `compiled`) nao sao gravados; quem carrega
+roda o resolver de novo.
+"""
+
+import dataclasses
+import hashlib
+import marshal
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from hmp.parser import ast as hmp_ast
+from hmp.parser.ast import Program
+from hmp.parser.parser import Parser
+
+MAGIC = b'HMPC'
+SUFFIX = '.hmpc'
+_HEADER = struct.Struct('<4s8sQQ32s')
+
+# Marcas de conteiner; indices >= 0 sao classes de no em `_NODES`
+_LIST = -1
+_TUPLE = -2
+_DICT = -3
+
+_FORMAT_ERROR = "Arquivo .hmpc de outro formato ou versao"
+
+_NODES: Tuple[type, ...] = tuple(
+    cls for cls in vars(hmp_ast).values()
+    if isinstance(cls, type) and dataclasses.is_dataclass(cls) and cls.__module__ == hmp_ast.__name__
+)
+_NODE_INDEX: Dict[type, int] = {cls: i for i, cls in enumerate(_NODES)}
+# Campos gravados de cada classe (os de comparacao, na ordem de declaracao)
+_FIELDS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(f.name for f in dataclasses.fields(cls) if f.compare) for cls in _NODES
+)
+SCHEMA = hashlib.sha256(
+    ';'.join(f"{cls.__name__}:{','.join(names)}" for cls, names in zip(_NODES, _FIELDS)).encode()
+).digest()[:8]
+
+
+class CachedProgram(NamedTuple):
+    """Conteudo de um .hmpc valido."""
+    program: Program
+    digest: str
+    mtime_ns: int
+    size: int
+
+
+def cache_path(source_path: Union[str, Path]) -> Path:
+    """Caminho do .hmpc de um arquivo .hmp (ao lado dele)."""
+    return Path(source_path).with_suffix(SUFFIX)
+
+
+def _encode(value: Any) -> Any:
+    cls = type(value)
+    index = _NODE_INDEX.get(cls)
+    if index is not None:
+        return (index,) + tuple(_encode(getattr(value, name)) for name in _FIELDS[index])
+    if cls is list:
+        return (_LIST, tuple(_encode(item) for item in value))
+    if cls is tuple:
+        return (_TUPLE, tuple(_encode(item) for item in value))
+    if cls is dict:
+        return (_DICT, tuple(value.keys()), tuple(_encode(item) for item in value.values()))
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if type(value) is not tuple:
+        return value
+    tag = value[0]
+    if tag == _LIST:
+        return [_decode(item) for item in value[1]]
+    if tag == _TUPLE:
+        return tuple(_decode(item) for item in value[1])
+    if tag == _DICT:
+        return dict(zip(value[1], (_decode(item) for item in value[2])))
+    # Indice negativo ou alem da tabela: arquivo corrompido, nao outro no
+    if type(tag) is not int or not 0 <= tag < len(_NODES):
+        raise ValueError(_FORMAT_ERROR)
+    cls = _NODES[tag]
+    return cls(**{name: _decode(item) for name, item in zip(_FIELDS[tag], value[1:])})
+
+
+def dumps(program: Program, source: str, mtime_ns: int = 0, size: int = 0) -> bytes:
+    """Serializa a `Program` parseada de `source`."""
+    digest = hashlib.sha256(source.encode('utf-8')).digest()
+    header = _HEADER.pack(MAGIC, SCHEMA, mtime_ns, size, digest)
+    return header + marshal.dumps(_encode(program))
+
+
+def loads(data: bytes) -> CachedProgram:
+    """Desserializa um .hmpc; levanta ValueError se o formato nao for o atual."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Arquivo .hmpc truncado")
+    magic, schema, mtime_ns, size, digest = _HEADER.unpack_from(data)
+    if magic != MAGIC or schema != SCHEMA:
+        raise ValueError(_FORMAT_ERROR)
+    program = _decode(marshal.loads(data[_HEADER.size:]))
+    return CachedProgram(program, digest.hex(), mtime_ns, size)
+
+
+def load_cached(source_path: Union[str, Path], stat: Optional[os.stat_result] = None) -> Optional[CachedProgram]:
+    """
+    Retorna o .hmpc de `source_path` se ele estiver atualizado, senao None.
+
+    Atualizado quer dizer mesmo mtime e tamanho do fonte gravados no
+    cabecalho; arquivos ausentes, corrompidos ou de outra versao sao
+    ignorados.
+    """
+    source_path = Path(source_path)
+    try:
+        stat = stat or source_path.stat()
+        data = cache_path(source_path).read_bytes()
+        magic, schema, mtime_ns, size, _ = _HEADER.unpack_from(data)
+        if magic != MAGIC or schema != SCHEMA or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+        return loads(data)
+    except (OSError, ValueError, EOFError, TypeError, IndexError, struct.error):
+        return None
+
+
+def compile_file(source_path: Union[str, Path]) -> Path:
+    """Parseia um .hmp e grava o .hmpc ao lado; levanta HMPParseError se invalido."""
+    source_path = Path(source_path)
+    stat = source_path.stat()
+    source = source_path.read_text(encoding='utf-8')
+    program = Parser(source).parse()
+    target = cache_path(source_path)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(dumps(program, source, stat.st_mtime_ns, stat.st_size))
+    os.replace(tmp, target)
+    return target
+
+
+def compile_dir(directory: Union[str, Path]) -> Tuple[List[Path], List[Tuple[Path, Exception]]]:
+    """Compila todos os .hmp abaixo de `directory`; retorna (gravados, erros)."""
+    written: List[Path] = []
+    errors: List[Tuple[Path, Exception]] = []
+    for path in sorted(Path(directory).rglob('*.hmp')):
+        try:
+            written.append(compile_file(path))
+        except Exception as e:
+            errors.append((path, e))
+    return written, errors
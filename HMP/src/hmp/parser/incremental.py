@@ -0,0 +1,175 @@
+"""
+Parse incremental de buffers HMP editados repetidamente (REPL, editores).
+
+O buffer e cortado em trechos de linhas, um por comando de nivel superior
+(com o bloco inteiro de IF/LOOP/FUNCTION/...). Cada trecho e identificado
+pelo hash do seu texto; so os trechos novos ou alterados passam pelo
+`Parser`, e os demais reaproveitam as subarvores do parse anterior.
+
+Os cortes sao feitos olhando cada linha isoladamente com o regex do
+`Tokenizer` (resultado em cache por linha). Linhas que terminam dentro de
+uma string ou expressao `${...}` encerram os cortes: dali ate o fim o buffer
+vira um trecho so. Se algum trecho falhar, o buffer inteiro e parseado de
+novo, entao erros e resultados sao sempre os de `Parser(buffer).parse()`.
+"""
+
+import dataclasses
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+from hmp.parser.ast import Node, Program, Statement
+from hmp.parser.parser import Parser
+from hmp.parser.tokenizer import Tokenizer
+
+# Palavras que abrem e fecham blocos
+_OPENERS = frozenset({'IF', 'LOOP', 'WHILE', 'FOR', 'FUNCTION', 'TRY', 'PARALLEL'})
+_CLOSERS = frozenset({'ENDIF', 'ENDLOOP', 'ENDWHILE', 'ENDFOR', 'ENDFUNCTION', 'ENDTRY', 'ENDPARALLEL'})
+# Palavras que iniciam um comando
+_STARTERS = _OPENERS | {'SET', 'CALL', 'IMPORT', 'RETURN'}
+
+_CLOSED_STRING = re.compile(r'"(?:[^"\\]|\\[\s\S])*"|\'(?:[^\'\\]|\\[\s\S])*\'')
+# Apenas para `_expression_end`, que nao depende do estado da instancia
+_TOKENIZER = Tokenizer('')
+
+
+class LineInfo(NamedTuple):
+    """Resumo de uma linha usado para achar os cortes."""
+    starts: bool      # primeira palavra inicia um comando
+    depth: int        # blocos abertos menos fechados na linha
+    complete: bool    # False se a linha termina dentro de string/expressao
+
+
+def scan_line(line: str) -> LineInfo:
+    """Classifica uma linha (sem o '\\n') com os mesmos tokens do `Tokenizer`."""
+    match = Tokenizer._MASTER.match
+    starts = False
+    depth = 0
+    pos = 0
+    first = True
+    while True:
+        m = match(line, pos)
+        kind = m.lastgroup
+        if kind in ('END', 'COMMENT'):
+            return LineInfo(starts, depth, True)
+        pos = m.end()
+        if kind == 'IDENTIFIER':
+            word = m['IDENTIFIER'].upper()
+            if first:
+                starts = word in _STARTERS
+            if word in _OPENERS:
+                depth += 1
+            elif word in _CLOSERS:
+                depth -= 1
+        elif kind == 'STRING':
+            if not _CLOSED_STRING.fullmatch(m['STRING']):
+                return LineInfo(starts, depth, False)
+        elif kind == 'NESTED':
+            pos = _TOKENIZER._expression_end(line, pos)
+            if pos is None:
+                return LineInfo(starts, depth, False)
+        first = False
+
+
+def is_complete(source: str) -> bool:
+    """True se `source` nao tem blocos, strings ou expressoes abertos (entrada do REPL)."""
+    depth = 0
+    for line in source.split('\n'):
+        info = scan_line(line)
+        if not info.complete:
+            return False
+        depth += info.depth
+    return depth <= 0
+
+
+class IncrementalParser:
+    """
+    Parser que reaproveita o parse anterior do mesmo buffer.
+
+    `parse(source)` retorna a mesma AST que `Parser(source).parse()`; trechos
+    com o mesmo texto de antes voltam com os mesmos nos (apenas com as linhas
+    deslocadas, se o trecho mudou de posicao). O cache guarda so os trechos do
+    ultimo parse, entao nao cresce com o historico de edicoes.
+    """
+
+    def __init__(self):
+        # texto da linha -> LineInfo
+        self._lines: Dict[str, LineInfo] = {}
+        # texto do trecho (chave de hash) -> (linha inicial, comandos)
+        self._chunks: Dict[str, Tuple[int, Tuple[Statement, ...]]] = {}
+        self.reparsed = 0
+        self.reused = 0
+
+    def parse(self, source: str) -> Program:
+        lines = source.split('\n')
+        chunks: Dict[str, Tuple[int, Tuple[Statement, ...]]] = {}
+        statements: List[Statement] = []
+        self.reparsed = self.reused = 0
+        try:
+            for start, end in self._spans(lines):
+                text = '\n'.join(lines[start:end])
+                line = start + 1
+                entry = chunks.get(text) or self._chunks.get(text)
+                if entry is not None:
+                    nodes = entry[1]
+                    if entry[0] != line:
+                        nodes = _shift(nodes, line - entry[0])
+                    self.reused += 1
+                else:
+                    nodes = Parser(text, line=line).parse().statements
+                    self.reparsed += 1
+                chunks[text] = (line, nodes)
+                statements.extend(nodes)
+        except Exception:
+            # Corte errado ou erro de sintaxe: o parse completo da o resultado
+            # (e a mensagem de erro) de referencia
+            self._chunks = {}
+            program = Parser(source).parse()
+            self.reparsed, self.reused = 1, 0
+            return program
+        self._chunks = chunks
+        return Program(line=1, statements=tuple(statements))
+
+    def _spans(self, lines: List[str]) -> Iterator[Tuple[int, int]]:
+        """(inicio, fim) de cada trecho, em indices de `lines`."""
+        cache = self._lines
+        if len(cache) > 4 * len(lines) + 1024:
+            cache.clear()
+        depth = 0
+        start = 0
+        for i, line in enumerate(lines):
+            info = cache.get(line)
+            if info is None:
+                info = cache[line] = scan_line(line)
+            if info.starts and depth == 0 and i > start:
+                yield start, i
+                start = i
+            depth += info.depth
+            if not info.complete:
+                # Quebras de linha dentro de strings nao contam como linhas
+                # do Tokenizer: o resto do buffer vai inteiro para o Parser
+                break
+        yield start, len(lines)
+
+
+# Campos de cada classe de no na ordem do construtor ('line' primeiro). Os
+# campos preenchidos depois do parse (slot, layout, compiled) ficam de fora:
+# o resolver e o compilador os recalculam.
+_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _shift(value: Any, delta: int) -> Any:
+    """Copia nos da AST somando `delta` ao numero de linha."""
+    if isinstance(value, Node):
+        cls = type(value)
+        names = _FIELDS.get(cls)
+        if names is None:
+            names = _FIELDS[cls] = tuple(f.name for f in dataclasses.fields(cls) if f.compare)[1:]
+        return cls(value.line + delta, *[_shift(getattr(value, name), delta) for name in names])
+    cls = type(value)
+    if cls is tuple:
+        return tuple([_shift(item, delta) for item in value])
+    if cls is list:
+        return [_shift(item, delta) for item in value]
+    if cls is dict:
+        return {key: _shift(item, delta) for key, item in value.items()}
+    return value
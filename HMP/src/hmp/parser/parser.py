@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import ast as py_ast
-from typing import List, Optional, Sequence, Dict, Any, Union
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Dict, Any, TextIO, Tuple, Union
 
 from hmp.parser.tokenizer import Tokenizer, Token, TokenType
 from hmp.parser.ast import (
@@ -25,6 +26,8 @@ from hmp.parser.ast import (
     Variable,
     InterpolatedString,
 )
+from hmp.parser.expression import parse_expression
+from hmp.runtime.errors import HMPSyntaxError
 
 
 class HMPParseError(Exception):
@@ -37,22 +40,33 @@ class HMPParseError(Exception):
 
 
 class Parser:
-    """Parser de scripts HMP para AST."""
+    """
+    Parser de scripts HMP para AST.
 
-    def __init__(self, source: str):
-        tokenizer = Tokenizer(source)
-        self._tokens = [t for t in tokenizer.tokenize() if t.type != TokenType.COMMENT]
-        self._pos = 0
+    Aceita o texto do script ou um arquivo de texto aberto. Os tokens vem do
+    gerador do `Tokenizer` (sem comentarios) e so os ainda nao consumidos que
+    o parser olhou a frente ficam em memoria. `line` e o numero da primeira
+    linha de `source` (usado pelo parser incremental para trechos de um buffer).
+    """
+
+    def __init__(self, source: Union[str, TextIO], line: int = 1):
+        self._tokens = Tokenizer(source, line).iter_tokens(comments=False)
+        self._lookahead: Deque[Token] = deque()
 
     def _peek(self, offset: int = 0) -> Token:
-        if self._pos + offset < len(self._tokens):
-            return self._tokens[self._pos + offset]
-        return self._tokens[-1]
+        lookahead = self._lookahead
+        while len(lookahead) <= offset:
+            token = next(self._tokens, None)
+            if token is None:
+                # O gerador acabou: o ultimo token e o EOF
+                return lookahead[-1]
+            lookahead.append(token)
+        return lookahead[offset]
 
     def _advance(self) -> Token:
         token = self._peek()
         if token.type != TokenType.EOF:
-            self._pos += 1
+            self._lookahead.popleft()
         return token
 
     def _match(self, *types: TokenType) -> bool:
@@ -72,7 +86,7 @@ class Parser:
         statements = self._parse_block(stop_types=[TokenType.EOF])
         return Program(line=1, statements=statements)
 
-    def _parse_block(self, stop_types: List[TokenType]) -> List[Statement]:
+    def _parse_block(self, stop_types: List[TokenType]) -> Tuple[Statement, ...]:
         statements: List[Statement] = []
         
         while self._peek().type not in stop_types and self._peek().type != TokenType.EOF:
@@ -85,7 +99,8 @@ class Parser:
             if self._peek().type not in [TokenType.NEWLINE, TokenType.EOF] + stop_types:
                 raise HMPParseError(f"Esperado nova linha apos comando, encontrado {self._peek().type} ({self._peek().value})", self._peek().line, self._peek().column)
 
-        return statements
+        # Tupla: sem a sobra de capacidade de uma lista na AST residente
+        return tuple(statements)
 
     def _parse_statement(self) -> Statement:
         token = self._peek()
@@ -155,7 +170,7 @@ class Parser:
         self._match(TokenType.NEWLINE)
         
         body = self._parse_block(stop_types=[TokenType.ELSE, TokenType.ENDIF])
-        else_body = []
+        else_body = ()
         
         if self._match(TokenType.ELSE):
             self._match(TokenType.NEWLINE)
@@ -218,7 +233,7 @@ class Parser:
     def _parse_try(self, start_token: Token) -> TryCatchStatement:
         self._match(TokenType.NEWLINE)
         body = self._parse_block(stop_types=[TokenType.CATCH, TokenType.ENDTRY])
-        catch_body = []
+        catch_body = ()
         error_var = "error"
         
         if self._match(TokenType.CATCH):
@@ -255,8 +270,7 @@ class Parser:
                 return Literal(line=token.line, value=token.value)
                 
         if token.type == TokenType.EXPRESSION:
-            expr_content = token.value[2:-1]
-            return Variable(line=token.line, name=f"${{{expr_content}}}")
+            return self._parse_typed_expression(token.value[2:-1], token.line)
             
         if token.type == TokenType.IDENTIFIER:
             if token.value.lower() == 'true': return Literal(line=token.line, value=True)
@@ -300,11 +314,24 @@ class Parser:
             token = self._advance()
             expr_parts.append(token.value)
             
-        expr_str = " ".join(expr_parts).strip()
-        if expr_str.startswith("${") and expr_str.endswith("}"):
-            expr_str = expr_str[2:-1]
-            
-        return Variable(line=start_line, name=f"${{{expr_str}}}")
+        if len(expr_parts) == 1 and expr_parts[0].startswith("${") and expr_parts[0].endswith("}"):
+            expr_str = expr_parts[0][2:-1]
+        else:
+            expr_str = " ".join(expr_parts).strip()
+
+        return self._parse_typed_expression(expr_str, start_line)
+
+    def _parse_typed_expression(self, expr_str: str, line: int) -> Expression:
+        """
+        Converte o texto de uma expressao em nos tipados.
+
+        Construcoes fora do subconjunto suportado pelo parser de expressoes
+        continuam como Variable("${...}") e sao avaliadas pelo texto.
+        """
+        try:
+            return parse_expression(expr_str, line)
+        except HMPSyntaxError:
+            return Variable(line=line, name=f"${{{expr_str}}}")
 
     def _parse_interpolated_string(self, content: str, line: int) -> InterpolatedString:
         import re
@@ -313,8 +340,7 @@ class Parser:
         for match in re.finditer(r'\$\{(.*?)\}', content):
             if match.start() > last_pos:
                 parts.append(content[last_pos:match.start()])
-            expr_str = match.group(1)
-            parts.append(Variable(line=line, name=f"${{{expr_str}}}"))
+            parts.append(self._parse_typed_expression(match.group(1), line))
             last_pos = match.end()
         if last_pos < len(content):
             parts.append(content[last_pos:])
@@ -1,9 +1,10 @@
 """Tokenizador de scripts HMP."""
 
+import functools
 import re
-from dataclasses import dataclass
+import sys
 from enum import Enum, auto
-from typing import List, Optional
+from typing import Generator, Iterator, List, NamedTuple, Optional, TextIO, Union
 
 
 class TokenType(Enum):
@@ -55,9 +56,8 @@ class TokenType(Enum):
     COLON = auto()
 
 
-@dataclass
-class Token:
-    """Representa um token do HMP."""
+class Token(NamedTuple):
+    """Representa um token do HMP (tupla: sem `__dict__` por instancia)."""
     type: TokenType
     value: str
     line: int
@@ -98,234 +98,211 @@ class Tokenizer:
         'ENDPARALLEL': TokenType.ENDPARALLEL,
     }
     
-    def __init__(self, source: str):
+    # Espacos seguidos de uma alternativa por tipo de token, em ordem de
+    # prioridade (ex.: "-1" e numero antes de ser operador). `digits` e
+    # `not_start` completam as classes de numero e de inicio de nome (ver
+    # `_master_for`)
+    _MASTER_TEMPLATE = r"""
+        [ \t\r]*
+      (?:
+        (?P<NEWLINE>\n)
+      | (?P<COMMENT>\#[^\n]*)
+      | (?P<STRING>"[^"\\]*(?:\\[\s\S][^"\\]*)*(?:"|\\?\Z)
+                  |'[^'\\]*(?:\\[\s\S][^'\\]*)*(?:'|\\?\Z))
+      | (?P<EXPRESSION>\$\{[^{}]*\})
+      | (?P<NESTED>\$\{)
+      | (?P<NUMBER>-?[\d%(digits)s]+(?:\.[\d%(digits)s]*)?)
+      | (?P<IDENTIFIER>%(not_start)s[^\W\d][\w.]*)
+      | (?P<COMMA>,)
+      | (?P<OPERATOR_EQ>==)
+      | (?P<EQUALS>=)
+      | (?P<LBRACKET>\[)
+      | (?P<RBRACKET>\])
+      | (?P<LPAREN>\()
+      | (?P<RPAREN>\))
+      | (?P<OPERATOR>!=|<=|>=|[-+*/<>!])
+      | (?P<LBRACE>\{)
+      | (?P<RBRACE>\})
+      | (?P<COLON>:)
+      | (?P<OTHER>.)
+      | (?P<END>\Z)
+      )
+    """
+    _MASTER = re.compile(_MASTER_TEMPLATE % {'digits': '', 'not_start': ''}, re.VERBOSE)
+    
+    # Tipo de token de cada grupo do regex mestre (OTHER e END sao descartados)
+    _GROUP_TYPES = {
+        'COMMENT': TokenType.COMMENT,
+        'STRING': TokenType.STRING,
+        'EXPRESSION': TokenType.EXPRESSION,
+        'NUMBER': TokenType.NUMBER,
+        'COMMA': TokenType.COMMA,
+        'OPERATOR_EQ': TokenType.OPERATOR,
+        'EQUALS': TokenType.EQUALS,
+        'LBRACKET': TokenType.LBRACKET,
+        'RBRACKET': TokenType.RBRACKET,
+        'LPAREN': TokenType.LPAREN,
+        'RPAREN': TokenType.RPAREN,
+        'OPERATOR': TokenType.OPERATOR,
+        'LBRACE': TokenType.LBRACE,
+        'RBRACE': TokenType.RBRACE,
+        'COLON': TokenType.COLON,
+    }
+    
+    _BRACES = re.compile(r'[{}]')
+    
+    # Tamanho dos blocos lidos quando a fonte e um arquivo
+    CHUNK_SIZE = 1 << 16
+    
+    def __init__(self, source: Union[str, TextIO], line: int = 1):
         self.source = source
         self.pos = 0
-        self.line = 1
+        # Numero da primeira linha (trechos de um buffer maior comecam depois da 1)
+        self.first_line = line
+        self.line = line
         self.column = 1
         self.tokens: List[Token] = []
+        self._line_start = 0
     
     def tokenize(self) -> List[Token]:
-        """Tokeniza o codigo fonte."""
-        self.tokens = []
-        
-        while self.pos < len(self.source):
-            self._skip_whitespace()
-            
-            if self.pos >= len(self.source):
-                break
-            
-            char = self.source[self.pos]
-            
-            if char == '\n':
-                self._add_token(TokenType.NEWLINE, '\n')
-                self.pos += 1
-                self.line += 1
-                self.column = 1
-                continue
-            
-            if char == '#':
-                self._read_comment()
-                continue
-            
-            if char == '"' or char == "'":
-                self._read_string(char)
-                continue
-            
-            if char == '$' and self._peek(1) == '{':
-                self._read_expression()
-                continue
-            
-            if char.isdigit() or (char == '-' and self._peek(1).isdigit()):
-                self._read_number()
-                continue
-            
-            if char.isalpha() or char == '_':
-                self._read_identifier()
-                continue
-            
-            if char == ',':
-                self._add_token(TokenType.COMMA, ',')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            if char == '=':
-                if self._peek(1) == '=':
-                    self._add_token(TokenType.OPERATOR, '==')
-                    self.pos += 2
-                    self.column += 2
-                else:
-                    self._add_token(TokenType.EQUALS, '=')
-                    self.pos += 1
-                    self.column += 1
-                continue
-            
-            if char == '[':
-                self._add_token(TokenType.LBRACKET, '[')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            if char == ']':
-                self._add_token(TokenType.RBRACKET, ']')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            if char == '(':
-                self._add_token(TokenType.LPAREN, '(')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            if char == ')':
-                self._add_token(TokenType.RPAREN, ')')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            if char in '+-*/<>!':
-                self._read_operator()
-                continue
-
-            if char == '{':
-                self._add_token(TokenType.LBRACE, '{')
-                self.pos += 1
-                self.column += 1
-                continue
-
-            if char == '}':
-                self._add_token(TokenType.RBRACE, '}')
-                self.pos += 1
-                self.column += 1
-                continue
-
-            if char == ':':
-                self._add_token(TokenType.COLON, ':')
-                self.pos += 1
-                self.column += 1
-                continue
-            
-            self.pos += 1
-            self.column += 1
-        
-        self._add_token(TokenType.EOF, '')
+        """Tokeniza o codigo fonte inteiro (inclusive comentarios)."""
+        self.tokens = list(self.iter_tokens())
         return self.tokens
     
-    def _peek(self, offset: int = 0) -> str:
-        """Retorna caractere na posicao atual + offset."""
-        pos = self.pos + offset
-        if pos < len(self.source):
-            return self.source[pos]
-        return ''
-    
-    def _add_token(self, type: TokenType, value: str) -> None:
-        """Adiciona um token a lista."""
-        self.tokens.append(Token(type, value, self.line, self.column))
-    
-    def _skip_whitespace(self) -> None:
-        """Pula espacos em branco (exceto newline)."""
-        while self.pos < len(self.source) and self.source[self.pos] in ' \t\r':
-            self.pos += 1
-            self.column += 1
-    
-    def _read_comment(self) -> None:
-        """Le um comentario ate o fim da linha."""
-        start = self.pos
-        while self.pos < len(self.source) and self.source[self.pos] != '\n':
-            self.pos += 1
-        value = self.source[start:self.pos]
-        self._add_token(TokenType.COMMENT, value)
-        self.column += len(value)
-    
-    def _read_string(self, quote: str) -> None:
-        """Le uma string."""
-        start = self.pos
-        self.pos += 1
-        
-        while self.pos < len(self.source):
-            char = self.source[self.pos]
-            if char == quote:
-                self.pos += 1
-                break
-            if char == '\\' and self.pos + 1 < len(self.source):
-                self.pos += 2
-            else:
-                self.pos += 1
+    def iter_tokens(self, comments: bool = True) -> Iterator[Token]:
+        """
+        Gera os tokens sob demanda, terminando com EOF.
         
-        value = self.source[start:self.pos]
-        self._add_token(TokenType.STRING, value)
-        self.column += len(value)
+        `source` pode ser uma string ou um arquivo de texto; arquivos sao
+        lidos em blocos de `CHUNK_SIZE` cortados no ultimo fim de linha, e um
+        token que ainda pode continuar (string ou expressao sem fechamento)
+        espera o bloco seguinte. Com `comments=False` os COMMENT nao sao
+        emitidos.
+        """
+        self.line = self.first_line
+        self._line_start = 0
+        if isinstance(self.source, str):
+            yield from self._scan(self.source, 0, True, comments)
+            self.pos = len(self.source)
+        else:
+            read = self.source.read
+            buffer = ''
+            base = 0
+            while True:
+                chunk = read(self.CHUNK_SIZE)
+                final = not chunk
+                buffer += chunk
+                limit = len(buffer) if final else buffer.rfind('\n') + 1
+                if limit == 0 and not final:
+                    continue
+                text = buffer if limit == len(buffer) else buffer[:limit]
+                consumed = yield from self._scan(text, base, final, comments)
+                buffer = buffer[consumed:]
+                base += consumed
+                if final:
+                    break
+            self.pos = base
+        self.column = self.pos - self._line_start + 1
+        yield Token(TokenType.EOF, '', self.line, self.column)
     
-    def _read_expression(self) -> None:
-        """Le uma expressao ${...}."""
-        start = self.pos
-        self.pos += 2
-        depth = 1
-        
-        while self.pos < len(self.source) and depth > 0:
-            char = self.source[self.pos]
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-            self.pos += 1
-        
-        value = self.source[start:self.pos]
-        self._add_token(TokenType.EXPRESSION, value)
-        self.column += len(value)
-    
-    def _read_number(self) -> None:
-        """Le um numero."""
-        start = self.pos
-        
-        if self.source[self.pos] == '-':
-            self.pos += 1
+    def _scan(self, text: str, base: int, final: bool, comments: bool) -> Generator[Token, None, int]:
+        """
+        Tokeniza `text` (que comeca no offset `base` da fonte) e retorna
+        quantos caracteres foram consumidos.
         
-        while self.pos < len(self.source) and self.source[self.pos].isdigit():
-            self.pos += 1
+        Uma unica regex com grupos nomeados classifica cada token; so
+        expressoes `${...}` com chaves aninhadas (ou sem fechamento) saem do
+        regex para contar a profundidade. A coluna e contada a partir do
+        ultimo NEWLINE: quebras de linha dentro de strings e expressoes nao
+        avancam a linha. Se `final` for falso, `text` termina em fim de linha
+        e para no primeiro token que chega ao fim do bloco sem fechar.
+        """
+        finditer = self._master_for(text).finditer
+        keywords = self.KEYWORDS
+        types = self._GROUP_TYPES
+        intern = sys.intern
+        identifier = TokenType.IDENTIFIER
+        newline = TokenType.NEWLINE
+        end = len(text)
         
-        if self.pos < len(self.source) and self.source[self.pos] == '.':
-            self.pos += 1
-            while self.pos < len(self.source) and self.source[self.pos].isdigit():
-                self.pos += 1
+        line = self.line
+        # Inicio da linha atual, relativo a `text`
+        line_start = self._line_start - base
+        pos = 0
         
-        value = self.source[start:self.pos]
-        self._add_token(TokenType.NUMBER, value)
-        self.column += len(value)
+        try:
+            while True:
+                for m in finditer(text, pos):
+                    kind = m.lastgroup
+                    if kind == 'IDENTIFIER':
+                        # Nomes se repetem muito: uma unica string por nome
+                        value = intern(m[kind])
+                        yield Token(keywords.get(value.upper(), identifier), value, line, m.start(kind) - line_start + 1)
+                    elif kind == 'NEWLINE':
+                        start = m.start(kind)
+                        yield Token(newline, '\n', line, start - line_start + 1)
+                        line += 1
+                        line_start = start + 1
+                    elif kind == 'OTHER' or kind == 'END':
+                        continue
+                    elif kind == 'NESTED':
+                        start = m.start(kind)
+                        pos = self._expression_end(text, m.end())
+                        if pos is None:
+                            if not final:
+                                return m.start()
+                            pos = end
+                        yield Token(TokenType.EXPRESSION, text[start:pos], line, start - line_start + 1)
+                        # Recomeca o regex depois da expressao
+                        break
+                    elif kind == 'COMMENT' and not comments:
+                        continue
+                    else:
+                        if kind == 'STRING' and not final and m.end() == end:
+                            return m.start()
+                        yield Token(types[kind], m[kind], line, m.start(kind) - line_start + 1)
+                else:
+                    return end
+        finally:
+            self.line = line
+            self._line_start = line_start + base
     
-    def _read_identifier(self) -> None:
-        """Le um identificador ou keyword."""
-        start = self.pos
-        
-        while self.pos < len(self.source):
-            char = self.source[self.pos]
-            if char.isalnum() or char == '_':
-                self.pos += 1
-            elif char == '.':
-                self.pos += 1
-            else:
-                break
+    @classmethod
+    def _master_for(cls, text: str) -> "re.Pattern":
+        """
+        Regex mestre para `text`.
         
-        value = self.source[start:self.pos]
-        token_type = self.KEYWORDS.get(value.upper(), TokenType.IDENTIFIER)
-        self._add_token(token_type, value)
-        self.column += len(value)
+        `\\d` so aceita digitos decimais, mas numeros e nomes seguem
+        `str.isdigit` e `str.isalpha`: '²' comeca um numero e '½' nao comeca
+        um nome. Se `text` tem caracteres assim, as classes do regex os incluem.
+        """
+        if text.isascii():
+            return cls._MASTER
+        digits = []
+        others = []
+        for char in set(text):
+            if char.isnumeric() and not char.isdecimal() and not char.isalpha():
+                (digits if char.isdigit() else others).append(char)
+        if not digits and not others:
+            return cls._MASTER
+        return _numeric_master(''.join(sorted(digits)), ''.join(sorted(others)))
     
-    def _read_operator(self) -> None:
-        """Le um operador."""
-        start = self.pos
-        
-        two_char_ops = ['==', '!=', '<=', '>=', '&&', '||']
-        if self.pos + 1 < len(self.source):
-            two_char = self.source[self.pos:self.pos+2]
-            if two_char in two_char_ops:
-                self.pos += 2
-                self._add_token(TokenType.OPERATOR, two_char)
-                self.column += 2
-                return
-        
-        self._add_token(TokenType.OPERATOR, self.source[self.pos])
-        self.pos += 1
-        self.column += 1
+    def _expression_end(self, text: str, pos: int) -> Optional[int]:
+        """Fim de uma expressao `${...}` aninhada a partir de `pos` (apos `${`); None se nao fecha."""
+        depth = 1
+        search = self._BRACES.search
+        while depth > 0:
+            m = search(text, pos)
+            if m is None:
+                return None
+            depth += 1 if m.group() == '{' else -1
+            pos = m.end()
+        return pos
+
+
+@functools.lru_cache(maxsize=64)
+def _numeric_master(digits: str, others: str) -> "re.Pattern":
+    """Regex mestre com digitos extras (`digits`) e numerais que nao iniciam nomes."""
+    escaped = ''.join(re.escape(char) for char in digits)
+    not_start = f"(?![{escaped}{''.join(re.escape(char) for char in others)}])"
+    return re.compile(Tokenizer._MASTER_TEMPLATE % {'digits': escaped, 'not_start': not_start}, re.VERBOSE)
@@ -1,5 +1,7 @@
 """Modulo de runtime do HMP."""
 
 from hmp.runtime.errors import HMPError, HMPSyntaxError, HMPRuntimeError, HMPLimitError
+from hmp.runtime.persistent import PersistentVector
+from hmp.runtime.sets import ValueSet
 
-__all__ = ["HMPError", "HMPSyntaxError", "HMPRuntimeError", "HMPLimitError"]
+__all__ = ["HMPError", "HMPSyntaxError", "HMPRuntimeError", "HMPLimitError", "PersistentVector", "ValueSet"]
@@ -0,0 +1,71 @@
+"""
+Atualizacao in-place em `CALL list.<acao> WITH list=${xs} ... AS xs`.
+
+Quando o resultado de uma tool de lista (ou `set.add`) volta para a mesma
+variavel que foi passada em `list` (`items`), o valor antigo deixa de ser
+visivel para o script logo depois da chamada. O resolver marca esses
+comandos em tempo de compilacao (`CallStatement.inplace`) quando:
+
+    - a leitura e o `AS` usam o mesmo armazenamento (o dicionario global
+      no corpo principal; dentro de funcao, uma local que ja tem valor em
+      todos os caminhos, porque ler uma local sem valor cai na global);
+    - nenhuma outra leitura da variavel (nem de `last_result`, IMPORT ou
+      tools que avaliam expressoes em texto) pode vir antes de uma dessas
+      chamadas: so depois da ultima, fora dos loops que as contem.
+
+Na execucao, cada armazenamento guarda a lista que o proprio engine criou
+para o alvo (`claim`/`settle`): a primeira chamada copia o valor recebido
+e altera a copia; as seguintes alteram essa mesma copia enquanto a
+variavel ainda aponta para ela. Como nenhuma leitura do script pode ter
+guardado a copia antes de uma alteracao, ela nunca tem outro dono. Valores
+vindos de fora (variaveis iniciais, parametros, literais, outras tools)
+nunca sao alterados. Tools recebem as listas so pelos parametros; as que
+leem o contexto (ex.: log) nao as guardam.
+"""
+
+from typing import Any, Dict, Optional
+
+from hmp.runtime.sets import ValueSet
+
+# Tools que aceitam `inplace=True` -> parametro com o valor alterado
+INPLACE_TOOLS = {
+    'list.push': 'list',
+    'list.set': 'list',
+    'list.extend': 'list',
+    'set.add': 'items',
+}
+
+
+def claim(args: Dict[str, Any], param: str, owned: Any) -> bool:
+    """
+    Deixa em `args[param]` um valor que so o alvo do CALL referencia.
+
+    `owned` e o valor que o engine criou para o alvo (None se nenhum).
+    Outra `list` ou `ValueSet` e trocada por uma copia; retorna False para
+    os demais tipos (a chamada segue pelo caminho normal).
+    """
+    value = args.get(param)
+    kind = type(value)
+    if kind is list:
+        if value is not owned:
+            args[param] = list(value)
+    elif kind is ValueSet:
+        if value is not owned:
+            args[param] = value.union(())
+    else:
+        return False
+    return True
+
+
+def settle(owned: Dict[str, Any], target: str, args: Dict[str, Any], param: str, value: Any) -> None:
+    """Registra `value` como do alvo se a tool devolveu o valor reservado por `claim`."""
+    if value is args.get(param):
+        owned[target] = value
+    else:
+        owned.pop(target, None)
+
+
+def release(owned: Optional[Dict[str, Any]], target: str) -> None:
+    """Esquece o valor do alvo (chamada que seguiu pelo caminho normal)."""
+    if owned:
+        owned.pop(target, None)
@@ -0,0 +1,261 @@
+"""
+Vetor persistente (imutavel, com compartilhamento estrutural) para listas.
+
+`PersistentVector` e uma trie de aridade 32 com uma "cauda" para os ultimos
+elementos, no estilo dos vetores do Clojure: `append` e `set` devolvem um
+vetor novo copiando so o caminho ate a folha alterada (O(log32 n), na
+pratica O(1)), e o vetor antigo continua valido. As tools de lista usam
+este tipo para que acumular com `CALL list.push ... AS lista` em um loop nao
+copie a lista inteira a cada iteracao.
+
+Para o script, o vetor se comporta como uma lista: indices e fatias,
+`in`, `+`, `*`, comparacoes (`==` com listas), iteracao em FOR EACH e
+`repr`/`str` iguais aos de `list`. Nos resultados das execucoes os vetores
+sao convertidos de volta em `list` (`thaw`), entao o que sai do engine
+continua sendo serializavel em JSON.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from hmp.runtime.sets import ValueSet
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class PersistentVector(Sequence):
+    """Sequencia imutavel com `append`/`set` que preservam a versao anterior."""
+
+    __slots__ = ('_count', '_shift', '_root', '_tail')
+
+    def __init__(self, items: Iterable[Any] = ()):
+        items = tuple(items)
+        count = len(items)
+        if count <= _WIDTH:
+            self._init(count, _BITS, (), items)
+            return
+        # Folhas cheias na arvore, o resto (1 a 32 itens) na cauda
+        tailoff = ((count - 1) >> _BITS) << _BITS
+        nodes: List[Any] = [items[i:i + _WIDTH] for i in range(0, tailoff, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [tuple(nodes[i:i + _WIDTH]) for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._init(count, shift, tuple(nodes), items[tailoff:])
+
+    def _init(self, count: int, shift: int, root: tuple, tail: tuple) -> None:
+        self._count = count
+        self._shift = shift
+        self._root = root
+        self._tail = tail
+
+    @classmethod
+    def _make(cls, count: int, shift: int, root: tuple, tail: tuple) -> "PersistentVector":
+        vector = cls.__new__(cls)
+        vector._init(count, shift, root, tail)
+        return vector
+
+    def _tailoff(self) -> int:
+        return self._count - len(self._tail)
+
+    # -- atualizacoes ---------------------------------------------------------------
+
+    def append(self, value: Any) -> "PersistentVector":
+        """Vetor novo com `value` no fim."""
+        count, shift, root, tail = self._count, self._shift, self._root, self._tail
+        if len(tail) < _WIDTH:
+            return self._make(count + 1, shift, root, tail + (value,))
+        # Cauda cheia: vira folha da arvore e uma cauda nova comeca
+        if (count >> _BITS) > (1 << shift):
+            root = (root, _new_path(shift, tail))
+            shift += _BITS
+        else:
+            root = _push_tail(count, shift, root, tail)
+        return self._make(count + 1, shift, root, (value,))
+
+    def extend(self, values: Iterable[Any]) -> "PersistentVector":
+        """Vetor novo com `values` no fim."""
+        vector = self
+        for value in values:
+            vector = vector.append(value)
+        return vector
+
+    def set(self, index: int, value: Any) -> "PersistentVector":
+        """Vetor novo com `value` na posicao `index` (0 <= index < len)."""
+        if not 0 <= index < self._count:
+            raise IndexError('indice fora da lista')
+        tailoff = self._tailoff()
+        if index >= tailoff:
+            i = index - tailoff
+            tail = self._tail[:i] + (value,) + self._tail[i + 1:]
+            return self._make(self._count, self._shift, self._root, tail)
+        root = _assoc(self._shift, self._root, index, value)
+        return self._make(self._count, self._shift, root, self._tail)
+
+    # -- leitura ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        count = self._count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('list index out of range')
+        tailoff = count - len(self._tail)
+        if index >= tailoff:
+            return self._tail[index - tailoff]
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(index >> level) & _MASK]
+            level -= _BITS
+        return node[index & _MASK]
+
+    def _chunks(self) -> Iterator[tuple]:
+        """Folhas da arvore, em ordem, seguidas da cauda."""
+        yield from _leaves(self._root, self._shift)
+        yield self._tail
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks():
+            yield from chunk
+
+    def __contains__(self, value: Any) -> bool:
+        return any(value in chunk for chunk in self._chunks())
+
+    def index(self, value: Any, start: int = 0, stop: Any = None) -> int:
+        return list(self).index(value, start, self._count if stop is None else stop)
+
+    def count(self, value: Any) -> int:
+        return sum(chunk.count(value) for chunk in self._chunks())
+
+    def tolist(self) -> List[Any]:
+        return list(self)
+
+    # -- comportamento de lista -------------------------------------------------------
+
+    def __eq__(self, other: Any) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, (list, PersistentVector)):
+            return len(other) == self._count and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __lt__(self, other: Any) -> bool:
+        return _compare(self, other, list.__lt__)
+
+    def __le__(self, other: Any) -> bool:
+        return _compare(self, other, list.__le__)
+
+    def __gt__(self, other: Any) -> bool:
+        return _compare(self, other, list.__gt__)
+
+    def __ge__(self, other: Any) -> bool:
+        return _compare(self, other, list.__ge__)
+
+    def __add__(self, other: Any) -> Any:
+        if isinstance(other, (list, PersistentVector)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other: Any) -> Any:
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def __mul__(self, times: Any) -> Any:
+        if isinstance(times, int):
+            return list(self) * times
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (PersistentVector, (list(self),))
+
+
+def _compare(vector: PersistentVector, other: Any, op: Any) -> Any:
+    if isinstance(other, (list, PersistentVector)):
+        return op(list(vector), list(other))
+    return NotImplemented
+
+
+def _new_path(level: int, node: tuple) -> tuple:
+    while level > 0:
+        node = (node,)
+        level -= _BITS
+    return node
+
+
+def _push_tail(count: int, level: int, parent: tuple, tail: tuple) -> tuple:
+    """Copia do caminho de `parent` ate a nova folha `tail` (elementos count-32..count-1)."""
+    sub = ((count - 1) >> level) & _MASK
+    if level == _BITS:
+        node = tail
+    elif sub < len(parent):
+        node = _push_tail(count, level - _BITS, parent[sub], tail)
+    else:
+        node = _new_path(level - _BITS, tail)
+    if sub < len(parent):
+        return parent[:sub] + (node,) + parent[sub + 1:]
+    return parent + (node,)
+
+
+def _assoc(level: int, node: tuple, index: int, value: Any) -> tuple:
+    if level == 0:
+        i = index & _MASK
+        return node[:i] + (value,) + node[i + 1:]
+    sub = (index >> level) & _MASK
+    return node[:sub] + (_assoc(level - _BITS, node[sub], index, value),) + node[sub + 1:]
+
+
+def _leaves(node: tuple, level: int) -> Iterator[tuple]:
+    if level == _BITS:
+        yield from node
+    else:
+        for child in node:
+            yield from _leaves(child, level - _BITS)
+
+
+# Valores que as tools de lista aceitam como lista, e os que FOR EACH percorre
+LIST_TYPES = (list, PersistentVector)
+SEQUENCE_TYPES = (list, tuple, PersistentVector, ValueSet)
+
+_CONTAINERS = (PersistentVector, ValueSet, list, dict)
+
+
+def thaw(value: Any) -> Any:
+    """
+    Troca os `PersistentVector` e `ValueSet` de `value` (em qualquer nivel) por listas.
+
+    Listas e dicionarios sem vetores dentro voltam como o mesmo objeto.
+    """
+    cls = type(value)
+    if cls is PersistentVector or cls is ValueSet:
+        return [thaw(item) for item in value]
+    if cls is list:
+        for i, item in enumerate(value):
+            if type(item) in _CONTAINERS:
+                new = thaw(item)
+                if new is not item:
+                    return value[:i] + [new] + [thaw(rest) for rest in value[i + 1:]]
+        return value
+    if cls is dict:
+        for key, item in value.items():
+            if type(item) in _CONTAINERS:
+                new = thaw(item)
+                if new is not item:
+                    return {k: thaw(v) for k, v in value.items()}
+        return value
+    return value
@@ -0,0 +1,148 @@
+"""
+Conjunto de valores (`ValueSet`) e chave canonica para deduplicar valores.
+
+`canonical_key` leva um valor do script a uma chave hashable com a mesma
+igualdade do `==` do Python: escalares e valores hashable sao a propria
+chave; listas (e `PersistentVector`), dicionarios e conjuntos viram tuplas
+e frozensets marcados por tipo, entao `[1, 2]`, `{"a": [1]}` e afins
+tambem podem ser deduplicados por hash. Outros valores nao hashable sao
+comparados por identidade.
+
+`ValueSet` e o conjunto devolvido pelas tools `set.*`: guarda os valores
+na ordem de insercao, com pertinencia O(1) pela chave canonica. Como as
+listas das tools, e um valor: `add`, `union` e afins devolvem um conjunto
+novo. Nos scripts percorre-se com FOR EACH, `set.has` consulta a
+pertinencia, e nos resultados das execucoes vira uma lista (`thaw`).
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Hashable, Iterable, Iterator, Tuple
+
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+class _Tag:
+    """Marcador de tipo das chaves estruturadas (nao e igual a nenhum valor)."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f'<{self.name}>'
+
+
+_LIST = _Tag('lista')
+_TUPLE = _Tag('tupla')
+_DICT = _Tag('dicionario')
+_SET = _Tag('conjunto')
+_OBJECT = _Tag('objeto')
+
+
+def canonical_key(value: Any) -> Hashable:
+    """Chave hashable de `value`; chaves iguais <=> valores iguais (`==`)."""
+    cls = type(value)
+    if cls in _SCALARS:
+        return value
+    if cls is dict:
+        return (_DICT, frozenset((key, canonical_key(item)) for key, item in value.items()))
+    if cls is ValueSet:
+        return (_SET, frozenset(value._items))
+    # Listas e PersistentVector: sequencias sem hash, iguais entre si
+    if cls is list or (cls.__hash__ is None and isinstance(value, Sequence)):
+        return (_LIST,) + tuple(map(canonical_key, value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        if isinstance(value, tuple):
+            return (_TUPLE,) + tuple(map(canonical_key, value))
+        return (_OBJECT, id(value))
+
+
+class ValueSet:
+    """Conjunto de valores do script, na ordem de insercao."""
+
+    __slots__ = ('_items',)
+
+    def __init__(self, values: Iterable[Any] = ()):
+        items: Dict[Hashable, Any] = {}
+        for value in values:
+            items.setdefault(canonical_key(value), value)
+        self._items = items
+
+    @classmethod
+    def _make(cls, items: Dict[Hashable, Any]) -> "ValueSet":
+        result = cls.__new__(cls)
+        result._items = items
+        return result
+
+    # -- operacoes ------------------------------------------------------------------
+
+    def add(self, value: Any) -> "ValueSet":
+        """Conjunto novo com `value`."""
+        key = canonical_key(value)
+        if key in self._items:
+            return self
+        items = self._items.copy()
+        items[key] = value
+        return self._make(items)
+
+    def add_inplace(self, value: Any) -> "ValueSet":
+        """Inclui `value` neste conjunto (so para quem tem a unica referencia)."""
+        self._items.setdefault(canonical_key(value), value)
+        return self
+
+    def union(self, other: Iterable[Any]) -> "ValueSet":
+        items = self._items.copy()
+        for key, value in _keyed(other):
+            items.setdefault(key, value)
+        return self._make(items)
+
+    def intersection(self, other: Iterable[Any]) -> "ValueSet":
+        keys = _keys(other)
+        return self._make({key: value for key, value in self._items.items() if key in keys})
+
+    def difference(self, other: Iterable[Any]) -> "ValueSet":
+        keys = _keys(other)
+        return self._make({key: value for key, value in self._items.items() if key not in keys})
+
+    # -- leitura ------------------------------------------------------------------
+
+    def __contains__(self, value: Any) -> bool:
+        return canonical_key(value) in self._items
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def tolist(self) -> list:
+        return list(self._items.values())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ValueSet):
+            return self._items.keys() == other._items.keys()
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self._items.values()))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (ValueSet, (self.tolist(),))
+
+
+def _keyed(values: Iterable[Any]) -> Iterator[Tuple[Hashable, Any]]:
+    if isinstance(values, ValueSet):
+        return iter(values._items.items())
+    return ((canonical_key(value), value) for value in values)
+
+
+def _keys(values: Iterable[Any]) -> Any:
+    if isinstance(values, ValueSet):
+        return values._items.keys()
+    return {canonical_key(value) for value in values}
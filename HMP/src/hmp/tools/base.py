@@ -1,5 +1,6 @@
 """Classe base abstrata para tools do HMP."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
@@ -65,6 +66,27 @@ class BaseTool(ABC):
         """
         pass
 
+    async def ainvoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
+        """
+        Versao assincrona de `invoke`, usada por `HMPEngine.execute_async`.
+        
+        Por padrao roda `invoke` no executor de threads do loop, para que
+        tools sincronas nao bloqueiem o event loop. Tools de I/O podem
+        sobrescrever com uma implementacao nao bloqueante.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.invoke, params, context)
+
+    def invoke_inplace(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
+        """
+        Variante de `invoke` chamada com `inplace=True` (ver hmp.runtime.inplace).
+
+        O engine so a usa quando `params['list']` e uma `list` criada por ele
+        que nenhuma outra referencia pode ver, entao a tool pode altera-la e
+        devolve-la. Por padrao chama `invoke`.
+        """
+        return self.invoke(params, context)
+
     def validate_params(self, params: Dict[str, Any]) -> Optional[str]:
         """
         Valida os parametros fornecidos.
@@ -1,17 +1,147 @@
 """Tools HTTP do HMP."""
 
+import asyncio
 import json
+import ssl
 import urllib.request
 import urllib.error
-from urllib.parse import urlparse
-from typing import Any, Dict, List, TYPE_CHECKING
+from email.message import Message
+from urllib.parse import urljoin, urlparse
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
+from hmp.runtime.persistent import thaw
 from hmp.tools.base import BaseTool, ToolProvider
 
 if TYPE_CHECKING:
     from hmp.core.context import ExecutionContext
 
 
+_MAX_REDIRECTS = 5
+
+
+async def _async_request(
+    method: str,
+    url: str,
+    body: Optional[bytes],
+    headers: Dict[str, str],
+    context: "ExecutionContext",
+    is_host_allowed
+) -> Tuple[Message, bytes]:
+    """
+    Requisicao HTTP/1.1 com sockets nao bloqueantes (asyncio).
+
+    Segue redirecionamentos como o urllib (303, e 301/302 em POST, viram GET)
+    e levanta as mesmas excecoes (`HTTPError` para status >= 400, `URLError`
+    para falhas de conexao e timeout), entao as tools tratam os erros do mesmo
+    jeito nos dois modos.
+    """
+    timeout = context.config.http_timeout
+    max_size = context.config.http_max_response_size
+    for _ in range(_MAX_REDIRECTS + 1):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise urllib.error.URLError(f"URL invalida: {url}")
+        # Sem usuario/senha da URL: e o host a que a conexao vai de fato
+        if not is_host_allowed(parsed.hostname, context):
+            raise urllib.error.URLError(f"Host nao permitido: {parsed.hostname}")
+        https = parsed.scheme == 'https'
+        default_port = 443 if https else 80
+        port = parsed.port or default_port
+        host = f"[{parsed.hostname}]" if ':' in parsed.hostname else parsed.hostname
+        if port != default_port:
+            host += f":{port}"
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: close"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b'')
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    parsed.hostname, port,
+                    ssl=ssl.create_default_context() if https else None,
+                ),
+                timeout,
+            )
+        except (OSError, TimeoutError) as e:
+            raise urllib.error.URLError(e)
+        try:
+            writer.write(request)
+            status, reason, response_headers, data = await asyncio.wait_for(
+                _read_response(reader, max_size), timeout
+            )
+        except (OSError, TimeoutError, asyncio.IncompleteReadError) as e:
+            raise urllib.error.URLError(e)
+        finally:
+            writer.close()
+
+        location = response_headers.get('Location')
+        if status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            if status == 303 or (status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+                headers = {k: v for k, v in headers.items() if k.lower() != 'content-type'}
+            continue
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, response_headers, None)
+        return response_headers, data
+    raise urllib.error.URLError(f"Redirecionamentos demais: {url}")
+
+
+async def _read_response(reader: asyncio.StreamReader, max_size: int) -> Tuple[int, str, Message, bytes]:
+    status_line = (await reader.readline()).decode('latin-1').strip()
+    parts = status_line.split(' ', 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise OSError(f"Resposta HTTP invalida: {status_line!r}")
+    status = int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ''
+
+    headers = Message()
+    while True:
+        line = (await reader.readline()).decode('latin-1')
+        if line in ('\r\n', '\n', ''):
+            break
+        key, _, value = line.partition(':')
+        headers[key.strip()] = value.strip()
+
+    if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        chunks = []
+        size = 0
+        while size < max_size:
+            length = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if length == 0:
+                break
+            chunks.append(await reader.readexactly(length))
+            await reader.readline()
+            size += length
+        data = b''.join(chunks)
+    elif headers.get('Content-Length', '').isdigit():
+        data = await reader.readexactly(min(int(headers['Content-Length']), max_size))
+    else:
+        # Sem tamanho declarado: o corpo termina quando o servidor fecha a conexao
+        chunks = []
+        size = 0
+        while size < max_size:
+            chunk = await reader.read(max_size - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        data = b''.join(chunks)
+    return status, reason, headers, data[:max_size]
+
+
+def _decode(data: bytes, content_type: str) -> Any:
+    if 'application/json' in content_type:
+        return json.loads(data.decode('utf-8'))
+    return data.decode('utf-8')
+
+
 class HttpGet(BaseTool):
     @property
     def name(self) -> str:
@@ -58,6 +188,26 @@ class HttpGet(BaseTool):
             return {"error": f"Erro de conexao: {str(e)}"}
         except Exception as e:
             return {"error": f"Erro HTTP: {str(e)}"}
+    
+    async def ainvoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
+        url = str(params.get('url', ''))
+        
+        if not url:
+            return {"error": "URL nao fornecida"}
+        
+        parsed = urlparse(url)
+        if not self._is_host_allowed(parsed.netloc, context):
+            return {"error": f"Host nao permitido: {parsed.netloc}"}
+        
+        try:
+            headers, data = await _async_request(
+                'GET', url, None, {'User-Agent': 'HMP/3.0'}, context, self._is_host_allowed
+            )
+            return _decode(data, headers.get('Content-Type', ''))
+        except urllib.error.URLError as e:
+            return {"error": f"Erro de conexao: {str(e)}"}
+        except Exception as e:
+            return {"error": f"Erro HTTP: {str(e)}"}
 
 
 class HttpPost(BaseTool):
@@ -85,7 +235,7 @@ class HttpPost(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         url = str(params.get('url', ''))
-        body = params.get('body', {})
+        body = thaw(params.get('body', {}))
         
         if not url:
             return {"error": "URL nao fornecida"}
@@ -116,6 +266,29 @@ class HttpPost(BaseTool):
             return {"error": f"Erro de conexao: {str(e)}"}
         except Exception as e:
             return {"error": f"Erro HTTP: {str(e)}"}
+    
+    async def ainvoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
+        url = str(params.get('url', ''))
+        body = thaw(params.get('body', {}))
+        
+        if not url:
+            return {"error": "URL nao fornecida"}
+        
+        parsed = urlparse(url)
+        if not self._is_host_allowed(parsed.netloc, context):
+            return {"error": f"Host nao permitido: {parsed.netloc}"}
+        
+        try:
+            headers, data = await _async_request(
+                'POST', url, json.dumps(body).encode('utf-8'),
+                {'User-Agent': 'HMP/3.0', 'Content-Type': 'application/json'},
+                context, self._is_host_allowed
+            )
+            return _decode(data, headers.get('Content-Type', ''))
+        except urllib.error.URLError as e:
+            return {"error": f"Erro de conexao: {str(e)}"}
+        except Exception as e:
+            return {"error": f"Erro HTTP: {str(e)}"}
 
 
 class HttpToolProvider(ToolProvider):
@@ -3,6 +3,7 @@
 import json
 from typing import Any, Dict, List, TYPE_CHECKING
 
+from hmp.runtime.persistent import thaw
 from hmp.tools.base import BaseTool, ToolProvider
 
 if TYPE_CHECKING:
@@ -36,7 +37,7 @@ class JsonStringify(BaseTool):
         return "Converte objeto para string JSON"
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> str:
-        value = params.get('value', {})
+        value = thaw(params.get('value', {}))
         pretty = params.get('pretty', False)
         try:
             if pretty:
@@ -1,7 +1,10 @@
 """Tools de lista do HMP."""
 
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Mapping, Tuple, TYPE_CHECKING
 
+from hmp.expr.evaluator import compile_source
+from hmp.runtime.persistent import LIST_TYPES, PersistentVector
+from hmp.runtime.sets import ValueSet, canonical_key
 from hmp.tools.base import BaseTool, ToolProvider
 
 if TYPE_CHECKING:
@@ -13,14 +16,46 @@ class ListPush(BaseTool):
     def name(self) -> str:
         return "list.push"
     
-    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> PersistentVector:
         items = params.get('list', [])
         value = params.get('value')
-        if isinstance(items, list):
-            result = items.copy()
-            result.append(value)
-            return result
-        return [value]
+        if isinstance(items, PersistentVector):
+            return items.append(value)
+        if isinstance(items, LIST_TYPES):
+            return PersistentVector(items).append(value)
+        return PersistentVector([value])
+
+    def invoke_inplace(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params['list']
+        if type(items) is not list:
+            return self.invoke(params, context)
+        items.append(params.get('value'))
+        return items
+
+
+class ListExtend(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.extend"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> PersistentVector:
+        items = params.get('list', [])
+        values = params.get('values', [])
+        if not isinstance(items, LIST_TYPES):
+            items = []
+        if not isinstance(values, LIST_TYPES):
+            values = [values]
+        if not isinstance(items, PersistentVector):
+            items = PersistentVector(items)
+        return items.extend(values)
+
+    def invoke_inplace(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params['list']
+        if type(items) is not list:
+            return self.invoke(params, context)
+        values = params.get('values', [])
+        items.extend(values if isinstance(values, LIST_TYPES) else [values])
+        return items
 
 
 class ListPop(BaseTool):
@@ -30,9 +65,8 @@ class ListPop(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         items = params.get('list', [])
-        if isinstance(items, list) and len(items) > 0:
-            result = items.copy()
-            return result.pop()
+        if isinstance(items, LIST_TYPES) and len(items) > 0:
+            return items[-1]
         return None
 
 
@@ -43,7 +77,7 @@ class ListLength(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> int:
         items = params.get('list', [])
-        return len(items) if isinstance(items, list) else 0
+        return len(items) if isinstance(items, LIST_TYPES) else 0
 
 
 class ListGet(BaseTool):
@@ -54,7 +88,7 @@ class ListGet(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         items = params.get('list', [])
         index = int(params.get('index', 0))
-        if isinstance(items, list) and 0 <= index < len(items):
+        if isinstance(items, LIST_TYPES) and 0 <= index < len(items):
             return items[index]
         return None
 
@@ -68,11 +102,20 @@ class ListSet(BaseTool):
         items = params.get('list', [])
         index = int(params.get('index', 0))
         value = params.get('value')
-        if isinstance(items, list) and 0 <= index < len(items):
-            result = items.copy()
-            result[index] = value
-            return result
-        return items if isinstance(items, list) else []
+        if isinstance(items, LIST_TYPES) and 0 <= index < len(items):
+            if not isinstance(items, PersistentVector):
+                items = PersistentVector(items)
+            return items.set(index, value)
+        return items if isinstance(items, LIST_TYPES) else []
+
+    def invoke_inplace(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params['list']
+        if type(items) is not list:
+            return self.invoke(params, context)
+        index = int(params.get('index', 0))
+        if 0 <= index < len(items):
+            items[index] = params.get('value')
+        return items
 
 
 class ListReverse(BaseTool):
@@ -82,7 +125,7 @@ class ListReverse(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('list', [])
-        return list(reversed(items)) if isinstance(items, list) else []
+        return list(reversed(items)) if isinstance(items, LIST_TYPES) else []
 
 
 class ListSort(BaseTool):
@@ -93,7 +136,7 @@ class ListSort(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('list', [])
         reverse = params.get('reverse', False)
-        if isinstance(items, list):
+        if isinstance(items, LIST_TYPES):
             try:
                 return sorted(items, reverse=bool(reverse))
             except TypeError:
@@ -109,7 +152,7 @@ class ListContains(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> bool:
         items = params.get('list', [])
         value = params.get('value')
-        return value in items if isinstance(items, list) else False
+        return value in items if isinstance(items, (*LIST_TYPES, ValueSet)) else False
 
 
 class ListIndex(BaseTool):
@@ -120,7 +163,7 @@ class ListIndex(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> int:
         items = params.get('list', [])
         value = params.get('value')
-        if isinstance(items, list) and value in items:
+        if isinstance(items, LIST_TYPES) and value in items:
             return items.index(value)
         return -1
 
@@ -134,7 +177,7 @@ class ListSlice(BaseTool):
         items = params.get('list', [])
         start = int(params.get('start', 0))
         end = params.get('end', None)
-        if isinstance(items, list):
+        if isinstance(items, LIST_TYPES):
             if end is not None:
                 return items[start:int(end)]
             return items[start:]
@@ -148,7 +191,7 @@ class ListFilter(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('list', [])
-        if isinstance(items, list):
+        if isinstance(items, LIST_TYPES):
             return [x for x in items if x]
         return []
 
@@ -160,12 +203,12 @@ class ListUnique(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('list', [])
-        if isinstance(items, list):
-            seen = []
+        if isinstance(items, LIST_TYPES):
+            # Chave canonica: hash tambem para dicionarios e listas
+            seen: Dict[Any, Any] = {}
             for item in items:
-                if item not in seen:
-                    seen.append(item)
-            return seen
+                seen.setdefault(canonical_key(item), item)
+            return list(seen.values())
         return []
 
 
@@ -177,21 +220,153 @@ class ListFlatten(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('list', [])
         result = []
-        if isinstance(items, list):
+        if isinstance(items, LIST_TYPES):
             for item in items:
-                if isinstance(item, list):
+                if isinstance(item, LIST_TYPES):
                     result.extend(item)
                 else:
                     result.append(item)
         return result
 
 
+# Tools que avaliam uma expressao com as variaveis do script (`context.current_scope()`)
+SCOPE_TOOLS = frozenset({'list.map', 'list.filter_by', 'list.reduce', 'list.sort_by', 'list.group_by'})
+
+
+class _ItemScope(dict):
+    """Variaveis de uma expressao por item: `item`, `index`, `acc` e, no resto, as do script."""
+
+    __slots__ = ('_outer',)
+
+    def __init__(self, outer: Mapping[str, Any]):
+        super().__init__()
+        self._outer = outer
+
+    def __missing__(self, name: str) -> Any:
+        return self._outer[name]
+
+
+def _expression(params: Dict[str, Any], context: "ExecutionContext") -> Tuple[Callable[[Any], Any], _ItemScope]:
+    """Expressao de `params['expr']`, compilada uma vez, e o escopo para avalia-la."""
+    source = params.get('expr')
+    if not isinstance(source, str):
+        raise ValueError("parametro 'expr' deve ser o texto de uma expressao")
+    return compile_source(source, context.cache), _ItemScope(context.current_scope())
+
+
+class ListMap(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.map"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params.get('list', [])
+        if not isinstance(items, LIST_TYPES):
+            return []
+        fn, scope = _expression(params, context)
+        result = []
+        for index, item in enumerate(items):
+            scope['index'] = index
+            scope['item'] = item
+            result.append(fn(scope))
+        return result
+
+
+class ListFilterBy(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.filter_by"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params.get('list', [])
+        if not isinstance(items, LIST_TYPES):
+            return []
+        fn, scope = _expression(params, context)
+        result = []
+        for index, item in enumerate(items):
+            scope['index'] = index
+            scope['item'] = item
+            if fn(scope):
+                result.append(item)
+        return result
+
+
+class ListReduce(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.reduce"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
+        items = params.get('list', [])
+        if not isinstance(items, LIST_TYPES):
+            return params.get('initial')
+        fn, scope = _expression(params, context)
+        iterator = enumerate(items)
+        if 'initial' in params:
+            acc = params['initial']
+        else:
+            # Sem valor inicial, o primeiro item e o acumulador
+            acc = next(iterator, (0, None))[1]
+        for index, item in iterator:
+            scope['index'] = index
+            scope['item'] = item
+            scope['acc'] = acc
+            acc = fn(scope)
+        return acc
+
+
+class ListSortBy(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.sort_by"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        items = params.get('list', [])
+        reverse = params.get('reverse', False)
+        if not isinstance(items, LIST_TYPES):
+            return []
+        fn, scope = _expression(params, context)
+        keyed = []
+        for index, item in enumerate(items):
+            scope['index'] = index
+            scope['item'] = item
+            keyed.append((fn(scope), item))
+        try:
+            keyed.sort(key=lambda pair: pair[0], reverse=bool(reverse))
+        except TypeError:
+            return items
+        return [item for _, item in keyed]
+
+
+class ListGroupBy(BaseTool):
+    @property
+    def name(self) -> str:
+        return "list.group_by"
+    
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Dict:
+        items = params.get('list', [])
+        if not isinstance(items, LIST_TYPES):
+            return {}
+        fn, scope = _expression(params, context)
+        groups: Dict[Any, List] = {}
+        for index, item in enumerate(items):
+            scope['index'] = index
+            scope['item'] = item
+            key = fn(scope)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(item)
+        return groups
+
+
 class ListToolProvider(ToolProvider):
     """Provider de tools de lista."""
     
     def get_tools(self) -> List[BaseTool]:
         return [
             ListPush(),
+            ListExtend(),
             ListPop(),
             ListLength(),
             ListGet(),
@@ -204,4 +379,9 @@ class ListToolProvider(ToolProvider):
             ListFilter(),
             ListUnique(),
             ListFlatten(),
+            ListMap(),
+            ListFilterBy(),
+            ListReduce(),
+            ListSortBy(),
+            ListGroupBy(),
         ]
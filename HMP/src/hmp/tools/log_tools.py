@@ -24,7 +24,10 @@ class LogPrint(BaseTool):
             if not var.startswith('_'):
                 message = message.replace(f'${{{var}}}', str(val))
         
-        print(f"[LOG] {message}")
+        if context.output is not None:
+            context.output.append(f"[LOG] {message}")
+        else:
+            print(f"[LOG] {message}")
         return message
 
 
@@ -3,6 +3,7 @@
 import math as pymath
 from typing import Any, Dict, List, TYPE_CHECKING
 
+from hmp.runtime.persistent import LIST_TYPES
 from hmp.tools.base import BaseTool, ToolParameter, ToolProvider
 
 if TYPE_CHECKING:
@@ -109,7 +110,7 @@ class MathMin(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         values = params.get('values', [])
-        if isinstance(values, list) and len(values) > 0:
+        if isinstance(values, LIST_TYPES) and len(values) > 0:
             return min(values)
         return None
 
@@ -121,7 +122,7 @@ class MathMax(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         values = params.get('values', [])
-        if isinstance(values, list) and len(values) > 0:
+        if isinstance(values, LIST_TYPES) and len(values) > 0:
             return max(values)
         return None
 
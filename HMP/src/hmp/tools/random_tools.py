@@ -3,6 +3,7 @@
 import random
 from typing import Any, Dict, List, TYPE_CHECKING
 
+from hmp.runtime.persistent import LIST_TYPES
 from hmp.tools.base import BaseTool, ToolProvider
 
 if TYPE_CHECKING:
@@ -35,7 +36,7 @@ class RandomChoice(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> Any:
         items = params.get('items', [])
-        if isinstance(items, list) and len(items) > 0:
+        if isinstance(items, LIST_TYPES) and len(items) > 0:
             return random.choice(items)
         return None
 
@@ -51,8 +52,8 @@ class RandomShuffle(BaseTool):
     
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
         items = params.get('items', [])
-        if isinstance(items, list):
-            result = items.copy()
+        if isinstance(items, LIST_TYPES):
+            result = list(items)
             random.shuffle(result)
             return result
         return []
@@ -1,6 +1,9 @@
 """Registro centralizado de tools do HMP."""
 
-from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+import asyncio
+import contextlib
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from hmp.tools.base import BaseTool, ToolProvider
@@ -57,7 +60,8 @@ class ToolRegistry:
         self, 
         tool_name: str, 
         params: Dict[str, Any], 
-        context: "ExecutionContext"
+        context: "ExecutionContext",
+        inplace: bool = False
     ) -> Any:
         """
         Executa uma tool registrada.
@@ -66,18 +70,65 @@ class ToolRegistry:
             tool_name: Nome da tool a executar
             params: Parametros para a tool
             context: Contexto de execucao
+            inplace: Usa `BaseTool.invoke_inplace` (so o engine passa True,
+                quando `params['list']` e uma lista criada por ele, sem alias)
             
         Returns:
             Resultado da execucao
         """
         self._call_counts[tool_name] = self._call_counts.get(tool_name, 0) + 1
 
+        profiler = getattr(context, 'profiler', None)
+        tracer = getattr(context, 'tracer', None)
+        if profiler is None and tracer is None:
+            return self._dispatch(tool_name, params, context, inplace)
+        # Tracers recebem os parametros depois da chamada: sem mutacao
+        with self._instrumented(tool_name, params, context, profiler, tracer) as outcome:
+            outcome[0] = self._dispatch(tool_name, params, context, inplace and tracer is None)
+        return outcome[0]
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _instrumented(
+        tool_name: str,
+        params: Dict[str, Any],
+        context: "ExecutionContext",
+        profiler: Any,
+        tracer: Any
+    ) -> Iterator[List[Any]]:
+        """
+        Ganchos do profiler e do tracer do contexto em volta de uma chamada.
+
+        Usado por `execute` e `aexecute`; o bloco guarda o resultado em
+        `outcome[0]`, que o tracer recebe (None se a chamada levantou).
+        """
+        if profiler is not None:
+            profiler.enter_tool(tool_name)
+        start = time.perf_counter()
+        outcome: List[Any] = [None]
+        try:
+            yield outcome
+        finally:
+            if profiler is not None:
+                profiler.exit_tool()
+            if tracer is not None:
+                tracer.on_tool(tool_name, params, outcome[0], time.perf_counter() - start, context)
+
+    def _dispatch(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        context: "ExecutionContext",
+        inplace: bool = False
+    ) -> Any:
         if tool_name in self._tools:
             tool = self._tools[tool_name]
             error = tool.validate_params(params)
             if error:
                 return {"error": error}
             try:
+                if inplace:
+                    return tool.invoke_inplace(params, context)
                 return tool.invoke(params, context)
             except Exception as e:
                 return {"error": f"{tool_name}: {str(e)}"}
@@ -90,6 +141,53 @@ class ToolRegistry:
 
         return {"error": f"Tool desconhecida: {tool_name}"}
 
+    async def aexecute(
+        self, 
+        tool_name: str, 
+        params: Dict[str, Any], 
+        context: "ExecutionContext",
+        inplace: bool = False
+    ) -> Any:
+        """Versao assincrona de `execute`: usa `BaseTool.ainvoke`."""
+        self._call_counts[tool_name] = self._call_counts.get(tool_name, 0) + 1
+
+        profiler = getattr(context, 'profiler', None)
+        tracer = getattr(context, 'tracer', None)
+        if profiler is None and tracer is None:
+            return await self._adispatch(tool_name, params, context, inplace)
+        with self._instrumented(tool_name, params, context, profiler, tracer) as outcome:
+            outcome[0] = await self._adispatch(tool_name, params, context, inplace and tracer is None)
+        return outcome[0]
+
+    async def _adispatch(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        context: "ExecutionContext",
+        inplace: bool = False
+    ) -> Any:
+        if tool_name in self._tools:
+            tool = self._tools[tool_name]
+            error = tool.validate_params(params)
+            if error:
+                return {"error": error}
+            try:
+                if inplace:
+                    # Alteracoes em memoria O(1) (ver hmp.runtime.inplace): no proprio loop
+                    return tool.invoke_inplace(params, context)
+                return await tool.ainvoke(params, context)
+            except Exception as e:
+                return {"error": f"{tool_name}: {str(e)}"}
+
+        if tool_name in self._legacy_tools:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(None, self._legacy_tools[tool_name], params, context.variables)
+            except Exception as e:
+                return {"error": f"{tool_name}: {str(e)}"}
+
+        return {"error": f"Tool desconhecida: {tool_name}"}
+
     def list_tools(self) -> List[str]:
         """Lista todas as tools disponiveis."""
         all_tools = set(self._tools.keys()) | set(self._legacy_tools.keys())
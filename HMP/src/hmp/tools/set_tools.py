@@ -0,0 +1,118 @@
+"""Tools de conjunto do HMP."""
+
+from typing import Any, Dict, List, TYPE_CHECKING
+
+from hmp.runtime.persistent import LIST_TYPES
+from hmp.runtime.sets import ValueSet
+from hmp.tools.base import BaseTool, ToolProvider
+
+if TYPE_CHECKING:
+    from hmp.core.context import ExecutionContext
+
+
+def _as_set(value: Any) -> ValueSet:
+    """Conjunto a partir de um parametro (conjunto, lista ou valor ausente)."""
+    if isinstance(value, ValueSet):
+        return value
+    if isinstance(value, LIST_TYPES):
+        return ValueSet(value)
+    return ValueSet()
+
+
+class SetNew(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.new"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        values = params.get('values', [])
+        return ValueSet(values) if isinstance(values, (*LIST_TYPES, ValueSet)) else ValueSet()
+
+
+class SetAdd(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.add"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        return _as_set(params.get('items')).add(params.get('value'))
+
+    def invoke_inplace(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        items = params['items']
+        if type(items) is not ValueSet:
+            return self.invoke(params, context)
+        return items.add_inplace(params.get('value'))
+
+
+class SetHas(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.has"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> bool:
+        items = params.get('items')
+        value = params.get('value')
+        if isinstance(items, ValueSet):
+            return value in items
+        return isinstance(items, LIST_TYPES) and value in items
+
+
+class SetSize(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.size"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> int:
+        return len(_as_set(params.get('items')))
+
+
+class SetValues(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.values"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> List:
+        return _as_set(params.get('items')).tolist()
+
+
+class SetUnion(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.union"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        return _as_set(params.get('a')).union(_as_set(params.get('b')))
+
+
+class SetIntersect(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.intersect"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        return _as_set(params.get('a')).intersection(_as_set(params.get('b')))
+
+
+class SetDifference(BaseTool):
+    @property
+    def name(self) -> str:
+        return "set.difference"
+
+    def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> ValueSet:
+        return _as_set(params.get('a')).difference(_as_set(params.get('b')))
+
+
+class SetToolProvider(ToolProvider):
+    """Provider de tools de conjunto."""
+
+    def get_tools(self) -> List[BaseTool]:
+        return [
+            SetNew(),
+            SetAdd(),
+            SetHas(),
+            SetSize(),
+            SetValues(),
+            SetUnion(),
+            SetIntersect(),
+            SetDifference(),
+        ]
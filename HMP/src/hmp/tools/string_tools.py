@@ -2,6 +2,7 @@
 
 from typing import Any, Dict, List, TYPE_CHECKING
 
+from hmp.runtime.persistent import LIST_TYPES
 from hmp.tools.base import BaseTool, ToolProvider
 
 if TYPE_CHECKING:
@@ -34,7 +35,7 @@ class StringJoin(BaseTool):
     def invoke(self, params: Dict[str, Any], context: "ExecutionContext") -> str:
         items = params.get('items', [])
         delimiter = str(params.get('delimiter', ''))
-        if isinstance(items, list):
+        if isinstance(items, LIST_TYPES):
             return delimiter.join(str(item) for item in items)
         return str(items)
 
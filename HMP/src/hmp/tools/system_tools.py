@@ -1,5 +1,6 @@
 """Tools de sistema do HMP."""
 
+import asyncio
 import os
 import time
 from typing import Any, Dict, List, TYPE_CHECKING
@@ -41,6 +42,11 @@ class SystemSleep(BaseTool):
         seconds = min(float(params.get('seconds', 0)), 5)
         time.sleep(seconds)
         return f"Pausado por {seconds} segundos"
+    
+    async def ainvoke(self, params: Dict[str, Any], context: "ExecutionContext") -> str:
+        seconds = min(float(params.get('seconds', 0)), 5)
+        await asyncio.sleep(seconds)
+        return f"Pausado por {seconds} segundos"
 
 
 class SystemToolProvider(ToolProvider):
@@ -0,0 +1,6 @@
+"""Backend que transpila programas HMP para codigo Python."""
+
+from hmp.transpiler.codegen import GeneratedModule, PythonGenerator, generate_source
+from hmp.transpiler.runtime import Transpiler
+
+__all__ = ["GeneratedModule", "PythonGenerator", "generate_source", "Transpiler"]
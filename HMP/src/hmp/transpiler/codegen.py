@@ -0,0 +1,393 @@
+"""Geracao de codigo Python a partir do Program (AST) do HMP."""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from hmp.core.resolver import resolve_function
+from hmp.parser import ast as hmp_ast
+from hmp.parser.ast import (
+    Program,
+    Statement,
+    SetStatement,
+    CallStatement,
+    ImportStatement,
+    ReturnStatement,
+    IfStatement,
+    LoopTimesStatement,
+    WhileStatement,
+    ForEachStatement,
+    FunctionDef,
+    TryCatchStatement,
+    ParallelStatement,
+    Expression,
+    Literal,
+    ParsedExpression,
+)
+from hmp.tools.list_tools import SCOPE_TOOLS
+
+_BINARY = {'+', '-', '*', '/', '//', '%', '**'}
+_UNARY = {'-', '+'}
+_COMPARE = {'==', '!=', '<', '<=', '>', '>='}
+
+# Valores emitidos diretamente no codigo; o resto vai para a tabela `_k`
+_INLINE_INT_LIMIT = 10 ** 18
+
+
+class _UnsupportedError(Exception):
+    """No de expressao sem traducao direta; a expressao usa o fallback."""
+
+
+class GeneratedModule:
+    """Codigo Python gerado e as constantes referenciadas por ele (`_k`)."""
+
+    __slots__ = ('source', 'constants', 'functions')
+
+    def __init__(self, source: str, constants: Tuple[Any, ...], functions: Tuple[Tuple[str, str], ...]):
+        self.source = source
+        self.constants = constants
+        # (nome HMP, nome da funcao Python) para cada FUNCTION do programa
+        self.functions = functions
+
+
+class _Unit:
+    """Estado de geracao de uma unidade (programa principal ou funcao)."""
+
+    def __init__(self, in_function: bool, locals_: Optional[Dict[str, str]] = None, names_ref: str = ''):
+        self.in_function = in_function
+        self.locals = locals_ or {}
+        self.names_ref = names_ref
+
+
+class PythonGenerator:
+    """
+    Traduz um `Program` em um modulo Python com `_main()` e uma funcao por
+    FUNCTION.
+
+    O codigo gerado so usa os helpers injetados pelo runtime (`_g`, `_call`,
+    `_fb`, ...): nomes do script viram `_g[...]` ou locais `v<n>`, constantes
+    vem de `repr` ou da tabela `_k`, e nenhum acesso a atributo do script e
+    emitido. Expressoes sem traducao direta usam o mesmo avaliador seguro
+    dos outros backends.
+    """
+
+    def __init__(self):
+        self._lines: List[str] = []
+        self._constants: List[Any] = []
+        self._constant_index: Dict[int, int] = {}
+        self._indent = 0
+        self._unit = _Unit(False)
+
+    # -- API ------------------------------------------------------------------
+
+    def generate(self, program: Program) -> GeneratedModule:
+        functions = []
+        self._emit_main(program.statements)
+        for statement in program.statements:
+            if isinstance(statement, FunctionDef):
+                py_name = f"_f{len(functions)}"
+                self._emit_function(py_name, statement.name, statement.params, statement.body,
+                                    statement.layout or resolve_function(statement))
+                functions.append((statement.name, py_name))
+        return GeneratedModule('\n'.join(self._lines) + '\n', tuple(self._constants), tuple(functions))
+
+    def generate_function(self, name: str, params: Sequence[str], body: Sequence[Statement], layout) -> GeneratedModule:
+        """Gera um modulo com uma unica funcao `_f0` (funcoes registradas fora do programa)."""
+        self._emit_function('_f0', name, params, body, layout)
+        return GeneratedModule('\n'.join(self._lines) + '\n', tuple(self._constants), ((name, '_f0'),))
+
+    # -- emissao --------------------------------------------------------------
+
+    def _line(self, text: str) -> None:
+        self._lines.append('    ' * self._indent + text)
+
+    def _const(self, value: Any) -> str:
+        if value is None or isinstance(value, (bool, str)):
+            return repr(value)
+        if type(value) is int and -_INLINE_INT_LIMIT < value < _INLINE_INT_LIMIT:
+            return repr(value)
+        if type(value) is float and math.isfinite(value):
+            return repr(value)
+        key = id(value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self._constants)
+            self._constants.append(value)
+        return f"_k[{index}]"
+
+    def _ref(self, value: Any) -> str:
+        """Referencia um objeto qualquer (no da AST, tupla de nomes) pela tabela `_k`."""
+        index = len(self._constants)
+        self._constants.append(value)
+        return f"_k[{index}]"
+
+    def _scope(self) -> str:
+        if self._unit.in_function:
+            return f"_scope({self._unit.names_ref}, _locals())"
+        return "_g"
+
+    def _emit_main(self, statements: Sequence[Statement]) -> None:
+        self._unit = _Unit(False)
+        self._line("def _main():")
+        self._indent += 1
+        self._line("_n = 0")
+        self._line("_room = _room_left()")
+        self._block(statements)
+        self._line("_flush(_n)")
+        self._indent -= 1
+        self._line("")
+
+    def _emit_function(self, py_name: str, name: str, params: Sequence[str], body: Sequence[Statement], layout) -> None:
+        locals_ = {local: f"v{i}" for i, local in enumerate(layout.names)}
+        self._unit = _Unit(True, locals_, self._ref(tuple(layout.names)))
+        self._line(f"def {py_name}(_args):")
+        self._indent += 1
+        self._line(f"_enter({self._const(name)}, True)")
+        self._line("try:")
+        self._indent += 1
+        params = set(params)
+        for local, py_local in locals_.items():
+            if local in params:
+                self._line(f"{py_local} = _args.get({self._const(local)})")
+            else:
+                self._line(f"{py_local} = _U")
+        self._line("_n = 0")
+        self._line("_room = _room_left()")
+        self._block(body)
+        self._line("return _ret(_n, None)")
+        self._indent -= 1
+        self._line("finally:")
+        self._line("    _leave()")
+        self._indent -= 1
+        self._line("")
+
+    # -- comandos -------------------------------------------------------------
+
+    def _block(self, statements: Sequence[Statement]) -> None:
+        if not statements:
+            self._line("pass")
+            return
+        for statement in statements:
+            self._line(f"# linha {statement.line}: {type(statement).__name__}")
+            self._line("_n += 1")
+            self._statement(statement)
+
+    def _target(self, name: Optional[str]) -> str:
+        local = self._unit.locals.get(name)
+        if local is not None:
+            return local
+        return f"_g[{self._const(name)}]"
+
+    def _inplace_call(self, statement: CallStatement, items: List[str]) -> None:
+        """
+        CALL marcado pelo resolver como `inplace` (ver hmp.runtime.inplace).
+
+        O engine confere a lista do alvo no frame da funcao (ou nas globais)
+        e a altera so se foi criada por ele.
+        """
+        self._line(f"_r = _call_inplace(_n, {self._ref(statement)}, {{{', '.join(items)}}})")
+
+    def _back_edge(self) -> None:
+        self._line("if _n > _room:")
+        self._line("    _over(_n)")
+
+    def _statement(self, statement: Statement) -> None:
+        if isinstance(statement, SetStatement):
+            self._assign(self._target(statement.name), statement.value)
+
+        elif isinstance(statement, CallStatement):
+            items = []
+            for i, (param, expr) in enumerate(statement.params.items()):
+                temp = f"_a{i}"
+                self._assign(temp, expr)
+                items.append(f"{self._const(param)}: {temp}")
+            if self._unit.in_function and statement.tool in SCOPE_TOOLS:
+                # A tool le variaveis do script pelo contexto
+                self._line(f"_expose({self._unit.names_ref}, _locals())")
+            if statement.inplace:
+                self._inplace_call(statement, items)
+            else:
+                self._line(f"_r = _call(_n, {self._const(statement.tool)}, {{{', '.join(items)}}})")
+            self._line("_n = 0")
+            self._line("_room = _room_left()")
+            if statement.target:
+                self._line(f"{self._target(statement.target)} = _r")
+            self._line(f"{self._target('last_result')} = _r")
+            if self._unit.in_function:
+                self._line("if _r is not None:")
+                self._line("    return _r")
+
+        elif isinstance(statement, ImportStatement):
+            self._line(f"_import(_n, {self._ref(statement)})")
+            self._line("_n = 0")
+            self._line("_room = _room_left()")
+
+        elif isinstance(statement, ReturnStatement):
+            self._assign("_r", statement.value)
+            self._line("_result['return_value'] = _r")
+            if self._unit.in_function:
+                self._line("if _r is not None:")
+                self._line("    return _ret(_n, _r)")
+
+        elif isinstance(statement, IfStatement):
+            self._assign("_c", statement.condition)
+            self._line("if _c:")
+            self._indent += 1
+            self._block(statement.body)
+            self._indent -= 1
+            if statement.else_body:
+                self._line("else:")
+                self._indent += 1
+                self._block(statement.else_body)
+                self._indent -= 1
+
+        elif isinstance(statement, LoopTimesStatement):
+            self._assign("_c", statement.count)
+            self._line("for _ in _range(_int(_c)):")
+            self._indent += 1
+            self._block(statement.body)
+            self._back_edge()
+            self._indent -= 1
+
+        elif isinstance(statement, WhileStatement):
+            self._line("while True:")
+            self._indent += 1
+            self._assign("_c", statement.condition)
+            self._line("if not _c:")
+            self._line("    break")
+            self._block(statement.body)
+            self._back_edge()
+            self._indent -= 1
+
+        elif isinstance(statement, ForEachStatement):
+            self._assign("_c", statement.iterable)
+            self._line("_enter('foreach', False)")
+            self._line("try:")
+            self._indent += 1
+            self._line(f"for {self._target(statement.var_name)} in _items(_c):")
+            self._indent += 1
+            self._block(statement.body)
+            self._back_edge()
+            self._indent -= 2
+            self._line("finally:")
+            self._line("    _leave()")
+
+        elif isinstance(statement, TryCatchStatement):
+            self._line("try:")
+            self._indent += 1
+            self._block(statement.body)
+            self._indent -= 1
+            self._line("except _Exception as _e:")
+            self._indent += 1
+            self._line("_enter('catch', False)")
+            self._line("try:")
+            self._indent += 1
+            self._line(f"{self._target(statement.error_var)} = _str(_e)")
+            self._block(statement.catch_body)
+            self._indent -= 1
+            self._line("finally:")
+            self._line("    _leave()")
+            self._indent -= 1
+
+        elif isinstance(statement, ParallelStatement):
+            # Os ramos rodam no pool do engine; dentro de funcoes as locais
+            # vao para o frame antes do bloco e voltam depois dele
+            if self._unit.in_function:
+                self._line(f"_r, _w = _parallel(_n, {self._ref(statement)}, {self._unit.names_ref}, _locals())")
+            else:
+                self._line(f"_r, _w = _parallel(_n, {self._ref(statement)}, None, None)")
+            self._line("_n = 0")
+            self._line("_room = _room_left()")
+            if self._unit.in_function:
+                if self._unit.locals:
+                    self._line(f"{', '.join(self._unit.locals.values())}, = _w")
+                self._line("if _r is not None:")
+                self._line("    return _r")
+
+        # FunctionDef e comandos desconhecidos: apenas contam como comando
+
+    # -- expressoes -----------------------------------------------------------
+
+    def _assign(self, target: str, expr: Expression) -> None:
+        if isinstance(expr, Literal) and not isinstance(expr.value, (list, dict)):
+            self._line(f"{target} = {self._const(expr.value)}")
+            return
+        if not isinstance(expr, ParsedExpression):
+            self._line(f"{target} = _ev({self._ref(expr)}, {self._scope()})")
+            return
+        fallback = f"_fb({self._const(expr.source)}, {self._scope()})"
+        try:
+            code = self._expr(expr.body)
+        except _UnsupportedError:
+            self._line(f"{target} = {fallback}")
+            return
+        self._line("try:")
+        self._line(f"    {target} = {code}")
+        self._line("except _FALLBACK:")
+        self._line(f"    {target} = {fallback}")
+
+    def _expr(self, node: Expression) -> str:
+        if isinstance(node, hmp_ast.Constant):
+            return self._const(node.value)
+
+        if isinstance(node, hmp_ast.Name):
+            name = self._const(node.id)
+            local = self._unit.locals.get(node.id)
+            read = local if local is not None else f"_g.get({name}, _U)"
+            return f"(_t if (_t := {read}).__class__ not in _SLOW else _rv(_t, {name}, {self._scope()}))"
+
+        if isinstance(node, hmp_ast.BinaryOp):
+            if node.op not in _BINARY:
+                raise _UnsupportedError(node.op)
+            return f"({self._expr(node.left)} {node.op} {self._expr(node.right)})"
+
+        if isinstance(node, hmp_ast.UnaryOp):
+            if node.op == 'not':
+                return f"(not {self._expr(node.operand)})"
+            if node.op not in _UNARY:
+                raise _UnsupportedError(node.op)
+            return f"({node.op}{self._expr(node.operand)})"
+
+        if isinstance(node, hmp_ast.Compare):
+            parts = [self._expr(node.left)]
+            for op, comparator in zip(node.ops, node.comparators):
+                if op not in _COMPARE:
+                    raise _UnsupportedError(op)
+                parts.append(op)
+                parts.append(self._expr(comparator))
+            return f"(True if {' '.join(parts)} else False)"
+
+        if isinstance(node, hmp_ast.BoolOp):
+            joiner = f" {node.op} "
+            return f"(True if {joiner.join(self._expr(v) for v in node.values)} else False)"
+
+        if isinstance(node, hmp_ast.Subscript):
+            return f"{self._expr(node.value)}[{self._expr(node.index)}]"
+
+        if isinstance(node, hmp_ast.Conditional):
+            return f"({self._expr(node.body)} if {self._expr(node.test)} else {self._expr(node.orelse)})"
+
+        if isinstance(node, hmp_ast.ListExpr):
+            return f"[{', '.join(self._expr(e) for e in node.elements)}]"
+
+        if isinstance(node, hmp_ast.TupleExpr):
+            if len(node.elements) == 1:
+                return f"({self._expr(node.elements[0])},)"
+            return f"({', '.join(self._expr(e) for e in node.elements)})"
+
+        if isinstance(node, hmp_ast.DictExpr):
+            items = ', '.join(f"{self._expr(k)}: {self._expr(v)}" for k, v in zip(node.keys, node.values))
+            return f"{{{items}}}"
+
+        if isinstance(node, ParsedExpression):
+            if isinstance(node.body, hmp_ast.Name):
+                # ${nome} aninhado: o fallback falharia com o mesmo erro da leitura
+                return self._expr(node.body)
+            # Interpolacao aninhada: closure propria, com o seu fallback
+            return f"_nested({self._ref(node)}, {self._scope()})"
+
+        raise _UnsupportedError(type(node).__name__)
+
+
+def generate_source(program: Program) -> GeneratedModule:
+    """Gera o modulo Python equivalente a um programa HMP."""
+    return PythonGenerator().generate(program)
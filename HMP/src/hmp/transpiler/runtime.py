@@ -0,0 +1,266 @@
+"""Execucao dos modulos Python gerados a partir de scripts HMP."""
+
+import hashlib
+import warnings
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, TYPE_CHECKING
+
+from hmp.core.context import ExecutionContext
+from hmp.core.resolver import resolve_function
+from hmp.expr.cache import ExpressionCache
+from hmp.expr.evaluator import compile_parsed, safe_eval_expr
+from hmp.parser.ast import CallStatement, Program
+from hmp.runtime.persistent import SEQUENCE_TYPES
+from hmp.transpiler.codegen import GeneratedModule, PythonGenerator
+
+if TYPE_CHECKING:
+    from hmp.core.engine import HMPEngine
+
+
+class _Unset:
+    """Marca de variavel local ainda nao atribuida."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return '<unset>'
+
+
+_U = _Unset()
+
+# Classes cujos valores precisam do caminho lento na leitura
+_SLOW = frozenset({str, _Unset})
+
+# Mesmos erros que levam os outros backends ao avaliador textual
+_FALLBACK = (SyntaxError, ValueError, TypeError)
+
+
+def _compile(source: str, filename: str) -> Any:
+    """
+    `compile` do codigo gerado, sem os SyntaxWarning do Python.
+
+    Expressoes validas em HMP (ex.: `${1[0]}`) geram avisos do compilador
+    que iriam parar no stderr; em tempo de execucao elas seguem a semantica
+    do HMP como nos outros backends.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', SyntaxWarning)
+        return compile(source, filename, 'exec')
+
+
+def _items(value: Any) -> Any:
+    return value if isinstance(value, SEQUENCE_TYPES) else ()
+
+
+class _LocalScope(Mapping):
+    """Variaveis locais de uma funcao gerada, sobre as globais (fallbacks)."""
+
+    __slots__ = ('_locals', '_globals')
+
+    def __init__(self, local_vars: Dict[str, Any], global_vars: Dict[str, Any]):
+        self._locals = local_vars
+        self._globals = global_vars
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._locals:
+            return self._locals[name]
+        return self._globals[name]
+
+    def __iter__(self):
+        yield from self._locals
+        for name in self._globals:
+            if name not in self._locals:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _scope(names: Sequence[str], frame_locals: Dict[str, Any], global_vars: Dict[str, Any]) -> _LocalScope:
+    local_vars = {}
+    for i, name in enumerate(names):
+        value = frame_locals.get(f"v{i}", _U)
+        if value is not _U:
+            local_vars[name] = value
+    return _LocalScope(local_vars, global_vars)
+
+
+class Transpiler:
+    """
+    Backend que traduz o `Program` em codigo Python e o executa.
+
+    O codigo e compilado com `compile()` uma vez e o objeto de codigo fica em
+    cache pelo hash do texto do script. Tools passam pelo `ToolRegistry`, os
+    limites de iteracao sao verificados nas voltas dos loops e na entrada de
+    funcoes, e o modulo gerado roda sem builtins.
+    """
+
+    def __init__(self, engine: "HMPEngine", cache_size: int = 128):
+        self.engine = engine
+        self._codes = ExpressionCache(maxsize=cache_size)
+
+    def prepare(self, program: Program, source: Optional[str] = None, digest: Optional[str] = None):
+        """
+        Retorna (objeto de codigo, modulo gerado), usando o cache quando possivel.
+
+        A chave do cache e `digest` (sha256 do script) ou o hash de `source`;
+        sem nenhum dos dois, o hash do codigo gerado. O objeto de codigo e
+        None quando o Python recusa o codigo gerado.
+        """
+        key = digest
+        if key is None and source is not None:
+            key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        if key is not None:
+            entry = self._codes.get(key)
+            if entry is not None:
+                return entry
+        module = PythonGenerator().generate(program)
+        if key is None:
+            key = hashlib.sha256(module.source.encode('utf-8')).hexdigest()
+            entry = self._codes.get(key)
+            if entry is not None:
+                return entry
+        try:
+            code = _compile(module.source, f"<hmp:{key[:12]}>")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Aninhamento alem do que o compilador do Python aceita
+            code = None
+        entry = (code, module)
+        self._codes.set(key, entry)
+        return entry
+
+    def run(self, program: Program, context: ExecutionContext, result: Dict, source: Optional[str] = None) -> bool:
+        """Executa o programa; retorna False se ele nao puder ser compilado para Python."""
+        return self.execute(self.prepare(program, source), context, result)
+
+    def execute(self, entry, context: ExecutionContext, result: Dict) -> bool:
+        """Executa uma entrada devolvida por `prepare`."""
+        code, module = entry
+        # O corpo gerado escreve direto nas globais; importado dentro de uma
+        # funcao, as escritas do modulo vao para o frame (interpretador de arvore)
+        if code is None or context.function_frame is not None:
+            return False
+        namespace = self._namespace(module, context, result)
+        exec(code, namespace)
+        for name, py_name in module.functions:
+            func = context.functions.get(name)
+            if func is not None and "py" not in func:
+                func["py"] = namespace[py_name]
+        namespace['_main']()
+        return True
+
+    def function(self, name: str, func: Dict[str, Any], context: ExecutionContext, result: Dict) -> Callable:
+        """Gera (na primeira chamada) a funcao Python de uma FUNCTION registrada."""
+        py = func.get("py")
+        if py is None:
+            layout = func.get("layout")
+            if layout is None:
+                from hmp.parser.ast import FunctionDef
+                layout = resolve_function(FunctionDef(line=0, name=name, params=func["params"], body=func["body"]))
+            module = PythonGenerator().generate_function(name, func["params"], func["body"], layout)
+            namespace = self._namespace(module, context, result)
+            exec(_compile(module.source, f"<hmp:{name}>"), namespace)
+            py = func["py"] = namespace['_f0']
+        return py
+
+    def _namespace(self, module: GeneratedModule, context: ExecutionContext, result: Dict) -> Dict[str, Any]:
+        engine = self.engine
+        cache = engine.cache
+        global_vars = context.variables
+        functions = context.functions
+        config = context.config
+
+        def room_left() -> int:
+            return config.max_iterations - context.iteration_count
+
+        def flush(count: int) -> None:
+            context.increment_iteration(count)
+
+        def over(count: int) -> None:
+            context.increment_iteration(count)
+            context.check_limits()
+
+        def ret(count: int, value: Any) -> Any:
+            context.increment_iteration(count)
+            return value
+
+        def enter(name: str, is_function: bool) -> None:
+            context.push_frame(name, is_function=is_function)
+            context.check_limits()
+
+        def call(count: int, name: str, args: Dict[str, Any]) -> Any:
+            context.increment_iteration(count)
+            func = functions.get(name)
+            if func is not None:
+                return self.function(name, func, context, result)(args)
+            return engine._invoke_tool(name, args, context)
+
+        def call_inplace(count: int, statement: CallStatement, args: Dict[str, Any]) -> Any:
+            context.increment_iteration(count)
+            func = functions.get(statement.tool)
+            if func is not None:
+                return self.function(statement.tool, func, context, result)(args)
+            return engine._invoke_owned(statement, args, context)
+
+        def do_import(count: int, statement) -> None:
+            context.increment_iteration(count)
+            engine._execute_import(statement, context, result)
+
+        def expose(names: Sequence[str], frame_locals: Dict[str, Any]) -> None:
+            """Copia as locais da funcao para o frame, onde tools e ramos as leem."""
+            frame = context.function_frame
+            for i, name in enumerate(names):
+                value = frame_locals.get(f"v{i}", _U)
+                if value is not _U:
+                    frame.set(name, value)
+
+        def parallel(count: int, statement, names: Optional[Sequence[str]], frame_locals: Optional[Dict[str, Any]]):
+            context.increment_iteration(count)
+            if names is None:
+                return engine._execute_parallel(statement, context, result, False), None
+            frame = context.function_frame
+            expose(names, frame_locals)
+            returned = engine._execute_parallel(statement, context, result, True)
+            values = tuple(frame.variables.get(name, _U) for name in names)
+            return returned, values
+
+        def read(value: Any, name: str, scope: Mapping) -> Any:
+            if value is _U:
+                value = global_vars.get(name, _U)
+                if value is _U:
+                    raise ValueError(f"Variavel nao definida: {name}")
+            # Se o valor da variavel for uma string com ${...}, resolvemos
+            if isinstance(value, str) and '${' in value:
+                return safe_eval_expr(value, scope, cache)
+            return value
+
+        return {
+            '__builtins__': {},
+            '_k': module.constants,
+            '_g': global_vars,
+            '_result': result,
+            '_U': _U,
+            '_SLOW': _SLOW,
+            '_FALLBACK': _FALLBACK,
+            '_Exception': Exception,
+            '_str': str,
+            '_int': int,
+            '_range': range,
+            '_locals': locals,
+            '_items': _items,
+            '_room_left': room_left,
+            '_flush': flush,
+            '_over': over,
+            '_ret': ret,
+            '_enter': enter,
+            '_leave': context.pop_frame,
+            '_call': call,
+            '_call_inplace': call_inplace,
+            '_import': do_import,
+            '_parallel': parallel,
+            '_expose': expose,
+            '_rv': read,
+            '_fb': lambda text, scope: safe_eval_expr(text, scope, cache),
+            '_ev': lambda node, scope: engine._evaluate_expression(node, context, scope),
+            '_nested': lambda node, scope: compile_parsed(node, cache)(scope),
+            '_scope': lambda names, frame_locals: _scope(names, frame_locals, global_vars),
+        }
@@ -0,0 +1,6 @@
+"""Backend de bytecode do HMP: compilador e maquina virtual de pilha."""
+
+from hmp.vm.bytecode import Code, BytecodeCompiler, compile_statements
+from hmp.vm.machine import VirtualMachine
+
+__all__ = ["Code", "BytecodeCompiler", "compile_statements", "VirtualMachine"]
@@ -0,0 +1,255 @@
+"""Compilador de Program (AST) para bytecode da VM do HMP."""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from hmp.expr.cache import ExpressionCache
+from hmp.expr.evaluator import compile_parsed
+from hmp.parser.ast import (
+    Statement,
+    SetStatement,
+    CallStatement,
+    ImportStatement,
+    ReturnStatement,
+    IfStatement,
+    LoopTimesStatement,
+    WhileStatement,
+    ForEachStatement,
+    TryCatchStatement,
+    ParallelStatement,
+    Expression,
+    Literal,
+    Variable,
+    ParsedExpression,
+)
+
+# Opcodes. Cada instrucao e uma tupla (opcode, arg1, arg2).
+TICK = 0               # conta uma iteracao e verifica limites (inicio de cada comando)
+CHECK = 1              # verifica limites (inicio de cada volta de loop)
+EVAL = 2               # empilha fn(scope) - closure de ParsedExpression
+CONST = 3              # empilha um valor constante
+EVAL_NODE = 4          # empilha engine._evaluate_expression(no)
+LOAD_NAME = 5          # empilha context.get_variable(nome)
+STORE = 6              # desempilha e atribui (slot, nome)
+JUMP = 7               # desvia para arg1
+POP_JUMP_IF_FALSE = 8  # desempilha; desvia para arg1 se falso
+ITER_ITEMS = 9         # troca o topo por um iterador de lista/tupla (ou vazio)
+ITER_RANGE = 10        # troca o topo por iter(range(int(topo)))
+FOR_ITER = 11          # proximo item: verifica limites e atribui a arg2 (slot, nome) se houver;
+                       # esgotado: desempilha o iterador e desvia para arg1
+PUSH_FRAME = 12        # context.push_frame(arg1)
+POP_FRAME = 13         # context.pop_frame()
+SETUP_TRY = 14         # registra handler em arg1
+POP_TRY = 15           # remove o handler mais recente
+CALL = 16              # chama funcao/tool (arg1=CallStatement, arg2=nomes dos parametros)
+SET_RETURN = 17        # result["return_value"] = topo (arg1: manter no topo)
+RETURN_IF_VALUE = 18   # desempilha; retorna da funcao se nao for None
+RETURN_VALUE = 19      # desempilha e retorna da funcao
+POP = 20               # descarta o topo
+IMPORT = 21            # executa IMPORT (arg1=ImportStatement)
+HALT = 22              # fim do programa principal
+# Superinstrucoes para as sequencias mais frequentes
+SET_EXPR = 23          # TICK + EVAL + STORE (arg1=closure, arg2=(slot, nome))
+JUMP_IF_NOT_EXPR = 24  # EVAL + POP_JUMP_IF_FALSE (arg1=alvo, arg2=closure)
+PARALLEL = 25          # empilha engine._execute_parallel(arg1=ParallelStatement)
+
+OPNAMES = (
+    'TICK', 'CHECK', 'EVAL', 'CONST', 'EVAL_NODE', 'LOAD_NAME', 'STORE', 'JUMP',
+    'POP_JUMP_IF_FALSE', 'ITER_ITEMS', 'ITER_RANGE', 'FOR_ITER', 'PUSH_FRAME',
+    'POP_FRAME', 'SETUP_TRY', 'POP_TRY', 'CALL', 'SET_RETURN', 'RETURN_IF_VALUE',
+    'RETURN_VALUE', 'POP', 'IMPORT', 'HALT', 'SET_EXPR', 'JUMP_IF_NOT_EXPR',
+    'PARALLEL',
+)
+
+Instruction = Tuple[int, Any, Any]
+
+
+class Code:
+    """Sequencia plana de instrucoes de um programa ou corpo de funcao."""
+
+    __slots__ = ('name', 'instructions', 'in_function')
+
+    def __init__(self, name: str, instructions: Sequence[Instruction], in_function: bool):
+        self.name = name
+        self.instructions: Tuple[Instruction, ...] = tuple(instructions)
+        self.in_function = in_function
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def disassemble(self) -> str:
+        """Representacao textual das instrucoes (para depuracao)."""
+        lines = []
+        for pc, (op, arg1, arg2) in enumerate(self.instructions):
+            if op in (EVAL, EVAL_NODE):
+                arg1 = getattr(arg2, 'source', None) or type(arg2).__name__
+                arg2 = None
+            elif op == SET_EXPR:
+                arg1 = '<expr>'
+            elif op == JUMP_IF_NOT_EXPR:
+                arg2 = '<expr>'
+            elif op == PARALLEL:
+                arg1 = f"{len(arg1.body)} ramos"
+            elif op in (CALL, IMPORT):
+                arg1 = getattr(arg1, 'tool', None) or getattr(arg1, 'path', None)
+            args = ' '.join(repr(a) for a in (arg1, arg2) if a is not None)
+            lines.append(f"{pc:4d} {OPNAMES[op]:<18} {args}".rstrip())
+        return '\n'.join(lines)
+
+    def __repr__(self) -> str:
+        return f"Code({self.name!r}, {len(self.instructions)} instrucoes)"
+
+
+class BytecodeCompiler:
+    """
+    Traduz uma lista de comandos em instrucoes com desvios explicitos.
+
+    A semantica acompanha o interpretador de arvore (`HMPEngine`): dentro de
+    funcoes, um CALL ou RETURN com valor diferente de None encerra a funcao;
+    no programa principal, RETURN apenas registra o valor de retorno.
+    """
+
+    def __init__(self, cache: Optional[ExpressionCache] = None, in_function: bool = False):
+        self.cache = cache
+        self.in_function = in_function
+        self._code: List[List[Any]] = []
+
+    def compile(self, statements: Sequence[Statement], name: str) -> Code:
+        self._statements(statements)
+        if self.in_function:
+            self._emit(CONST, None)
+            self._emit(RETURN_VALUE)
+        else:
+            self._emit(HALT)
+        return Code(name, [tuple(ins) for ins in self._code], self.in_function)
+
+    # -- emissao --------------------------------------------------------------
+
+    def _emit(self, op: int, arg1: Any = None, arg2: Any = None) -> int:
+        self._code.append([op, arg1, arg2])
+        return len(self._code) - 1
+
+    def _label(self) -> int:
+        return len(self._code)
+
+    def _patch(self, index: int, target: int) -> None:
+        self._code[index][1] = target
+
+    # -- comandos -------------------------------------------------------------
+
+    def _statements(self, statements: Sequence[Statement]) -> None:
+        for statement in statements:
+            if isinstance(statement, SetStatement) and isinstance(statement.value, ParsedExpression):
+                fn = compile_parsed(statement.value, self.cache)
+                self._emit(SET_EXPR, fn, (statement.slot, statement.name))
+                continue
+            self._emit(TICK)
+            self._statement(statement)
+
+    def _statement(self, statement: Statement) -> None:
+        if isinstance(statement, SetStatement):
+            self._expression(statement.value)
+            self._emit(STORE, statement.slot, statement.name)
+
+        elif isinstance(statement, CallStatement):
+            names = tuple(statement.params)
+            for expr in statement.params.values():
+                self._expression(expr)
+            self._emit(CALL, statement, names)
+            self._emit(RETURN_IF_VALUE if self.in_function else POP)
+
+        elif isinstance(statement, ImportStatement):
+            self._emit(IMPORT, statement)
+
+        elif isinstance(statement, ReturnStatement):
+            self._expression(statement.value)
+            if self.in_function:
+                self._emit(SET_RETURN, True)
+                self._emit(RETURN_IF_VALUE)
+            else:
+                self._emit(SET_RETURN, False)
+
+        elif isinstance(statement, IfStatement):
+            jump_else = self._jump_if_false(statement.condition)
+            self._statements(statement.body)
+            if statement.else_body:
+                jump_end = self._emit(JUMP)
+                self._patch(jump_else, self._label())
+                self._statements(statement.else_body)
+                self._patch(jump_end, self._label())
+            else:
+                self._patch(jump_else, self._label())
+
+        elif isinstance(statement, LoopTimesStatement):
+            self._expression(statement.count)
+            self._emit(ITER_RANGE)
+            self._loop(statement.body)
+
+        elif isinstance(statement, WhileStatement):
+            start = self._label()
+            jump_end = self._jump_if_false(statement.condition)
+            self._emit(CHECK)
+            self._statements(statement.body)
+            self._emit(JUMP, start)
+            self._patch(jump_end, self._label())
+
+        elif isinstance(statement, ForEachStatement):
+            self._expression(statement.iterable)
+            self._emit(ITER_ITEMS)
+            self._emit(PUSH_FRAME, 'foreach')
+            self._loop(statement.body, (statement.slot, statement.var_name))
+            self._emit(POP_FRAME)
+
+        elif isinstance(statement, TryCatchStatement):
+            setup = self._emit(SETUP_TRY)
+            self._statements(statement.body)
+            self._emit(POP_TRY)
+            jump_end = self._emit(JUMP)
+            # O handler recebe str(erro) no topo da pilha
+            self._patch(setup, self._label())
+            self._emit(PUSH_FRAME, 'catch')
+            self._emit(STORE, statement.slot, statement.error_var)
+            self._statements(statement.catch_body)
+            self._emit(POP_FRAME)
+            self._patch(jump_end, self._label())
+
+        elif isinstance(statement, ParallelStatement):
+            # Os ramos rodam no pool do engine, cada um em um contexto isolado
+            self._emit(PARALLEL, statement)
+            self._emit(RETURN_IF_VALUE if self.in_function else POP)
+
+        # FunctionDef e comandos desconhecidos nao geram codigo alem do TICK
+
+    def _loop(self, body: Sequence[Statement], target: Optional[Tuple[Optional[int], str]] = None) -> None:
+        start = self._emit(FOR_ITER, None, target)
+        self._statements(body)
+        self._emit(JUMP, start)
+        self._patch(start, self._label())
+
+    # -- expressoes -----------------------------------------------------------
+
+    def _jump_if_false(self, condition: Expression) -> int:
+        """Emite o teste de uma condicao; retorna o indice do desvio a corrigir."""
+        if isinstance(condition, ParsedExpression):
+            return self._emit(JUMP_IF_NOT_EXPR, None, compile_parsed(condition, self.cache))
+        self._expression(condition)
+        return self._emit(POP_JUMP_IF_FALSE)
+
+    def _expression(self, expr: Expression) -> None:
+        if isinstance(expr, ParsedExpression):
+            self._emit(EVAL, compile_parsed(expr, self.cache), expr)
+        elif isinstance(expr, Literal) and not isinstance(expr.value, (list, dict)):
+            self._emit(CONST, expr.value)
+        elif isinstance(expr, Variable) and not (expr.name.startswith('${') and expr.name.endswith('}')):
+            self._emit(LOAD_NAME, expr.name)
+        else:
+            self._emit(EVAL_NODE, None, expr)
+
+
+def compile_statements(
+    statements: Sequence[Statement],
+    name: str = '<main>',
+    in_function: bool = False,
+    cache: Optional[ExpressionCache] = None
+) -> Code:
+    """Compila uma lista de comandos (programa ou corpo de funcao) em bytecode."""
+    return BytecodeCompiler(cache, in_function).compile(statements, name)
@@ -0,0 +1,222 @@
+"""Maquina virtual de pilha que executa o bytecode do HMP."""
+
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+
+from hmp.core.context import ExecutionContext
+from hmp.runtime.persistent import SEQUENCE_TYPES
+from hmp.vm.bytecode import (
+    Code,
+    compile_statements,
+    TICK,
+    CHECK,
+    EVAL,
+    CONST,
+    EVAL_NODE,
+    LOAD_NAME,
+    STORE,
+    JUMP,
+    POP_JUMP_IF_FALSE,
+    ITER_ITEMS,
+    ITER_RANGE,
+    FOR_ITER,
+    PUSH_FRAME,
+    POP_FRAME,
+    SETUP_TRY,
+    POP_TRY,
+    CALL,
+    SET_RETURN,
+    RETURN_IF_VALUE,
+    RETURN_VALUE,
+    POP,
+    IMPORT,
+    HALT,
+    SET_EXPR,
+    JUMP_IF_NOT_EXPR,
+    PARALLEL,
+)
+
+if TYPE_CHECKING:
+    from hmp.core.engine import HMPEngine
+
+_DONE = object()
+
+
+class _Activation:
+    """Registro de ativacao da VM (programa principal ou chamada de funcao)."""
+
+    __slots__ = ('code', 'pc', 'stack', 'handlers', 'base', 'call')
+
+    def __init__(self, code: Code, base: int, call: Any = None):
+        self.code = code
+        self.pc = 0
+        self.stack: List[Any] = []
+        # (alvo, altura da pilha, profundidade da call_stack do contexto)
+        self.handlers: List[Tuple[int, int, int]] = []
+        self.base = base
+        self.call = call
+
+
+class VirtualMachine:
+    """
+    Executa `Code` com um laco de despacho unico, sem recursao em Python
+    para chamadas de funcoes do script.
+
+    Expressoes, tools e IMPORT reutilizam o engine, de modo que os resultados
+    sao os mesmos do interpretador de arvore.
+    """
+
+    def __init__(self, engine: "HMPEngine"):
+        self.engine = engine
+
+    def function_code(self, name: str, func: Dict[str, Any]) -> Code:
+        """Retorna (compilando na primeira vez) o bytecode de uma funcao registrada."""
+        code = func.get("code")
+        if code is None:
+            code = compile_statements(func["body"], name, in_function=True, cache=self.engine.cache)
+            func["code"] = code
+        return code
+
+    def run(self, code: Code, context: ExecutionContext, result: Dict) -> None:
+        frames = [_Activation(code, len(context.call_stack))]
+        while True:
+            try:
+                self._dispatch(frames, context, result)
+                return
+            except Exception as error:
+                if not self._handle(frames, context, error):
+                    raise
+
+    def _handle(self, frames: List[_Activation], context: ExecutionContext, error: Exception) -> bool:
+        """Desvia para o TRY mais interno; False se nenhum capturar o erro."""
+        while frames:
+            frame = frames[-1]
+            if frame.handlers:
+                target, height, depth = frame.handlers.pop()
+                self._unwind(context, depth)
+                del frame.stack[height:]
+                frame.stack.append(str(error))
+                frame.pc = target
+                return True
+            frames.pop()
+            self._unwind(context, frame.base)
+        return False
+
+    @staticmethod
+    def _unwind(context: ExecutionContext, depth: int) -> None:
+        while len(context.call_stack) > depth:
+            context.pop_frame()
+
+    def _dispatch(self, frames: List[_Activation], context: ExecutionContext, result: Dict) -> None:
+        engine = self.engine
+        evaluate = engine._evaluate_expression
+        functions = context.functions
+        tick = context.tick
+        check = context.check_limits
+        store = context.store
+
+        frame = frames[-1]
+        instructions = frame.code.instructions
+        stack = frame.stack
+        pc = frame.pc
+        scope = context.current_scope()
+
+        while True:
+            op, arg1, arg2 = instructions[pc]
+            pc += 1
+
+            if op == SET_EXPR:
+                tick()
+                store(arg2[0], arg2[1], arg1(scope))
+            elif op == TICK:
+                tick()
+            elif op == JUMP_IF_NOT_EXPR:
+                if not arg2(scope):
+                    pc = arg1
+            elif op == FOR_ITER:
+                item = next(stack[-1], _DONE)
+                if item is _DONE:
+                    stack.pop()
+                    pc = arg1
+                else:
+                    check()
+                    if arg2 is not None:
+                        store(arg2[0], arg2[1], item)
+            elif op == JUMP:
+                pc = arg1
+            elif op == EVAL:
+                stack.append(arg1(scope))
+            elif op == STORE:
+                store(arg1, arg2, stack.pop())
+            elif op == CHECK:
+                check()
+            elif op == POP_JUMP_IF_FALSE:
+                if not stack.pop():
+                    pc = arg1
+            elif op == CONST:
+                stack.append(arg1)
+            elif op == LOAD_NAME:
+                stack.append(context.get_variable(arg1))
+            elif op == EVAL_NODE:
+                stack.append(evaluate(arg2, context))
+            elif op == POP:
+                stack.pop()
+            elif op == CALL:
+                statement = arg1
+                count = len(arg2)
+                if count:
+                    args = dict(zip(arg2, stack[-count:]))
+                    del stack[-count:]
+                else:
+                    args = {}
+                func = functions.get(statement.tool)
+                if func is None:
+                    stack.append(engine._call_tool(statement, args, context))
+                    continue
+                local_vars = {name: args.get(name) for name in func["params"]}
+                code = self.function_code(statement.tool, func)
+                frame.pc = pc
+                base = len(context.call_stack)
+                context.push_frame(statement.tool, local_vars, is_function=True, layout=func.get("layout"))
+                frame = _Activation(code, base, statement)
+                frames.append(frame)
+                instructions = code.instructions
+                stack = frame.stack
+                pc = 0
+                scope = context.current_scope()
+            elif op == RETURN_IF_VALUE or op == RETURN_VALUE:
+                value = stack.pop()
+                if value is None and op == RETURN_IF_VALUE:
+                    continue
+                self._unwind(context, frame.base)
+                statement = frame.call
+                frames.pop()
+                if statement.target:
+                    store(statement.slot, statement.target, value)
+                context.set_variable('last_result', value)
+                frame = frames[-1]
+                instructions = frame.code.instructions
+                stack = frame.stack
+                pc = frame.pc
+                scope = context.current_scope()
+                stack.append(value)
+            elif op == ITER_ITEMS:
+                items = stack[-1]
+                stack[-1] = iter(items if isinstance(items, SEQUENCE_TYPES) else ())
+            elif op == ITER_RANGE:
+                stack[-1] = iter(range(int(stack[-1])))
+            elif op == PUSH_FRAME:
+                context.push_frame(arg1)
+            elif op == POP_FRAME:
+                context.pop_frame()
+            elif op == SETUP_TRY:
+                frame.handlers.append((arg1, len(stack), len(context.call_stack)))
+            elif op == POP_TRY:
+                frame.handlers.pop()
+            elif op == SET_RETURN:
+                result["return_value"] = stack[-1] if arg1 else stack.pop()
+            elif op == IMPORT:
+                engine._execute_import(arg1, context, result)
+            elif op == PARALLEL:
+                stack.append(engine._execute_parallel(arg1, context, result, frame.code.in_function))
+            elif op == HALT:
+                return
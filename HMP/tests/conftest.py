@@ -0,0 +1,126 @@
+"""Fixtures compartilhadas pelos testes."""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# Scripts de exemplo usados como corpus de equivalencia entre backends
+SCRIPTS = sorted((ROOT / "examples").glob("*.hmp")) + sorted((ROOT / "projetos").glob("*.hmp"))
+
+
+@pytest.fixture
+def examples_dir() -> Path:
+    """Diretorio `examples/` do projeto."""
+    return ROOT / "examples"
+
+
+@pytest.fixture
+def example_paths() -> list:
+    """Todos os scripts de exemplo (examples/ e projetos/)."""
+    return list(SCRIPTS)
+
+
+@pytest.fixture(params=SCRIPTS, ids=lambda p: p.name)
+def example_path(request) -> Path:
+    """Cada script de exemplo, um por teste."""
+    return request.param
+
+
+@pytest.fixture
+def run_both():
+    """
+    Executa um script no interpretador de arvore e em outro backend.
+
+    Devolve `(tree, outro)`, os resultados de `HMPEngine.execute` de cada um.
+    """
+    from hmp.core.context import HMPConfig
+    from hmp.core.engine import HMPEngine
+
+    def run(backend: str, script: str, script_path: str = None, **config):
+        tree = HMPEngine(config=HMPConfig(backend="tree", **config), script_path=script_path).execute(script)
+        other = HMPEngine(config=HMPConfig(backend=backend, **config), script_path=script_path).execute(script)
+        return tree, other
+
+    return run
+
+
+# Programas aleatorios para os testes diferenciais entre backends: listas que
+# crescem com list.push dentro e ao lado de PARALLEL, FOR EACH cuja variavel
+# continua visivel depois do loop e locais com o mesmo nome de globais
+_NAMES = ("xs", "ys", "it", "n")
+
+
+def _block(rng, depth: int, indent: int, in_function: bool) -> list:
+    lines = []
+    for _ in range(rng.randint(1, 3)):
+        lines += _statement(rng, depth, indent, in_function)
+    return lines
+
+
+def _nested(rng, opening: str, closing: str, depth: int, indent: int, in_function: bool) -> list:
+    pad = "    " * indent
+    return [pad + opening] + _block(rng, depth + 1, indent + 1, in_function) + [pad + closing]
+
+
+def _statement(rng, depth: int, indent: int, in_function: bool) -> list:
+    pad = "    " * indent
+    choice = rng.random() if depth < 2 else rng.random() * 0.5
+    if choice < 0.2:
+        name = rng.choice(_NAMES)
+        if name in ("xs", "ys"):
+            value = rng.choice(["[]", f"[{rng.randint(0, 3)}]", "${xs}", "${ys}"])
+        else:
+            value = str(rng.randint(0, 3))
+        return [f"{pad}SET {name} TO {value}"]
+    if choice < 0.5:
+        source = rng.choice(["xs", "ys"])
+        target = rng.choice([source, source, "xs", "ys"])
+        value = rng.choice(["${n}", "${it}", str(rng.randint(0, 9))])
+        return [f"{pad}CALL list.push WITH list=${{{source}}}, value={value} AS {target}"]
+    if choice < 0.65:
+        iterable = rng.choice(["xs", "ys", "xs", "ys", "n"])
+        return _nested(rng, f"FOR EACH it IN ${{{iterable}}}", "ENDFOR", depth, indent, in_function)
+    if choice < 0.8:
+        return _nested(rng, "PARALLEL", "ENDPARALLEL", depth, indent, in_function)
+    if choice < 0.9:
+        return _nested(rng, "LOOP 2 TIMES", "ENDLOOP", depth, indent, in_function)
+    if choice < 0.93 and in_function:
+        return [f"{pad}IF ${{it == {rng.randint(0, 3)}}} THEN", f"{pad}    RETURN ${{[xs, it]}}", f"{pad}ENDIF"]
+    if choice < 0.96:
+        failure = "${1 / 0}" if rng.random() < 0.5 else "1"
+        return (
+            [f"{pad}TRY"] + _block(rng, depth + 1, indent + 1, in_function)
+            + [f"{pad}    SET n TO {failure}", f"{pad}CATCH"]
+            + _block(rng, depth + 1, indent + 1, in_function) + [f"{pad}ENDTRY"]
+        )
+    if choice < 0.98 and not in_function:
+        return [f"{pad}CALL h WITH n=${{n}} AS {rng.choice(_NAMES)}"]
+    return _nested(rng, "IF ${n} THEN", "ENDIF", depth, indent, in_function)
+
+
+def _random_program(seed: int) -> str:
+    rng = random.Random(seed)
+    initial = ["SET xs TO [1]", "SET ys TO []", "SET n TO 1", "SET it TO 0"]
+    lines = [line for line in initial if rng.random() < 0.6]
+    lines += ["FUNCTION h(n)"] + _block(rng, 0, 1, True) + ["    RETURN ${[xs, it]}", "ENDFUNCTION"]
+    if rng.random() < 0.3:
+        lines += ["FUNCTION g(xs)"] + _block(rng, 0, 1, True) + ["    RETURN ${[xs, ys, it]}", "ENDFUNCTION"]
+        lines += _block(rng, 0, 0, False) + ["CALL g WITH xs=${ys} AS r2"]
+    if rng.random() < 0.5:
+        lines += ["FUNCTION f(n)"] + _block(rng, 0, 1, True)
+        lines += ["    SET fim TO ${[xs, ys, it, n]}", "    RETURN ${fim}", "ENDFUNCTION"]
+        lines += _block(rng, 0, 0, False) + ["CALL f WITH n=${n} AS r"]
+    else:
+        lines += _block(rng, 0, 0, False)
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def random_program():
+    """Gera o codigo-fonte de um programa HMP aleatorio (deterministico por semente)."""
+    return _random_program
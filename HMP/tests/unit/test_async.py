@@ -0,0 +1,331 @@
+"""Testes unitarios para o modo asyncio (execute_async)."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import ExecutionContext, HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.tools.base import BaseTool
+from hmp.tools.http_tools import _async_request
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/dados')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/ausente':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/grande':
+            # Sem Content-Length nem chunked: o corpo vai ate o fechamento
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for _ in range(30):
+                self.wfile.write(b'x' * 10000)
+                self.wfile.flush()
+            return
+        if self.path == '/host':
+            body = json.dumps({'host': self.headers['Host']}).encode()
+        else:
+            body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.wfile.write(b'%x\r\n%s\r\n0\r\n\r\n' % (len(body), body))
+
+
+@pytest.fixture(scope="module")
+def http_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class EcoAsync(BaseTool):
+    @property
+    def name(self) -> str:
+        return "teste.eco"
+
+    def invoke(self, params, context):
+        raise AssertionError("execute_async deve usar ainvoke")
+
+    async def ainvoke(self, params, context):
+        await asyncio.sleep(0)
+        return params.get('valor')
+
+
+class ThreadAtual(BaseTool):
+    @property
+    def name(self) -> str:
+        return "teste.thread"
+
+    def invoke(self, params, context):
+        return threading.current_thread().name
+
+
+# Um script por comando ou regra do interpretador de arvore: o modo asyncio
+# precisa dar o mesmo resultado (ver AsyncInterpreter)
+FEATURES = {
+    "set_e_expressoes": '''
+        SET a TO 3
+        SET b TO ${a * 2 + 1}
+        SET nome TO "mundo"
+        SET texto TO "ola ${nome}"
+        SET lista TO [1, ${a}, {"k": ${b}}]
+    ''',
+    "if_else": '''
+        SET x TO 5
+        IF ${x > 3} THEN
+            SET r TO "maior"
+        ELSE
+            SET r TO "menor"
+        ENDIF
+        IF ${x > 10} THEN
+            SET s TO 1
+        ENDIF
+    ''',
+    "loops": '''
+        SET total TO 0
+        LOOP 4 TIMES
+            SET total TO ${total + 1}
+        ENDLOOP
+        SET i TO 0
+        WHILE ${i} < 3 DO
+            SET i TO ${i + 1}
+        ENDWHILE
+        FOR EACH n IN [1, 2, 3]
+            SET total TO ${total + n}
+        ENDFOR
+        FOR EACH n IN 7
+            SET nunca TO 1
+        ENDFOR
+    ''',
+    "funcoes": '''
+        FUNCTION primeiro_par(xs)
+            FOR EACH x IN ${xs}
+                IF ${x % 2 == 0} THEN
+                    RETURN ${x}
+                ENDIF
+            ENDFOR
+            RETURN ${none}
+        ENDFUNCTION
+        FUNCTION soma(a, b)
+            CALL math.sum WITH a=${a}, b=${b}
+        ENDFUNCTION
+        CALL primeiro_par WITH xs=[1, 3, 4, 6] AS p
+        CALL soma WITH a=2 AS parcial
+        CALL soma WITH a=2, b=3
+        SET ultimo TO ${last_result}
+    ''',
+    "try_catch": '''
+        TRY
+            SET q TO ${1 / 0}
+            CALL nao.existe AS r
+        CATCH
+            SET e TO ${error}
+        ENDTRY
+        FUNCTION falha()
+            SET z TO ${1 / 0}
+        ENDFUNCTION
+        TRY
+            CALL falha
+        CATCH erro
+            SET capturado TO ${erro}
+        ENDTRY
+    ''',
+    "listas_no_lugar": '''
+        SET xs TO []
+        LOOP 5 TIMES
+            CALL list.push WITH list=${xs}, value=1 AS xs
+        ENDLOOP
+        SET alias TO ${xs}
+        CALL list.push WITH list=${xs}, value=2 AS xs
+        CALL list.extend WITH list=${xs}, values=[3] AS xs
+        CALL set.new WITH values=[1, 1, 2] AS s
+        CALL set.add WITH items=${s}, value=3 AS s
+    ''',
+    "tools_com_expressao": '''
+        FUNCTION acima(xs, limite)
+            CALL list.filter_by WITH list=${xs}, expr="item > limite" AS r
+            RETURN ${r}
+        ENDFUNCTION
+        CALL acima WITH xs=[1, 5, 9], limite=4 AS grandes
+        CALL list.map WITH list=${grandes}, expr="item * 10" AS dez
+        CALL list.reduce WITH list=${dez}, expr="acc + item", initial=0 AS total
+    ''',
+    "parallel": '''
+        SET base TO 1
+        PARALLEL
+            SET a TO ${base + 1}
+            CALL math.sum WITH a=1, b=2 AS b
+            SET base TO 10
+        ENDPARALLEL
+        TRY
+            PARALLEL
+                SET c TO 1
+                SET d TO ${1 / 0}
+            ENDPARALLEL
+        CATCH
+            SET falhou TO ${error}
+        ENDTRY
+    ''',
+    "erro_de_execucao": '''
+        SET a TO 1
+        CALL nao.existe
+        LOOP ${"x"} TIMES
+            SET a TO 2
+        ENDLOOP
+    ''',
+    "return_global": '''
+        SET a TO 1
+        RETURN ${a + 1}
+        SET a TO 5
+    ''',
+}
+
+
+class TestExecuteAsync:
+    """Testes de equivalencia e concorrencia do modo asyncio."""
+    
+    def test_examples_match_execute(self, example_path):
+        engine = HMPEngine(script_path=str(example_path.parent))
+        script = example_path.read_text()
+        assert asyncio.run(engine.execute_async(script)) == engine.execute(script)
+    
+    @pytest.mark.parametrize("name", sorted(FEATURES))
+    def test_features_match_execute(self, name):
+        engine = HMPEngine()
+        script = FEATURES[name]
+        assert asyncio.run(engine.execute_async(script)) == engine.execute(script)
+
+    def test_limits_match_execute(self):
+        engine = HMPEngine(config=HMPConfig(max_iterations=50))
+        script = 'SET i TO 0\nWHILE ${i} < 100 DO\n    SET i TO ${i + 1}\nENDWHILE\n'
+        result = asyncio.run(engine.execute_async(script))
+        assert result == engine.execute(script) and not result["success"]
+    
+    def test_parallel_sleep_uses_gather(self):
+        engine = HMPEngine()
+        script = '''
+            PARALLEL
+                CALL system.sleep WITH seconds=0.2 AS a
+                CALL system.sleep WITH seconds=0.2 AS b
+                CALL system.sleep WITH seconds=0.2 AS c
+            ENDPARALLEL
+        '''
+        start = time.perf_counter()
+        result = asyncio.run(engine.execute_async(script))
+        assert time.perf_counter() - start < 0.5
+        assert set(result['variables']) == {'a', 'b', 'c'}
+    
+    def test_many_workflows_share_one_loop(self):
+        engine = HMPEngine()
+        prepared = engine.compile('''
+            CALL system.sleep WITH seconds=0.2
+            SET dobro TO ${n * 2}
+        ''')
+        
+        async def main():
+            return await asyncio.gather(*(prepared.run_async({'n': n}) for n in range(100)))
+        
+        start = time.perf_counter()
+        results = asyncio.run(main())
+        assert time.perf_counter() - start < 1.5
+        assert [r['variables']['dobro'] for r in results] == [n * 2 for n in range(100)]
+    
+    def test_async_and_sync_tools(self):
+        engine = HMPEngine()
+        engine.registry.register(EcoAsync())
+        engine.registry.register(ThreadAtual())
+        result = asyncio.run(engine.execute_async('''
+            CALL teste.eco WITH valor=42 AS eco
+            CALL teste.thread AS thread
+        '''))
+        assert result['variables']['eco'] == 42
+        # Tools sincronas rodam no executor, fora da thread do loop
+        assert result['variables']['thread'] != threading.current_thread().name
+    
+    def test_parallel_error_semantics_match_threads(self):
+        script = '''
+            TRY
+                PARALLEL
+                    SET ok TO 1
+                    SET q TO ${1 / 0}
+                    SET depois TO 2
+                ENDPARALLEL
+            CATCH
+                SET erro TO ${error}
+            ENDTRY
+        '''
+        engine = HMPEngine()
+        assert asyncio.run(engine.execute_async(script)) == engine.execute(script)
+    
+    def test_http_tools(self, http_server):
+        engine = HMPEngine(config=HMPConfig(allowed_http_hosts=frozenset(['127.0.0.1'])))
+        script = f'''
+            PARALLEL
+                CALL http.get WITH url="{http_server}/dados" AS a
+                CALL http.get WITH url="{http_server}/redirect" AS b
+                CALL http.get WITH url="{http_server}/ausente" AS c
+                CALL http.post WITH url="{http_server}/eco", body={{"x": 1}} AS d
+            ENDPARALLEL
+        '''
+        result = asyncio.run(engine.execute_async(script))
+        assert result == engine.execute(script)
+        assert result['variables']['a'] == {'path': '/dados'}
+        assert result['variables']['b'] == {'path': '/dados'}
+        assert 'HTTP Error 404' in result['variables']['c']['error']
+        assert json.loads(result['variables']['d']) == {'x': 1}
+
+    def test_http_body_until_close(self, http_server):
+        engine = HMPEngine(config=HMPConfig(allowed_http_hosts=frozenset(['127.0.0.1'])))
+        script = f'CALL http.get WITH url="{http_server}/grande" AS a'
+        result = asyncio.run(engine.execute_async(script))
+        assert result == engine.execute(script)
+        assert result['variables']['a'] == 'x' * 300000
+
+    def test_http_host_header_without_credentials(self, http_server):
+        url = http_server.replace('http://', 'http://usuario:senha@')
+        allowed = []
+        _, data = asyncio.run(_async_request(
+            'GET', f'{url}/host', None, {}, ExecutionContext(), lambda host, ctx: allowed.append(host) or True
+        ))
+        assert json.loads(data) == {'host': http_server[len('http://'):]}
+        assert allowed == ['127.0.0.1']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
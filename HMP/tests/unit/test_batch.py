@@ -0,0 +1,214 @@
+"""Testes unitarios para execute_many, execute_files e validate_files (pool de processos)."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.cli.main import cmd_run_many, cmd_validate, create_parser
+from hmp.core import batch
+from hmp.core.batch import collect_files, validate_files
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.tools.base import BaseTool
+
+SCRIPT = '''
+FUNCTION fib(n)
+    SET a TO 0
+    SET b TO 1
+    LOOP ${n} TIMES
+        SET t TO ${a + b}
+        SET a TO ${b}
+        SET b TO ${t}
+    ENDLOOP
+    RETURN ${a}
+ENDFUNCTION
+CALL fib WITH n=${n} AS r
+'''
+
+
+class Pid(BaseTool):
+    @property
+    def name(self) -> str:
+        return "teste.pid"
+
+    def invoke(self, params, context):
+        return os.getpid()
+
+
+def registra_pid(engine):
+    engine.registry.register(Pid())
+
+
+class TestExecuteMany:
+    """Testes do executor em lote."""
+    
+    def test_ordered_results_match_execute(self):
+        engine = HMPEngine()
+        inputs = [{'n': n} for n in range(40)]
+        results = list(engine.execute_many(inputs, workers=2, script=SCRIPT))
+        assert [index for index, _ in results] == list(range(40))
+        for (index, result), initial_vars in zip(results, inputs):
+            assert result == engine.execute(SCRIPT, initial_vars)
+    
+    def test_completion_order_covers_all_jobs(self):
+        engine = HMPEngine()
+        jobs = [(SCRIPT, {'n': n}) for n in range(30)] + ['SET x TO 1', 'IF x']
+        results = dict(engine.execute_many(jobs, workers=3, ordered=False, chunksize=4))
+        assert sorted(results) == list(range(32))
+        assert results[10]['variables']['r'] == 55
+        assert results[30]['variables'] == {'x': 1}
+        assert not results[31]['success']
+    
+    def test_setup_runs_in_each_worker(self):
+        engine = HMPEngine()
+        script = 'CALL teste.pid AS pid'
+        results = list(engine.execute_many([script] * 8, workers=2, setup=registra_pid, chunksize=1))
+        pids = {result['variables']['pid'] for _, result in results}
+        assert os.getpid() not in pids
+    
+    def test_single_worker_runs_in_process(self):
+        engine = HMPEngine()
+        engine.registry.register(Pid())
+        results = list(engine.execute_many(['CALL teste.pid AS pid'], workers=1))
+        assert results == [(0, engine.execute('CALL teste.pid AS pid'))]
+        assert list(engine.execute_many([], workers=2)) == []
+
+    def test_pool_reused_until_close(self):
+        engine = HMPEngine()
+        script = 'CALL teste.pid AS pid'
+        first = dict(engine.execute_many([script] * 4, workers=2, setup=registra_pid, chunksize=1))
+        pool = engine._workers
+        second = dict(engine.execute_many([script] * 4, workers=2, setup=registra_pid, chunksize=1))
+        assert engine._workers is pool
+        pids = {r['variables']['pid'] for r in list(first.values()) + list(second.values())}
+        assert len(pids) <= 2
+        # Outro numero de processos troca o pool
+        assert len(dict(engine.execute_many([script] * 2, workers=3, setup=registra_pid))) == 2
+        assert engine._workers is not pool
+        engine.close()
+        assert engine._workers is None
+
+    def test_script_sent_once_per_worker(self, monkeypatch):
+        engine = HMPEngine()
+        sent = []
+        original = batch.WorkerPool.map
+
+        def spy(self, fn, items, *args):
+            sent.extend(item[3] for item in items)
+            return original(self, fn, items, *args)
+
+        monkeypatch.setattr(batch.WorkerPool, "map", spy)
+        inputs = [{'n': n} for n in range(20)]
+        for _ in range(3):
+            results = dict(engine.execute_many(inputs, workers=2, script=SCRIPT, chunksize=2))
+            assert [results[n]['variables']['r'] for n in (0, 10)] == [0, 55]
+        # So o primeiro job do primeiro lote leva o texto; os outros processos
+        # pedem de novo (_Resend) uma vez
+        assert sent.count(SCRIPT) == 1 and len(sent) == 60
+        engine.close()
+
+    def test_worker_keeps_programs_bounded(self):
+        batch._init_worker(HMPConfig(program_cache_size=1), os.getcwd(), None)
+        jobs, scripts = batch._normalize(['SET x TO 1', 'IF x', 'SET y TO 2'], None)
+        results = batch._run_jobs([job + (scripts[job[1]],) for job in jobs])
+        assert [r['success'] for _, r in results] == [True, False, True]
+        # O primeiro saiu do LRU: o processo pede o texto de novo
+        results = batch._run_jobs([job + (None,) for job in jobs])
+        assert isinstance(results[0][1], batch._Resend)
+        assert not results[1][1]['success'] and results[2][1]['variables'] == {'y': 2}
+        assert len(batch._worker_engine._programs) == 1 and len(batch._worker_failures) == 1
+
+
+
+@pytest.fixture
+def scripts_dir(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.hmp").write_text('SET a TO 1\nCALL log.print WITH message="oi ${a}"\n')
+    (tmp_path / "sub" / "b.hmp").write_text("SET b TO 2\nRETURN ${b * 10}\n")
+    (tmp_path / "ruim.hmp").write_text("IF ${a} THEN\n")
+    (tmp_path / "notas.txt").write_text("SET x TO 1\n")
+    return tmp_path
+
+
+class TestFiles:
+    """Testes dos lotes de arquivos."""
+    
+    def test_collect_files(self, scripts_dir):
+        expected = [scripts_dir / "a.hmp", scripts_dir / "ruim.hmp", scripts_dir / "sub" / "b.hmp"]
+        assert collect_files([scripts_dir]) == expected
+        assert collect_files([str(scripts_dir / "**" / "b.hmp"), scripts_dir / "sub"]) == [scripts_dir / "sub" / "b.hmp"]
+        assert collect_files([str(scripts_dir / "nada*.hmp")]) == []
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_validate_files(self, scripts_dir, workers):
+        files = collect_files([scripts_dir])
+        reports = [report for _, report in validate_files(files, workers=workers, chunksize=1)]
+        assert [r["file"] for r in reports] == [str(f) for f in files]
+        assert [r["success"] for r in reports] == [True, False, True]
+        assert reports[0]["statements"] == 2
+        assert "ENDIF" in reports[1]["error"]
+        assert all(r["time_ms"] >= 0 for r in reports)
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_execute_files(self, scripts_dir, workers, capsys):
+        files = collect_files([scripts_dir])
+        results = dict(HMPEngine().execute_files(files, workers=workers, ordered=False))
+        assert sorted(results) == [0, 1, 2]
+        assert results[0]["output"] == ["[LOG] oi 1"]
+        assert results[0]["variables"] == {"a": 1}
+        assert not results[1]["success"]
+        assert results[2]["return_value"] == 20
+        assert "[LOG]" not in capsys.readouterr().out
+
+    def test_execute_files_in_process_keeps_stdout(self, scripts_dir):
+        seen = []
+
+        class Stdout(BaseTool):
+            @property
+            def name(self) -> str:
+                return "teste.stdout"
+
+            def invoke(self, params, context):
+                seen.append(sys.stdout)
+
+        script = scripts_dir / "saida.hmp"
+        script.write_text('CALL teste.stdout\nCALL log.print WITH message="oi"\n')
+        engine = HMPEngine()
+        engine.registry.register(Stdout())
+        stdout = sys.stdout
+        results = dict(engine.execute_files([script], workers=1))
+        assert seen == [stdout]
+        assert results[0]["output"] == ["[LOG] oi"]
+
+
+class TestBatchCommands:
+    """Testes de `hmp validate DIR` e `hmp run-many`."""
+    
+    def test_validate_directory_jsonl(self, scripts_dir, capsys):
+        args = create_parser().parse_args(["validate", str(scripts_dir), "-j", "2", "--format", "jsonl"])
+        assert cmd_validate(args) == 1
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line.get("success") for line in lines[:-1]] == [True, False, True]
+        summary = lines[-1]["summary"]
+        assert (summary["files"], summary["ok"], summary["errors"], summary["jobs"]) == (3, 2, 1, 2)
+    
+    def test_validate_single_file_keeps_message(self, scripts_dir, capsys):
+        args = create_parser().parse_args(["validate", str(scripts_dir / "a.hmp")])
+        assert cmd_validate(args) == 0
+        assert "Validacao OK: 2 statements encontrados" in capsys.readouterr().out
+    
+    def test_run_many_text(self, scripts_dir, capsys):
+        pattern = str(scripts_dir / "**" / "[ab].hmp")
+        args = create_parser().parse_args(["run-many", pattern, "-j", "1", "--var", "a", "5"])
+        assert cmd_run_many(args) == 0
+        out = capsys.readouterr().out
+        assert "2 arquivo(s), 0 erro(s)" in out
+        assert "Mais lento:" in out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
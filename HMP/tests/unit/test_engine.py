@@ -1,6 +1,9 @@
 """Testes unitarios para o HMP Engine."""
 
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
@@ -8,6 +11,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 import pytest
 from hmp import run_script, list_tools
 from hmp.core.engine import HMPEngine
+from hmp.core.context import ExecutionContext, FrameLayout, HMPConfig
+from hmp.core.modules import ModuleCache
+from hmp.core.resolver import resolve_program
+from hmp.parser.parser import Parser, HMPParseError
 
 
 class TestVariables:
@@ -221,5 +228,301 @@ class TestReturn:
         assert result['return_value'] == 20
 
 
+class TestScope:
+    """Testes da visao de escopo do contexto."""
+    
+    def test_scope_reads_live_values(self):
+        context = ExecutionContext(initial_vars={'a': 1})
+        scope = context.scope
+        context.set_variable('b', 2)
+        assert scope['a'] == 1
+        assert scope['b'] == 2
+        assert 'c' not in scope
+    
+    def test_scope_respects_function_frames(self):
+        context = ExecutionContext(initial_vars={'x': 'global', 'g': 1})
+        context.push_frame('caller', {'x': 'caller', 'only_caller': True}, is_function=True)
+        context.push_frame('callee', {'y': 2}, is_function=True)
+        scope = context.scope
+        assert scope['x'] == 'global'
+        assert scope['y'] == 2
+        assert 'only_caller' not in scope
+        assert sorted(scope) == ['g', 'x', 'y']
+        context.pop_frame()
+        assert scope['x'] == 'caller'
+    
+    def test_scope_is_read_only(self):
+        context = ExecutionContext()
+        with pytest.raises(TypeError):
+            context.scope['x'] = 1
+    
+    def test_function_does_not_see_caller_locals(self):
+        result = run_script('''
+            FUNCTION interna()
+                RETURN ${segredo}
+            ENDFUNCTION
+            FUNCTION externa()
+                SET segredo TO 42
+                CALL interna
+                RETURN ${last_result}
+            ENDFUNCTION
+            CALL externa
+            SET r TO ${last_result}
+        ''')
+        assert result['variables']['r'] == 'segredo'
+
+
+class TestSlots:
+    """Testes da resolucao de slots das variaveis locais."""
+    
+    def test_resolver_assigns_fixed_slots(self):
+        program = Parser('''
+            FUNCTION f(a, b)
+                SET total TO ${a + b}
+                FOR EACH item IN ${a}
+                    SET total TO ${total + item}
+                ENDFOR
+                RETURN ${total}
+            ENDFUNCTION
+        ''').parse()
+        resolve_program(program)
+        func = program.statements[0]
+        assert func.layout.names == ('a', 'b', 'total', 'item')
+        assert func.body[0].slot == 2
+        assert func.body[1].slot == 3
+        assert func.body[1].body[0].slot == 2
+    
+    def test_frame_keeps_dict_api(self):
+        context = ExecutionContext()
+        context.push_frame('f', {'a': 1}, is_function=True, layout=FrameLayout(['a', 'b']))
+        context.store(1, 'b', 2)
+        context.set_variable('extra', 3)
+        frame = context.call_stack[-1]
+        assert dict(frame.variables) == {'a': 1, 'b': 2, 'extra': 3}
+        assert frame.slots == [1, 2]
+        assert context.get_variable('b') == 2
+        del frame.variables['b']
+        assert context.get_variable('b', 'x') == 'x'
+        context.pop_frame()
+        assert context.variables == {}
+    
+    def test_foreach_inside_recursive_function(self):
+        result = run_script('''
+            FUNCTION soma(n, acc)
+                SET total TO ${acc}
+                FOR EACH x IN [1, 2, 3]
+                    SET total TO ${total + x}
+                ENDFOR
+                IF ${n} > 0 THEN
+                    CALL soma WITH n=${n - 1}, acc=${total}
+                ENDIF
+                RETURN ${total}
+            ENDFUNCTION
+            CALL soma WITH n=5, acc=0 AS r
+        ''')
+        assert result['variables']['r'] == 36
+        assert 'total' not in result['variables']
+
+
+class TestPreparedProgram:
+    """Testes de engine.compile e PreparedProgram."""
+    
+    SCRIPT = '''
+        FUNCTION dobro(x)
+            SET y TO ${x * 2}
+            RETURN ${y}
+        ENDFUNCTION
+        CALL dobro WITH x=${n} AS r
+        SET total TO 0
+        LOOP ${n} TIMES
+            SET total TO ${total + 1}
+        ENDLOOP
+    '''
+    
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_run_many_times(self, backend):
+        engine = HMPEngine(config=HMPConfig(backend=backend))
+        prepared = engine.compile(self.SCRIPT)
+        for n in (1, 5, 3):
+            result = prepared.run({'n': n})
+            assert result['success'], result['error']
+            assert result['variables']['r'] == n * 2
+            assert result['variables']['total'] == n
+        assert prepared.run({'n': 2}) == engine.execute(self.SCRIPT, {'n': 2})
+    
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_run_from_threads(self, backend):
+        engine = HMPEngine(config=HMPConfig(backend=backend))
+        prepared = engine.compile(self.SCRIPT)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda n: prepared.run({'n': n}), range(40)))
+        for n, result in enumerate(results):
+            assert result['variables']['r'] == n * 2
+            assert result['variables']['total'] == n
+    
+    def test_prepared_is_immutable(self):
+        prepared = HMPEngine().compile(self.SCRIPT)
+        with pytest.raises(Exception):
+            prepared.source = 'SET x TO 1'
+        with pytest.raises(TypeError):
+            prepared.functions['outra'] = {}
+    
+    def test_execute_reuses_prepared_program(self):
+        engine = HMPEngine()
+        engine.execute(self.SCRIPT, {'n': 1})
+        engine.execute(self.SCRIPT, {'n': 2})
+        assert engine.compile(self.SCRIPT) is engine.compile(self.SCRIPT)
+        assert engine._programs.stats()['size'] == 1
+    
+    def test_parse_error_is_reported(self):
+        engine = HMPEngine()
+        with pytest.raises(HMPParseError):
+            engine.compile('IF ${x} THEN')
+        result = engine.execute('IF ${x} THEN')
+        assert not result['success']
+        assert result['error']
+    
+    def test_import_runs_again_on_each_execution(self):
+        examples = Path(__file__).parent.parent.parent / "examples"
+        script = (examples / "usando_import.hmp").read_text()
+        engine = HMPEngine(script_path=str(examples))
+        first = engine.execute(script)
+        second = engine.execute(script)
+        assert second == first
+        assert second['variables']['resultado'] == 20
+
+
+class TestParallel:
+    """Testes do bloco PARALLEL."""
+    
+    def test_branches_run_concurrently(self):
+        engine = HMPEngine(config=HMPConfig(parallel_max_workers=4))
+        start = time.perf_counter()
+        result = engine.execute('''
+            PARALLEL
+                CALL system.sleep WITH seconds=0.2 AS a
+                CALL system.sleep WITH seconds=0.2 AS b
+                CALL system.sleep WITH seconds=0.2 AS c
+                CALL system.sleep WITH seconds=0.2 AS d
+            ENDPARALLEL
+        ''')
+        elapsed = time.perf_counter() - start
+        engine.close()
+        assert result['success']
+        assert set(result['variables']) == {'a', 'b', 'c', 'd'}
+        assert elapsed < 0.6
+    
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_branches_are_isolated_and_merged_in_order(self, backend, workers):
+        engine = HMPEngine(config=HMPConfig(backend=backend, parallel_max_workers=workers))
+        result = engine.execute('''
+            FUNCTION f(a)
+                SET x TO 1
+                PARALLEL
+                    SET x TO ${a + 5}
+                    SET y TO ${a + x}
+                ENDPARALLEL
+                RETURN ${[x, y]}
+            ENDFUNCTION
+            SET n TO 1
+            PARALLEL
+                SET n TO 10
+                SET m TO ${n}
+                SET n TO 20
+                CALL f WITH a=100 AS r
+            ENDPARALLEL
+        ''')
+        assert result['success'], result['error']
+        # Cada ramo le o estado de antes do bloco; o ultimo ramo que escreve vence
+        assert result['variables']['m'] == 1
+        assert result['variables']['n'] == 20
+        assert result['variables']['r'] == [105, 101]
+    
+    def test_failed_branch_raises_after_others_finish(self):
+        result = run_script('''
+            TRY
+                PARALLEL
+                    SET ok TO 1
+                    SET q TO ${1 / 0}
+                    CALL tool.inexistente
+                    SET depois TO 2
+                ENDPARALLEL
+            CATCH
+                SET erro TO ${error}
+            ENDTRY
+        ''')
+        assert result['variables']['ok'] == 1
+        assert result['variables']['depois'] == 2
+        assert 'q' not in result['variables']
+        assert result['variables']['erro'] == 'division by zero'
+    
+    def test_return_inside_function(self):
+        result = run_script('''
+            FUNCTION escolhe()
+                PARALLEL
+                    SET a TO 1
+                    RETURN "primeiro"
+                    RETURN "segundo"
+                ENDPARALLEL
+                RETURN "nunca"
+            ENDFUNCTION
+            CALL escolhe AS r
+        ''')
+        assert result['variables']['r'] == 'primeiro'
+
+
+class TestModuleCache:
+    """Testes do cache de modulos do IMPORT."""
+    
+    SCRIPT = '''
+        IMPORT "util"
+        CALL dobro WITH x=21 AS r
+    '''
+    
+    def _write_module(self, directory, factor):
+        (directory / "util.hmp").write_text(f'''
+FUNCTION dobro(x)
+    RETURN ${{x * {factor}}}
+ENDFUNCTION
+''')
+    
+    def test_module_parsed_once_across_engines(self, tmp_path):
+        self._write_module(tmp_path, 2)
+        modules = ModuleCache()
+        first = HMPEngine(script_path=str(tmp_path), modules=modules).execute(self.SCRIPT)
+        second = HMPEngine(script_path=str(tmp_path), modules=modules).execute(self.SCRIPT)
+        assert first['variables']['r'] == second['variables']['r'] == 42
+        assert modules.stats()['misses'] == 1
+        assert modules.stats()['hits'] == 1
+        assert modules.stats()['resolved'] == 1
+    
+    def test_changed_file_is_reparsed(self, tmp_path):
+        self._write_module(tmp_path, 2)
+        modules = ModuleCache()
+        engine = HMPEngine(script_path=str(tmp_path), modules=modules)
+        assert engine.execute(self.SCRIPT)['variables']['r'] == 42
+        self._write_module(tmp_path, 3)
+        path = tmp_path / "util.hmp"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert engine.execute(self.SCRIPT)['variables']['r'] == 63
+        assert modules.stats()['misses'] == 2
+    
+    def test_moved_module_is_resolved_again(self, tmp_path):
+        (tmp_path / "modules").mkdir()
+        self._write_module(tmp_path, 2)
+        modules = ModuleCache()
+        engine = HMPEngine(script_path=str(tmp_path), modules=modules)
+        assert engine.execute(self.SCRIPT)['variables']['r'] == 42
+        (tmp_path / "util.hmp").rename(tmp_path / "modules" / "util.hmp")
+        assert engine.execute(self.SCRIPT)['variables']['r'] == 42
+    
+    def test_missing_module(self, tmp_path):
+        result = HMPEngine(script_path=str(tmp_path), modules=ModuleCache()).execute('IMPORT "nao_existe"')
+        assert not result['success']
+        assert "nao_existe" in result['error']
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+"""Testes unitarios para o avaliador de expressoes."""
+
+import ast
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.expr.cache import ExpressionCache
+from hmp.expr.compiler import compile_expr
+from hmp.expr.evaluator import safe_eval_expr
+from hmp.parser.ast import BinaryOp, Compare, ParsedExpression, Variable
+from hmp.parser.expression import parse_expression
+from hmp.parser.parser import Parser
+
+
+class TestExpressionCache:
+    """Testes do cache de expressoes."""
+
+    def test_parse_is_cached(self):
+        cache = ExpressionCache(maxsize=10)
+        for i in range(5):
+            assert safe_eval_expr('i + 1', {'i': i}, cache) == i + 1
+        stats = cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 4
+        assert stats['size'] == 1
+
+    def test_key_is_normalized_text(self):
+        cache = ExpressionCache(maxsize=10)
+        assert safe_eval_expr('a AND b', {'a': True, 'b': True}, cache) is True
+        assert safe_eval_expr('a and b', {'a': True, 'b': False}, cache) is False
+        assert cache.stats()['size'] == 1
+
+    def test_interpolation_does_not_change_key(self):
+        cache = ExpressionCache(maxsize=10)
+        for i in range(3):
+            assert safe_eval_expr('${i} < 2', {'i': i}, cache) == (i < 2)
+        # Uma entrada para "${i} < 2" e outra para "i"
+        assert cache.stats()['size'] == 2
+
+    def test_lru_eviction(self):
+        cache = ExpressionCache(maxsize=2)
+        safe_eval_expr('1 + 1', {}, cache)
+        safe_eval_expr('2 + 2', {}, cache)
+        safe_eval_expr('3 + 3', {}, cache)
+        assert cache.stats()['size'] == 2
+        assert cache.get_ast('1 + 1') is None
+
+    def test_invalid_expression_returns_text(self):
+        cache = ExpressionCache(maxsize=10)
+        assert safe_eval_expr('string.length WITH text=${t}', {'t': 'abc'}, cache) == \
+            "string.length WITH text='abc'"
+        assert safe_eval_expr('nao_definida', {}, cache) == 'nao_definida'
+
+    def test_adjacent_interpolations(self):
+        assert safe_eval_expr('${a}${b}', {'a': 1, 'b': 2}) == 12
+
+    def test_engine_cache_size_from_config(self):
+        engine = HMPEngine(config=HMPConfig(expression_cache_size=7))
+        assert engine.cache.stats()['maxsize'] == 7
+
+
+class TestCompiledExpressions:
+    """Testes das expressoes compiladas em closures."""
+
+    def test_compiled_is_reusable(self):
+        fn = compile_expr(ast.parse('a * 2 + b', mode='eval'))
+        assert fn({'a': 1, 'b': 1}) == 3
+        assert fn({'a': 5, 'b': 0}) == 10
+
+    def test_constant_subtree_is_folded(self):
+        fn = compile_expr(ast.parse('5 + 3 * 2', mode='eval'))
+        assert fn({}) == 11
+
+    def test_literal_list_is_fresh(self):
+        fn = compile_expr(ast.parse('[1, 2]', mode='eval'))
+        first = fn({})
+        first.append(3)
+        assert fn({}) == [1, 2]
+
+    def test_boolean_results(self):
+        assert safe_eval_expr('1 and 2') is True
+        assert safe_eval_expr('0 or ""') is False
+        assert safe_eval_expr('1 < x < 3', {'x': 2}) is True
+
+    def test_unsupported_branch_is_lazy(self):
+        assert safe_eval_expr('1 if ok else a.b', {'ok': True}) == 1
+        assert safe_eval_expr('1 if ok else a.b', {'ok': False}) == '1 if ok else a.b'
+
+    def test_runtime_errors_propagate(self):
+        with pytest.raises(ZeroDivisionError):
+            safe_eval_expr('x / 0', {'x': 1})
+        with pytest.raises(KeyError):
+            safe_eval_expr("d['z']", {'d': {}})
+
+
+class TestExpressionParser:
+    """Testes do parse de expressoes em nos tipados."""
+
+    def test_precedence(self):
+        expr = parse_expression('1 + 2 * 3 ** 2')
+        assert isinstance(expr.body, BinaryOp)
+        assert expr.body.op == '+'
+        assert expr.body.right.op == '*'
+        assert expr.body.right.right.op == '**'
+
+    def test_unary_minus_binds_weaker_than_power(self):
+        expr = parse_expression('-2 ** 2')
+        assert expr.body.op == '-'
+        assert expr.body.operand.op == '**'
+
+    def test_chained_comparison(self):
+        expr = parse_expression('1 < x <= 3')
+        assert isinstance(expr.body, Compare)
+        assert expr.body.ops == ('<', '<=')
+
+    def test_statements_hold_typed_expressions(self):
+        program = Parser('''
+            SET x TO ${a + 1}
+            WHILE x < 10 AND ok DO
+                SET x TO ${x + 1}
+            ENDWHILE
+        ''').parse()
+        assert isinstance(program.statements[0].value, ParsedExpression)
+        assert isinstance(program.statements[1].condition, ParsedExpression)
+        assert program.statements[1].condition.body.op == 'and'
+
+    def test_unsupported_syntax_keeps_text(self):
+        program = Parser('SET x TO ${lista.size}').parse()
+        assert program.statements[0].value == Variable(line=1, name='${lista.size}')
+
+    def test_condition_with_two_interpolations(self):
+        engine = HMPEngine()
+        result = engine.execute('''
+            SET a TO 1
+            SET b TO 2
+            SET r TO "nao"
+            IF ${a} > ${b} THEN
+                SET r TO "sim"
+            ENDIF
+        ''')
+        assert result['variables']['r'] == 'nao'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
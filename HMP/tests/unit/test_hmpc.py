@@ -0,0 +1,135 @@
+"""Testes unitarios para os arquivos .hmpc (AST pre-parseada)."""
+
+import hashlib
+import marshal
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.cli.main import create_parser, cmd_compile
+from hmp.core.engine import HMPEngine
+from hmp.core.modules import ModuleCache
+from hmp.parser import hmpc
+from hmp.parser.parser import Parser
+
+
+class TestFormat:
+    """Testes da serializacao da AST."""
+    
+    def test_round_trip(self, example_path):
+        source = example_path.read_text()
+        program = Parser(source).parse()
+        cached = hmpc.loads(hmpc.dumps(program, source, 7, 11))
+        assert cached.program == program
+        assert (cached.mtime_ns, cached.size) == (7, 11)
+    
+    def test_rejects_other_format(self):
+        data = hmpc.dumps(Parser("SET a TO 1\n").parse(), "SET a TO 1\n")
+        with pytest.raises(ValueError):
+            hmpc.loads(b"XXXX" + data[4:])
+        with pytest.raises(ValueError):
+            hmpc.loads(data[:10])
+
+    @pytest.mark.parametrize("tag", [-4, len(hmpc._NODES), "0"])
+    def test_rejects_bad_node_tag(self, tag):
+        source = "SET a TO 1\n"
+        header = hmpc.dumps(Parser(source).parse(), source)[:hmpc._HEADER.size]
+        with pytest.raises(ValueError, match="outro formato"):
+            hmpc.loads(header + marshal.dumps((tag, ())))
+
+
+class TestCompiledFiles:
+    """Testes de uso automatico dos .hmpc atualizados."""
+    
+    def test_compile_file_and_freshness(self, tmp_path):
+        script = tmp_path / "a.hmp"
+        script.write_text("SET x TO ${2 * 21}\n")
+        target = hmpc.compile_file(script)
+        assert target == tmp_path / "a.hmpc"
+        assert hmpc.load_cached(script) is not None
+        
+        script.write_text("SET x TO ${2 * 22}\n")
+        os.utime(script, ns=(1, 1))
+        assert hmpc.load_cached(script) is None
+        # Arquivo desatualizado: o fonte e parseado de novo
+        assert HMPEngine().execute_file(script)['variables']['x'] == 44
+    
+    def test_engine_uses_fresh_cache(self, tmp_path):
+        script = tmp_path / "a.hmp"
+        script.write_text("SET x TO 1\n")
+        stat = script.stat()
+        source = "SET x TO 2\n"
+        # Mesmo mtime e tamanho do fonte: o .hmpc vale e o fonte nem e lido
+        (tmp_path / "a.hmpc").write_bytes(
+            hmpc.dumps(Parser(source).parse(), source, stat.st_mtime_ns, stat.st_size)
+        )
+        engine = HMPEngine()
+        assert engine.execute_file(script)['variables']['x'] == 2
+        assert engine.compile_file(script) is engine.compile(source)
+    
+    def test_corrupt_cache_is_ignored(self, tmp_path):
+        script = tmp_path / "a.hmp"
+        script.write_text("SET x TO 1\n")
+        hmpc.compile_file(script)
+        target = tmp_path / "a.hmpc"
+        target.write_bytes(target.read_bytes()[:-3])
+        assert hmpc.load_cached(script) is None
+        assert HMPEngine().execute_file(script)['variables']['x'] == 1
+    
+    def test_bad_node_tag_falls_back_to_source(self, tmp_path):
+        script = tmp_path / "a.hmp"
+        script.write_text("SET x TO 1\n")
+        hmpc.compile_file(script)
+        target = tmp_path / "a.hmpc"
+        header = target.read_bytes()[:hmpc._HEADER.size]
+        target.write_bytes(header + marshal.dumps((-5, ())))
+        assert hmpc.load_cached(script) is None
+        assert HMPEngine().execute_file(script)['variables']['x'] == 1
+    
+    def test_import_uses_cache(self, tmp_path):
+        module = tmp_path / "util.hmp"
+        module.write_text("FUNCTION dobro(n)\n    RETURN ${n * 2}\nENDFUNCTION\n")
+        stat = module.stat()
+        source = "FUNCTION dobro(n)\n    RETURN ${n * 3}\nENDFUNCTION\n"
+        (tmp_path / "util.hmpc").write_bytes(
+            hmpc.dumps(Parser(source).parse(), source, stat.st_mtime_ns, stat.st_size)
+        )
+        modules = ModuleCache()
+        engine = HMPEngine(script_path=str(tmp_path), modules=modules)
+        result = engine.execute('IMPORT "util"\nCALL dobro WITH n=4 AS r\n')
+        assert result['variables']['r'] == 12
+        assert modules.load(module.resolve()).digest == hashlib.sha256(source.encode('utf-8')).hexdigest()
+    
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_backends_match_source(self, examples_dir, backend, tmp_path):
+        from hmp.core.context import HMPConfig
+        path = examples_dir / "calculadora.hmp"
+        script = tmp_path / path.name
+        script.write_text(path.read_text())
+        config = HMPConfig(backend=backend)
+        expected = HMPEngine(config=config).execute(script.read_text())
+        hmpc.compile_file(script)
+        assert HMPEngine(config=config).execute_file(script) == expected
+
+
+class TestCompileCommand:
+    """Testes do comando `hmp compile`."""
+    
+    def test_compile_directory(self, tmp_path, capsys):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.hmp").write_text("SET a TO 1\n")
+        (tmp_path / "sub" / "b.hmp").write_text("SET b TO 2\n")
+        (tmp_path / "ruim.hmp").write_text("IF ${a} THEN\n")
+        args = create_parser().parse_args(["compile", str(tmp_path)])
+        assert cmd_compile(args) == 1
+        assert (tmp_path / "a.hmpc").exists()
+        assert (tmp_path / "sub" / "b.hmpc").exists()
+        assert not (tmp_path / "ruim.hmpc").exists()
+        assert "2 arquivo(s) compilado(s), 1 erro(s)" in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,466 @@
+"""Testes unitarios para a atualizacao in-place de listas (`CALL ... AS` a mesma variavel)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.modules import ModuleCache
+from hmp.core.resolver import resolve_program
+from hmp.core.session import HMPSession
+from hmp.core.tracing import Tracer
+from hmp.parser.parser import Parser
+from hmp.runtime.inplace import claim, settle
+from hmp.runtime.sets import ValueSet
+from hmp.tools.list_tools import ListExtend, ListPush, ListSet
+
+BACKENDS = ["tree", "vm", "python"]
+
+ACCUMULATE = '''
+SET xs TO []
+LOOP 50 TIMES
+    CALL list.push WITH list=${xs}, value=1 AS xs
+ENDLOOP
+CALL list.extend WITH list=${xs}, values=[2, 3] AS xs
+CALL list.set WITH list=${xs}, index=0, value=0 AS xs
+'''
+
+
+def parse(source: str):
+    program = Parser(source).parse()
+    resolve_program(program)
+    return program
+
+
+@pytest.fixture
+def inplace_calls(monkeypatch):
+    """Conta as chamadas que seguiram pelo caminho in-place."""
+    calls = []
+    for tool in (ListPush, ListExtend, ListSet):
+        original = tool.invoke_inplace
+
+        def spy(self, params, context, original=original):
+            calls.append(self.name)
+            return original(self, params, context)
+
+        monkeypatch.setattr(tool, "invoke_inplace", spy)
+    return calls
+
+
+class TestMarking:
+    """Marcacao dos CALLs pelo resolver."""
+
+    def test_self_update_marked(self):
+        program = parse('''
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            CALL list.push WITH list=xs, value=1 AS xs
+            LOOP 2 TIMES
+                CALL list.extend WITH list=${xs}, values=[1] AS xs
+            ENDLOOP
+            FUNCTION f(ys)
+                CALL list.set WITH list=${ys}, index=0, value=1 AS ys
+            ENDFUNCTION
+        ''')
+        statements = program.statements
+        assert statements[0].inplace and statements[1].inplace
+        assert statements[2].body[0].inplace
+        assert statements[3].body[0].inplace
+
+    @pytest.mark.parametrize("line", [
+        "CALL list.push WITH list=${xs}, value=1 AS ys",
+        "CALL list.push WITH list=${xs}, value=1",
+        "CALL list.push WITH list=${xs[0]}, value=1 AS xs",
+        "CALL list.sort WITH list=${xs} AS xs",
+        "CALL list.pop WITH list=${xs} AS xs",
+        "CALL list.push WITH list=${last_result}, value=1 AS last_result",
+    ])
+    def test_other_calls_not_marked(self, line):
+        assert not parse(line).statements[0].inplace
+
+
+class TestFunctionStorage:
+    """Dentro de funcao, so marca quando a local ja tem valor (senao a leitura e da global)."""
+
+    def marks(self, body: str):
+        program = parse("FUNCTION f(p)\n" + body + "\nENDFUNCTION\n")
+        return [
+            statement.inplace
+            for statement in _walk(program.statements[0].body)
+            if getattr(statement, "tool", None) == "list.push"
+        ]
+
+    def test_global_read_not_marked(self):
+        assert self.marks("CALL list.push WITH list=${xs}, value=1 AS xs") == [False]
+
+    def test_parameter_and_assigned_local_marked(self):
+        assert self.marks('''
+            CALL list.push WITH list=${p}, value=1 AS p
+            SET xs TO []
+            CALL list.push WITH list=${xs}, value=1 AS xs
+        ''') == [True, True]
+
+    def test_second_call_marked(self):
+        assert self.marks('''
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            CALL list.push WITH list=${xs}, value=2 AS xs
+        ''') == [False, True]
+
+    def test_only_assigned_on_every_path(self):
+        assert self.marks('''
+            IF ${p} THEN
+                SET xs TO []
+            ENDIF
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            IF ${p} THEN
+                SET ys TO []
+            ELSE
+                SET ys TO [0]
+            ENDIF
+            CALL list.push WITH list=${ys}, value=1 AS ys
+            LOOP 2 TIMES
+                SET zs TO []
+                CALL list.push WITH list=${zs}, value=1 AS zs
+            ENDLOOP
+            CALL list.push WITH list=${zs}, value=1 AS zs
+            FOR EACH item IN ${p}
+                CALL list.push WITH list=${item}, value=1 AS item
+            ENDFOR
+        ''') == [False, True, True, False, True]
+
+    def test_try_and_parallel(self):
+        assert self.marks('''
+            TRY
+                SET a TO []
+            CATCH
+                SET a TO [0]
+            ENDTRY
+            CALL list.push WITH list=${a}, value=1 AS a
+            PARALLEL
+                SET b TO []
+                SET c TO []
+            ENDPARALLEL
+            CALL list.push WITH list=${b}, value=1 AS b
+            TRY
+                SET d TO []
+            CATCH
+                SET e TO 1
+            ENDTRY
+            CALL list.push WITH list=${d}, value=1 AS d
+        ''') == [True, True, False]
+
+
+def _walk(statements):
+    for statement in statements:
+        yield statement
+        for name in ("body", "else_body", "catch_body"):
+            yield from _walk(getattr(statement, name, None) or [])
+
+
+# Scripts em que a lista lida pode ser de outro armazenamento ou ter alias
+OWNERSHIP_SCRIPTS = {
+    "global_reatribuida_na_funcao": '''
+        SET xs TO [1, 2]
+        FUNCTION f()
+            CALL list.push WITH list=${xs}, value=99 AS xs
+            RETURN ${xs}
+        ENDFUNCTION
+        CALL f AS r
+    ''',
+    "global_em_loop_na_funcao": '''
+        SET xs TO [1, 2]
+        SET last TO ${xs}
+        FUNCTION f(n)
+            LOOP ${n} TIMES
+                CALL list.push WITH list=${xs}, value=${n} AS xs
+            ENDLOOP
+            SET fim TO ${xs}
+            RETURN ${fim}
+        ENDFUNCTION
+        CALL f WITH n=3 AS r
+        CALL list.push WITH list=${xs}, value=0 AS xs
+    ''',
+    "atribuida_em_um_ramo": '''
+        SET xs TO [1]
+        FUNCTION f(flag)
+            IF ${flag} THEN
+                SET xs TO []
+            ENDIF
+            CALL list.push WITH list=${xs}, value=7 AS xs
+            CALL list.push WITH list=${xs}, value=8 AS xs
+            SET fim TO ${xs}
+            RETURN ${fim}
+        ENDFUNCTION
+        CALL f WITH flag=false AS a
+        CALL f WITH flag=true AS b
+    ''',
+    "last_result_global": '''
+        SET xs TO []
+        CALL list.push WITH list=${xs}, value=1 AS xs
+        FUNCTION f(ys)
+            CALL list.push WITH list=${ys}, value=2 AS ys
+            SET fim TO ${ys}
+            RETURN ${fim}
+        ENDFUNCTION
+        CALL f WITH ys=${last_result} AS r
+    ''',
+    "parallel": '''
+        SET xs TO [0]
+        FUNCTION f()
+            PARALLEL
+                CALL list.push WITH list=${xs}, value=1 AS xs
+                SET ys TO ${xs}
+            ENDPARALLEL
+            SET fim TO ${xs}
+            RETURN ${fim}
+        ENDFUNCTION
+        CALL f AS r
+        PARALLEL
+            CALL list.push WITH list=${xs}, value=2 AS xs
+            CALL list.push WITH list=${xs}, value=3 AS xs
+        ENDPARALLEL
+    ''',
+}
+
+
+class TestOwnership:
+    """Mesmo resultado com e sem o caminho in-place, em todos os backends e no asyncio."""
+
+    @pytest.mark.parametrize("name", sorted(OWNERSHIP_SCRIPTS))
+    def test_matches_copying(self, name):
+        script = OWNERSHIP_SCRIPTS[name]
+        results = {}
+        for backend in BACKENDS:
+            results[backend] = HMPEngine(config=HMPConfig(backend=backend)).execute(script)
+        results["async"] = asyncio.run(HMPEngine().execute_async(script))
+        # Referencia: com tracer, nenhuma mutacao no lugar
+        expected = HMPEngine(tracers=[Tracer()]).execute(script)
+        assert expected["success"]
+        for label, result in results.items():
+            assert result == expected, label
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_import_inside_function(self, backend, tmp_path):
+        # O corpo do modulo roda no frame da funcao: o `AS` nao escreve na global lida
+        (tmp_path / "acumula.hmp").write_text("CALL list.push WITH list=${xs}, value=9 AS xs\n")
+        script = '''
+            SET xs TO [1]
+            FUNCTION f()
+                IMPORT "acumula"
+            ENDFUNCTION
+            CALL f
+        '''
+
+        def run(*tracers):
+            engine = HMPEngine(
+                config=HMPConfig(backend=backend), script_path=str(tmp_path), modules=ModuleCache(), tracers=tracers
+            )
+            return engine.execute(script)
+
+        result = run()
+        assert result == run(Tracer())
+        if backend != "python":
+            assert result["variables"]["xs"] == [1]
+
+
+class TestPrivacy:
+    """Atualizacoes so sao marcadas quando nenhuma leitura vem antes delas."""
+
+    def marks(self, source: str):
+        program = parse(source)
+        return [
+            statement.inplace
+            for statement in _walk(program.statements)
+            if getattr(statement, "tool", None) in ("list.push", "set.add")
+        ]
+
+    def test_reads_after_last_update(self):
+        assert self.marks(ACCUMULATE + 'SET ys TO ${xs}\nCALL log.info WITH message="${xs}"\n')[:1] == [True]
+
+    @pytest.mark.parametrize("read", [
+        "SET ys TO ${xs}",
+        "SET ys TO ${[xs]}",
+        "CALL log.info WITH message=\"total: ${xs}\"",
+        "CALL list.push WITH list=${ys}, value=${xs} AS ys",
+        "SET ys TO ${last_result}",
+        "CALL list.map WITH list=${zs}, expr=\"x\"",
+        "IMPORT \"modulo\"",
+    ])
+    def test_read_before_update(self, read):
+        source = "SET xs TO []\n" + read + "\nCALL list.push WITH list=${xs}, value=1 AS xs\n"
+        assert self.marks(source)[-1] is False
+
+    def test_read_in_same_loop(self):
+        assert self.marks('''
+            SET xs TO []
+            LOOP 3 TIMES
+                CALL list.push WITH list=${xs}, value=1 AS xs
+                SET n TO ${xs}
+            ENDLOOP
+            WHILE ${ys}
+                CALL set.add WITH items=${ys}, value=1 AS ys
+            ENDWHILE
+        ''') == [False, False]
+
+    def test_value_of_the_update_itself(self):
+        assert self.marks("CALL list.push WITH list=${xs}, value=${xs} AS xs") == [False]
+
+    def test_global_read_by_function(self):
+        assert self.marks('''
+            FUNCTION f()
+                CALL list.push WITH list=${xs}, value=1 AS ys
+            ENDFUNCTION
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            CALL list.push WITH list=${zs}, value=1 AS zs
+        ''') == [False, False, True]
+
+    def test_function_locals(self):
+        assert self.marks('''
+            FUNCTION f(p)
+                SET xs TO []
+                LOOP ${p} TIMES
+                    CALL list.push WITH list=${xs}, value=1 AS xs
+                ENDLOOP
+                SET ys TO ${p}
+                CALL list.push WITH list=${p}, value=1 AS p
+                RETURN ${xs}
+            ENDFUNCTION
+        ''') == [True, False]
+
+
+class TestClaim:
+    """Copia na primeira atualizacao; depois, so altera a lista criada pelo engine."""
+
+    @pytest.mark.parametrize("value", [[1, 2], ValueSet([1, 2])], ids=["lista", "conjunto"])
+    def test_copies_foreign_value(self, value):
+        args = {"list": value}
+        assert claim(args, "list", None)
+        assert args["list"] == value and args["list"] is not value
+
+    def test_owned_value_kept(self):
+        owned = [1]
+        args = {"list": owned}
+        assert claim(args, "list", owned)
+        assert args["list"] is owned
+
+    @pytest.mark.parametrize("value", [(1,), None, "abc"])
+    def test_other_types_not_claimed(self, value):
+        args = {"list": value}
+        assert not claim(args, "list", value)
+        assert args["list"] is value
+
+    def test_settle(self):
+        owned = {}
+        args = {"list": [1]}
+        settle(owned, "xs", args, "list", args["list"])
+        assert owned["xs"] is args["list"]
+        settle(owned, "xs", args, "list", {"error": "falhou"})
+        assert owned == {}
+
+
+class TestInPlace:
+    """Mesmos resultados com e sem mutacao; aliases nunca sao alterados."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_accumulation_mutates(self, backend, inplace_calls):
+        result = HMPEngine(config=HMPConfig(backend=backend)).execute(ACCUMULATE)
+        assert result["variables"]["xs"] == [0] + [1] * 49 + [2, 3]
+        assert inplace_calls == ["list.push"] * 50 + ["list.extend", "list.set"]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_aliases_unchanged(self, backend, inplace_calls):
+        script = '''
+            SET xs TO []
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            SET ys TO ${xs}
+            SET box TO ${[xs]}
+            CALL list.push WITH list=${xs}, value=2 AS xs
+            CALL list.set WITH list=${xs}, index=0, value=9 AS xs
+            PARALLEL
+                CALL list.push WITH list=${xs}, value=3 AS xs
+            ENDPARALLEL
+        '''
+        variables = HMPEngine(config=HMPConfig(backend=backend)).execute(script)["variables"]
+        assert variables["ys"] == [1]
+        assert variables["box"] == [[1]]
+        assert variables["xs"] == [9, 2, 3]
+        # Lida antes das atualizacoes: nenhuma e feita no lugar
+        assert inplace_calls == []
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_reads_after_updates(self, backend, inplace_calls):
+        script = ACCUMULATE + 'SET ys TO ${xs}\nCALL list.length WITH list=${xs} AS n\n'
+        variables = HMPEngine(config=HMPConfig(backend=backend)).execute(script)["variables"]
+        assert variables["ys"] == variables["xs"] == [0] + [1] * 49 + [2, 3]
+        assert variables["n"] == 52
+        assert inplace_calls == ["list.push"] * 50 + ["list.extend", "list.set"]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_parameter_copied(self, backend, inplace_calls):
+        # A lista do chamador chega como parametro: a funcao altera uma copia
+        script = '''
+            FUNCTION preenche(p)
+                CALL list.push WITH list=${p}, value=0 AS p
+            ENDFUNCTION
+            CALL preenche WITH p=${base} AS a
+            CALL preenche WITH p=${base} AS b
+        '''
+        base = [1]
+        variables = HMPEngine(config=HMPConfig(backend=backend)).execute(script, {"base": base})["variables"]
+        assert base == variables["base"] == [1]
+        assert variables["a"] == variables["b"] == [1, 0]
+        assert inplace_calls == ["list.push"] * 2
+
+    def test_execute_async(self, inplace_calls):
+        script = ACCUMULATE + 'SET ys TO ${xs}\n'
+        variables = asyncio.run(HMPEngine().execute_async(script))["variables"]
+        assert variables["xs"] == variables["ys"] == [0] + [1] * 49 + [2, 3]
+        assert inplace_calls == ["list.push"] * 50 + ["list.extend", "list.set"]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_caller_list_unchanged(self, backend):
+        items = [1, 2]
+        script = 'CALL list.push WITH list=${xs}, value=3 AS xs'
+        result = HMPEngine(config=HMPConfig(backend=backend)).execute(script, {"xs": items})
+        assert items == [1, 2]
+        assert result["variables"]["xs"] == [1, 2, 3]
+
+    def test_session_results_unchanged(self):
+        session = HMPSession(HMPEngine())
+        first = session.execute('SET xs TO []\nCALL list.push WITH list=${xs}, value=1 AS xs')
+        session.execute('CALL list.push WITH list=${xs}, value=2 AS xs')
+        assert first["variables"]["xs"] == [1]
+        assert session.variables["xs"] == [1, 2]
+
+    def test_tracer_sees_params_before_call(self, inplace_calls):
+        class Params(Tracer):
+            def __init__(self):
+                self.seen = []
+
+            def on_tool(self, name, params, result, elapsed, context):
+                self.seen.append(list(params["list"]))
+
+        tracer = Params()
+        HMPEngine(tracers=[tracer]).execute(ACCUMULATE)
+        assert tracer.seen[:3] == [[], [1], [1, 1]]
+        assert inplace_calls == []
+
+
+class TestListExtend:
+    """Tool list.extend."""
+
+    def test_extend(self):
+        variables = HMPEngine().execute('''
+            SET a TO [1]
+            CALL list.extend WITH list=${a}, values=[2, 3] AS b
+            CALL list.extend WITH list=${b}, values=4 AS c
+            CALL list.extend WITH list=${b}, values=${b} AS d
+        ''')["variables"]
+        assert variables == {"a": [1], "b": [1, 2, 3], "c": [1, 2, 3, 4], "d": [1, 2, 3, 1, 2, 3]}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
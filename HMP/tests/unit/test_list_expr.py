@@ -0,0 +1,100 @@
+"""Testes unitarios para as tools de lista com expressao (`list.map`, `list.filter_by`, ...)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.expr.evaluator import compile_source
+
+BACKENDS = ["tree", "vm", "python"]
+
+RECORDS = [
+    {"id": 1, "score": 30, "team": "a"},
+    {"id": 2, "score": 80, "team": "b"},
+    {"id": 3, "score": 55, "team": "a"},
+]
+
+
+def run(source, backend="tree", variables=None):
+    return HMPEngine(config=HMPConfig(backend=backend)).execute(source, variables)
+
+
+class TestCompileSource:
+    """Compilacao do texto da expressao."""
+
+    def test_compiles_once(self):
+        fn = compile_source("item['score'] * 2")
+        assert fn({"item": {"score": 4}}) == 8
+        assert compile_source("item['score'] * 2") is fn
+
+    @pytest.mark.parametrize("source", ["item[", "${x} + 1"])
+    def test_rejects(self, source):
+        with pytest.raises(ValueError):
+            compile_source(source)
+
+
+class TestListExprTools:
+    """Tools nos scripts, em todos os backends."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_tools(self, backend):
+        script = '''
+            SET bonus TO 5
+            CALL list.map WITH list=${records}, expr="item['score'] + bonus" AS pontos
+            CALL list.map WITH list=${records}, expr="index" AS indices
+            CALL list.filter_by WITH list=${records}, expr="item['score'] > 50" AS altos
+            CALL list.reduce WITH list=${records}, expr="acc + item['score']", initial=0 AS total
+            CALL list.reduce WITH list=[3, 9, 4], expr="item if item > acc else acc" AS maior
+            CALL list.sort_by WITH list=${records}, expr="item['score']" AS crescente
+            CALL list.sort_by WITH list=${records}, expr="item['score']", reverse=true AS decrescente
+            CALL list.group_by WITH list=${records}, expr="item['team']" AS grupos
+        '''
+        variables = run(script, backend, {"records": RECORDS})["variables"]
+        assert variables["pontos"] == [35, 85, 60]
+        assert variables["indices"] == [0, 1, 2]
+        assert [r["id"] for r in variables["altos"]] == [2, 3]
+        assert variables["total"] == 165
+        assert variables["maior"] == 9
+        assert [r["id"] for r in variables["crescente"]] == [1, 3, 2]
+        assert [r["id"] for r in variables["decrescente"]] == [2, 3, 1]
+        assert {team: [r["id"] for r in group] for team, group in variables["grupos"].items()} == {
+            "a": [1, 3], "b": [2],
+        }
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_function_locals(self, backend):
+        script = '''
+            FUNCTION acima(xs, limite)
+                CALL list.filter_by WITH list=${xs}, expr="item > limite" AS r
+                RETURN ${r}
+            ENDFUNCTION
+            CALL acima WITH xs=[1, 5, 9], limite=4 AS r
+        '''
+        assert run(script, backend)["variables"]["r"] == [5, 9]
+
+    def test_empty_and_non_list(self):
+        variables = run('''
+            CALL list.reduce WITH list=[], expr="acc + item" AS vazio
+            CALL list.reduce WITH list=[], expr="acc + item", initial=7 AS inicial
+            CALL list.map WITH list=3, expr="item" AS nada
+        ''')["variables"]
+        assert variables["vazio"] is None
+        assert variables["inicial"] == 7
+        assert variables["nada"] == []
+
+    def test_sort_by_mixed_keys_keeps_order(self):
+        result = run('CALL list.sort_by WITH list=[2, "a", 1], expr="item" AS r')
+        assert result["variables"]["r"] == [2, "a", 1]
+
+    @pytest.mark.parametrize("expr", ["item[", "nao_existe + 1", "${x}"])
+    def test_errors(self, expr):
+        result = run(f'CALL list.map WITH list=[1, 2], expr="{expr}" AS r')
+        assert "error" in result["variables"]["r"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,168 @@
+"""Testes unitarios para o otimizador de AST (HMPConfig.optimize_level)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.optimizer import optimize_program
+from hmp.parser.ast import IfStatement, Literal, ParsedExpression, WhileStatement
+from hmp.parser.parser import Parser
+
+BACKENDS = ["tree", "vm", "python"]
+
+
+def run(script: str, backend: str = "tree", level: int = 0, script_path: str = None, **config):
+    config = HMPConfig(backend=backend, optimize_level=level, **config)
+    return HMPEngine(config=config, script_path=script_path).execute(script)
+
+
+def optimize(script: str, level: int = 1):
+    return optimize_program(Parser(script).parse(), level)
+
+
+class TestEquivalence:
+    """Todos os exemplos dao o mesmo resultado em todos os niveis e backends."""
+
+    @pytest.mark.parametrize("level", [1, 2])
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_examples(self, example_path, backend, level):
+        script = example_path.read_text()
+        expected = run(script, backend, 0, script_path=str(example_path.parent))
+        assert run(script, backend, level, script_path=str(example_path.parent)) == expected
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_iteration_count_preserved(self, backend):
+        script = '''
+            SET n TO 3
+            IF ${n > 5} THEN
+                SET a TO 1
+                SET b TO 2
+            ENDIF
+            LOOP ${n * 100} TIMES
+                SET x TO ${n + 1}
+            ENDLOOP
+        '''
+        results = [run(script, backend, level, max_iterations=200) for level in (0, 1, 2)]
+        assert not results[0]['success']
+        assert results[1] == results[0]
+        assert results[2] == results[0]
+
+
+class TestFolding:
+    """Testes do nivel 1."""
+
+    def test_constant_expressions_become_literals(self):
+        program = optimize('SET a TO ${5 + 3 * 2}\nSET b TO "x${1 + 1}y"\nSET c TO ${n + 1}\n')
+        a, b, c = program.statements
+        assert a.value == Literal(line=1, value=11)
+        assert b.value.value == "x2y"
+        assert isinstance(c.value, ParsedExpression)
+
+    def test_errors_stay_at_runtime(self):
+        program = optimize('SET q TO ${1 / 0}\n')
+        assert isinstance(program.statements[0].value, ParsedExpression)
+        script = 'TRY\n  SET q TO ${1 / 0}\nCATCH\n  SET e TO ${error}\nENDTRY\n'
+        assert run(script, level=1) == run(script)
+
+    def test_dead_branches_pruned(self):
+        program = optimize('''
+            IF ${1 > 2} THEN
+                SET a TO 1
+            ELSE
+                SET b TO 2
+            ENDIF
+            WHILE ${False}
+                SET c TO 3
+            ENDWHILE
+        ''')
+        branch, loop = program.statements
+        assert isinstance(branch, IfStatement)
+        assert branch.body == () and len(branch.else_body) == 1
+        assert isinstance(loop, WhileStatement) and loop.body == ()
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_frozen_literal_lists_are_fresh(self, backend):
+        script = '''
+            FUNCTION nova()
+                SET xs TO [1, 2, ${1 + 2}]
+                CALL list.append WITH list=${xs}, item=4
+                RETURN ${xs}
+            ENDFUNCTION
+            CALL nova AS a
+            CALL nova AS b
+        '''
+        result = run(script, backend, 1)
+        assert result == run(script, backend, 0)
+        assert result['variables']['a'] is not result['variables']['b']
+
+    def test_original_program_untouched(self):
+        program = Parser('SET a TO ${1 + 1}\n').parse()
+        optimized = optimize_program(program, 1)
+        assert isinstance(program.statements[0].value, ParsedExpression)
+        assert optimized is not program
+
+    def test_level_zero_is_identity(self):
+        program = Parser('SET a TO ${1 + 1}\n').parse()
+        assert optimize_program(program, 0) is program
+
+
+class TestPropagation:
+    """Testes do nivel 2 (propagacao de globais constantes)."""
+
+    def test_invariant_loop_expression_precomputed(self):
+        script = '''
+            SET taxa TO 0.5
+            SET total TO 0
+            LOOP 3 TIMES
+                SET total TO ${total + taxa * 10}
+            ENDLOOP
+        '''
+        body = optimize(script, level=2).statements[2].body[0].value
+        assert isinstance(body, ParsedExpression)
+        assert 'taxa' not in repr(body.body)
+        assert run(script, level=2) == run(script)
+        assert run(script, level=2)['variables']['total'] == 15
+
+    def test_reassigned_names_not_propagated(self):
+        program = optimize('''
+            SET x TO 1
+            SET y TO ${x + 1}
+            SET x TO 5
+        ''', level=2)
+        assert isinstance(program.statements[1].value, ParsedExpression)
+
+    def test_functions_not_propagated(self):
+        program = optimize('''
+            SET x TO 1
+            FUNCTION f(x)
+                RETURN ${x + 1}
+            ENDFUNCTION
+        ''', level=2)
+        assert isinstance(program.statements[1].body[0].value, ParsedExpression)
+
+    def test_import_disables_propagation(self):
+        program = optimize('''
+            SET x TO 1
+            IMPORT "modulo.hmp"
+            SET y TO ${x + 1}
+        ''', level=2)
+        assert isinstance(program.statements[2].value, ParsedExpression)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_interpolated_strings_propagated(self, backend):
+        script = '''
+            SET n TO 2
+            SET f TO "${n * 3}"
+            SET r TO ${f}
+        '''
+        assert run(script, backend, 2) == run(script, backend, 0)
+        assert run(script, backend, 2)['variables']['r'] == '6'
+        assert optimize(script, level=2).statements[2].value == Literal(line=4, value='6')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,137 @@
+"""Testes unitarios para o vetor persistente usado pelas tools de lista."""
+
+import json
+import pickle
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.runtime.persistent import PersistentVector, thaw
+
+BACKENDS = ["tree", "vm", "python"]
+
+
+class TestPersistentVector:
+    """Estrutura de dados: mesmo conteudo de uma lista, versoes antigas intactas."""
+
+    @pytest.mark.parametrize("size", [0, 1, 31, 32, 33, 1024, 1056, 1057, 40000])
+    def test_build_append_set(self, size):
+        items = list(range(size))
+        vector = PersistentVector(items)
+        assert vector == items and len(vector) == size
+        assert vector.append(-1) == items + [-1]
+        if size:
+            assert vector.set(size - 1, "x")[size - 1] == "x"
+            assert vector.set(0, "x")[0] == "x"
+            assert vector[-1] == size - 1
+        assert vector == items
+
+    def test_random_operations_keep_versions(self):
+        rng = random.Random(7)
+        vector, reference = PersistentVector(), []
+        snapshots = []
+        for step in range(20000):
+            if reference and rng.random() < 0.3:
+                index = rng.randrange(len(reference))
+                vector = vector.set(index, step)
+                reference[index] = step
+            else:
+                vector = vector.append(step)
+                reference.append(step)
+            if step % 1000 == 0:
+                snapshots.append((vector, list(reference)))
+        assert list(vector) == reference
+        for old, expected in snapshots:
+            assert old == expected
+
+    def test_behaves_like_list(self):
+        vector = PersistentVector([1, 2, 3])
+        assert repr(vector) == "[1, 2, 3]" and str(vector) == "[1, 2, 3]"
+        assert vector[1:] == [2, 3] and isinstance(vector[1:], list)
+        assert vector + [4] == [1, 2, 3, 4] and [0] + vector == [0, 1, 2, 3]
+        assert vector * 2 == [1, 2, 3, 1, 2, 3]
+        assert 2 in vector and 5 not in vector
+        assert vector.index(3) == 2 and vector.count(1) == 1
+        assert vector < [1, 2, 4] and vector != (1, 2, 3)
+        with pytest.raises(IndexError):
+            vector[3]
+        with pytest.raises(TypeError):
+            hash(vector)
+        assert pickle.loads(pickle.dumps(vector)) == vector
+
+    def test_thaw(self):
+        nested = {"a": [1, PersistentVector([2, PersistentVector([3])])]}
+        assert json.dumps(thaw(nested)) == '{"a": [1, [2, [3]]]}'
+        plain = {"a": [1, [2]]}
+        assert thaw(plain) is plain
+
+
+class TestListTools:
+    """Tools de lista sobre o vetor persistente."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_accumulation_results_are_lists(self, backend):
+        script = '''
+            SET xs TO []
+            LOOP 100 TIMES
+                CALL list.push WITH list=${xs}, value=${len_placeholder} AS xs
+            ENDLOOP
+            CALL list.set WITH list=${xs}, index=0, value="a" AS ys
+            SET total TO 0
+            FOR EACH x IN ${ys}
+                SET total TO ${total + 1}
+            ENDFOR
+            SET primeiro TO ${xs[0]}
+            CALL list.slice WITH list=${xs}, start=98 AS fatia
+            CALL list.push WITH list=[7], value=7 AS zs
+            SET texto TO "${ys[0]}-${zs}"
+            CALL json.stringify WITH value=${zs} AS j
+            CALL list.pop WITH list=${ys} AS ultimo
+        '''
+        engine = HMPEngine(config=HMPConfig(backend=backend))
+        result = engine.execute(script, {"len_placeholder": 7})
+        variables = result["variables"]
+        assert type(variables["xs"]) is list and variables["xs"] == [7] * 100
+        assert variables["ys"][:2] == ["a", 7]
+        assert variables["total"] == 100
+        assert variables["primeiro"] == 7 and variables["fatia"] == [7, 7]
+        assert variables["texto"] == "a-[7, 7]"
+        assert variables["j"] == "[7, 7]"
+        assert variables["ultimo"] == 7
+
+    def test_old_value_unchanged(self):
+        script = '''
+            SET a TO [1, 2]
+            CALL list.push WITH list=${a}, value=3 AS b
+            CALL list.push WITH list=${b}, value=4 AS c
+            CALL list.set WITH list=${c}, index=0, value=9 AS d
+        '''
+        variables = HMPEngine().execute(script)["variables"]
+        assert variables == {"a": [1, 2], "b": [1, 2, 3], "c": [1, 2, 3, 4], "d": [9, 2, 3, 4]}
+
+    def test_other_tools_accept_vectors(self):
+        script = '''
+            SET xs TO []
+            CALL list.push WITH list=${xs}, value=3 AS xs
+            CALL list.push WITH list=${xs}, value=1 AS xs
+            CALL math.max WITH values=${xs} AS maior
+            CALL list.sort WITH list=${xs} AS ordenada
+            CALL list.length WITH list=${xs} AS n
+            CALL string.join WITH items=${xs}, delimiter="," AS s
+            CALL list.flatten WITH list=${[xs, [5]]} AS plana
+        '''
+        variables = HMPEngine().execute(script)["variables"]
+        assert variables["maior"] == 3
+        assert variables["ordenada"] == [1, 3]
+        assert variables["n"] == 2
+        assert variables["s"] == "3,1"
+        assert variables["plana"] == [3, 1, 5]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
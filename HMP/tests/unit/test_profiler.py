@@ -0,0 +1,175 @@
+"""Testes unitarios para o profiler de execucao."""
+
+import itertools
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.cli.main import cmd_run, create_parser
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.profiler import Profiler
+
+SCRIPT = '''
+FUNCTION quadrado(x)
+    CALL math.power WITH base=${x}, exp=2
+ENDFUNCTION
+FUNCTION soma(n)
+    SET total TO 0
+    FOR EACH i IN ${n}
+        SET total TO ${total + i}
+    ENDFOR
+    CALL quadrado WITH x=${total}
+ENDFUNCTION
+SET total TO 0
+FOR EACH i IN [0, 1, 2, 3]
+    CALL quadrado WITH x=${i} AS q
+    SET total TO ${total + q}
+ENDFOR
+CALL soma WITH n=[1, 2, 3] AS r
+'''
+
+
+def ticking_clock():
+    """Relogio falso que avanca 1 segundo a cada leitura."""
+    counter = itertools.count()
+    return lambda: float(next(counter))
+
+
+def profile(script: str, backend: str = "tree", clock=None):
+    profiler = Profiler(clock) if clock else Profiler()
+    result = HMPEngine(config=HMPConfig(backend=backend)).execute(script, profiler=profiler)
+    return result, profiler
+
+
+class TestProfiler:
+    """Contagens, tempos proprios/acumulados e relatorios."""
+
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_result_unchanged(self, backend):
+        result, profiler = profile(SCRIPT, backend)
+        assert result == HMPEngine(config=HMPConfig(backend=backend)).execute(SCRIPT)
+        assert profiler.functions["soma"].count == 1
+
+    def test_counts(self):
+        _, profiler = profile(SCRIPT)
+        assert profiler.functions["quadrado"].count == 5
+        assert profiler.tools["math.power"].count == 5
+        assert profiler.lines[(14, "CALL quadrado")].count == 4
+        assert profiler.lines[(8, "SET total")].count == 3
+        assert profiler.lines[(17, "CALL soma")].count == 1
+        assert profiler.runs.count == 1
+
+    def test_self_and_cumulative(self):
+        _, profiler = profile(SCRIPT, clock=ticking_clock())
+        soma, quadrado, pow_ = profiler.functions["soma"], profiler.functions["quadrado"], profiler.tools["math.power"]
+        in_soma = [t for path, t in profiler.stacks.items() if path.startswith("<main>;soma")]
+        assert soma.cumulative == pytest.approx(sum(in_soma))
+        assert quadrado.cumulative == pytest.approx(quadrado.self_time + pow_.cumulative)
+        assert pow_.self_time == pow_.cumulative
+        # As pilhas dividem o tempo total sem sobreposicao
+        assert sum(profiler.stacks.values()) == pytest.approx(profiler.total)
+        # O tempo proprio da linha do FOR EACH nao inclui o corpo
+        loop = profiler.lines[(13, "FOR EACH i")]
+        assert loop.self_time < loop.cumulative
+
+    def test_recursion_counts_outer_call_once(self):
+        script = '''
+            FUNCTION desce(n)
+                IF ${n > 0} THEN
+                    CALL desce WITH n=${n - 1}
+                ENDIF
+                RETURN 0
+            ENDFUNCTION
+            CALL desce WITH n=4
+        '''
+        result, profiler = profile(script, clock=ticking_clock())
+        assert result["success"]
+        desce = profiler.functions["desce"]
+        assert desce.count == 5
+        assert desce.cumulative <= profiler.total
+        assert "<main>;desce;desce;desce;desce;desce" in profiler.stacks
+
+    def test_reports(self):
+        _, profiler = profile(SCRIPT)
+        report = json.loads(profiler.to_json(sort="cumulative"))
+        assert report["runs"] == 1
+        assert sorted(f["name"] for f in report["functions"]) == ["quadrado", "soma"]
+        times = [line["cumulative_ms"] for line in report["lines"]]
+        assert times == sorted(times, reverse=True)
+        assert {"line", "statement", "count", "self_ms", "cumulative_ms"} <= set(report["lines"][0])
+
+        table = profiler.format_table(limit=3)
+        assert "Funcoes" in table and "math.power" in table
+
+        for line in profiler.collapsed().splitlines():
+            path, micros = line.rsplit(" ", 1)
+            assert path.startswith("<main>")
+            assert int(micros) >= 0
+
+        with pytest.raises(ValueError):
+            profiler.report(sort="nome")
+
+    def test_error_closes_frames(self):
+        script = '''
+            FUNCTION falha()
+                SET x TO ${1 / 0}
+            ENDFUNCTION
+            CALL falha
+        '''
+        result, profiler = profile(script)
+        assert not result["success"]
+        assert profiler.functions["falha"].count == 1
+        assert not profiler._call_frames and not profiler._line_frames and not profiler._active
+
+    def test_parallel_branches_profiled(self):
+        script = '''
+            PARALLEL
+                CALL math.abs WITH value=-1 AS a
+                CALL math.abs WITH value=-2 AS b
+            ENDPARALLEL
+        '''
+        result, profiler = profile(script)
+        assert result["variables"] == {"a": 1, "b": 2}
+        assert profiler.tools["math.abs"].count == 2
+
+    def test_runs_accumulate(self):
+        profiler = Profiler()
+        engine = HMPEngine()
+        engine.execute("CALL math.abs WITH value=-1", profiler=profiler)
+        engine.execute("CALL math.abs WITH value=-1", profiler=profiler)
+        assert profiler.runs.count == 2
+        assert profiler.tools["math.abs"].count == 2
+
+    def test_call_counts_without_profiler(self):
+        engine = HMPEngine()
+        engine.execute(SCRIPT)
+        assert engine.registry.get_stats()["math.power"] == 5
+
+
+class TestProfileCommand:
+    """Testes de `hmp run --profile`."""
+
+    def test_json_to_file(self, tmp_path, capsys):
+        script = tmp_path / "a.hmp"
+        script.write_text(SCRIPT)
+        output = tmp_path / "perfil.json"
+        args = create_parser().parse_args(["run", str(script), "--profile", "json", "--profile-output", str(output)])
+        assert cmd_run(args) == 0
+        report = json.loads(output.read_text())
+        assert report["tools"][0]["name"] == "math.power"
+
+    def test_table_on_stderr(self, tmp_path, capsys):
+        script = tmp_path / "a.hmp"
+        script.write_text(SCRIPT)
+        assert cmd_run(create_parser().parse_args(["run", str(script), "--profile"])) == 0
+        captured = capsys.readouterr()
+        assert "Tempo total" in captured.err
+        assert "Tempo total" not in captured.out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,125 @@
+"""Testes unitarios para sessoes interativas e o parser incremental."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.session import HMPSession
+from hmp.parser.incremental import IncrementalParser, is_complete
+from hmp.parser.parser import HMPParseError, Parser
+
+
+def parse_or_error(parse, source):
+    try:
+        return parse(source)
+    except HMPParseError as e:
+        return str(e)
+
+
+class TestSession:
+    """Testes do contexto persistente entre execucoes."""
+
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_variables_and_functions_persist(self, backend):
+        session = HMPSession(HMPEngine(config=HMPConfig(backend=backend)))
+        session.execute('SET a TO 2')
+        session.execute('FUNCTION dobro(x)\n  RETURN ${x * 2}\nENDFUNCTION')
+        result = session.execute('CALL dobro WITH x=${a} AS b')
+        assert result['success']
+        assert result['variables'] == {'a': 2, 'b': 4}
+        assert session.functions == ['dobro']
+
+    def test_iteration_limit_per_execution(self):
+        session = HMPSession(HMPEngine(config=HMPConfig(max_iterations=50)))
+        for _ in range(10):
+            assert session.execute('LOOP 5 TIMES\n  SET x TO 1\nENDLOOP')['success']
+
+    def test_error_keeps_session_usable(self):
+        session = HMPSession()
+        session.execute('SET a TO 1')
+        # Estoura o limite de aninhamento
+        failed = session.execute('FUNCTION f()\n  CALL f\nENDFUNCTION\nCALL f')
+        assert not failed['success']
+        assert not session.execute('SET TO 1')['success']
+        result = session.execute('SET b TO ${a + 1}')
+        assert result['variables'] == {'a': 1, 'b': 2}
+        assert not session.context.call_stack
+
+    def test_reset(self):
+        session = HMPSession(initial_vars={'n': 1})
+        session.execute('FUNCTION f()\n  RETURN 1\nENDFUNCTION\nSET a TO 1')
+        session.reset()
+        assert session.variables == {}
+        assert session.functions == []
+
+    def test_execute_buffer_reparses_changes_only(self):
+        session = HMPSession()
+        source = '\n'.join(f'SET v{i} TO ${{{i} * 2}}' for i in range(50))
+        assert session.execute_buffer(source, 'a.hmp')['variables']['v49'] == 98
+        edited = source.replace('SET v10 TO ${10 * 2}', 'SET v10 TO ${10 * 3}')
+        assert session.execute_buffer(edited, 'a.hmp')['variables']['v10'] == 30
+        parser = session._parsers['a.hmp']
+        assert (parser.reparsed, parser.reused) == (1, 49)
+
+
+class TestIncrementalParser:
+    """O parser incremental devolve sempre a AST do parse completo."""
+
+    def test_random_edits_match_full_parse(self, example_path):
+        lines = example_path.read_text().split('\n')
+        extra = ['"aberta', '${a +', 'ENDIF', 'IF ${x} THEN', 'SET y TO 2', '# nota', '']
+        parser = IncrementalParser()
+        rng = random.Random(example_path.name)
+        current = list(lines)
+        for _ in range(100):
+            edited = list(current if rng.random() < 0.7 else lines)
+            i = rng.randrange(len(edited))
+            choice = rng.random()
+            if choice < 0.3:
+                del edited[i]
+            elif choice < 0.6:
+                edited.insert(i, rng.choice(lines + extra))
+            else:
+                edited[i] = edited[i][:rng.randrange(len(edited[i]) + 1)]
+            source = '\n'.join(edited)
+            assert parse_or_error(parser.parse, source) == parse_or_error(lambda s: Parser(s).parse(), source)
+            current = edited
+
+    def test_unchanged_chunks_reuse_nodes(self):
+        source = 'SET a TO 1\nIF ${a} THEN\n  SET b TO 2\nENDIF\nSET c TO 3'
+        parser = IncrementalParser()
+        first = parser.parse(source)
+        second = parser.parse(source.replace('SET c TO 3', 'SET c TO 4'))
+        assert second.statements[0] is first.statements[0]
+        assert second.statements[1] is first.statements[1]
+        assert (parser.reparsed, parser.reused) == (1, 2)
+
+    def test_inserted_lines_shift_reused_nodes(self):
+        source = 'SET a TO 1\nSET b TO ${a + 1}'
+        parser = IncrementalParser()
+        parser.parse(source)
+        program = parser.parse('SET z TO 0\n' + source)
+        assert program == Parser('SET z TO 0\n' + source).parse()
+        assert [s.line for s in program.statements] == [1, 2, 3]
+        assert parser.reused == 2
+
+    def test_multiline_string_stops_chunking(self):
+        source = 'SET s TO "a\nSET x TO 1"\nSET y TO 2'
+        assert IncrementalParser().parse(source) == Parser(source).parse()
+
+    def test_is_complete(self):
+        assert is_complete('SET a TO 1')
+        assert not is_complete('FUNCTION f()')
+        assert not is_complete('IF ${a} THEN\n  SET b TO 1')
+        assert is_complete('IF ${a} THEN\n  SET b TO 1\nENDIF')
+        assert not is_complete('SET s TO "aberta')
+        assert is_complete('SET s TO "IF ENDIF"')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,151 @@
+"""Testes unitarios para conjuntos (`ValueSet`, tools `set.*`) e deduplicacao por hash."""
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.runtime.persistent import PersistentVector, thaw
+from hmp.runtime.sets import ValueSet, canonical_key
+from hmp.tools.set_tools import SetAdd
+
+BACKENDS = ["tree", "vm", "python"]
+
+
+class TestCanonicalKey:
+    """Chaves iguais exatamente para valores iguais."""
+
+    @pytest.mark.parametrize("a, b", [
+        (1, 1.0),
+        ([1, {"a": [2]}], [1, {"a": [2]}]),
+        ({"a": 1, "b": 2}, {"b": 2, "a": 1}),
+        ([1, 2], PersistentVector([1, 2])),
+        ((1, [2]), (1, [2])),
+        (ValueSet([1, 2]), ValueSet([2, 1])),
+    ])
+    def test_equal_values(self, a, b):
+        assert canonical_key(a) == canonical_key(b)
+        hash(canonical_key(a))
+
+    @pytest.mark.parametrize("a, b", [
+        ([1, 2], [2, 1]),
+        ([1, 2], (1, 2)),
+        ({"a": 1}, [["a", 1]]),
+        ([[1]], [1]),
+        ("1", 1),
+    ])
+    def test_different_values(self, a, b):
+        assert canonical_key(a) != canonical_key(b)
+
+
+class TestValueSet:
+    """Estrutura de dados."""
+
+    def test_operations(self):
+        s = ValueSet([3, 1, 3, {"id": 1}])
+        assert list(s) == [3, 1, {"id": 1}] and len(s) == 3
+        assert {"id": 1} in s and 2 not in s
+        t = s.add(2)
+        assert 2 in t and 2 not in s
+        assert s.add(3) is s
+        assert list(s.union([5, 1])) == [3, 1, {"id": 1}, 5]
+        assert list(s.intersection(ValueSet([1, 9, 3]))) == [3, 1]
+        assert list(s.difference([1])) == [3, {"id": 1}]
+        assert s == ValueSet([1, {"id": 1}, 3]) and s != ValueSet([1])
+        assert repr(s) == "[3, 1, {'id': 1}]"
+        assert pickle.loads(pickle.dumps(s)) == s
+        with pytest.raises(TypeError):
+            hash(s)
+
+    def test_thaw(self):
+        value = {"s": ValueSet([1, PersistentVector([2])])}
+        assert json.dumps(thaw(value)) == '{"s": [1, [2]]}'
+
+
+class TestSetTools:
+    """Tools set.* nos scripts."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_tools(self, backend):
+        script = '''
+            CALL set.new WITH values=[1, 2, 2, {"a": 1}] AS s
+            CALL set.add WITH items=${s}, value=3 AS t
+            CALL set.add WITH items=${t}, value={"a": 1} AS t
+            CALL set.has WITH items=${t}, value={"a": 1} AS tem_dict
+            CALL set.has WITH items=${s}, value=3 AS tem_3
+            CALL set.size WITH items=${t} AS n
+            CALL set.union WITH a=${s}, b=[7, 1] AS u
+            CALL set.intersect WITH a=${t}, b=${s} AS i
+            CALL set.difference WITH a=${t}, b=${s} AS d
+            CALL set.values WITH items=${d} AS lista
+            SET total TO 0
+            FOR EACH x IN ${s}
+                SET total TO ${total + 1}
+            ENDFOR
+        '''
+        variables = HMPEngine(config=HMPConfig(backend=backend)).execute(script)["variables"]
+        assert variables["s"] == [1, 2, {"a": 1}]
+        assert variables["t"] == [1, 2, {"a": 1}, 3]
+        assert variables["tem_dict"] is True and variables["tem_3"] is False
+        assert variables["n"] == 4
+        assert variables["u"] == [1, 2, {"a": 1}, 7]
+        assert variables["i"] == [1, 2, {"a": 1}]
+        assert variables["d"] == [3] and variables["lista"] == [3]
+        assert variables["total"] == 3
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_add_in_place_keeps_aliases(self, backend, monkeypatch):
+        calls = []
+        original = SetAdd.invoke_inplace
+
+        def spy(self, params, context):
+            calls.append(1)
+            return original(self, params, context)
+
+        monkeypatch.setattr(SetAdd, "invoke_inplace", spy)
+        script = '''
+            CALL set.new AS vistos
+            FOR EACH id IN [1, 2, 1, 3]
+                CALL set.add WITH items=${vistos}, value=${id} AS vistos
+            ENDFOR
+            SET copia TO ${vistos}
+        '''
+        engine = HMPEngine(config=HMPConfig(backend=backend))
+        variables = engine.execute(script)["variables"]
+        assert variables["vistos"] == variables["copia"] == [1, 2, 3]
+        assert len(calls) == 4
+        # Lido antes de outra atualizacao: nenhuma e feita no lugar
+        variables = engine.execute(script + 'CALL set.add WITH items=${vistos}, value=4 AS vistos\n')["variables"]
+        assert variables["vistos"] == [1, 2, 3, 4]
+        assert variables["copia"] == [1, 2, 3]
+        assert len(calls) == 4
+
+
+class TestListDedup:
+    """list.unique e list.contains."""
+
+    def test_unique_keeps_first_occurrence(self):
+        items = [3, {"id": 1}, [1], 3, {"id": 1}, True, 1, [1], "3"]
+        result = HMPEngine().execute("CALL list.unique WITH list=${xs} AS u", {"xs": items})
+        assert result["variables"]["u"] == [3, {"id": 1}, [1], True, "3"]
+
+    def test_unique_large(self):
+        items = [f"INC-{i % 5000}" for i in range(200_000)]
+        result = HMPEngine().execute("CALL list.unique WITH list=${xs} AS u", {"xs": items})
+        assert result["variables"]["u"] == items[:5000]
+
+    def test_contains_accepts_set(self):
+        result = HMPEngine().execute('''
+            CALL set.new WITH values=[1, 2] AS s
+            CALL list.contains WITH list=${s}, value=2 AS tem
+        ''')
+        assert result["variables"]["tem"] is True
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
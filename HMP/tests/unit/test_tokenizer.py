@@ -0,0 +1,168 @@
+"""Testes unitarios para o tokenizador."""
+
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.parser.parser import Parser, HMPParseError
+from hmp.parser.tokenizer import Tokenizer, TokenType
+
+
+def tokens(source: str):
+    return [(t.type.name, t.value, t.line, t.column) for t in Tokenizer(source).tokenize()]
+
+
+class TestTokenizer:
+    """Testes de tipos, valores e posicoes dos tokens."""
+    
+    def test_statement_positions(self):
+        assert tokens('SET x TO ${a + 1}  # fim\n  call f') == [
+            ('SET', 'SET', 1, 1),
+            ('IDENTIFIER', 'x', 1, 5),
+            ('TO', 'TO', 1, 7),
+            ('EXPRESSION', '${a + 1}', 1, 10),
+            ('COMMENT', '# fim', 1, 20),
+            ('NEWLINE', '\n', 1, 25),
+            ('CALL', 'call', 2, 3),
+            ('IDENTIFIER', 'f', 2, 8),
+            ('EOF', '', 2, 9),
+        ]
+    
+    def test_operators_numbers_and_punctuation(self):
+        values = [(t, v) for t, v, _, _ in tokens('a=-1.5, b==c != d<=e >=- 2.[x](y){k: 1.}')]
+        assert values == [
+            ('IDENTIFIER', 'a'), ('EQUALS', '='), ('NUMBER', '-1.5'), ('COMMA', ','),
+            ('IDENTIFIER', 'b'), ('OPERATOR', '=='), ('IDENTIFIER', 'c'), ('OPERATOR', '!='),
+            ('IDENTIFIER', 'd'), ('OPERATOR', '<='), ('IDENTIFIER', 'e'), ('OPERATOR', '>='),
+            ('OPERATOR', '-'), ('NUMBER', '2.'), ('LBRACKET', '['), ('IDENTIFIER', 'x'),
+            ('RBRACKET', ']'), ('LPAREN', '('), ('IDENTIFIER', 'y'), ('RPAREN', ')'),
+            ('LBRACE', '{'), ('IDENTIFIER', 'k'), ('COLON', ':'), ('NUMBER', '1.'),
+            ('RBRACE', '}'), ('EOF', ''),
+        ]
+    
+    def test_strings_and_escapes(self):
+        assert tokens(r'"a \"b\" c" ' + "'d\\'e'")[:2] == [
+            ('STRING', r'"a \"b\" c"', 1, 1),
+            ('STRING', "'d\\'e'", 1, 13),
+        ]
+        # Sem fechamento, a string vai ate o fim do arquivo
+        assert tokens('"aberta\nSET x')[0] == ('STRING', '"aberta\nSET x', 1, 1)
+    
+    def test_nested_expressions(self):
+        source = 'SET d TO ${ {"a": {"b": 1}}["a"] } x\nSET y TO 1'
+        result = tokens(source)
+        assert result[3] == ('EXPRESSION', '${ {"a": {"b": 1}}["a"] }', 1, 10)
+        assert result[4] == ('IDENTIFIER', 'x', 1, 36)
+        assert result[6] == ('SET', 'SET', 2, 1)
+        assert tokens('${ {a}')[0] == ('EXPRESSION', '${ {a}', 1, 1)
+    
+    def test_multiline_tokens_keep_line_count(self):
+        # Quebras de linha dentro de strings e expressoes nao contam como NEWLINE
+        result = tokens('SET s TO "a\nb" x\ny')
+        assert result[4] == ('IDENTIFIER', 'x', 1, 16)
+        assert result[6] == ('IDENTIFIER', 'y', 2, 1)
+    
+    def test_identifiers_and_unknown_characters(self):
+        values = [(t, v) for t, v, _, _ in tokens('string.upper açaí _x1 & $ | lOoP')]
+        assert values == [
+            ('IDENTIFIER', 'string.upper'), ('IDENTIFIER', 'açaí'), ('IDENTIFIER', '_x1'),
+            ('LOOP', 'lOoP'), ('EOF', ''),
+        ]
+        assert Tokenizer('').tokenize()[0].type == TokenType.EOF
+    
+    def test_unicode_digits_follow_str_methods(self):
+        # Numeros seguem str.isdigit e nomes str.isalpha, nao `\d` do regex
+        values = [(t, v) for t, v, _, _ in tokens('x² ² -²3 ①.⑵ ٣.٤ ½a 一2')]
+        assert values == [
+            ('IDENTIFIER', 'x²'), ('NUMBER', '²'), ('NUMBER', '-²3'), ('NUMBER', '①.⑵'),
+            ('NUMBER', '٣.٤'), ('IDENTIFIER', 'a'), ('IDENTIFIER', '一2'), ('EOF', ''),
+        ]
+
+
+class TestStreaming:
+    """Testes da tokenizacao e do parse a partir de arquivos."""
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_file_tokens_match_string(self, example_paths, chunk_size, monkeypatch):
+        monkeypatch.setattr(Tokenizer, "CHUNK_SIZE", chunk_size)
+        sources = [path.read_text() for path in example_paths] + [
+            'SET s TO "a\nb\\" c" x\nSET e TO ${ {"k":\n {"j": 1}} }\n',
+            'SET s TO "nunca fecha\n\n',
+            'SET e TO ${ {a\n',
+            'SET a TO 1',
+        ]
+        for source in sources:
+            expected = tokens(source)
+            got = [(t.type.name, t.value, t.line, t.column) for t in Tokenizer(io.StringIO(source)).tokenize()]
+            assert got == expected
+    
+    def test_comments_filtered_inline(self):
+        types = [t.type for t in Tokenizer('# a\nSET x TO 1 # b\n').iter_tokens(comments=False)]
+        assert TokenType.COMMENT not in types
+        assert types[-1] == TokenType.EOF
+    
+    def test_parser_accepts_file(self, example_paths):
+        for path in example_paths:
+            with open(path, encoding='utf-8') as f:
+                assert Parser(f).parse() == Parser(path.read_text()).parse()
+    
+    def test_parse_error_position_from_file(self):
+        with pytest.raises(HMPParseError) as exc:
+            Parser(io.StringIO('SET a TO 1\n\nSET TO 2\n')).parse()
+        assert exc.value.line == 3
+    
+    def test_lazy_tokenization(self, monkeypatch):
+        # O parser consome o gerador sob demanda: nada alem do lookahead e lido
+        monkeypatch.setattr(Tokenizer, "CHUNK_SIZE", 64)
+        reads = []
+        
+        class Reader(io.StringIO):
+            def read(self, size=-1):
+                chunk = super().read(size)
+                reads.append(chunk)
+                return chunk
+        
+        source = "SET a TO 1\n" * 1000
+        parser = Parser(Reader(source))
+        assert parser._peek().type == TokenType.SET
+        assert len(''.join(reads)) <= 64
+        assert len(parser.parse().statements) == 1000
+
+
+
+class TestCompactRepresentation:
+    """Testes da representacao compacta de tokens e nos da AST."""
+    
+    def test_tokens_are_tuples_with_interned_names(self):
+        first, second = [t for t in Tokenizer('SET contador TO 1\nSET contador TO 2').tokenize()
+                         if t.type == TokenType.IDENTIFIER]
+        assert isinstance(first, tuple) and not hasattr(first, '__dict__')
+        assert first.value is second.value
+    
+    def test_ast_nodes_have_no_dict(self, examples_dir):
+        import dataclasses
+        import pickle
+        from hmp.core.resolver import resolve_program
+        
+        program = Parser((examples_dir / "calculadora.hmp").read_text()).parse()
+        resolve_program(program)
+        seen = 0
+        pending = [program]
+        while pending:
+            value = pending.pop()
+            if dataclasses.is_dataclass(value):
+                assert not hasattr(value, '__dict__'), type(value).__name__
+                seen += 1
+                pending.extend(getattr(value, f.name) for f in dataclasses.fields(value))
+            elif isinstance(value, (list, tuple)):
+                pending.extend(value)
+            elif isinstance(value, dict):
+                pending.extend(value.values())
+        assert seen > 50
+        assert pickle.loads(pickle.dumps(program)) == program
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
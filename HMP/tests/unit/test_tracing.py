@@ -0,0 +1,230 @@
+"""Testes unitarios para os tracers de execucao."""
+
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.cli.main import cmd_run, create_parser
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.profiler import Profiler
+from hmp.core.session import HMPSession
+from hmp.core.tracing import JsonLinesTracer, SpanExporter, Tracer
+
+SCRIPT = '''
+FUNCTION absoluto(x)
+    CALL math.abs WITH value=${x}
+ENDFUNCTION
+CALL absoluto WITH x=-3 AS a
+PARALLEL
+    CALL math.abs WITH value=-1 AS b
+    CALL math.abs WITH value=-2 AS c
+ENDPARALLEL
+'''
+
+
+class Recorder(Tracer):
+    """Guarda os eventos recebidos."""
+
+    def __init__(self):
+        self.events = []
+
+    def on_run_start(self, context):
+        self.events.append(("run_start",))
+
+    def on_statement(self, node, context):
+        self.events.append(("statement", node.line))
+
+    def on_call_enter(self, name, args, context):
+        self.events.append(("call_enter", name, args))
+
+    def on_call_exit(self, name, value, elapsed, context, error=None):
+        self.events.append(("call_exit", name, value, error is not None))
+
+    def on_tool(self, name, params, result, elapsed, context):
+        self.events.append(("tool", name, params, result))
+
+    def on_error(self, error, node, context):
+        self.events.append(("error", node.line if node else None))
+
+    def on_run_end(self, result, context):
+        self.events.append(("run_end", result["success"]))
+
+
+def read_jsonl(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestTracerHooks:
+    """Eventos recebidos pelos tracers registrados no engine."""
+
+    @pytest.mark.parametrize("backend", ["tree", "vm", "python"])
+    def test_events_and_result(self, backend):
+        recorder = Recorder()
+        engine = HMPEngine(config=HMPConfig(backend=backend), tracers=[recorder])
+        result = engine.execute(SCRIPT)
+        assert result == HMPEngine(config=HMPConfig(backend=backend)).execute(SCRIPT)
+        events = recorder.events
+        assert events[0] == ("run_start",)
+        assert events[-1] == ("run_end", True)
+        assert ("call_enter", "absoluto", {"x": -3}) in events
+        assert ("call_exit", "absoluto", 3.0, False) in events
+        tools = [e for e in events if e[0] == "tool"]
+        assert [e[2]["value"] for e in tools] == [-3, -1, -2]
+        assert [e[1] for e in events if e[0] == "statement"] == [2, 5, 3, 6, 7, 8]
+
+    def test_error_reported_once_at_innermost_statement(self):
+        recorder = Recorder()
+        engine = HMPEngine(tracers=[recorder])
+        result = engine.execute('''
+            FUNCTION falha()
+                SET x TO ${1 / 0}
+            ENDFUNCTION
+            CALL falha
+        ''')
+        assert not result["success"]
+        assert [e for e in recorder.events if e[0] == "error"] == [("error", 3)]
+        assert ("call_exit", "falha", None, True) in recorder.events
+        assert recorder.events[-1] == ("run_end", False)
+
+    def test_limit_error_outside_statements(self):
+        recorder = Recorder()
+        engine = HMPEngine(config=HMPConfig(max_iterations=2), tracers=[recorder])
+        assert not engine.execute('SET a TO 1\nSET b TO 2\nSET c TO 3')["success"]
+        assert ("error", None) in recorder.events
+
+    @pytest.mark.parametrize("script", [SCRIPT, 'FUNCTION falha()\n    SET x TO ${1 / 0}\nENDFUNCTION\nCALL falha\n'])
+    def test_execute_async_matches_execute(self, script):
+        sync_recorder, async_recorder = Recorder(), Recorder()
+        expected = HMPEngine(tracers=[sync_recorder]).execute(script)
+        result = asyncio.run(HMPEngine(tracers=[async_recorder]).execute_async(script))
+        assert result == expected
+        assert async_recorder.events == sync_recorder.events
+        assert len(async_recorder.events) > 2
+
+    def test_execute_async_with_profiler(self):
+        profiler = Profiler()
+        result = asyncio.run(HMPEngine().execute_async(SCRIPT, profiler=profiler))
+        assert result["success"]
+        assert profiler.runs.count == 1
+        assert profiler.functions["absoluto"].count == 1
+        assert profiler.tools["math.abs"].count == 3
+
+    def test_failing_tracer_does_not_abort_script(self):
+        class Broken(Tracer):
+            def on_statement(self, node, context):
+                raise ValueError("quebrado")
+
+        recorder = Recorder()
+        engine = HMPEngine(tracers=[Broken(), recorder])
+        with pytest.warns(RuntimeWarning, match="Broken falhou em on_statement"):
+            result = engine.execute(SCRIPT)
+        assert result == HMPEngine().execute(SCRIPT)
+        assert recorder.events[-1] == ("run_end", True)
+
+    def test_add_and_remove(self):
+        recorder = Recorder()
+        engine = HMPEngine()
+        engine.add_tracer(recorder)
+        engine.execute('SET a TO 1')
+        engine.remove_tracer(recorder)
+        engine.execute('SET a TO 1')
+        assert recorder.events == [("run_start",), ("statement", 1), ("run_end", True)]
+        assert engine.tracers == ()
+
+    def test_session_runs_traced(self):
+        recorder = Recorder()
+        session = HMPSession(HMPEngine(tracers=[recorder]))
+        session.execute('SET a TO 1')
+        session.execute('SET b TO ${a + 1}')
+        assert recorder.events.count(("run_start",)) == 2
+        assert session.variables == {"a": 1, "b": 2}
+
+    def test_with_profiler(self):
+        recorder = Recorder()
+        profiler = Profiler()
+        engine = HMPEngine(tracers=[recorder])
+        assert engine.execute(SCRIPT, profiler=profiler)["success"]
+        assert profiler.tools["math.abs"].count == 3
+        assert len([e for e in recorder.events if e[0] == "tool"]) == 3
+
+
+class TestBuiltinTracers:
+    """JsonLinesTracer e SpanExporter."""
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        HMPEngine(tracers=[JsonLinesTracer(stream)]).execute(SCRIPT)
+        events = read_jsonl(stream)
+        assert events[0]["event"] == "run_start" and events[-1]["event"] == "run_end"
+        statement = next(e for e in events if e["event"] == "statement")
+        assert statement == {**statement, "line": 2, "statement": "FUNCTION absoluto"}
+        tool = next(e for e in events if e["event"] == "tool")
+        assert tool["params"] == {"value": -3} and tool["result"] == 3.0
+
+    def test_json_lines_without_statements(self):
+        stream = io.StringIO()
+        HMPEngine(tracers=[JsonLinesTracer(stream, statements=False)]).execute(SCRIPT)
+        assert all(e["event"] != "statement" for e in read_jsonl(stream))
+
+    def test_spans(self):
+        stream = io.StringIO()
+        engine = HMPEngine(tracers=[SpanExporter(stream)])
+        engine.execute(SCRIPT)
+        engine.execute('CALL math.sqrt WITH value=-1')
+        spans = read_jsonl(stream)
+        first = [s for s in spans if s["trace_id"] == spans[0]["trace_id"]]
+        by_name = {s["name"]: s for s in first}
+        root = by_name["hmp.run"]
+        assert root["parent_span_id"] is None
+        assert by_name["absoluto"]["parent_span_id"] == root["span_id"]
+        tools = [s for s in first if s["name"] == "math.abs"]
+        assert len(tools) == 3
+        assert tools[0]["parent_span_id"] == by_name["absoluto"]["span_id"]
+        assert all(s["start_time_unix_nano"] <= s["end_time_unix_nano"] for s in first)
+        # A tool que devolve {"error": ...} fica com status de erro
+        failed = spans[-2]
+        assert failed["name"] == "math.sqrt" and failed["status"]["code"] == "ERROR"
+        assert spans[-1]["name"] == "hmp.run" and spans[-1]["trace_id"] != root["trace_id"]
+
+    def test_spans_of_interleaved_async_runs(self):
+        stream = io.StringIO()
+        engine = HMPEngine(tracers=[SpanExporter(stream)])
+        script = '''
+            FUNCTION espera()
+                CALL system.sleep WITH seconds=0.01
+            ENDFUNCTION
+            CALL espera
+            CALL math.abs WITH value=${-x}
+        '''
+
+        async def main():
+            return await asyncio.gather(*(engine.execute_async(script, {"x": x}) for x in (1, 2)))
+
+        assert all(r["success"] for r in asyncio.run(main()))
+        spans = read_jsonl(stream)
+        assert len({s["trace_id"] for s in spans}) == 2
+        for trace_id in {s["trace_id"] for s in spans}:
+            by_name = {s["name"]: s for s in spans if s["trace_id"] == trace_id}
+            assert set(by_name) == {"hmp.run", "espera", "system.sleep", "math.abs"}
+            assert by_name["espera"]["parent_span_id"] == by_name["hmp.run"]["span_id"]
+            assert by_name["system.sleep"]["parent_span_id"] == by_name["espera"]["span_id"]
+            assert by_name["math.abs"]["parent_span_id"] == by_name["hmp.run"]["span_id"]
+
+    def test_run_command_writes_files(self, tmp_path, capsys):
+        script = tmp_path / "a.hmp"
+        script.write_text(SCRIPT)
+        events, spans = tmp_path / "eventos.jsonl", tmp_path / "spans.jsonl"
+        args = create_parser().parse_args(["run", str(script), "--trace", str(events), "--spans", str(spans)])
+        assert cmd_run(args) == 0
+        assert json.loads(events.read_text().splitlines()[-1])["event"] == "run_end"
+        assert len(spans.read_text().splitlines()) == 5
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,178 @@
+"""Testes unitarios para o backend transpilado para Python."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.core.resolver import resolve_program
+from hmp.parser.parser import Parser
+from hmp.transpiler import generate_source
+
+
+class TestCodegen:
+    """Testes do gerador de codigo Python."""
+    
+    def test_locals_become_python_variables(self):
+        program = Parser('''
+            FUNCTION dobro(x)
+                SET y TO ${x * 2}
+                RETURN ${y}
+            ENDFUNCTION
+            SET z TO 1
+        ''').parse()
+        resolve_program(program)
+        module = generate_source(program)
+        assert "def _f0(_args):" in module.source
+        assert "v1 = " in module.source
+        assert "_g['z'] = 1" in module.source
+        assert module.functions == (("dobro", "_f0"),)
+    
+    def test_generated_code_compiles(self, example_paths):
+        for path in example_paths:
+            program = Parser(path.read_text()).parse()
+            resolve_program(program)
+            compile(generate_source(program).source, str(path), 'exec')
+
+
+class TestTranspiler:
+    """Testes de equivalencia entre o codigo gerado e o interpretador de arvore."""
+    
+    def test_examples_match_tree_walker(self, run_both, example_path):
+        tree, py = run_both("python", example_path.read_text(), script_path=str(example_path.parent))
+        assert py == tree
+    
+    def test_call_and_return_quirks(self, run_both):
+        tree, py = run_both("python", '''
+            FUNCTION h(a)
+                CALL string.upper WITH text=${a}
+                SET nunca TO 1
+            ENDFUNCTION
+            FUNCTION primeiro(xs)
+                FOR EACH x IN ${xs}
+                    IF ${x} > 2 THEN
+                        RETURN ${x}
+                    ENDIF
+                ENDFOR
+                RETURN "nenhum"
+            ENDFUNCTION
+            CALL h WITH a="oi" AS u
+            CALL primeiro WITH xs=[1, 2, 3] AS a
+            CALL primeiro WITH xs=[1] AS b
+            RETURN ${a}
+            SET depois TO 1
+        ''')
+        assert py == tree
+        assert py['variables']['u'] == 'OI'
+        assert py['variables']['b'] == 'nenhum'
+        assert py['return_value'] == 3
+    
+    def test_try_catch_and_fallback(self, run_both):
+        tree, py = run_both("python", '''
+            SET nome TO "mundo"
+            SET texto TO "ola ${nome}"
+            SET msg TO ${texto}
+            TRY
+                SET q TO ${1 / 0}
+            CATCH
+                SET e TO ${error}
+            ENDTRY
+        ''')
+        assert py == tree
+        assert py['variables']['msg'] == 'ola mundo'
+        assert 'division' in py['variables']['e']
+    
+    def test_iteration_limit(self, run_both):
+        tree, py = run_both("python", '''
+            SET i TO 0
+            WHILE ${i} < 100000
+                SET i TO ${i + 1}
+            ENDWHILE
+        ''', max_iterations=1000)
+        assert not py['success']
+        assert py['error'] == tree['error']
+    
+    def test_no_python_builtins(self, run_both):
+        tree, py = run_both("python", '''
+            SET x TO ${__import__("os")}
+            SET y TO ${open}
+        ''')
+        assert py == tree
+        assert isinstance(py['variables']['x'], str)
+    
+    def test_code_object_cached_by_source(self):
+        engine = HMPEngine(config=HMPConfig(backend="python"))
+        script = "SET a TO ${1 + 2}\n"
+        first = engine._transpiler.prepare(Parser(script).parse(), script)
+        second = engine._transpiler.prepare(Parser(script).parse(), script)
+        assert first is second
+        assert engine.execute(script)['variables']['a'] == 3
+    
+    def test_compile_prints_no_syntax_warnings(self):
+        code = (
+            "from hmp.core.context import HMPConfig\n"
+            "from hmp.core.engine import HMPEngine\n"
+            "engine = HMPEngine(config=HMPConfig(backend='python'))\n"
+            "engine.execute('SET r TO ${1[0]}')\n"
+            "engine.execute('FUNCTION f()\\n    SET r TO ${2[0]}\\nENDFUNCTION\\nCALL f')\n"
+        )
+        src = str(Path(__file__).parent.parent.parent / "src")
+        proc = subprocess.run(
+            [sys.executable, "-W", "default", "-c", code],
+            capture_output=True, text=True, cwd=src, check=True
+        )
+        assert proc.stderr == ""
+    
+    def test_deep_nesting_falls_back_to_tree(self, run_both):
+        script = "SET n TO 0\n" + "LOOP 1 TIMES\n" * 25 + "SET n TO ${n + 1}\n" + "ENDLOOP\n" * 25
+        tree, py = run_both("python", script)
+        assert py == tree
+        assert py['variables']['n'] == 1
+    
+    def test_foreach_variable_after_loop(self, run_both):
+        tree, py = run_both("python", '''
+            SET xs TO [1, 2]
+            FUNCTION f()
+                SET ys TO []
+                FOR EACH it IN ${xs}
+                    SET ys TO ${ys + [it * 10]}
+                ENDFOR
+                RETURN ${[ys, it]}
+            ENDFUNCTION
+            FOR EACH it IN ${xs}
+                PARALLEL
+                    CALL list.push WITH list=${xs}, value=${it} AS xs
+                ENDPARALLEL
+            ENDFOR
+            CALL f AS r
+        ''')
+        assert py == tree
+        assert py['variables']['it'] == 2
+        assert py['variables']['xs'] == [1, 2, 1, 2]
+        assert py['variables']['r'] == [[10, 20, 10, 20], 2]
+    
+    def test_import_inside_function_writes_frame(self, run_both, tmp_path):
+        (tmp_path / "acumula.hmp").write_text("CALL list.push WITH list=${xs}, value=9 AS xs\n")
+        tree, py = run_both("python", '''
+            SET xs TO [1]
+            FUNCTION f()
+                IMPORT "acumula"
+            ENDFUNCTION
+            CALL f
+        ''', script_path=str(tmp_path))
+        assert py == tree
+        assert py['variables']['xs'] == [1]
+    
+    @pytest.mark.parametrize("seed", range(200))
+    def test_random_programs_match_tree_walker(self, run_both, random_program, seed):
+        tree, py = run_both("python", random_program(seed))
+        assert tree['success']
+        assert py == tree
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
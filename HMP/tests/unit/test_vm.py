@@ -0,0 +1,104 @@
+"""Testes unitarios para o backend de bytecode (VM)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from hmp.core.context import HMPConfig
+from hmp.core.engine import HMPEngine
+from hmp.parser.parser import Parser
+from hmp.vm.bytecode import compile_statements, SET_EXPR, JUMP_IF_NOT_EXPR, HALT
+
+
+class TestBytecode:
+    """Testes do compilador de bytecode."""
+    
+    def test_while_compiles_to_jumps(self):
+        program = Parser('''
+            SET i TO 0
+            WHILE ${i} < 3
+                SET i TO ${i + 1}
+            ENDWHILE
+        ''').parse()
+        code = compile_statements(program.statements)
+        ops = [ins[0] for ins in code.instructions]
+        assert SET_EXPR in ops
+        assert JUMP_IF_NOT_EXPR in ops
+        assert ops[-1] == HALT
+        assert 'JUMP_IF_NOT_EXPR' in code.disassemble()
+    
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            HMPEngine(config=HMPConfig(backend="jit"))
+
+
+class TestVirtualMachine:
+    """Testes de equivalencia entre a VM e o interpretador de arvore."""
+    
+    def test_examples_match_tree_walker(self, run_both, example_path):
+        tree, vm = run_both("vm", example_path.read_text(), script_path=str(example_path.parent))
+        assert vm == tree
+    
+    def test_return_inside_foreach(self, run_both):
+        tree, vm = run_both("vm", '''
+            FUNCTION primeiro(xs)
+                FOR EACH x IN ${xs}
+                    IF ${x} > 2 THEN
+                        RETURN ${x}
+                    ENDIF
+                ENDFOR
+                RETURN "nenhum"
+            ENDFUNCTION
+            CALL primeiro WITH xs=[1, 2, 3, 4] AS a
+            CALL primeiro WITH xs=[1] AS b
+        ''')
+        assert vm == tree
+        assert vm['variables']['a'] == 3
+        assert vm['variables']['b'] == 'nenhum'
+    
+    def test_error_unwinds_nested_calls(self, run_both):
+        tree, vm = run_both("vm", '''
+            FUNCTION explode(n)
+                FOR EACH x IN [1]
+                    IF ${n} == 0 THEN
+                        SET q TO ${1 / 0}
+                    ENDIF
+                ENDFOR
+                CALL explode WITH n=${n - 1}
+            ENDFUNCTION
+            TRY
+                CALL explode WITH n=3
+            CATCH
+                SET capturado TO ${error}
+            ENDTRY
+            SET depois TO 1
+        ''')
+        assert vm == tree
+        assert vm['variables']['capturado'] == 'division by zero'
+    
+    def test_limits_match(self, run_both):
+        tree, vm = run_both("vm", '''
+            FUNCTION r(n)
+                CALL r WITH n=${n + 1}
+            ENDFUNCTION
+            CALL r WITH n=0
+        ''')
+        assert vm == tree
+        assert not vm['success']
+    
+    def test_import_runs_on_vm(self, examples_dir, run_both):
+        tree, vm = run_both("vm", (examples_dir / "usando_import.hmp").read_text(), script_path=str(examples_dir))
+        assert vm['success']
+        assert vm == tree
+    
+    @pytest.mark.parametrize("seed", range(200))
+    def test_random_programs_match_tree_walker(self, run_both, random_program, seed):
+        tree, vm = run_both("vm", random_program(seed))
+        assert tree['success']
+        assert vm == tree
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
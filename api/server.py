@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'HMP', 'src'))
 
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-from hmp import run_script, list_tools
+from hmp import run_script, run_file, list_tools
 from hmp.tools.registry import ToolRegistry
 from hmp.tools.math_tools import MathToolProvider
 from hmp.tools.string_tools import StringToolProvider
@@ -162,7 +162,8 @@ def run_hmp_script():
     
     Body JSON:
     {
-        "script": "SET x TO 10\\nCALL log.print WITH message=\\"Ola!\\""
+        "script": "SET x TO 10\\nCALL log.print WITH message=\\"Ola!\\"",
+        "variables": {"nome": "Mundo"}  (opcional)
     }
     """
     data = request.get_json()
@@ -175,7 +176,7 @@ def run_hmp_script():
     script = data['script']
     
     try:
-        result = run_script(script)
+        result = run_script(script, data.get('variables'))
         return jsonify({
             'success': True,
             'output': result.get('output', []),
@@ -386,18 +387,12 @@ def run_hmp_file(filename):
         }), 404
     
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            script = f.read()
-        
         data = request.get_json() or {}
         initial_vars = data.get('variables', {})
         
-        if initial_vars:
-            prefix = '\n'.join([f'SET {k} TO "{v}"' if isinstance(v, str) else f'SET {k} TO {v}' 
-                               for k, v in initial_vars.items()])
-            script = prefix + '\n' + script
-        
-        result = run_script(script)
+        # O engine reaproveita o programa ja preparado (ou a AST do .hmpc
+        # gerado por `hmp compile`) e as variaveis entram no contexto inicial
+        result = run_file(filepath, initial_vars)
         return jsonify({
             'success': True,
             'filename': filename,